@@ -0,0 +1,306 @@
+"""Token-budgeted assembly of the context sent with agent prompts.
+
+An agent prompt carries several optional context sections (selected residues,
+structure summary, current code, pipeline state, uploaded files, recent
+history, RAG examples). Instead of each section applying its own character
+cut, every section is tokenized once and a per-model token budget is handed
+out by priority: the most important sections are kept whole, the next one is
+truncated at a token boundary to whatever is left, and the rest are dropped.
+Sections are then rendered in their declared order, stable sections first,
+so the start of the prompt stays byte-identical between turns and can hit
+provider-side prompt caches.
+
+The rendered context is also cached per session: when a session sends the
+same sections under the same budget, the previous rendering is reused as is.
+
+Environment:
+    CONTEXT_TOKENIZER       "regex" (default, no downloads) or "tiktoken"
+    CONTEXT_MAX_TOKENS      upper bound on a prompt's assembled context
+    CONTEXT_WINDOW_SHARE    fraction of the model's window the context may use
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+CONTEXT_TOKENIZER = os.getenv("CONTEXT_TOKENIZER", "regex").lower()
+CONTEXT_MAX_TOKENS = int(os.getenv("CONTEXT_MAX_TOKENS", "6000"))
+CONTEXT_WINDOW_SHARE = float(os.getenv("CONTEXT_WINDOW_SHARE", "0.25"))
+# Window assumed for models missing from models_config.json
+DEFAULT_CONTEXT_WINDOW = 32768
+# Sessions whose last rendering is kept
+SESSION_CACHE_SIZE = 512
+# Texts whose token count is kept
+TOKEN_COUNT_CACHE_SIZE = 4096
+
+MODELS_CONFIG = Path(__file__).parent.parent / "models_config.json"
+
+SEPARATOR = "\n\n"
+
+# Words, numbers and punctuation runs; approximates BPE pre-tokenization
+_PIECE_RE = re.compile(r"\w+|[^\w\s]+")
+
+
+class RegexTokenizer:
+    """Dependency-free token estimate: one token per ~4 word characters.
+
+    Within a few percent of cl100k-style tokenizers on English and code,
+    which is all a budget needs, and fast because the scan is one regex.
+    """
+
+    name = "regex"
+
+    def measure(self, text: str) -> Tuple[List[int], List[int]]:
+        """Cumulative token counts and the end offset reached at each count."""
+        counts: List[int] = []
+        ends: List[int] = []
+        total = 0
+        for match in _PIECE_RE.finditer(text):
+            total += math.ceil((match.end() - match.start()) / 4)
+            counts.append(total)
+            ends.append(match.end())
+        return counts, ends
+
+
+class TiktokenTokenizer:
+    """Exact counts with tiktoken (the encoding file must be available locally)."""
+
+    name = "tiktoken"
+
+    def __init__(self, encoding: str = "cl100k_base"):
+        import tiktoken
+
+        self._encoding = tiktoken.get_encoding(encoding)
+
+    def measure(self, text: str) -> Tuple[List[int], List[int]]:
+        tokens = self._encoding.encode(text, disallowed_special=())
+        # Character offset reached after each UTF-8 byte of the text
+        char_at: List[int] = [0]
+        for index, char in enumerate(text, 1):
+            char_at.extend([index - 1] * (len(char.encode("utf-8")) - 1) + [index])
+        counts: List[int] = []
+        ends: List[int] = []
+        offset = 0
+        for index, token in enumerate(tokens, 1):
+            offset += len(self._encoding.decode_single_token_bytes(token))
+            counts.append(index)
+            ends.append(char_at[min(offset, len(char_at) - 1)])
+        return counts, ends
+
+
+def _make_tokenizer():
+    if CONTEXT_TOKENIZER == "tiktoken":
+        try:
+            return TiktokenTokenizer()
+        except Exception:
+            pass
+    return RegexTokenizer()
+
+
+tokenizer = _make_tokenizer()
+
+
+# Token counts keyed by a digest of the text, so cached entries stay small
+# however large the texts are; cut offsets are recomputed when truncating.
+_token_counts: "OrderedDict[bytes, int]" = OrderedDict()
+_token_counts_lock = threading.Lock()
+
+
+def count_tokens(text: str) -> int:
+    key = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    with _token_counts_lock:
+        total = _token_counts.get(key)
+        if total is not None:
+            _token_counts.move_to_end(key)
+            return total
+    counts, _ = tokenizer.measure(text)
+    total = counts[-1] if counts else 0
+    with _token_counts_lock:
+        _token_counts[key] = total
+        if len(_token_counts) > TOKEN_COUNT_CACHE_SIZE:
+            _token_counts.popitem(last=False)
+    return total
+
+
+def truncate_tokens(text: str, max_tokens: int, keep: str = "head") -> str:
+    """``text`` cut at a token boundary to at most ``max_tokens`` tokens.
+
+    ``keep="head"`` keeps the beginning, ``"tail"`` the end.
+    """
+    total = count_tokens(text)
+    if total <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+    counts, ends = tokenizer.measure(text)
+    # One token of the budget is left for the ellipsis
+    if keep == "tail":
+        cut = bisect_right(counts, total - max_tokens)  # smallest prefix to drop
+        start = ends[cut] if cut < len(ends) else len(text)
+        return "..." + text[start:].lstrip()
+    cut = bisect_right(counts, max_tokens - 1)  # pieces fully within budget
+    end = ends[cut - 1] if cut else 0
+    return text[:end].rstrip() + "..."
+
+
+@lru_cache(maxsize=None)
+def _context_windows() -> Dict[str, int]:
+    try:
+        with open(MODELS_CONFIG, "r") as f:
+            models = json.load(f).get("models", [])
+    except Exception:
+        return {}
+    return {m["id"]: int(m["context_length"]) for m in models if m.get("id") and m.get("context_length")}
+
+
+def context_budget(model: Optional[str]) -> int:
+    """Tokens of assembled context allowed in one prompt to ``model``."""
+    window = _context_windows().get(model or "", DEFAULT_CONTEXT_WINDOW)
+    return max(256, min(CONTEXT_MAX_TOKENS, int(window * CONTEXT_WINDOW_SHARE)))
+
+
+@dataclass
+class ContextSection:
+    """One block of prompt context.
+
+    Lower ``priority`` values are kept first. A section that cannot get at
+    least ``min_tokens`` is dropped instead of truncated; ``keep`` chooses
+    which end of the text survives truncation.
+    """
+
+    name: str
+    text: str
+    priority: int
+    min_tokens: int = 32
+    keep: str = "head"
+
+
+@dataclass
+class AssembledContext:
+    """Rendered context plus what was kept, truncated and dropped."""
+
+    text: str
+    tokens: int
+    budget: int
+    sections: Dict[str, int] = field(default_factory=dict)
+    truncated: List[str] = field(default_factory=list)
+    dropped: List[str] = field(default_factory=list)
+    cached: bool = False
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "tokens": self.tokens,
+            "budget": self.budget,
+            "sections": self.sections,
+            "truncated": self.truncated,
+            "dropped": self.dropped,
+            "cached": self.cached,
+        }
+
+
+class ContextAssembler:
+    """Allocates a token budget across sections and caches renderings per session."""
+
+    def __init__(self, session_cache_size: int = SESSION_CACHE_SIZE):
+        self.session_cache_size = session_cache_size
+        self._sessions: "OrderedDict[str, Tuple[str, AssembledContext]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def assemble(
+        self,
+        sections: Sequence[ContextSection],
+        budget: int,
+        session_key: Optional[str] = None,
+    ) -> AssembledContext:
+        sections = [s for s in sections if s.text and s.text.strip()]
+        fingerprint = None
+        if session_key:
+            fingerprint = self._fingerprint(sections, budget)
+            with self._lock:
+                hit = self._sessions.get(session_key)
+                if hit is not None and hit[0] == fingerprint:
+                    self._sessions.move_to_end(session_key)
+                    cached = hit[1]
+                    return AssembledContext(
+                        cached.text, cached.tokens, cached.budget,
+                        dict(cached.sections), list(cached.truncated), list(cached.dropped), cached=True,
+                    )
+
+        result = self._allocate(sections, budget)
+        if session_key:
+            with self._lock:
+                self._sessions[session_key] = (fingerprint, result)
+                self._sessions.move_to_end(session_key)
+                while len(self._sessions) > self.session_cache_size:
+                    self._sessions.popitem(last=False)
+        return result
+
+    def _allocate(self, sections: List[ContextSection], budget: int) -> AssembledContext:
+        separator_cost = count_tokens(SEPARATOR) or 1
+        remaining = budget
+        rendered: Dict[int, str] = {}
+        result = AssembledContext(text="", tokens=0, budget=budget)
+        order = sorted(range(len(sections)), key=lambda i: sections[i].priority)
+        for index in order:
+            section = sections[index]
+            cost = count_tokens(section.text) + (separator_cost if rendered else 0)
+            if cost <= remaining:
+                rendered[index] = section.text
+                result.sections[section.name] = cost
+                remaining -= cost
+                continue
+            allowance = remaining - (separator_cost if rendered else 0)
+            if allowance >= section.min_tokens:
+                rendered[index] = truncate_tokens(section.text, allowance, section.keep)
+                result.sections[section.name] = remaining
+                result.truncated.append(section.name)
+                remaining = 0
+            else:
+                result.dropped.append(section.name)
+        result.text = SEPARATOR.join(rendered[i] for i in sorted(rendered))
+        result.tokens = budget - remaining
+        return result
+
+    @staticmethod
+    def _fingerprint(sections: Sequence[ContextSection], budget: int) -> str:
+        digest = hashlib.sha256(str(budget).encode())
+        for s in sections:
+            digest.update(f"\0{s.name}\0{s.priority}\0{s.min_tokens}\0{s.keep}\0".encode())
+            digest.update(s.text.encode("utf-8", errors="replace"))
+        return digest.hexdigest()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._sessions.clear()
+
+
+def fit_history(messages: List[Dict[str, Any]], budget: int) -> List[Dict[str, Any]]:
+    """Most recent chat messages whose content fits in ``budget`` tokens.
+
+    Whole messages are dropped oldest first so roles keep alternating as sent.
+    """
+    kept: List[Dict[str, Any]] = []
+    remaining = budget
+    for message in reversed(messages):
+        cost = count_tokens(str(message.get("content") or "")) + 4  # role/formatting overhead
+        if cost > remaining:
+            break
+        kept.append(message)
+        remaining -= cost
+    kept.reverse()
+    return kept
+
+
+# Shared instance used by the agent runner
+context_assembler = ContextAssembler()
@@ -330,7 +330,7 @@ class AlphaFoldHandler:
                 if pdb_content:
                     # Save PDB file
                     filename = f"alphafold_{job_id}.pdb"
-                    filepath = nims_client.save_pdb_file(pdb_content, filename)
+                    filepath = await nims_client.save_pdb_file_async(pdb_content, filename)
                     
                     # Associate file with session if session_id provided
                     session_id = job_data.get("sessionId")
@@ -534,7 +534,7 @@ class AlphaFoldHandler:
                 if pdb_content:
                     # Save PDB file
                     filename = f"alphafold3_{job_id}.pdb"
-                    filepath = af3_client.save_pdb_file(pdb_content, filename)
+                    filepath = await af3_client.save_pdb_file_async(pdb_content, filename)
                     
                     # Associate file with session if session_id provided
                     session_id = job_data.get("sessionId")
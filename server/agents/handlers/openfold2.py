@@ -20,11 +20,11 @@ if str(_server_dir) not in sys.path:
 
 try:
     from ...tools.nvidia.openfold2_client import OpenFold2Client
-    from ...domain.storage.file_access import save_result_file
+    from ...domain.storage.file_access import save_result_file_async
     from ...domain.storage.session_tracker import associate_file_with_session
 except ImportError:
     from tools.nvidia.openfold2_client import OpenFold2Client
-    from domain.storage.file_access import save_result_file
+    from domain.storage.file_access import save_result_file_async
     from domain.storage.session_tracker import associate_file_with_session
 
 logger = logging.getLogger(__name__)
@@ -198,7 +198,7 @@ class OpenFold2Handler:
 
             filename = f"openfold2_{job_id}.pdb"
             try:
-                stored_path = save_result_file(
+                stored_path = await save_result_file_async(
                     user_id=user_id,
                     file_id=job_id,
                     file_type="openfold2",
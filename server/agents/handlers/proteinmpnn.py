@@ -3,12 +3,11 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
 import os
 import sys
 from pathlib import Path
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 # Ensure server directory is in Python path for imports
 _server_dir = os.path.dirname(os.path.abspath(__file__))
@@ -20,15 +19,55 @@ try:
     from ...tools.nvidia.proteinmpnn import get_proteinmpnn_client, ProteinMPNNClient
     from ...domain.storage.pdb_storage import get_uploaded_pdb, list_uploaded_pdbs
     from ...domain.storage.file_access import list_user_files, get_file_metadata
+    from ...domain.storage.result_storage import (
+        locate_result, logical_name, read_result_json, read_result_text, write_result_json_async,
+        write_result_text_async,
+    )
+    from ...infrastructure.compute import compute_executor
 except ImportError:
     from infrastructure.utils import log_line
     from tools.nvidia.proteinmpnn import get_proteinmpnn_client, ProteinMPNNClient
     from domain.storage.pdb_storage import get_uploaded_pdb, list_uploaded_pdbs
     from domain.storage.file_access import list_user_files, get_file_metadata
+    from domain.storage.result_storage import (
+        locate_result, logical_name, read_result_json, read_result_text, write_result_json_async,
+        write_result_text_async,
+    )
+    from infrastructure.compute import compute_executor
 
 logger = logging.getLogger(__name__)
 
 
+def _parse_mfasta_sequences(mfasta_content: str) -> List[str]:
+    """Extract designed sequences from the NVIDIA ``mfasta`` output."""
+    # Parse FASTA format: extract sequences (lines that don't start with >)
+    parsed_sequences = []
+    current_seq = []
+    for line in mfasta_content.split("\n"):
+        line = line.strip()
+        if line.startswith(">"):
+            # Save previous sequence if we have one
+            if current_seq:
+                seq = "".join(current_seq)
+                # Skip input sequence (usually first one with ">input" header)
+                if not line.startswith(">input"):
+                    # Remove any chain separators (/) and extract just the sequence
+                    clean_seq = seq.split("/")[0] if "/" in seq else seq
+                    if clean_seq and all(c in "ACDEFGHIKLMNPQRSTVWY" for c in clean_seq.upper()):
+                        parsed_sequences.append(clean_seq)
+            current_seq = []
+        elif line:
+            # Accumulate sequence lines
+            current_seq.append(line)
+    # Handle last sequence
+    if current_seq:
+        seq = "".join(current_seq)
+        clean_seq = seq.split("/")[0] if "/" in seq else seq
+        if clean_seq and all(c in "ACDEFGHIKLMNPQRSTVWY" for c in clean_seq.upper()):
+            parsed_sequences.append(clean_seq)
+    return parsed_sequences
+
+
 class ProteinMPNNHandler:
     """Coordinates ProteinMPNN design jobs and persists results."""
 
@@ -52,13 +91,13 @@ class ProteinMPNNHandler:
             if meta and meta.get("file_type") == "rfdiffusion":
                 stored = meta.get("stored_path")
                 if stored:
-                    path = self._base_dir / stored
-                    if path.exists():
+                    path = locate_result(self._base_dir / stored)
+                    if path:
                         return path
             # Then try direct path
             base = self._base_dir / "storage" / user_id / "rfdiffusion_results"
-            candidate = base / f"rfdiffusion_{safe_id}.pdb"
-            if candidate.exists():
+            candidate = locate_result(base / f"rfdiffusion_{safe_id}.pdb")
+            if candidate:
                 return candidate
         # Fallback: legacy global rfdiffusion_results directory
         for base in [
@@ -66,8 +105,8 @@ class ProteinMPNNHandler:
             Path(__file__).parent / "rfdiffusion_results",
             self._base_dir / "rfdiffusion_results",
         ]:
-            candidate = base / f"rfdiffusion_{safe_id}.pdb"
-            if candidate.exists():
+            candidate = locate_result(base / f"rfdiffusion_{safe_id}.pdb")
+            if candidate:
                 return candidate
         raise FileNotFoundError(f"RFdiffusion result for job {source_job_id} not found")
 
@@ -87,7 +126,7 @@ class ProteinMPNNHandler:
             if not source_job_id:
                 raise ValueError("sourceJobId required for RFdiffusion source")
             path = self._resolve_rfdiffusion_path(source_job_id, user_id=user_id)
-            pdb_text = path.read_text()
+            pdb_text = read_result_text(path)
             source_meta = {
                 "type": "rfdiffusion",
                 "job_id": source_job_id,
@@ -145,10 +184,10 @@ class ProteinMPNNHandler:
             ])
             
             for result_dir in search_paths:
-                result_file = result_dir / "result.json"
-                if result_file.exists():
+                result_file = locate_result(result_dir / "result.json")
+                if result_file:
                     try:
-                        data = json.loads(result_file.read_text())
+                        data = read_result_json(result_file)
                         status = data.get("status", "completed")
                         response = {
                             "job_id": job_id,
@@ -159,7 +198,7 @@ class ProteinMPNNHandler:
                             response["error"] = data.get("error")
                         logger.info(f"[ProteinMPNN] Found job status from file system: {job_id} = {status}")
                         return response
-                    except (json.JSONDecodeError, KeyError) as e:
+                    except (ValueError, OSError, RuntimeError, KeyError) as e:
                         logger.warning(f"[ProteinMPNN] Failed to read status from {result_file}: {e}")
                         continue
         
@@ -187,14 +226,14 @@ class ProteinMPNNHandler:
         
         logger.debug(f"[ProteinMPNN] Searching for result {job_id} (user_id={user_id}) in {len(search_paths)} locations")
         for result_dir in search_paths:
-            result_file = result_dir / "result.json"
-            logger.debug(f"[ProteinMPNN] Checking: {result_file} (exists={result_file.exists()})")
-            if result_file.exists():
+            result_file = locate_result(result_dir / "result.json")
+            logger.debug(f"[ProteinMPNN] Checking: {result_dir} (found={result_file})")
+            if result_file:
                 try:
-                    data = json.loads(result_file.read_text())
+                    data = read_result_json(result_file)
                     logger.info(f"[ProteinMPNN] Found result at: {result_file}")
                     return data
-                except json.JSONDecodeError as e:
+                except (ValueError, OSError, RuntimeError) as e:
                     logger.warning(f"[ProteinMPNN] Failed to parse JSON at {result_file}: {e}")
                     continue
         
@@ -202,14 +241,14 @@ class ProteinMPNNHandler:
         return None
 
     def get_result_dir(self, job_id: str, user_id: Optional[str] = None) -> Optional[Path]:
-        """Return the result directory path if it exists."""
+        """Return the result directory if it holds stored results."""
         candidates = []
         if user_id:
             candidates.append(self._base_dir / "storage" / user_id / "proteinmpnn_results" / job_id)
         candidates.append(self._base_dir / "storage" / "system" / "proteinmpnn_results" / job_id)
         candidates.append(self._base_dir / "proteinmpnn_results" / job_id)
         for p in candidates:
-            if p.exists():
+            if locate_result(p / "metadata.json") or locate_result(p / "result.json"):
                 return p
         return None
 
@@ -252,13 +291,17 @@ class ProteinMPNNHandler:
             else:
                 rfdiffusion_dir = None
             if rfdiffusion_dir:
-                for pdb_file in sorted(rfdiffusion_dir.glob("rfdiffusion_*.pdb"), reverse=True):
+                # Plain legacy outputs and compressed ones (rfdiffusion_<id>.pdb.gz)
+                for pdb_file in sorted(rfdiffusion_dir.glob("rfdiffusion_*.pdb*"), reverse=True):
+                    name = logical_name(pdb_file)
+                    if not name.endswith(".pdb"):
+                        continue
                     try:
-                        job_id = pdb_file.stem.replace("rfdiffusion_", "", 1)
+                        job_id = Path(name).stem.replace("rfdiffusion_", "", 1)
                         stat = pdb_file.stat()
                         rfdiffusion_entries.append({
                             "jobId": job_id,
-                            "filename": pdb_file.name,
+                            "filename": name,
                             "path": str(pdb_file),
                             "size": stat.st_size,
                             "modified": stat.st_mtime,
@@ -311,8 +354,8 @@ class ProteinMPNNHandler:
                 job_id = rf_match.group(1)
                 # Check if RFdiffusion result exists
                 rfdiffusion_dir = Path(__file__).parent / "rfdiffusion_results"
-                candidate = rfdiffusion_dir / f"rfdiffusion_{job_id}.pdb"
-                if candidate.exists():
+                candidate = locate_result(rfdiffusion_dir / f"rfdiffusion_{job_id}.pdb")
+                if candidate:
                     pdb_source = "rfdiffusion"
                     source_info = {"jobId": job_id}
             
@@ -409,7 +452,9 @@ class ProteinMPNNHandler:
 
         try:
             user_id = job_data.get("userId", "system")
-            pdb_text, source_meta = self._load_pdb_content(job_data, user_id=user_id)
+            pdb_text, source_meta = await compute_executor.run(
+                self._load_pdb_content, job_data, user_id, kind="thread", label="proteinmpnn_load_pdb"
+            )
             parameters = job_data.get("parameters", {})
             client = self._get_client()
 
@@ -449,7 +494,6 @@ class ProteinMPNNHandler:
             user_id = job_data.get("userId", "system")
             results_dir = self._base_dir / "storage" / user_id / "proteinmpnn_results"
             result_dir = results_dir / job_id
-            result_dir.mkdir(parents=True, exist_ok=True)
             metadata = {
                 "job_id": job_id,
                 "source": source_meta,
@@ -457,7 +501,7 @@ class ProteinMPNNHandler:
                 "result": result,
             }
 
-            (result_dir / "metadata.json").write_text(json.dumps(metadata, indent=2), encoding="utf-8")
+            await write_result_json_async(result_dir / "metadata.json", metadata)
 
             if result.get("status") == "completed":
                 self.active_jobs[job_id] = "completed"
@@ -471,9 +515,7 @@ class ProteinMPNNHandler:
                     "metadata": metadata,
                     "sequences": result.get("sequences", []),
                 }
-                (result_dir / "result.json").write_text(
-                    json.dumps(result, indent=2), encoding="utf-8"
-                )
+                await write_result_json_async(result_dir / "result.json", result)
                 log_line("proteinmpnn_job_completed", {"jobId": job_id, "status": result.get("status"), "num_sequences": len(result.get("sequences", []))})
             else:
                 self.active_jobs[job_id] = result.get("status", "error")
@@ -482,9 +524,7 @@ class ProteinMPNNHandler:
                     "error": result.get("error"),
                     "metadata": metadata,
                 }
-                (result_dir / "result.json").write_text(
-                    json.dumps(result, indent=2), encoding="utf-8"
-                )
+                await write_result_json_async(result_dir / "result.json", result)
                 log_line(
                     "proteinmpnn_job_failed",
                     {"jobId": job_id, "status": result.get("status"), "error": result.get("error")},
@@ -506,39 +546,20 @@ class ProteinMPNNHandler:
         """Save any design artefacts (FASTA, JSON) if present in result."""
         data = result.get("data") or {}
         sequences = None
+        wrote_fasta = False
 
         # First, check for mfasta field (NVIDIA API format)
         if "mfasta" in data and isinstance(data["mfasta"], str):
             mfasta_content = data["mfasta"]
-            # Parse FASTA format: extract sequences (lines that don't start with >)
-            parsed_sequences = []
-            current_seq = []
-            for line in mfasta_content.split("\n"):
-                line = line.strip()
-                if line.startswith(">"):
-                    # Save previous sequence if we have one
-                    if current_seq:
-                        seq = "".join(current_seq)
-                        # Skip input sequence (usually first one with ">input" header)
-                        if not line.startswith(">input"):
-                            # Remove any chain separators (/) and extract just the sequence
-                            clean_seq = seq.split("/")[0] if "/" in seq else seq
-                            if clean_seq and all(c in "ACDEFGHIKLMNPQRSTVWY" for c in clean_seq.upper()):
-                                parsed_sequences.append(clean_seq)
-                    current_seq = []
-                elif line:
-                    # Accumulate sequence lines
-                    current_seq.append(line)
-            # Handle last sequence
-            if current_seq:
-                seq = "".join(current_seq)
-                clean_seq = seq.split("/")[0] if "/" in seq else seq
-                if clean_seq and all(c in "ACDEFGHIKLMNPQRSTVWY" for c in clean_seq.upper()):
-                    parsed_sequences.append(clean_seq)
+            # Parsing large multi-design outputs is CPU work; keep it off the event loop
+            parsed_sequences = await compute_executor.run(
+                _parse_mfasta_sequences, mfasta_content, kind="thread", label="parse_mfasta"
+            )
             if parsed_sequences:
                 sequences = parsed_sequences
                 # Also save the original mfasta as FASTA file
-                (result_dir / "designed_sequences.fasta").write_text(mfasta_content, encoding="utf-8")
+                await write_result_text_async(result_dir / "designed_sequences.fasta", mfasta_content)
+                wrote_fasta = True
 
         # Fallback: Attempt to extract designed sequences from known fields
         if not sequences:
@@ -562,18 +583,18 @@ class ProteinMPNNHandler:
 
         if sequences:
             # If we didn't already write FASTA from mfasta, create it now
-            if not (result_dir / "designed_sequences.fasta").exists():
+            if not wrote_fasta:
                 fasta_lines = []
                 for idx, seq in enumerate(sequences, start=1):
                     header = f">ProteinMPNN_design_{idx}"
                     fasta_lines.append(header)
                     fasta_lines.append(seq)
-                (result_dir / "designed_sequences.fasta").write_text("\n".join(fasta_lines), encoding="utf-8")
+                await write_result_text_async(result_dir / "designed_sequences.fasta", "\n".join(fasta_lines))
             
             # Store sequences in result.json for easy access
             result["sequences"] = sequences
 
-        (result_dir / "raw_data.json").write_text(json.dumps(data, indent=2), encoding="utf-8")
+        await write_result_json_async(result_dir / "raw_data.json", data)
 
 
 proteinmpnn_handler = ProteinMPNNHandler()
@@ -25,13 +25,18 @@ try:
     from ...domain.protein.sequence import SequenceExtractor
     from ...domain.storage.pdb_storage import get_uploaded_pdb
     from ...domain.storage.session_tracker import associate_file_with_session
-    from ...domain.storage.file_access import save_result_file
+    from ...domain.storage.file_access import save_result_file_async
+    from ...domain.storage.result_storage import locate_result, read_result_text
+    from ...infrastructure.compute import compute_executor
 except ImportError:
     # Fallback to absolute import (when running directly)
     from tools.nvidia.rfdiffusion import RFdiffusionClient
     from domain.protein.sequence import SequenceExtractor
     from domain.storage.pdb_storage import get_uploaded_pdb
     from domain.storage.session_tracker import associate_file_with_session
+    from domain.storage.file_access import save_result_file_async
+    from domain.storage.result_storage import locate_result, read_result_text
+    from infrastructure.compute import compute_executor
 
 logger = logging.getLogger(__name__)
 
@@ -343,7 +348,10 @@ class RFdiffusionHandler:
             user_id = job_data.get("userId")
             logger.info(f"Resolving PDB content for job {job_id}, parameters keys: {list(parameters.keys())}, user_id: {user_id}")
             logger.info(f"Parameters uploadId: {parameters.get('uploadId')}, upload_file_id: {parameters.get('upload_file_id')}, pdb_id: {parameters.get('pdb_id')}")
-            pdb_content = self._resolve_pdb_content(parameters, user_id=user_id)
+            # May read an upload from storage or fetch from RCSB; keep it off the event loop
+            pdb_content = await compute_executor.run(
+                self._resolve_pdb_content, parameters, user_id, kind="thread", label="rfdiffusion_resolve_pdb"
+            )
             design_mode = parameters.get("design_mode", "unconditional")
             logger.info(f"PDB resolution result: content_length={len(pdb_content) if pdb_content else 0}, design_mode={design_mode}, has_content={bool(pdb_content)}")
             
@@ -499,7 +507,7 @@ class RFdiffusionHandler:
                     
                     logger.info(f"[RFdiffusion Handler] Using user_id: {user_id} for file save")
                     filename = f"rfdiffusion_{job_id}.pdb"
-                    filepath = save_result_file(
+                    filepath = await save_result_file_async(
                         user_id=user_id,
                         file_id=job_id,
                         file_type="rfdiffusion",
@@ -635,9 +643,9 @@ class RFdiffusionHandler:
                     stored_path = file_metadata.get("stored_path")
                     if stored_path:
                         file_path = base_dir / stored_path
-                        if file_path.exists():
+                        if locate_result(file_path):
                             # Read PDB content
-                            pdb_content = file_path.read_text(encoding="utf-8")
+                            pdb_content = read_result_text(file_path)
                             metadata = file_metadata.get("metadata", {})
                             if isinstance(metadata, str):
                                 import json
@@ -6,10 +6,11 @@ triggered via the chat agent system.
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
 import sys
-from typing import Any, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 # Ensure server directory is in Python path for imports
 _server_dir = os.path.dirname(os.path.abspath(__file__))
@@ -19,11 +20,19 @@ if _server_dir not in sys.path:
 try:
     # Try relative import first (when running as module)
     from ...tools.validation.structure_validator import validate_structure
+    from ...tools.validation.batch_validator import MAX_BATCH_SIZE
     from ...domain.storage.file_access import get_user_file_path
+    from ...domain.storage.result_storage import read_result_text
+    from ...infrastructure.compute import compute_executor
+    from ...infrastructure.instrumentation import span
 except ImportError:
     # Fallback to absolute import (when running directly)
     from tools.validation.structure_validator import validate_structure
+    from tools.validation.batch_validator import MAX_BATCH_SIZE
     from domain.storage.file_access import get_user_file_path
+    from domain.storage.result_storage import read_result_text
+    from infrastructure.compute import compute_executor
+    from infrastructure.instrumentation import span
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +41,10 @@ class ValidationHandler:
     """Handles structure validation requests from the chat agent system."""
 
     async def process_validation_request(
-        self, input_text: str, context: Dict[str, Any] | None = None
+        self,
+        input_text: str,
+        context: Dict[str, Any] | None = None,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
     ) -> Dict[str, Any]:
         """
         Process a validation request.
@@ -49,6 +61,9 @@ class ValidationHandler:
         context : dict, optional
             Keys: current_pdb_content, uploaded_file_context, file_id,
             session_id, user_id.
+        is_disconnected : callable, optional
+            Coroutine function polled while validation runs; validation is
+            abandoned if it returns True (e.g. ``request.is_disconnected``).
 
         Returns
         -------
@@ -66,7 +81,9 @@ class ValidationHandler:
         if file_id and user_id:
             try:
                 file_path = get_user_file_path(file_id, user_id)
-                pdb_content = file_path.read_text()
+                pdb_content = await compute_executor.run(
+                    read_result_text, file_path, kind="thread", label="read_structure_file"
+                )
                 source_label = f"uploaded file ({file_id})"
                 logger.info("Validation: loaded PDB from file_id=%s", file_id)
             except Exception as exc:
@@ -97,9 +114,17 @@ class ValidationHandler:
                 ),
             }
 
-        # Run validation
+        # Run validation on the compute process pool, off the event loop
         try:
-            report = validate_structure(pdb_content)
+            # Timed here: the worker process has its own metrics registry
+            async with span("validate_structure"):
+                report = await compute_executor.run(
+                    validate_structure,
+                    pdb_content,
+                    kind="process",
+                    label="validate_structure",
+                    is_disconnected=is_disconnected,
+                )
             result = report.to_dict()
             result["action"] = "validation_result"
             result["source"] = source_label
@@ -113,6 +138,60 @@ class ValidationHandler:
             logger.error("Validation failed: %s", exc)
             return {"action": "error", "error": str(exc)}
 
+    async def load_batch_structures(
+        self, items: List[Dict[str, Any]], user_id: Optional[str]
+    ) -> List[Tuple[str, str]]:
+        """
+        Resolve batch request items into ``(name, pdb_content)`` pairs.
+
+        Each item carries either ``pdb_content`` or a ``file_id`` owned by the
+        user, plus an optional display ``name``. Files are looked up and read
+        concurrently on the compute thread pool.
+
+        Raises
+        ------
+        ValueError
+            If the batch is empty, too large, or an item cannot be resolved.
+        """
+        if not isinstance(items, list) or not items:
+            raise ValueError("structures must be a non-empty list")
+        if len(items) > MAX_BATCH_SIZE:
+            raise ValueError(f"At most {MAX_BATCH_SIZE} structures can be validated per batch")
+
+        names: List[str] = []
+        contents: List[Optional[str]] = []
+        reads: Dict[int, str] = {}
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                raise ValueError(f"structures[{index}] must be an object")
+            file_id = item.get("file_id")
+            pdb_content = item.get("pdb_content")
+            names.append(str(item.get("name") or file_id or f"structure_{index + 1}"))
+            contents.append(pdb_content)
+            if not pdb_content and file_id and user_id:
+                reads[index] = file_id
+            elif not pdb_content:
+                raise ValueError(f"structures[{index}] needs pdb_content or file_id")
+
+        loaded = await asyncio.gather(
+            *(
+                compute_executor.run(_read_user_file, file_id, user_id, kind="thread", label="read_structure_file")
+                for file_id in reads.values()
+            ),
+            return_exceptions=True,
+        )
+        for (index, file_id), result in zip(reads.items(), loaded):
+            if isinstance(result, BaseException):
+                raise ValueError(f"structures[{index}]: file {file_id} could not be loaded") from result
+            if not result:
+                raise ValueError(f"structures[{index}] needs pdb_content or file_id")
+            contents[index] = result
+        return list(zip(names, contents))
+
+
+def _read_user_file(file_id: str, user_id: str) -> str:
+    return read_result_text(get_user_file_path(file_id, user_id))
+
 
 # Global handler instance
 validation_handler = ValidationHandler()
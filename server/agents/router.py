@@ -1,20 +1,24 @@
 from __future__ import annotations
 
+import asyncio
 import os
 from typing import Any, Dict, List, Optional
 
 try:
-    from langsmith import traceable
+    from ..infrastructure.instrumentation import timed
+    from ..infrastructure.langsmith_config import traceable
 except ImportError:
-    def traceable(*args, **kwargs):
-        def noop(f):
-            return f
-        return noop
+    from infrastructure.instrumentation import timed
+    from infrastructure.langsmith_config import traceable
 
-try:
-    from langchain_openai import OpenAIEmbeddings  # type: ignore
-except Exception:  # pragma: no cover
-    OpenAIEmbeddings = None  # type: ignore
+
+def _load_embeddings_class():
+    """OpenAIEmbeddings, imported on first use (langchain_openai is slow to import)."""
+    try:
+        from langchain_openai import OpenAIEmbeddings  # type: ignore
+    except Exception:  # pragma: no cover
+        return None
+    return OpenAIEmbeddings
 
 
 class SimpleRouterGraph:
@@ -24,6 +28,8 @@ class SimpleRouterGraph:
         self.agent_vecs: Dict[str, List[float]] = {}
         self.threshold = float(0.32)
         self.margin = float(0.05)
+        # Set once ainit has finished; until then routing is rule-based only
+        self.ready = False
 
     async def ainit(self, agents: List[Dict[str, Any]]):
         # Build embedding index using agent descriptions and names
@@ -37,6 +43,10 @@ class SimpleRouterGraph:
             self.agent_texts[key] = text
         # Initialize embeddings only if OPENAI_API_KEY present and library available
         openai_api_key = os.getenv("OPENAI_API_KEY")
+        OpenAIEmbeddings = None
+        if texts and openai_api_key:
+            # Import off the event loop; warmup runs while requests are served
+            OpenAIEmbeddings = await asyncio.to_thread(_load_embeddings_class)
         if texts and OpenAIEmbeddings and openai_api_key:
             try:
                 # Initialize embeddings - will use OPENAI_API_KEY from environment
@@ -58,8 +68,10 @@ class SimpleRouterGraph:
                 print("[RouterGraph] OPENAI_API_KEY not found - using rule-based routing only")
             elif not OpenAIEmbeddings:
                 print("[RouterGraph] OpenAIEmbeddings not available - using rule-based routing only")
+        self.ready = True
 
     @traceable(name="RouterGraph.ainvoke", run_type="chain")
+    @timed("router.ainvoke")
     async def ainvoke(self, state: Dict[str, Any]) -> Dict[str, Any]:
         # Rule-based shortcut: selection present + interrogative → bio-chat
         input_text: str = state.get("input", "") or ""
@@ -7,20 +7,22 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, AsyncGenerator
 
 try:
-    from langsmith import traceable
-except ImportError:
-    def traceable(*args, **kwargs):
-        def noop(f):
-            return f
-        return noop
-
-try:
+    from ..infrastructure.instrumentation import span
+    from ..infrastructure.langsmith_config import traceable
     from ..infrastructure.utils import log_line, get_text_from_completion, strip_code_fences, trim_history, extract_code_and_text
+    from .thinking_steps import ThinkingStepParser
+    from .context_assembler import ContextSection, context_assembler, context_budget, count_tokens, fit_history, truncate_tokens
     from ..infrastructure.safety import violates_whitelist, ensure_clear_on_change
+    from ..infrastructure.llm_cache import llm_response_cache
     from ..domain.protein.uniprot import search_uniprot
 except ImportError:
+    from infrastructure.instrumentation import span
+    from infrastructure.langsmith_config import traceable
     from infrastructure.utils import log_line, get_text_from_completion, strip_code_fences, trim_history, extract_code_and_text
+    from agents.thinking_steps import ThinkingStepParser
+    from agents.context_assembler import ContextSection, context_assembler, context_budget, count_tokens, fit_history, truncate_tokens
     from infrastructure.safety import violates_whitelist, ensure_clear_on_change
+    from infrastructure.llm_cache import llm_response_cache
     from domain.protein.uniprot import search_uniprot
 
 
@@ -110,76 +112,6 @@ def _is_thinking_model(model: str) -> bool:
     return 'thinking' in model_lower
 
 
-def _parse_incremental_thinking_step(accumulated_reasoning: str, current_step: Optional[Dict[str, Any]] = None) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
-    """Parse thinking step incrementally from accumulated reasoning text.
-    
-    Returns:
-        (completed_step, current_step) - completed_step is emitted when a step boundary is detected
-    """
-    if not accumulated_reasoning:
-        return None, current_step
-    
-    lines = accumulated_reasoning.split('\n')
-    completed_step = None
-    new_current = current_step
-    
-    # Look for step boundaries (numbered lists, headers, etc.)
-    for i, line in enumerate(lines):
-        line = line.strip()
-        if not line:
-            continue
-        
-        # Check for step markers
-        step_match = None
-        step_id = None
-        
-        # Numbered list: "1. Step Title" or "1) Step Title"
-        if line and (line[0].isdigit() and (line.startswith(('.', ')')) or (len(line) > 1 and line[1] in ('.', ')')))):
-            if line[0].isdigit():
-                # Extract number
-                num_end = 1
-                while num_end < len(line) and line[num_end].isdigit():
-                    num_end += 1
-                if num_end < len(line) and line[num_end] in ('.', ')'):
-                    step_match = line[num_end + 1:].strip()
-                    step_id = f"step_{line[:num_end]}"
-        
-        # Bullet points: "- Step Title" or "* Step Title" or "• Step Title"
-        elif line.startswith(('-', '*', '•')):
-            step_match = line[1:].strip()
-            step_id = f"step_{len([l for l in lines[:i] if l.strip() and (l.strip()[0].isdigit() or l.strip().startswith(('-', '*', '•')))]) + 1}"
-        
-        # Header-like format: "Step Name:" or "STEP NAME:"
-        elif ':' in line and len(line) > 0 and (line[0].isupper() or line.split(':')[0].strip().isupper()):
-            parts = line.split(':', 1)
-            if len(parts) == 2:
-                step_match = parts[0].strip()
-                step_id = f"step_{step_match.lower().replace(' ', '_')}"
-        
-        if step_match:
-            # If we have a current step, complete it
-            if new_current:
-                new_current["content"] = new_current.get("content", "").strip()
-                completed_step = new_current
-                new_current = None
-            
-            # Start new step
-            new_current = {
-                "id": step_id or f"step_{int(time.time() * 1000)}",
-                "title": step_match,
-                "content": parts[1].strip() if ':' in line and len(parts) == 2 else "",
-                "status": "processing"
-            }
-        elif new_current:
-            # Append to current step content
-            if new_current.get("content"):
-                new_current["content"] += "\n" + line
-            else:
-                new_current["content"] = line
-    
-    return completed_step, new_current
-
-
 def _call_openrouter_api_stream(
     model: str,
     messages: List[Dict[str, Any]],
@@ -232,8 +164,10 @@ def _call_openrouter_api_stream(
         }
     
     try:
-        response = requests.post(url, headers=headers, json=payload, stream=True)
-        response.raise_for_status()
+        # Time to the response headers; the stream itself is paced by the consumer
+        with span("llm.stream_open"):
+            response = requests.post(url, headers=headers, json=payload, stream=True)
+            response.raise_for_status()
         
         log_line("runner:stream:started", {"model": model, "status": response.status_code})
         chunk_count = 0
@@ -262,7 +196,7 @@ def _call_openrouter_api_stream(
                             reasoning_text = delta["reasoning"]
                             if reasoning_text:
                                 chunk_count += 1
-                                log_line("runner:stream:reasoning", {"chunk": chunk_count, "length": len(reasoning_text)})
+                                log_line("runner:stream:reasoning", {"chunk": chunk_count, "length": len(reasoning_text)}, level="debug")
                                 yield {"type": "reasoning", "data": reasoning_text}
                         
                         # Check for content tokens
@@ -270,7 +204,7 @@ def _call_openrouter_api_stream(
                             content_text = delta["content"]
                             if content_text:
                                 chunk_count += 1
-                                log_line("runner:stream:content", {"chunk": chunk_count, "length": len(content_text)})
+                                log_line("runner:stream:content", {"chunk": chunk_count, "length": len(content_text)}, level="debug")
                                 yield {"type": "content", "data": content_text}
                 except json.JSONDecodeError as e:
                     log_line("runner:stream:parse_error", {"line": data_str[:100], "error": str(e)})
@@ -290,10 +224,13 @@ def _call_openrouter_api(
     api_key: Optional[str] = None,
     max_retries: int = 3,
     retry_delay: float = 1.0,
+    agent_id: Optional[str] = None,
 ) -> Any:
     """Make a direct API call to OpenRouter using requests with retry logic.
     
     Returns a response object compatible with get_text_from_completion().
+    Temperature-0 calls and calls from cacheable agents are served from
+    ``llm_response_cache`` when the same request was answered before.
     
     Args:
         model: Model ID to use
@@ -303,7 +240,15 @@ def _call_openrouter_api(
         api_key: Optional API key override
         max_retries: Maximum number of retries for rate limit errors (default: 3)
         retry_delay: Initial delay between retries in seconds (default: 1.0)
+        agent_id: Calling agent, used to decide whether the response is cacheable
     """
+    cacheable = llm_response_cache.is_cacheable(temperature, agent_id)
+    if cacheable:
+        cached = llm_response_cache.get(model, messages, temperature, max_tokens)
+        if cached is not None:
+            log_line("runner:cache:hit", {"model": model, "agentId": agent_id})
+            return cached
+    
     key = _get_openrouter_api_key(api_key)
     if not key:
         raise RuntimeError("OpenRouter API key is missing. Please set OPENROUTER_API_KEY in your .env file.")
@@ -348,11 +293,12 @@ def _call_openrouter_api(
     last_exception = None
     for attempt in range(max_retries + 1):
         try:
-            response = requests.post(url, headers=headers, json=payload)
-            response.raise_for_status()
-            
-            # Parse response and create a compatible object
-            data = response.json()
+            with span("llm.completion"):
+                response = requests.post(url, headers=headers, json=payload)
+                response.raise_for_status()
+                
+                # Parse response and create a compatible object
+                data = response.json()
             
             # Check for reasoning tokens in usage (some models like Moonshot report this)
             if "usage" in data and isinstance(data["usage"], dict):
@@ -455,7 +401,10 @@ def _call_openrouter_api(
                     self.thinking = thinking if thinking is not None else message_data.get("reasoning")
                     self.reasoning = message_data.get("reasoning") if thinking is None else thinking
             
-            return CompletionResponse(data, thinking_data)
+            completion = CompletionResponse(data, thinking_data)
+            if cacheable:
+                llm_response_cache.put(model, messages, temperature, completion, max_tokens, size=len(response.content))
+            return completion
         except requests.exceptions.HTTPError as e:
             # Extract the actual error message from OpenRouter's response
             error_detail = str(e)
@@ -819,6 +768,74 @@ def _build_summarized_structure_context(
     return full
 
 
+def _context_session_key(agent: Dict[str, Any], session_id: Optional[str], user_id: Optional[str]) -> Optional[str]:
+    owner = session_id or user_id
+    return f"{owner}:{agent.get('id')}" if owner else None
+
+
+def _assemble_text_context(
+    openrouter_model: str,
+    *,
+    uploaded_file_info: str = "",
+    pipeline_context_info: str = "",
+    structure_context: str = "",
+    code_context: str = "",
+    history_context_lines: Optional[List[str]] = None,
+    selection_context: str = "",
+    session_key: Optional[str] = None,
+) -> str:
+    """Context message for text agents, fitted to the model's token budget.
+
+    Sections are listed stable-first so the prompt prefix repeats across
+    turns; priorities decide what survives when the budget is tight.
+    """
+    history_text = ""
+    if history_context_lines:
+        history_text = "Recent Structure Generation History:\n" + "\n".join(history_context_lines)
+    assembled = context_assembler.assemble(
+        [
+            ContextSection("uploaded_file", uploaded_file_info, priority=1),
+            ContextSection("structure", structure_context, priority=1),
+            ContextSection("code", code_context, priority=2, min_tokens=64),
+            ContextSection("pipeline", pipeline_context_info, priority=3, min_tokens=64),
+            ContextSection("generation_history", history_text, priority=4, keep="tail"),
+            ContextSection("selection", selection_context, priority=0),
+        ],
+        context_budget(openrouter_model),
+        session_key,
+    )
+    log_line("agent:context", {"model": openrouter_model, **assembled.summary()})
+    return assembled.text
+
+
+def _fit_code_prompt(
+    openrouter_model: str,
+    system_prompt: Optional[str],
+    base_system_prompt: Optional[str],
+    conversation_history: List[Dict[str, Any]],
+    context_prefix: str,
+) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+    """Fit RAG examples and chat history for code agents into the token budget.
+
+    The request itself (which embeds the current code) is always sent whole.
+    RAG examples appended to the system prompt get up to half of what is
+    left and the most recent history messages fill the rest.
+    """
+    remaining = max(0, context_budget(openrouter_model) - count_tokens(context_prefix))
+    if system_prompt and base_system_prompt and system_prompt != base_system_prompt and system_prompt.startswith(base_system_prompt):
+        examples = truncate_tokens(system_prompt[len(base_system_prompt):], remaining // 2)
+        remaining -= count_tokens(examples)
+        system_prompt = base_system_prompt + examples
+    history = fit_history(conversation_history, remaining)
+    log_line("agent:context", {
+        "model": openrouter_model,
+        "remaining": remaining,
+        "history": len(history),
+        "history_dropped": len(conversation_history) - len(history),
+    })
+    return system_prompt, history
+
+
 @traceable(name="RunAgent", run_type="chain")
 async def run_agent(
     *,
@@ -836,6 +853,7 @@ async def run_agent(
     model_override: Optional[str] = None,
     user_id: Optional[str] = None,
     pdb_content: Optional[str] = None,
+    session_id: Optional[str] = None,
 ) -> Dict[str, Any]:
     # Use model_override if provided, otherwise fall back to agent's default
     if model_override:
@@ -1213,6 +1231,9 @@ async def run_agent(
         
         # Map model ID to OpenRouter format
         openrouter_model = _map_model_id(model)
+        system_prompt, conversation_history = _fit_code_prompt(
+            openrouter_model, system_prompt, agent.get("system"), conversation_history, context_prefix
+        )
         
         # Prepare messages with system prompt, conversation history, and current request
         messages = []
@@ -1229,6 +1250,7 @@ async def run_agent(
             messages=messages,
             max_tokens=1200,
             temperature=0.2,
+            agent_id=agent.get("id"),
         )
         content_text = get_text_from_completion(completion)
         code, explanation_text = extract_code_and_text(content_text)
@@ -1251,6 +1273,7 @@ async def run_agent(
                 messages=safety_messages,
                 max_tokens=1200,
                 temperature=0.2,
+                agent_id=agent.get("id"),
             )
             content_text2 = get_text_from_completion(completion2)
             code, explanation_text = extract_code_and_text(content_text2)
@@ -1442,7 +1465,7 @@ async def run_agent(
     selection_context = "Context:\n" + "\n".join(selection_lines) if selection_lines else ""
     
     code_context = (
-        f"CodeContext (Current PDB: {code_pdb_id or 'unknown'}):\n" + str(current_code)[:3000]
+        f"CodeContext (Current PDB: {code_pdb_id or 'unknown'}):\n" + str(current_code)
         if current_code and str(current_code).strip()
         else ""
     )
@@ -1582,33 +1605,30 @@ async def run_agent(
                 "note": "Using basic context without full pipeline data",
             })
     
-    messages: List[Dict[str, Any]] = []
-    context_parts = []
-    if uploaded_file_info:
-        context_parts.append(uploaded_file_info)
-    if pipeline_context_info:
-        context_parts.append(pipeline_context_info)
-    if history_context_lines:
-        context_parts.append("Recent Structure Generation History:\n" + "\n".join(history_context_lines))
-    if selection_context:
-        context_parts.append(selection_context)
-    # Add summarized StructureContext (chains, residue counts) for residue-suggestion questions
-    if summarized_structure_context and not is_greeting:
-        context_parts.append(summarized_structure_context)
+    # Map model ID to OpenRouter format
+    openrouter_model = _map_model_id(model)
+    
     # Only include code/structure context if user is NOT just greeting
     # For greetings, skip structure context to avoid describing structures unnecessarily
-    if code_context and not is_greeting:
-        context_parts.append(code_context)
+    context_text = _assemble_text_context(
+        openrouter_model,
+        uploaded_file_info=uploaded_file_info,
+        pipeline_context_info=pipeline_context_info,
+        # Summarized StructureContext (chains, residue counts) for residue-suggestion questions
+        structure_context="" if is_greeting else summarized_structure_context,
+        code_context="" if is_greeting else code_context,
+        history_context_lines=history_context_lines,
+        selection_context=selection_context,
+        session_key=_context_session_key(agent, session_id, user_id),
+    )
     
-    if context_parts:
-        messages.append({"role": "user", "content": "\n\n".join(context_parts)})
+    messages: List[Dict[str, Any]] = []
+    if context_text:
+        messages.append({"role": "user", "content": context_text})
     messages.append({"role": "user", "content": user_text})
 
     log_line("agent:text:req", {**base_log, "hasSelection": bool(selection), "userText": user_text})
     
-    # Map model ID to OpenRouter format
-    openrouter_model = _map_model_id(model)
-    
     # Prepare messages with system prompt
     openrouter_messages = []
     system_prompt = agent.get("system")
@@ -1623,6 +1643,7 @@ async def run_agent(
             messages=openrouter_messages,
             max_tokens=1000,
             temperature=0.5,
+            agent_id=agent.get("id"),
         )
     except RuntimeError as e:
         # If rate limited and using a model override, try falling back to default model
@@ -1644,6 +1665,7 @@ async def run_agent(
                         messages=openrouter_messages,
                         max_tokens=1000,
                         temperature=0.5,
+                        agent_id=agent.get("id"),
                     )
                     # Update base_log to reflect the fallback
                     base_log["model"] = default_model
@@ -1801,6 +1823,9 @@ async def run_agent_stream(
             
             # Map model ID to OpenRouter format
             openrouter_model = _map_model_id(model)
+            system_prompt, conversation_history = _fit_code_prompt(
+                openrouter_model, system_prompt, agent.get("system"), conversation_history, context_prefix
+            )
             
             # Build messages with conversation history
             messages = []
@@ -1812,10 +1837,8 @@ async def run_agent_stream(
             messages.append({"role": "user", "content": context_prefix})
             
             # Stream from OpenRouter
-            accumulated_reasoning = ""
             accumulated_content = ""
-            thinking_steps: List[Dict[str, Any]] = []
-            current_step: Optional[Dict[str, Any]] = None
+            step_parser = ThinkingStepParser()
             
             log_line("agent:stream:code:start", {**base_log, "userText": user_text})
             
@@ -1828,40 +1851,17 @@ async def run_agent_stream(
             )
             for chunk in stream_gen:
                 if chunk["type"] == "reasoning":
-                    accumulated_reasoning += chunk["data"]
-                    completed_step, current_step = _parse_incremental_thinking_step(accumulated_reasoning, current_step)
-                    
-                    if completed_step:
-                        completed_step["status"] = "completed"
-                        existing_idx = next((i for i, s in enumerate(thinking_steps) if s["id"] == completed_step["id"]), None)
-                        if existing_idx is not None:
-                            thinking_steps[existing_idx] = completed_step
-                        else:
-                            thinking_steps.append(completed_step)
-                        yield {"type": "thinking_step", "data": completed_step}
-                    
-                    if current_step:
-                        existing_idx = next((i for i, s in enumerate(thinking_steps) if s["id"] == current_step["id"]), None)
-                        if existing_idx is not None:
-                            thinking_steps[existing_idx] = current_step
-                        else:
-                            thinking_steps.append(current_step)
-                        yield {"type": "thinking_step", "data": current_step}
+                    for step in step_parser.feed(chunk["data"]):
+                        yield {"type": "thinking_step", "data": step}
                 
                 elif chunk["type"] == "content":
                     accumulated_content += chunk["data"]
                     yield {"type": "content", "data": {"text": chunk["data"]}}
             
             # Finalize any remaining step
-            if current_step:
-                current_step["status"] = "completed"
-                current_step["content"] = current_step.get("content", "").strip()
-                existing_idx = next((i for i, s in enumerate(thinking_steps) if s["id"] == current_step["id"]), None)
-                if existing_idx is not None:
-                    thinking_steps[existing_idx] = current_step
-                else:
-                    thinking_steps.append(current_step)
-                yield {"type": "thinking_step", "data": current_step}
+            for step in step_parser.finish():
+                yield {"type": "thinking_step", "data": step}
+            thinking_steps = step_parser.steps
             
             # Extract code from content
             log_line("agent:stream:code:extract", {
@@ -2045,7 +2045,7 @@ async def run_agent_stream(
         
         selection_context = "Context:\n" + "\n".join(selection_lines) if selection_lines else ""
         code_context = (
-            f"CodeContext (Current PDB: {code_pdb_id or 'unknown'}):\n" + str(current_code)[:3000]
+            f"CodeContext (Current PDB: {code_pdb_id or 'unknown'}):\n" + str(current_code)
             if current_code and str(current_code).strip()
             else ""
         )
@@ -2081,21 +2081,22 @@ async def run_agent_stream(
         greeting_patterns = ["hi", "hello", "hey", "greetings", "good morning", "good afternoon", "good evening", "thanks", "thank you", "ok", "okay"]
         is_greeting = any(pattern in user_text_lower for pattern in greeting_patterns) and len(user_text.strip()) < 30
         
-        messages: List[Dict[str, Any]] = []
-        context_parts = []
-        if uploaded_file_info:
-            context_parts.append(uploaded_file_info)
-        if history_context_lines:
-            context_parts.append("Recent Structure Generation History:\n" + "\n".join(history_context_lines))
-        if selection_context:
-            context_parts.append(selection_context)
+        # Map model ID to OpenRouter format
+        openrouter_model = _map_model_id(model)
+        
         # Only include code/structure context if user is NOT just greeting
         # For greetings, skip structure context to avoid describing structures unnecessarily
-        if code_context and not is_greeting:
-            context_parts.append(code_context)
+        context_text = _assemble_text_context(
+            openrouter_model,
+            uploaded_file_info=uploaded_file_info,
+            code_context="" if is_greeting else code_context,
+            history_context_lines=history_context_lines,
+            selection_context=selection_context,
+        )
         
-        if context_parts:
-            messages.append({"role": "user", "content": "\n\n".join(context_parts)})
+        messages: List[Dict[str, Any]] = []
+        if context_text:
+            messages.append({"role": "user", "content": context_text})
         messages.append({"role": "user", "content": user_text})
         
         # Prepare messages with system prompt
@@ -2105,15 +2106,10 @@ async def run_agent_stream(
             openrouter_messages.append({"role": "system", "content": system_prompt})
         openrouter_messages.extend(messages)
         
-        # Map model ID to OpenRouter format
-        openrouter_model = _map_model_id(model)
-        
         # Stream from OpenRouter
-        accumulated_reasoning = ""
+        reasoning_length = 0
         accumulated_content = ""
-        thinking_steps: List[Dict[str, Any]] = []
-        current_step: Optional[Dict[str, Any]] = None
-        step_counter = 0
+        step_parser = ThinkingStepParser()
         
         log_line("agent:stream:start", {**base_log, "userText": user_text})
         
@@ -2126,36 +2122,14 @@ async def run_agent_stream(
             max_tokens=1000,
             temperature=0.5,
         ):
-            log_line("agent:stream:chunk", {"type": chunk.get("type"), "agentId": agent.get("id")})
+            log_line("agent:stream:chunk", {"type": chunk.get("type"), "agentId": agent.get("id")}, level="debug")
             
             if chunk["type"] == "reasoning":
                 reasoning_chunks += 1
-                # Accumulate reasoning tokens
-                accumulated_reasoning += chunk["data"]
-                
-                # Parse incremental thinking steps
-                completed_step, current_step = _parse_incremental_thinking_step(accumulated_reasoning, current_step)
-                
-                # Emit completed step
-                if completed_step:
-                    completed_step["status"] = "completed"
-                    # Check if step already exists
-                    existing_idx = next((i for i, s in enumerate(thinking_steps) if s["id"] == completed_step["id"]), None)
-                    if existing_idx is not None:
-                        thinking_steps[existing_idx] = completed_step
-                    else:
-                        thinking_steps.append(completed_step)
-                    yield {"type": "thinking_step", "data": completed_step}
-                
-                # Emit current step if it exists
-                if current_step:
-                    # Check if step already exists
-                    existing_idx = next((i for i, s in enumerate(thinking_steps) if s["id"] == current_step["id"]), None)
-                    if existing_idx is not None:
-                        thinking_steps[existing_idx] = current_step
-                    else:
-                        thinking_steps.append(current_step)
-                    yield {"type": "thinking_step", "data": current_step}
+                reasoning_length += len(chunk["data"])
+                # Parse only the new delta; emits completed and in-progress steps
+                for step in step_parser.feed(chunk["data"]):
+                    yield {"type": "thinking_step", "data": step}
             
             elif chunk["type"] == "content":
                 content_chunks += 1
@@ -2167,20 +2141,14 @@ async def run_agent_stream(
             **base_log, 
             "reasoning_chunks": reasoning_chunks, 
             "content_chunks": content_chunks,
-            "accumulated_reasoning_length": len(accumulated_reasoning),
+            "accumulated_reasoning_length": reasoning_length,
             "accumulated_content_length": len(accumulated_content)
         })
         
         # Finalize any remaining step
-        if current_step:
-            current_step["status"] = "completed"
-            current_step["content"] = current_step.get("content", "").strip()
-            existing_idx = next((i for i, s in enumerate(thinking_steps) if s["id"] == current_step["id"]), None)
-            if existing_idx is not None:
-                thinking_steps[existing_idx] = current_step
-            else:
-                thinking_steps.append(current_step)
-            yield {"type": "thinking_step", "data": current_step}
+        for step in step_parser.finish():
+            yield {"type": "thinking_step", "data": step}
+        thinking_steps = step_parser.steps
         
         # Build final result
         final_result = {
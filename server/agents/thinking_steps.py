@@ -0,0 +1,112 @@
+"""Incremental parser turning streamed reasoning text into thinking steps.
+
+A step starts at a line that looks like a numbered item (``1. Title`` or
+``2) Title``), a bullet (``-``, ``*``, ``•``) or a header (``Title: text``);
+other lines are appended to the current step's content. Only each new
+delta is scanned: the unfinished last line is buffered until its newline
+arrives, and steps are kept in a list with an id -> position index, so a
+chunk costs time proportional to its own length plus the current step.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+_BULLETS = ("-", "*", "•")
+
+
+class ThinkingStepParser:
+    """Feed reasoning deltas; get back the step updates to emit.
+
+    ``feed`` and ``finish`` return snapshots of steps that changed: first any
+    step completed by a new boundary, then the in-progress step. ``steps``
+    holds the final list in order, with repeated ids replacing earlier steps.
+    """
+
+    def __init__(self) -> None:
+        self.steps: List[Dict[str, Any]] = []
+        self._index: Dict[str, int] = {}
+        self._pending: List[str] = []
+        self._current: Optional[Dict[str, Any]] = None
+        self._lines: List[str] = []
+        self._marker_lines = 0
+
+    def feed(self, delta: str) -> List[Dict[str, Any]]:
+        if not delta:
+            return []
+        if "\n" not in delta:
+            self._pending.append(delta)
+            return []
+        parts = delta.split("\n")
+        if self._pending:
+            parts[0] = "".join(self._pending) + parts[0]
+        self._pending = [parts[-1]] if parts[-1] else []
+        return self._consume(parts[:-1])
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """Flush the buffered last line and complete the current step."""
+        events = self._consume(["".join(self._pending)]) if self._pending else []
+        self._pending = []
+        if self._current is not None:
+            events = [e for e in events if e["id"] != self._current["id"]]
+            events.append(self._complete())
+        return events
+
+    def _consume(self, lines: List[str]) -> List[Dict[str, Any]]:
+        events: List[Dict[str, Any]] = []
+        changed = False
+        for raw in lines:
+            line = raw.strip()
+            if not line:
+                continue
+            marker = self._marker(line)
+            if line[0].isdigit() or line.startswith(_BULLETS):
+                self._marker_lines += 1
+            if marker:
+                if self._current is not None:
+                    events.append(self._complete())
+                step_id, title, content = marker
+                self._current = {"id": step_id, "title": title, "content": "", "status": "processing"}
+                self._lines = [content] if content else []
+                changed = True
+            elif self._current is not None:
+                self._lines.append(line)
+                changed = True
+        if changed and self._current is not None:
+            self._current["content"] = "\n".join(self._lines)
+            events.append(self._store(self._current))
+        return events
+
+    def _marker(self, line: str) -> Optional[Tuple[str, str, str]]:
+        """``(id, title, content)`` when ``line`` starts a step."""
+        if line[0].isdigit():
+            end = 1
+            while end < len(line) and line[end].isdigit():
+                end += 1
+            if end < len(line) and line[end] in (".", ")"):
+                return f"step_{line[:end]}", line[end + 1:].strip(), ""
+            return None
+        if line.startswith(_BULLETS):
+            return f"step_{self._marker_lines + 1}", line[1:].strip(), ""
+        head, sep, rest = line.partition(":")
+        if sep and (line[0].isupper() or head.strip().isupper()):
+            title = head.strip()
+            return f"step_{title.lower().replace(' ', '_')}", title, rest.strip()
+        return None
+
+    def _complete(self) -> Dict[str, Any]:
+        step = self._current
+        self._current = None
+        step["content"] = "\n".join(self._lines).strip()
+        step["status"] = "completed"
+        return self._store(step)
+
+    def _store(self, step: Dict[str, Any]) -> Dict[str, Any]:
+        snapshot = dict(step)
+        position = self._index.get(step["id"])
+        if position is None:
+            self._index[step["id"]] = len(self.steps)
+            self.steps.append(snapshot)
+        else:
+            self.steps[position] = snapshot
+        return snapshot
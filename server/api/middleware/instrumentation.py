@@ -0,0 +1,74 @@
+"""Per-route request latency and in-flight metrics (see infrastructure.instrumentation)."""
+
+import time
+
+from starlette.routing import Match
+
+try:
+    from ...infrastructure.instrumentation import metrics_registry
+except ImportError:
+    from infrastructure.instrumentation import metrics_registry
+
+REQUEST_SECONDS = metrics_registry.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency, until the response body has been sent.",
+    ("method", "route", "status"),
+)
+REQUESTS_IN_FLIGHT = metrics_registry.gauge(
+    "http_requests_in_flight",
+    "HTTP requests currently being handled.",
+    ("method", "route"),
+)
+
+# Label for paths no route matches, so scanners cannot blow up cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+
+def route_template(scope) -> str:
+    """Path template of the route serving ``scope`` (e.g. ``/api/jobs/{job_id}``)."""
+    app = scope.get("app")
+    router = getattr(app, "router", None)
+    partial = None
+    for route in getattr(router, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path  # path matches, method does not (405)
+    return partial or UNMATCHED_ROUTE
+
+
+class RequestMetricsMiddleware:
+    """ASGI middleware recording latency and in-flight requests per route.
+
+    Add it last so it is outermost and the time includes the other
+    middleware (rate limiting, CORS).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(scope)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc(method=method, route=route)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec(method=method, route=route)
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - started, method=method, route=route, status=str(status)
+            )
@@ -30,6 +30,16 @@ try:
         calculate_user_metrics,
         log_admin_action
     )
+    from ...infrastructure.password_hashing import password_hasher
+    from ...infrastructure.compute import compute_executor
+    from ...infrastructure.llm_cache import llm_response_cache
+    from ...infrastructure.startup_profile import startup_profile
+    from ...domain.chat.search import search_messages
+    from ...domain.admin.metrics import get_dashboard_stats, get_timeseries
+    from ...domain.admin.audit_log import audit_log_writer
+    from ...domain.admin import exports as admin_exports
+    from ...domain.storage.backends import get_storage_backend
+    from ...infrastructure.file_serving import serve_file
 except ImportError:
     # Fallback to absolute import (when running directly)
     from domain.user.service import (
@@ -51,6 +61,16 @@ except ImportError:
         calculate_user_metrics,
         log_admin_action
     )
+    from infrastructure.password_hashing import password_hasher
+    from infrastructure.compute import compute_executor
+    from infrastructure.llm_cache import llm_response_cache
+    from infrastructure.startup_profile import startup_profile
+    from domain.chat.search import search_messages
+    from domain.admin.metrics import get_dashboard_stats, get_timeseries
+    from domain.admin.audit_log import audit_log_writer
+    from domain.admin import exports as admin_exports
+    from domain.storage.backends import get_storage_backend
+    from infrastructure.file_serving import serve_file
 
 router = APIRouter(prefix="/api/admin", tags=["admin"])
 
@@ -417,42 +437,58 @@ async def update_user_status(
 async def get_stats(admin: Dict[str, Any] = Depends(require_admin)) -> Dict[str, Any]:
     """Get dashboard statistics (admin only)."""
     with get_db() as conn:
-        # Total users
-        total_users = conn.execute("SELECT COUNT(*) as count FROM users").fetchone()["count"]
-        
-        # Active users
-        active_users = conn.execute(
-            "SELECT COUNT(*) as count FROM users WHERE is_active = 1"
-        ).fetchone()["count"]
-        
-        # Total credits in system
-        total_credits = conn.execute(
-            "SELECT SUM(credits) as total FROM user_credits"
-        ).fetchone()["total"] or 0
-        
-        # Pending reports
-        pending_reports = conn.execute(
-            "SELECT COUNT(*) as count FROM user_reports WHERE status = 'pending'"
-        ).fetchone()["count"]
-        
-        # Recent signups (last 7 days)
-        from datetime import datetime, timedelta
-        week_ago = datetime.utcnow() - timedelta(days=7)
-        recent_signups = conn.execute(
-            "SELECT COUNT(*) as count FROM users WHERE created_at > ?",
-            (week_ago,)
-        ).fetchone()["count"]
+        stats = get_dashboard_stats(conn)
     
-    return {
-        "status": "success",
-        "stats": {
-            "total_users": total_users,
-            "active_users": active_users,
-            "total_credits": total_credits,
-            "pending_reports": pending_reports,
-            "recent_signups": recent_signups
-        }
-    }
+    return {"status": "success", "stats": stats}
+
+
+@router.get("/metrics/timeseries")
+async def get_metrics_timeseries(
+    metrics: str = Query("signups,credits_spent,jobs_completed"),
+    granularity: str = Query("day"),
+    start: Optional[str] = Query(None),
+    end: Optional[str] = Query(None),
+    admin: Dict[str, Any] = Depends(require_admin)
+) -> Dict[str, Any]:
+    """Signups, credit spend, messages and jobs over time (admin only)."""
+    names = [m.strip() for m in metrics.split(",") if m.strip()]
+    try:
+        with get_db() as conn:
+            timeseries = get_timeseries(conn, names, granularity=granularity, start=start, end=end)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return {"status": "success", **timeseries}
+
+
+@router.get("/system/password-hashing")
+async def get_password_hashing_metrics(admin: Dict[str, Any] = Depends(require_admin)) -> Dict[str, Any]:
+    """Get password hashing pool saturation and latency metrics (admin only)."""
+    return {"status": "success", "metrics": password_hasher.get_metrics()}
+
+
+@router.get("/system/compute")
+async def get_compute_metrics(admin: Dict[str, Any] = Depends(require_admin)) -> Dict[str, Any]:
+    """Get compute executor queue-wait and run-time metrics (admin only)."""
+    return {"status": "success", "metrics": compute_executor.get_stats()}
+
+
+@router.get("/system/llm-cache")
+async def get_llm_cache_metrics(admin: Dict[str, Any] = Depends(require_admin)) -> Dict[str, Any]:
+    """Get LLM response cache size and hit/miss metrics (admin only)."""
+    return {"status": "success", "metrics": llm_response_cache.get_stats()}
+
+
+@router.get("/system/startup")
+async def get_startup_metrics(admin: Dict[str, Any] = Depends(require_admin)) -> Dict[str, Any]:
+    """Get boot import time, warmup durations and slowest imports (admin only)."""
+    return {"status": "success", "metrics": startup_profile.get_stats()}
+
+
+@router.get("/system/audit-log")
+async def get_audit_log_metrics(admin: Dict[str, Any] = Depends(require_admin)) -> Dict[str, Any]:
+    """Get audit log writer queue depth and dropped/late entry counts (admin only)."""
+    return {"status": "success", "metrics": audit_log_writer.get_stats()}
 
 
 @router.get("/users/{user_id}/tokens")
@@ -598,69 +634,47 @@ async def get_chat_messages(
     privacy_mode: bool = Query(False),
     admin: Dict[str, Any] = Depends(require_admin)
 ) -> Dict[str, Any]:
-    """Get chat messages with filtering (admin only)."""
+    """Get chat messages with filtering (admin only).
+
+    With ``search``, messages are matched through the full-text index and
+    returned best match first with a highlighted ``snippet``.
+    """
     client_ip = request.client.host if request.client else None
     user_agent = request.headers.get("user-agent")
     
     timestamp, item_id, page_limit = get_pagination_params(cursor, limit)
     
     with get_db() as conn:
-        query = """SELECT cm.*, u.username as sender_username, u.email as sender_email
-                   FROM chat_messages cm
-                   LEFT JOIN users u ON cm.sender_id = u.id
-                   WHERE 1=1"""
-        params = []
-        
-        if user_id:
-            query += " AND cm.user_id = ?"
-            params.append(user_id)
-        
-        if session_id:
-            query += " AND cm.session_id = ?"
-            params.append(session_id)
-        
-        if conversation_id:
-            query += " AND cm.conversation_id = ?"
-            params.append(conversation_id)
-        
-        if date_from:
-            query += " AND cm.created_at >= ?"
-            params.append(date_from)
-        
-        if date_to:
-            query += " AND cm.created_at <= ?"
-            params.append(date_to)
-        
-        if message_type:
-            query += " AND cm.message_type = ?"
-            params.append(message_type)
-        
         if search:
-            query += " AND cm.content LIKE ?"
-            params.append(f"%{search}%")
-        
-        if timestamp and item_id:
-            query += " AND (cm.created_at < ? OR (cm.created_at = ? AND cm.id < ?))"
-            params.extend([timestamp, timestamp, item_id])
-        
-        query += " ORDER BY cm.created_at DESC, cm.id DESC LIMIT ?"
-        params.append(page_limit + 1)
-        
-        messages = conn.execute(query, params).fetchall()
-        
-        has_more = len(messages) > page_limit
-        if has_more:
-            messages = messages[:page_limit]
+            message_list, next_cursor = search_messages(
+                conn,
+                search,
+                user_id=user_id,
+                session_id=session_id,
+                conversation_id=conversation_id,
+                message_type=message_type,
+                date_from=date_from,
+                date_to=date_to,
+                limit=page_limit,
+                cursor=cursor,
+            )
+            response = {
+                "items": message_list,
+                "next_cursor": next_cursor,
+                "has_more": next_cursor is not None,
+                "limit": page_limit,
+            }
+        else:
+            message_list, response = _list_chat_messages(
+                conn, user_id, session_id, conversation_id, date_from, date_to,
+                message_type, timestamp, item_id, page_limit,
+            )
         
-        message_list = []
-        for msg in messages:
-            msg_dict = dict(msg)
-            # Mask content if privacy mode
-            if privacy_mode:
+        if privacy_mode:
+            for msg_dict in message_list:
                 msg_dict["content"] = "[Content hidden - privacy mode]"
-            message_list.append(msg_dict)
-        
-        response = create_pagination_response(message_list, page_limit, has_more)
+                if "snippet" in msg_dict:
+                    msg_dict["snippet"] = msg_dict["content"]
         
         log_admin_action(
             admin_id=admin["id"],
@@ -671,7 +685,8 @@ async def get_chat_messages(
                 "filters": {
                     "user_id": user_id,
                     "session_id": session_id,
-                    "message_type": message_type
+                    "message_type": message_type,
+                    "search": bool(search),
                 }
             },
             ip_address=client_ip,
@@ -687,6 +702,58 @@ async def get_chat_messages(
         }
 
 
+def _list_chat_messages(
+    conn, user_id, session_id, conversation_id, date_from, date_to,
+    message_type, timestamp, item_id, page_limit,
+):
+    """Newest-first page of chat messages for the admin listing."""
+    query = """SELECT cm.*, u.username as sender_username, u.email as sender_email
+               FROM chat_messages cm
+               LEFT JOIN users u ON cm.sender_id = u.id
+               WHERE 1=1"""
+    params = []
+    
+    if user_id:
+        query += " AND cm.user_id = ?"
+        params.append(user_id)
+    
+    if session_id:
+        query += " AND cm.session_id = ?"
+        params.append(session_id)
+    
+    if conversation_id:
+        query += " AND cm.conversation_id = ?"
+        params.append(conversation_id)
+    
+    if date_from:
+        query += " AND cm.created_at >= ?"
+        params.append(date_from)
+    
+    if date_to:
+        query += " AND cm.created_at <= ?"
+        params.append(date_to)
+    
+    if message_type:
+        query += " AND cm.message_type = ?"
+        params.append(message_type)
+    
+    if timestamp and item_id:
+        query += " AND (cm.created_at < ? OR (cm.created_at = ? AND cm.id < ?))"
+        params.extend([timestamp, timestamp, item_id])
+    
+    query += " ORDER BY cm.created_at DESC, cm.id DESC LIMIT ?"
+    params.append(page_limit + 1)
+    
+    messages = conn.execute(query, params).fetchall()
+    
+    has_more = len(messages) > page_limit
+    if has_more:
+        messages = messages[:page_limit]
+    
+    message_list = [dict(msg) for msg in messages]
+    return message_list, create_pagination_response(message_list, page_limit, has_more)
+
+
 @router.get("/chat/sessions")
 async def get_chat_sessions(
     request: Request,
@@ -1034,69 +1101,152 @@ async def get_audit_logs(
 
 class ExportRequest(BaseModel):
     """Model for export requests."""
-    format: str  # 'csv' or 'json'
+    format: str  # 'csv', 'ndjson' ('json') or 'parquet'
     filters: Optional[Dict[str, Any]] = None
     fields: Optional[List[str]] = None
     include_content: bool = False  # For chat exports
+    compression: Optional[str] = None  # 'gzip' (default), 'zstd' or 'none'
 
 
-@router.post("/export/users")
-async def export_users(
+async def _queue_export(
     request: Request,
+    export_type: str,
     export_data: ExportRequest,
-    admin: Dict[str, Any] = Depends(require_super_admin_dep)
+    admin: Dict[str, Any],
 ) -> Dict[str, Any]:
-    """Export user data (super admin only, requires approval)."""
-    client_ip = request.client.host if request.client else None
-    user_agent = request.headers.get("user-agent")
+    try:
+        with get_db() as conn:
+            export = admin_exports.create_export(
+                conn,
+                admin["id"],
+                export_type,
+                export_data.format,
+                filters=export_data.filters,
+                fields=export_data.fields,
+                include_content=export_data.include_content,
+                compression=export_data.compression,
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    # For now, return a simple response indicating export would be generated
-    # In production, this would queue the export and require approval
+    admin_exports.start_export(export["id"])
     
     log_admin_action(
         admin_id=admin["id"],
-        action_type="export_users",
+        action_type=f"export_{export_type}",
+        target_type="export",
+        target_id=export["id"],
         details={
-            "format": export_data.format,
+            "format": export["format"],
+            "compression": export["compression"],
             "filters": export_data.filters,
-            "fields": export_data.fields
+            "fields": export_data.fields,
+            "include_content": export_data.include_content
         },
-        ip_address=client_ip,
-        user_agent=user_agent
+        ip_address=request.client.host if request.client else None,
+        user_agent=request.headers.get("user-agent")
     )
     
     return {
         "status": "success",
-        "message": "Export request queued (approval required for sensitive data)",
-        "export_id": str(uuid.uuid4())
+        "message": "Export queued",
+        "export_id": export["id"],
+        "export": export
     }
 
 
+@router.post("/export/users")
+async def export_users(
+    request: Request,
+    export_data: ExportRequest,
+    admin: Dict[str, Any] = Depends(require_super_admin_dep)
+) -> Dict[str, Any]:
+    """Queue a background export of user data (super admin only)."""
+    return await _queue_export(request, "users", export_data, admin)
+
+
 @router.post("/export/chat")
 async def export_chat(
     request: Request,
     export_data: ExportRequest,
     admin: Dict[str, Any] = Depends(require_super_admin_dep)
 ) -> Dict[str, Any]:
-    """Export chat data (super admin only, requires approval)."""
-    client_ip = request.client.host if request.client else None
-    user_agent = request.headers.get("user-agent")
+    """Queue a background export of chat messages (super admin only)."""
+    return await _queue_export(request, "chat", export_data, admin)
+
+
+@router.get("/exports")
+async def list_exports(
+    limit: int = Query(50, ge=1, le=200),
+    admin: Dict[str, Any] = Depends(require_super_admin_dep)
+) -> Dict[str, Any]:
+    """Recent exports with their progress (super admin only)."""
+    with get_db() as conn:
+        exports = admin_exports.list_exports(conn, limit=limit)
+    return {"status": "success", "exports": exports}
+
+
+def _get_export_or_404(export_id: str) -> Dict[str, Any]:
+    with get_db() as conn:
+        export = admin_exports.get_export(conn, export_id)
+    if export is None:
+        raise HTTPException(status_code=404, detail="Export not found")
+    return export
+
+
+@router.get("/exports/{export_id}")
+async def get_export_status(
+    export_id: str,
+    admin: Dict[str, Any] = Depends(require_super_admin_dep)
+) -> Dict[str, Any]:
+    """Status and progress of one export (super admin only)."""
+    return {"status": "success", "export": _get_export_or_404(export_id)}
+
+
+@router.delete("/exports/{export_id}")
+async def cancel_export(
+    export_id: str,
+    admin: Dict[str, Any] = Depends(require_super_admin_dep)
+) -> Dict[str, Any]:
+    """Cancel a queued or running export (super admin only)."""
+    _get_export_or_404(export_id)
+    with get_db() as conn:
+        cancelled = admin_exports.cancel_export(conn, export_id)
+    if not cancelled:
+        raise HTTPException(status_code=409, detail="Export already finished")
+    return {"status": "success", "message": "Export cancelled"}
+
+
+@router.get("/exports/{export_id}/download")
+async def download_export(
+    request: Request,
+    export_id: str,
+    admin: Dict[str, Any] = Depends(require_super_admin_dep)
+):
+    """Download a finished export; supports Range requests (super admin only)."""
+    export = _get_export_or_404(export_id)
+    if export["status"] != "completed":
+        raise HTTPException(status_code=409, detail=f"Export is {export['status']}")
+    try:
+        path = await compute_executor.run(
+            get_storage_backend().local_path, export["storage_key"], kind="thread", label="export_fetch", timeout=None
+        )
+    except FileNotFoundError:
+        raise HTTPException(status_code=410, detail="Export file no longer exists")
     
     log_admin_action(
         admin_id=admin["id"],
-        action_type="export_chat",
-        details={
-            "format": export_data.format,
-            "filters": export_data.filters,
-            "include_content": export_data.include_content
-        },
-        ip_address=client_ip,
-        user_agent=user_agent
+        action_type="download_export",
+        target_type="export",
+        target_id=export_id,
+        ip_address=request.client.host if request.client else None,
+        user_agent=request.headers.get("user-agent")
     )
     
-    return {
-        "status": "success",
-        "message": "Export request queued (approval required for sensitive data)",
-        "export_id": str(uuid.uuid4())
-    }
-
+    return await serve_file(
+        request,
+        path,
+        media_type=admin_exports.export_media_type(export),
+        filename=admin_exports.export_filename(export),
+        decode_stored=False,
+    )
@@ -11,25 +11,38 @@ try:
     from ...domain.user.service import create_user, authenticate_user, get_user_by_id
     from ..middleware.auth import get_current_user
     from ...database.db import get_db
+    from ...infrastructure.password_hashing import PasswordHashBusyError
 except ImportError:
     # Fallback to absolute import (when running directly)
     from domain.user.models import UserCreate, UserLogin
     from domain.user.service import create_user, authenticate_user, get_user_by_id
     from api.middleware.auth import get_current_user
     from database.db import get_db
+    from infrastructure.password_hashing import PasswordHashBusyError
 from datetime import datetime
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
+def _hashing_busy() -> HTTPException:
+    """503 returned when the password hashing pool cannot take more work."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication service is busy, please retry shortly",
+        headers={"Retry-After": "2"},
+    )
+
+
 @router.post("/signup")
 async def signup(user_data: UserCreate) -> Dict[str, Any]:
     """User registration."""
     try:
-        result = create_user(user_data)
+        result = await create_user(user_data)
         return {"status": "success", **result}
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except PasswordHashBusyError:
+        raise _hashing_busy()
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Registration failed: {str(e)}")
 
@@ -42,7 +55,7 @@ async def signin(login_data: UserLogin) -> Dict[str, Any]:
         from ...infrastructure.utils import log_line
         log_line("signin_attempt", {"email": login_data.email})
         
-        result = authenticate_user(login_data)
+        result = await authenticate_user(login_data)
         
         log_line("signin_success", {"email": login_data.email, "user_id": result["user"]["id"]})
         
@@ -57,6 +70,10 @@ async def signin(login_data: UserLogin) -> Dict[str, Any]:
         from ...infrastructure.utils import log_line
         log_line("signin_failed", {"email": login_data.email, "error": str(e)})
         raise HTTPException(status_code=401, detail=str(e))
+    except PasswordHashBusyError as e:
+        from ...infrastructure.utils import log_line
+        log_line("signin_busy", {"email": login_data.email, "error": str(e)})
+        raise _hashing_busy()
     except Exception as e:
         from ...infrastructure.utils import log_line
         log_line("signin_error", {"email": login_data.email, "error": str(e), "trace": traceback.format_exc()})
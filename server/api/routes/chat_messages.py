@@ -9,10 +9,12 @@ import json
 try:
     # Try relative import first (when running as module)
     from ...database.db import get_db
+    from ...domain.pipeline.repository import load_pipeline_graphs
     from ..middleware.auth import get_current_user
 except ImportError:
     # Fallback to absolute import (when running directly)
     from database.db import get_db
+    from domain.pipeline.repository import load_pipeline_graphs
     from api.middleware.auth import get_current_user
 
 router = APIRouter(prefix="/api/chat/sessions/{session_id}/messages", tags=["chat_messages"])
@@ -175,6 +177,19 @@ async def list_messages(
         
         rows = conn.execute(query, params).fetchall()
         
+        # Linked pipelines for the whole page: one lookup plus two bulk graph queries
+        pipelines_by_message: Dict[str, Any] = {}
+        message_ids = [row["id"] for row in rows]
+        for start in range(0, len(message_ids), 500):
+            chunk = message_ids[start:start + 500]
+            placeholders = ",".join("?" * len(chunk))
+            for p_row in conn.execute(
+                f"SELECT id, name, status, message_id, updated_at FROM pipelines WHERE message_id IN ({placeholders})",
+                chunk,
+            ).fetchall():
+                pipelines_by_message.setdefault(p_row["message_id"], p_row)
+        pipeline_graphs = load_pipeline_graphs(conn, list(pipelines_by_message.values()))
+        
         messages = []
         for row in rows:
             msg = dict(row)
@@ -208,45 +223,15 @@ async def list_messages(
                         'previewUrl': canvas.get('preview_url'),
                     }
             
-            # Load linked pipeline from normalized tables
-            pipeline_row = conn.execute(
-                "SELECT id, name, status FROM pipelines WHERE message_id = ?",
-                (message_id,)
-            ).fetchone()
+            # Attach linked pipeline (graphs were loaded in bulk above)
+            pipeline_row = pipelines_by_message.get(message_id)
             if pipeline_row:
-                pipeline = dict(pipeline_row)
-                pid = pipeline['id']
-                node_rows = conn.execute(
-                    "SELECT * FROM pipeline_nodes WHERE pipeline_id = ? ORDER BY created_at",
-                    (pid,),
-                ).fetchall()
-                edge_rows = conn.execute(
-                    "SELECT * FROM pipeline_edges WHERE pipeline_id = ?",
-                    (pid,),
-                ).fetchall()
-                nodes = []
-                for n in node_rows:
-                    nd = dict(n)
-                    nodes.append({
-                        "id": nd["id"],
-                        "type": nd["type"],
-                        "label": nd["label"],
-                        "config": json.loads(nd["config"]) if nd.get("config") else {},
-                        "inputs": json.loads(nd["inputs"]) if nd.get("inputs") else {},
-                        "status": nd["status"],
-                        "result_metadata": json.loads(nd["result_metadata"]) if nd.get("result_metadata") else None,
-                        "error": nd.get("error"),
-                        "position": {"x": nd.get("position_x", 0), "y": nd.get("position_y", 0)},
-                    })
-                edges = [
-                    {"source": dict(e)["source_node_id"], "target": dict(e)["target_node_id"]}
-                    for e in edge_rows
-                ]
+                graph = pipeline_graphs[pipeline_row["id"]]
                 msg['pipeline'] = {
-                    'id': pid,
-                    'name': pipeline.get('name'),
-                    'workflowDefinition': {"nodes": nodes, "edges": edges},
-                    'status': pipeline.get('status', 'draft'),
+                    'id': pipeline_row["id"],
+                    'name': pipeline_row["name"],
+                    'workflowDefinition': {"nodes": graph["nodes"], "edges": graph["edges"]},
+                    'status': pipeline_row["status"],
                 }
             
             # Load linked attachments
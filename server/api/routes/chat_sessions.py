@@ -1,6 +1,6 @@
 """Chat session management API endpoints."""
 
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, status
 from typing import Dict, Any, List, Optional
 import uuid
 from datetime import datetime
@@ -8,11 +8,13 @@ from datetime import datetime
 try:
     # Try relative import first (when running as module)
     from ...database.db import get_db
+    from ...domain.chat.search import search_messages
     from ...domain.storage.session_tracker import create_chat_session, get_user_sessions
     from ..middleware.auth import get_current_user
 except ImportError:
     # Fallback to absolute import (when running directly)
     from database.db import get_db
+    from domain.chat.search import search_messages
     from domain.storage.session_tracker import create_chat_session, get_user_sessions
     from api.middleware.auth import get_current_user
 
@@ -116,6 +118,45 @@ async def list_sessions(
     }
 
 
+@router.get("/search")
+async def search_sessions(
+    q: str = Query(..., min_length=1, max_length=200),
+    session_id: Optional[str] = Query(None),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    user: Dict[str, Any] = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """Full-text search over the current user's own chat messages, best match first."""
+    with get_db() as conn:
+        results, next_cursor = search_messages(
+            conn,
+            q,
+            user_id=user["id"],
+            session_id=session_id,
+            limit=limit,
+            cursor=cursor,
+        )
+    
+    return {
+        "status": "success",
+        "results": [
+            {
+                "message_id": r["id"],
+                "session_id": r["session_id"],
+                "conversation_id": r["conversation_id"],
+                "role": r["role"],
+                "type": r["message_type"],
+                "snippet": r["snippet"],
+                "score": r["score"],
+                "created_at": r["created_at"],
+            }
+            for r in results
+        ],
+        "next_cursor": next_cursor,
+        "has_more": next_cursor is not None,
+    }
+
+
 @router.get("/{session_id}")
 async def get_session(
     session_id: str,
@@ -1,58 +1,125 @@
 """Pipeline persistence API endpoints (normalized schema)."""
 
-from fastapi import APIRouter, HTTPException, Depends, status
-from typing import Dict, Any, List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, status
+from typing import Dict, Any, List, Optional, Tuple
+import base64
+import gzip
 import json
 import uuid
 from datetime import datetime
 
 try:
     from ...database.db import get_db
+    from ...domain.storage.blob_store import PAYLOAD_COLUMNS, decode_payload, encode_payloads, is_blob_ref
+    from ...domain.pipeline.repository import (
+        load_pipeline,
+        load_pipelines,
+        pipeline_graph_cache,
+        save_pipeline_graph,
+        update_node_positions,
+    )
+    from ...infrastructure.compute import compute_executor
     from ..middleware.auth import get_current_user
 except ImportError:
     from database.db import get_db
+    from domain.storage.blob_store import PAYLOAD_COLUMNS, decode_payload, encode_payloads, is_blob_ref
+    from domain.pipeline.repository import (
+        load_pipeline,
+        load_pipelines,
+        pipeline_graph_cache,
+        save_pipeline_graph,
+        update_node_positions,
+    )
+    from infrastructure.compute import compute_executor
     from api.middleware.auth import get_current_user
 
 router = APIRouter(prefix="/api/pipelines", tags=["pipelines"])
 
+EXECUTION_PAGE_SIZE = 20
+EXECUTION_PAGE_MAX = 100
+# Node execution payloads smaller than this are not worth compressing
+PAYLOAD_GZIP_MIN_BYTES = 1024
+
+# Columns returned in execution history summaries
+_NODE_EXECUTION_COLUMNS = (
+    "id", "node_id", "node_label", "node_type", "status", "execution_order",
+    "started_at", "completed_at", "duration_ms", "error", "input_data", "output_data",
+    "request_method", "request_url", "response_status", "response_status_text",
+)
+# Potentially large columns, only loaded on request
+_NODE_EXECUTION_PAYLOAD_COLUMNS = (
+    "request_headers", "request_body", "response_headers", "response_data",
+)
+
 
 # ---------------------------------------------------------------------------
 # Helper functions
 # ---------------------------------------------------------------------------
 
-def _assemble_node(row: Dict[str, Any]) -> Dict[str, Any]:
-    """Reconstruct a PipelineNode dict from a pipeline_nodes row."""
-    return {
-        "id": row["id"],
-        "type": row["type"],
-        "label": row["label"],
-        "config": json.loads(row["config"]) if row.get("config") else {},
-        "inputs": json.loads(row["inputs"]) if row.get("inputs") else {},
-        "status": row["status"],
-        "result_metadata": json.loads(row["result_metadata"]) if row.get("result_metadata") else None,
-        "error": row.get("error"),
-        "position": {"x": row.get("position_x", 0), "y": row.get("position_y", 0)},
+def _assemble_node_execution(ne: Dict[str, Any], full: bool = False) -> Dict[str, Any]:
+    """Reconstruct an execution_log entry from a pipeline_node_executions row.
+
+    Summaries omit request/response headers and bodies, and input/output kept
+    in the blob store, and set hasPayload so the client knows to fetch them
+    from the node execution endpoint.
+    """
+    entry: Dict[str, Any] = {
+        "nodeExecutionId": ne["id"],
+        "nodeId": ne["node_id"],
+        "nodeLabel": ne["node_label"],
+        "nodeType": ne["node_type"],
+        "status": ne["status"],
+        "startedAt": ne.get("started_at"),
+        "completedAt": ne.get("completed_at"),
+        "duration": ne.get("duration_ms"),
+        "error": ne.get("error"),
     }
+    external = False
+    for key, column in (("input", "input_data"), ("output", "output_data")):
+        if not full and is_blob_ref(ne.get(column)):
+            external = True
+            continue
+        value = decode_payload(ne.get(column))
+        if value is not None:
+            entry[key] = value
+    if ne.get("request_method"):
+        entry["request"] = {
+            "method": ne["request_method"],
+            "url": ne.get("request_url"),
+        }
+    if ne.get("response_status") is not None:
+        entry["response"] = {
+            "status": ne["response_status"],
+            "statusText": ne.get("response_status_text"),
+        }
+    if not full:
+        entry["hasPayload"] = external or "request" in entry or "response" in entry
+        return entry
 
+    for section, key, column in (
+        ("request", "headers", "request_headers"),
+        ("request", "body", "request_body"),
+        ("response", "headers", "response_headers"),
+        ("response", "data", "response_data"),
+    ):
+        if section in entry:
+            value = decode_payload(ne.get(column))
+            if value is not None:
+                entry[section][key] = value
+    return entry
+
+
+def _encode_execution_cursor(started_at: Any, execution_id: str) -> str:
+    raw = json.dumps([str(started_at), execution_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
 
-def _assemble_pipeline(pipeline_row, node_rows, edge_rows) -> Dict[str, Any]:
-    """Reconstruct a full Pipeline object from normalized table rows."""
-    p = dict(pipeline_row)
-    return {
-        "id": p["id"],
-        "name": p.get("name"),
-        "description": p.get("description"),
-        "status": p.get("status", "draft"),
-        "createdAt": p.get("created_at"),
-        "updatedAt": p.get("updated_at"),
-        "message_id": p.get("message_id"),
-        "conversation_id": p.get("conversation_id"),
-        "nodes": [_assemble_node(dict(n)) for n in node_rows],
-        "edges": [
-            {"source": dict(e)["source_node_id"], "target": dict(e)["target_node_id"]}
-            for e in edge_rows
-        ],
-    }
+
+def _decode_execution_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        started_at, execution_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return str(started_at), str(execution_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
 
 
 def _strip_pdb_content(data: Any) -> Any:
@@ -64,65 +131,23 @@ def _strip_pdb_content(data: Any) -> Any:
     return cleaned if cleaned else None
 
 
-def _sync_node_files(conn, pipeline_id: str, nodes: List[Dict[str, Any]]):
-    """Extract and track file references from nodes into pipeline_node_files."""
-    # Remove old non-execution file refs for this pipeline (re-sync)
-    conn.execute(
-        "DELETE FROM pipeline_node_files WHERE pipeline_id = ? AND execution_id IS NULL",
-        (pipeline_id,),
-    )
+def _node_payloads(entry: Dict[str, Any]) -> List[Any]:
+    """Payload values of a node execution entry, in ``PAYLOAD_COLUMNS`` order."""
+    req = entry.get("request", {}) or {}
+    resp = entry.get("response", {}) or {}
+    return [entry.get("input"), entry.get("output"), req.get("body"), _strip_pdb_content(resp.get("data"))]
 
-    for node in nodes:
-        config = node.get("config", {})
-        if isinstance(config, str):
-            try:
-                config = json.loads(config)
-            except (json.JSONDecodeError, TypeError):
-                config = {}
-
-        node_type = node.get("type", "")
-        node_id = node.get("id", "")
-
-        # Input node files
-        if node_type == "input_node" and config.get("file_id"):
-            file_meta = {}
-            for key in ["atoms", "chains", "chain_residue_counts", "total_residues", "suggested_contigs"]:
-                if key in config:
-                    file_meta[key] = config[key]
-            conn.execute("""
-                INSERT INTO pipeline_node_files
-                    (id, pipeline_id, node_id, role, file_type, filename, file_url, file_id, metadata)
-                VALUES (?, ?, ?, 'input', 'pdb', ?, ?, ?, ?)
-            """, (
-                str(uuid.uuid4()), pipeline_id, node_id,
-                config.get("filename"),
-                config.get("file_url"),
-                config.get("file_id"),
-                json.dumps(file_meta) if file_meta else None,
-            ))
 
-        # Output file references from result_metadata
-        result_meta = node.get("result_metadata")
-        if isinstance(result_meta, str):
-            try:
-                result_meta = json.loads(result_meta)
-            except (json.JSONDecodeError, TypeError):
-                result_meta = None
-
-        if result_meta and isinstance(result_meta, dict):
-            output_file = result_meta.get("output_file")
-            if output_file and isinstance(output_file, dict):
-                conn.execute("""
-                    INSERT INTO pipeline_node_files
-                        (id, pipeline_id, node_id, role, file_type, filename, file_url, file_path, file_id)
-                    VALUES (?, ?, ?, 'output', 'pdb', ?, ?, ?, ?)
-                """, (
-                    str(uuid.uuid4()), pipeline_id, node_id,
-                    output_file.get("filename"),
-                    output_file.get("file_url"),
-                    output_file.get("filepath"),
-                    output_file.get("file_id"),
-                ))
+async def _encode_node_payloads(entries: List[Dict[str, Any]]) -> List[List[Optional[str]]]:
+    """Encoded payload columns for each entry.
+
+    Serializing, compressing and writing blobs runs on the compute thread
+    pool, not the event loop.
+    """
+    values = [value for entry in entries for value in _node_payloads(entry)]
+    encoded = await compute_executor.run(encode_payloads, values, kind="thread", label="encode_payloads")
+    width = len(PAYLOAD_COLUMNS)
+    return [encoded[i:i + width] for i in range(0, len(encoded), width)]
 
 
 # ---------------------------------------------------------------------------
@@ -195,72 +220,20 @@ async def create_pipeline(
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (pipeline_id, user["id"], message_id, conversation_id, name, description, status_value, now, now))
 
-        # 2. Sync nodes - delete removed nodes, upsert existing
-        incoming_nodes = pipeline_data.get("nodes", [])
-        incoming_node_ids = [n.get("id") for n in incoming_nodes if n.get("id")]
-
-        if incoming_node_ids:
-            placeholders = ",".join("?" * len(incoming_node_ids))
-            conn.execute(
-                f"DELETE FROM pipeline_nodes WHERE pipeline_id = ? AND id NOT IN ({placeholders})",
-                [pipeline_id] + incoming_node_ids,
-            )
-        else:
-            conn.execute("DELETE FROM pipeline_nodes WHERE pipeline_id = ?", (pipeline_id,))
-
-        for node in incoming_nodes:
-            node_id = node.get("id")
-            if not node_id:
-                continue
-            position = node.get("position", {})
-            config_val = node.get("config", {})
-            inputs_val = node.get("inputs", {})
-            result_meta = node.get("result_metadata")
-
-            config_json = json.dumps(config_val) if isinstance(config_val, dict) else (config_val or "{}")
-            inputs_json = json.dumps(inputs_val) if isinstance(inputs_val, dict) else (inputs_val or "{}")
-            result_json = json.dumps(result_meta) if result_meta else None
-
-            # Use INSERT OR REPLACE for upsert on composite PK
-            conn.execute("""
-                INSERT OR REPLACE INTO pipeline_nodes
-                    (id, pipeline_id, type, label, config, inputs, status,
-                     result_metadata, error, position_x, position_y, created_at, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, COALESCE(
-                    (SELECT created_at FROM pipeline_nodes WHERE id = ? AND pipeline_id = ?),
-                    ?
-                ), ?)
-            """, (
-                node_id, pipeline_id,
-                node.get("type", "input_node"),
-                node.get("label", ""),
-                config_json, inputs_json,
-                node.get("status", "idle"),
-                result_json,
-                node.get("error"),
-                position.get("x", 0), position.get("y", 0),
-                node_id, pipeline_id, now,  # For COALESCE
-                now,
-            ))
-
-        # 3. Replace edges
-        conn.execute("DELETE FROM pipeline_edges WHERE pipeline_id = ?", (pipeline_id,))
-        for edge in pipeline_data.get("edges", []):
-            source = edge.get("source", "")
-            target = edge.get("target", "")
-            if source and target:
-                conn.execute("""
-                    INSERT OR IGNORE INTO pipeline_edges (id, pipeline_id, source_node_id, target_node_id)
-                    VALUES (?, ?, ?, ?)
-                """, (str(uuid.uuid4()), pipeline_id, source, target))
-
-        # 4. Sync file references
-        _sync_node_files(conn, pipeline_id, incoming_nodes)
+        # 2. Apply only the node, edge and file-reference changes
+        changes = save_pipeline_graph(
+            conn,
+            pipeline_id,
+            pipeline_data.get("nodes", []),
+            pipeline_data.get("edges", []),
+            now,
+        )
 
     return {
         "status": "success",
         "pipeline_id": pipeline_id,
         "message": "Pipeline saved successfully",
+        "changes": changes,
     }
 
 
@@ -295,20 +268,12 @@ async def list_pipelines(
                 (user["id"],),
             ).fetchall()
 
-        pipelines = []
-        for p_row in pipeline_rows:
-            p = dict(p_row)
-            if full:
-                nodes = conn.execute(
-                    "SELECT * FROM pipeline_nodes WHERE pipeline_id = ? ORDER BY created_at",
-                    (p["id"],),
-                ).fetchall()
-                edges = conn.execute(
-                    "SELECT * FROM pipeline_edges WHERE pipeline_id = ?",
-                    (p["id"],),
-                ).fetchall()
-                pipelines.append(_assemble_pipeline(p_row, nodes, edges))
-            else:
+        if full:
+            pipelines = load_pipelines(conn, pipeline_rows)
+        else:
+            pipelines = []
+            for p_row in pipeline_rows:
+                p = dict(p_row)
                 pipelines.append({
                     "id": p["id"],
                     "name": p.get("name"),
@@ -330,26 +295,14 @@ async def get_pipeline(
 ) -> Dict[str, Any]:
     """Get a specific pipeline with all nodes and edges."""
     with get_db() as conn:
-        pipeline = conn.execute(
-            "SELECT * FROM pipelines WHERE id = ? AND user_id = ?",
-            (pipeline_id, user["id"]),
-        ).fetchone()
-        if not pipeline:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pipeline not found or access denied")
+        pipeline = load_pipeline(conn, pipeline_id, user["id"])
+    if not pipeline:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pipeline not found or access denied")
 
-        nodes = conn.execute(
-            "SELECT * FROM pipeline_nodes WHERE pipeline_id = ? ORDER BY created_at",
-            (pipeline_id,),
-        ).fetchall()
-        edges = conn.execute(
-            "SELECT * FROM pipeline_edges WHERE pipeline_id = ?",
-            (pipeline_id,),
-        ).fetchall()
-
-        return {
-            "status": "success",
-            "pipeline": _assemble_pipeline(pipeline, nodes, edges),
-        }
+    return {
+        "status": "success",
+        "pipeline": pipeline,
+    }
 
 
 @router.put("/{pipeline_id}")
@@ -376,7 +329,12 @@ async def delete_pipeline(
     pipeline_id: str,
     user: Dict[str, Any] = Depends(get_current_user),
 ) -> Dict[str, Any]:
-    """Delete a pipeline. Cascade deletes nodes, edges, executions, and file refs."""
+    """Delete a pipeline. Cascade deletes nodes, edges, executions, and file refs.
+
+    Execution rows are deleted explicitly as well, since connections do not
+    enable foreign keys; their payload blobs are then collected by the blob
+    store's sweep (see ``run_blob_gc``).
+    """
     with get_db() as conn:
         result = conn.execute(
             "DELETE FROM pipelines WHERE id = ? AND user_id = ?",
@@ -384,7 +342,14 @@ async def delete_pipeline(
         )
         if result.rowcount == 0:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pipeline not found or access denied")
+        conn.execute(
+            "DELETE FROM pipeline_node_executions WHERE execution_id IN "
+            "(SELECT id FROM pipeline_executions WHERE pipeline_id = ?)",
+            (pipeline_id,),
+        )
+        conn.execute("DELETE FROM pipeline_executions WHERE pipeline_id = ?", (pipeline_id,))
 
+    pipeline_graph_cache.invalidate(pipeline_id)
     return {"status": "success", "message": "Pipeline deleted successfully"}
 
 
@@ -404,9 +369,13 @@ async def create_execution(
             "SELECT id FROM pipelines WHERE id = ? AND user_id = ?",
             (pipeline_id, user["id"]),
         ).fetchone()
-        if not pipeline:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pipeline not found or access denied")
+    if not pipeline:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pipeline not found or access denied")
 
+    execution_log = execution_data.get("execution_log", [])
+    payloads = await _encode_node_payloads(execution_log)
+
+    with get_db() as conn:
         execution_id = str(uuid.uuid4())
         status_value = execution_data.get("status", "running")
         trigger_type = execution_data.get("trigger_type", "manual")
@@ -418,13 +387,11 @@ async def create_execution(
         """, (execution_id, pipeline_id, user["id"], status_value, trigger_type, now))
 
         # Insert per-node execution entries
-        for order, log in enumerate(execution_data.get("execution_log", [])):
+        for order, (log, encoded) in enumerate(zip(execution_log, payloads)):
             ne_id = str(uuid.uuid4())
             req = log.get("request", {}) or {}
             resp = log.get("response", {}) or {}
-
-            # Strip raw PDB content from response data
-            resp_data = _strip_pdb_content(resp.get("data"))
+            input_data, output_data, request_body, response_data = encoded
 
             conn.execute("""
                 INSERT INTO pipeline_node_executions
@@ -441,14 +408,14 @@ async def create_execution(
                 log.get("startedAt"), log.get("completedAt"),
                 log.get("duration"),
                 log.get("error"),
-                json.dumps(log.get("input")) if log.get("input") else None,
-                json.dumps(log.get("output")) if log.get("output") else None,
+                input_data,
+                output_data,
                 req.get("method"), req.get("url"),
                 json.dumps(req.get("headers")) if req.get("headers") else None,
-                json.dumps(req.get("body")) if req.get("body") else None,
+                request_body,
                 resp.get("status"), resp.get("statusText"),
                 json.dumps(resp.get("headers")) if resp.get("headers") else None,
-                json.dumps(resp_data) if resp_data else None,
+                response_data,
             ))
 
             # Track output files
@@ -477,93 +444,102 @@ async def create_execution(
 async def list_executions(
     pipeline_id: str,
     user: Dict[str, Any] = Depends(get_current_user),
+    limit: int = Query(EXECUTION_PAGE_SIZE, ge=1, le=EXECUTION_PAGE_MAX),
+    cursor: Optional[str] = None,
+    full: bool = False,
 ) -> Dict[str, Any]:
-    """List executions for a pipeline. Reconstructs execution_log array for frontend compatibility."""
-    with get_db() as conn:
-        pipeline = conn.execute(
-            "SELECT id FROM pipelines WHERE id = ? AND user_id = ?",
-            (pipeline_id, user["id"]),
-        ).fetchone()
-        if not pipeline:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pipeline not found or access denied")
+    """List executions for a pipeline, newest first, one page at a time.
+
+    Each execution carries an execution_log array for frontend compatibility.
+    By default log entries are summaries; request/response headers and bodies
+    are fetched per node via the node execution endpoint, or inlined with
+    full=true. Pass next_cursor back as cursor to get the following page.
+    """
+    after = _decode_execution_cursor(cursor) if cursor else None
+    ne_columns = _NODE_EXECUTION_COLUMNS + (_NODE_EXECUTION_PAYLOAD_COLUMNS if full else ())
+    select_ne = ", ".join(f"ne.{col} AS ne_{col}" for col in ne_columns)
+    keyset = "AND (started_at < ? OR (started_at = ? AND id < ?))" if after else ""
+    params: List[Any] = [pipeline_id, user["id"]]
+    if after:
+        params += [after[0], after[0], after[1]]
+    # Fetch one extra execution to know whether another page exists
+    params.append(limit + 1)
 
-        exec_rows = conn.execute("""
-            SELECT * FROM pipeline_executions
-            WHERE pipeline_id = ? AND user_id = ?
-            ORDER BY started_at DESC
-        """, (pipeline_id, user["id"])).fetchall()
-
-        executions = []
-        for ex_row in exec_rows:
-            ex = dict(ex_row)
-
-            node_exec_rows = conn.execute("""
-                SELECT * FROM pipeline_node_executions
-                WHERE execution_id = ?
-                ORDER BY execution_order
-            """, (ex["id"],)).fetchall()
-
-            # Reconstruct execution_log array for frontend compatibility
-            execution_log = []
-            for ne_row in node_exec_rows:
-                ne = dict(ne_row)
-                entry: Dict[str, Any] = {
-                    "nodeId": ne["node_id"],
-                    "nodeLabel": ne["node_label"],
-                    "nodeType": ne["node_type"],
-                    "status": ne["status"],
-                    "startedAt": ne.get("started_at"),
-                    "completedAt": ne.get("completed_at"),
-                    "duration": ne.get("duration_ms"),
-                    "error": ne.get("error"),
-                }
-                if ne.get("input_data"):
-                    try:
-                        entry["input"] = json.loads(ne["input_data"])
-                    except (json.JSONDecodeError, TypeError):
-                        pass
-                if ne.get("output_data"):
-                    try:
-                        entry["output"] = json.loads(ne["output_data"])
-                    except (json.JSONDecodeError, TypeError):
-                        pass
-                if ne.get("request_method"):
-                    entry["request"] = {
-                        "method": ne["request_method"],
-                        "url": ne.get("request_url"),
-                    }
-                    if ne.get("request_headers"):
-                        try:
-                            entry["request"]["headers"] = json.loads(ne["request_headers"])
-                        except (json.JSONDecodeError, TypeError):
-                            pass
-                    if ne.get("request_body"):
-                        try:
-                            entry["request"]["body"] = json.loads(ne["request_body"])
-                        except (json.JSONDecodeError, TypeError):
-                            pass
-                if ne.get("response_status") is not None:
-                    entry["response"] = {
-                        "status": ne["response_status"],
-                        "statusText": ne.get("response_status_text"),
-                    }
-                    if ne.get("response_headers"):
-                        try:
-                            entry["response"]["headers"] = json.loads(ne["response_headers"])
-                        except (json.JSONDecodeError, TypeError):
-                            pass
-                    if ne.get("response_data"):
-                        try:
-                            entry["response"]["data"] = json.loads(ne["response_data"])
-                        except (json.JSONDecodeError, TypeError):
-                            pass
-
-                execution_log.append(entry)
-
-            ex["execution_log"] = execution_log
+    with get_db() as conn:
+        rows = conn.execute(f"""
+            WITH page AS (
+                SELECT * FROM pipeline_executions
+                WHERE pipeline_id = ? AND user_id = ? {keyset}
+                ORDER BY started_at DESC, id DESC
+                LIMIT ?
+            )
+            SELECT page.*, {select_ne}
+            FROM page
+            LEFT JOIN pipeline_node_executions ne ON ne.execution_id = page.id
+            ORDER BY page.started_at DESC, page.id DESC, ne.execution_order
+        """, params).fetchall()
+
+        if not rows and not after:
+            pipeline = conn.execute(
+                "SELECT id FROM pipelines WHERE id = ? AND user_id = ?",
+                (pipeline_id, user["id"]),
+            ).fetchone()
+            if not pipeline:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pipeline not found or access denied")
+
+    executions: List[Dict[str, Any]] = []
+    by_id: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        r = dict(row)
+        ex = by_id.get(r["id"])
+        if ex is None:
+            ex = {k: v for k, v in r.items() if not k.startswith("ne_")}
+            ex["execution_log"] = []
+            by_id[ex["id"]] = ex
             executions.append(ex)
+        if r.get("ne_id") is not None:
+            ne = {col: r[f"ne_{col}"] for col in ne_columns}
+            ex["execution_log"].append(_assemble_node_execution(ne, full=full))
 
-        return {"status": "success", "executions": executions}
+    next_cursor = None
+    if len(executions) > limit:
+        executions = executions[:limit]
+        last = executions[-1]
+        next_cursor = _encode_execution_cursor(last["started_at"], last["id"])
+
+    return {"status": "success", "executions": executions, "next_cursor": next_cursor}
+
+
+@router.get("/{pipeline_id}/executions/{execution_id}/nodes/{node_id}")
+async def get_node_execution(
+    pipeline_id: str,
+    execution_id: str,
+    node_id: str,
+    request: Request,
+    user: Dict[str, Any] = Depends(get_current_user),
+) -> Response:
+    """Full log entry for one node execution, including request/response payloads.
+
+    Large bodies are gzip-compressed when the client accepts it.
+    """
+    with get_db() as conn:
+        row = conn.execute(f"""
+            SELECT {", ".join("ne." + col for col in _NODE_EXECUTION_COLUMNS + _NODE_EXECUTION_PAYLOAD_COLUMNS)}
+            FROM pipeline_node_executions ne
+            JOIN pipeline_executions ex ON ex.id = ne.execution_id
+            WHERE ne.execution_id = ? AND ne.node_id = ? AND ne.pipeline_id = ? AND ex.user_id = ?
+        """, (execution_id, node_id, pipeline_id, user["id"])).fetchone()
+    if not row:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Node execution not found")
+
+    body = json.dumps(
+        {"status": "success", "node_execution": _assemble_node_execution(dict(row), full=True)}
+    ).encode("utf-8")
+    headers = {"Vary": "Accept-Encoding"}
+    if len(body) >= PAYLOAD_GZIP_MIN_BYTES and "gzip" in request.headers.get("accept-encoding", ""):
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 # ---------------------------------------------------------------------------
@@ -654,6 +630,30 @@ async def update_node(
     return {"status": "success", "message": "Node updated successfully"}
 
 
+@router.patch("/{pipeline_id}/positions")
+async def update_positions(
+    pipeline_id: str,
+    position_data: Dict[str, Any],
+    user: Dict[str, Any] = Depends(get_current_user),
+) -> Dict[str, Any]:
+    """Move nodes on the canvas. Body: {"positions": {node_id: {"x": .., "y": ..}}}."""
+    positions = position_data.get("positions")
+    if not isinstance(positions, dict) or not all(isinstance(p, dict) for p in positions.values()):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="positions must map node IDs to {x, y}")
+
+    with get_db() as conn:
+        pipeline = conn.execute(
+            "SELECT id FROM pipelines WHERE id = ? AND user_id = ?",
+            (pipeline_id, user["id"]),
+        ).fetchone()
+        if not pipeline:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pipeline not found or access denied")
+
+        updated = update_node_positions(conn, pipeline_id, positions, datetime.utcnow())
+
+    return {"status": "success", "updated": updated}
+
+
 @router.get("/{pipeline_id}/nodes/{node_id}/files")
 async def get_node_files(
     pipeline_id: str,
@@ -742,12 +742,15 @@ async def upsert_node_execution(
             "SELECT id FROM pipeline_executions WHERE id = ? AND pipeline_id = ?",
             (execution_id, pipeline_id),
         ).fetchone()
-        if not execution:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Execution not found")
+    if not execution:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Execution not found")
 
+    encoded = await _encode_node_payloads([node_exec_data])
+    input_data, output_data, request_body, response_data = encoded[0]
+
+    with get_db() as conn:
         req = node_exec_data.get("request", {}) or {}
         resp = node_exec_data.get("response", {}) or {}
-        resp_data = _strip_pdb_content(resp.get("data"))
 
         # Check if node execution already exists
         existing = conn.execute(
@@ -769,14 +772,14 @@ async def upsert_node_execution(
                 node_exec_data.get("completedAt"),
                 node_exec_data.get("duration"),
                 node_exec_data.get("error"),
-                json.dumps(node_exec_data.get("input")) if node_exec_data.get("input") else None,
-                json.dumps(node_exec_data.get("output")) if node_exec_data.get("output") else None,
+                input_data,
+                output_data,
                 req.get("method"), req.get("url"),
                 json.dumps(req.get("headers")) if req.get("headers") else None,
-                json.dumps(req.get("body")) if req.get("body") else None,
+                request_body,
                 resp.get("status"), resp.get("statusText"),
                 json.dumps(resp.get("headers")) if resp.get("headers") else None,
-                json.dumps(resp_data) if resp_data else None,
+                response_data,
                 ne_id,
             ))
         else:
@@ -799,14 +802,14 @@ async def upsert_node_execution(
                 node_exec_data.get("completedAt"),
                 node_exec_data.get("duration"),
                 node_exec_data.get("error"),
-                json.dumps(node_exec_data.get("input")) if node_exec_data.get("input") else None,
-                json.dumps(node_exec_data.get("output")) if node_exec_data.get("output") else None,
+                input_data,
+                output_data,
                 req.get("method"), req.get("url"),
                 json.dumps(req.get("headers")) if req.get("headers") else None,
-                json.dumps(req.get("body")) if req.get("body") else None,
+                request_body,
                 resp.get("status"), resp.get("statusText"),
                 json.dumps(resp.get("headers")) if resp.get("headers") else None,
-                json.dumps(resp_data) if resp_data else None,
+                response_data,
             ))
 
     return {"status": "success", "node_execution_id": ne_id}
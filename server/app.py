@@ -1,4 +1,5 @@
 import asyncio
+import hmac
 import os
 import traceback
 import time
@@ -7,7 +8,6 @@ from typing import Any, Dict, Optional
 from pathlib import Path
 
 from dotenv import load_dotenv
-import httpx
 
 # Load env as early as possible, before importing modules that read env at import-time
 # Load .env from project root (one level up from server directory)
@@ -26,6 +26,13 @@ if os.path.exists(server_env_path):
     load_dotenv(server_env_path, override=True)
     print(f"Also loaded .env from: {server_env_path}")
 
+# Time everything imported from here on (reported at startup)
+try:
+    from .infrastructure.startup_profile import startup_profile
+except ImportError:
+    from infrastructure.startup_profile import startup_profile
+startup_profile.begin_imports()
+
 # LangSmith tracing (must run after env load, before agent imports)
 try:
     from .infrastructure.langsmith_config import setup_langsmith
@@ -52,37 +59,57 @@ if nvidia_key:
 else:
     print("Warning: NVCF_RUN_KEY not found or empty (AlphaFold/RFdiffusion will fail)")
 
-from fastapi import FastAPI, Request, UploadFile, File, HTTPException, Depends
+from fastapi import FastAPI, Request, UploadFile, File, HTTPException, Depends, Query
 from fastapi.middleware.cors import CORSMiddleware
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 from slowapi.middleware import SlowAPIMiddleware
 from slowapi.errors import RateLimitExceeded
-from fastapi.responses import JSONResponse, FileResponse
-
-try:
-    from langsmith import traceable, tracing_context, Client as LangSmithClient
-except ImportError:
-    def traceable(*args, **kwargs):
-        def noop(f):
-            return f
-        return noop
-    tracing_context = None
-    LangSmithClient = None
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 
 try:
     from .agents.registry import agents, list_agents
     from .agents.router import init_router, routerGraph
     from .agents.runner import run_agent
     from .infrastructure.utils import log_line, spell_fix
-    from .agents.handlers.alphafold import alphafold_handler
-    from .agents.handlers.rfdiffusion import rfdiffusion_handler
-    from .agents.handlers.proteinmpnn import proteinmpnn_handler
-    from .agents.handlers.openfold2 import openfold2_handler
-    from .domain.storage.pdb_storage import save_uploaded_pdb, get_uploaded_pdb
-    from .domain.storage.file_access import list_user_files, verify_file_ownership, get_file_metadata, get_user_file_path
+    from .infrastructure.langsmith_config import load_langsmith, traceable
+    from .infrastructure.lazy_imports import lazy_attribute, lazy_module
+    _HANDLERS_PACKAGE = f"{__package__}.agents.handlers"
+    from .domain.storage.pdb_storage import (
+        PDB_UPLOAD_MAX_BYTES,
+        get_uploaded_pdb,
+        save_uploaded_pdb_async,
+        save_uploaded_pdb_stream,
+    )
+    from .domain.storage.file_access import verify_file_ownership, get_file_metadata, get_user_file_path_async
+    from .domain.storage.file_catalog import (
+        FILE_PAGE_MAX,
+        FILE_RECONCILE_INTERVAL_SECONDS,
+        iter_user_files_ndjson,
+        query_user_files,
+        run_file_reconciler,
+    )
+    from .domain.admin.audit_log import audit_log_writer
+    from .domain.admin.metrics import METRICS_COMPACT_INTERVAL_SECONDS, run_metrics_compactor
+    from .domain.admin.exports import run_export_cleanup
+    from .domain.pipeline.repository import load_pipeline_graphs
+    from .domain.storage.blob_store import (
+        BLOB_GC_INTERVAL_SECONDS,
+        is_blob_ref,
+        payload_text,
+        run_blob_gc,
+        run_payload_migration,
+    )
+    from .domain.storage.backends import get_storage_backend
+    from .domain.storage.result_storage import read_result_text, result_local_path
     from .database.db import get_db
+    from .infrastructure.password_hashing import password_hasher
+    from .infrastructure.file_serving import etag_matches, file_etag, remove_precompressed, serve_file
+    from .infrastructure.compute import compute_executor, shutdown_pools, ComputeTimeoutError, ComputeCancelledError
+    from .infrastructure.llm_cache import llm_response_cache
+    from .infrastructure.instrumentation import metrics_registry
     from .api.middleware.auth import get_current_user, get_current_user_optional
+    from .api.middleware.instrumentation import RequestMetricsMiddleware
     from .api.routes import auth, chat_sessions, chat_messages, pipelines, credits, reports, admin, three_d_canvases, attachments
 except ImportError:
     # When running directly (not as module)
@@ -90,34 +117,73 @@ except ImportError:
     current_dir = os.path.dirname(os.path.abspath(__file__))
     if current_dir not in sys.path:
         sys.path.insert(0, current_dir)
-    try:
-        from langsmith import traceable, tracing_context, Client as LangSmithClient
-    except ImportError:
-        def traceable(*args, **kwargs):
-            def noop(f):
-                return f
-            return noop
-        tracing_context = None
-        LangSmithClient = None
     from agents.registry import agents, list_agents
     from agents.router import init_router, routerGraph
     from agents.runner import run_agent
     from infrastructure.utils import log_line, spell_fix
-    from agents.handlers.alphafold import alphafold_handler
-    from agents.handlers.rfdiffusion import rfdiffusion_handler
-    from agents.handlers.proteinmpnn import proteinmpnn_handler
-    from agents.handlers.openfold2 import openfold2_handler
-    from domain.storage.pdb_storage import save_uploaded_pdb, get_uploaded_pdb
-    from domain.storage.file_access import list_user_files, verify_file_ownership, get_file_metadata, get_user_file_path
+    from infrastructure.langsmith_config import load_langsmith, traceable
+    from infrastructure.lazy_imports import lazy_attribute, lazy_module
+    _HANDLERS_PACKAGE = "agents.handlers"
+    from domain.storage.pdb_storage import (
+        PDB_UPLOAD_MAX_BYTES,
+        get_uploaded_pdb,
+        save_uploaded_pdb_async,
+        save_uploaded_pdb_stream,
+    )
+    from domain.storage.file_access import verify_file_ownership, get_file_metadata, get_user_file_path_async
+    from domain.storage.file_catalog import (
+        FILE_PAGE_MAX,
+        FILE_RECONCILE_INTERVAL_SECONDS,
+        iter_user_files_ndjson,
+        query_user_files,
+        run_file_reconciler,
+    )
+    from domain.admin.audit_log import audit_log_writer
+    from domain.admin.metrics import METRICS_COMPACT_INTERVAL_SECONDS, run_metrics_compactor
+    from domain.admin.exports import run_export_cleanup
+    from domain.pipeline.repository import load_pipeline_graphs
+    from domain.storage.blob_store import (
+        BLOB_GC_INTERVAL_SECONDS,
+        is_blob_ref,
+        payload_text,
+        run_blob_gc,
+        run_payload_migration,
+    )
+    from domain.storage.backends import get_storage_backend
+    from domain.storage.result_storage import read_result_text, result_local_path
     from database.db import get_db
+    from infrastructure.password_hashing import password_hasher
+    from infrastructure.file_serving import etag_matches, file_etag, remove_precompressed, serve_file
+    from infrastructure.compute import compute_executor, shutdown_pools, ComputeTimeoutError, ComputeCancelledError
+    from infrastructure.llm_cache import llm_response_cache
+    from infrastructure.instrumentation import metrics_registry
     from api.middleware.auth import get_current_user, get_current_user_optional
+    from api.middleware.instrumentation import RequestMetricsMiddleware
     from api.routes import auth, chat_sessions, chat_messages, pipelines, credits, reports, admin, three_d_canvases, attachments
 
+startup_profile.end_imports()
+
+# Imported on first use; httpx is slow to import
+httpx = lazy_module("httpx")
+
+# Job handlers (and the NVIDIA clients behind them) load on first use
+alphafold_handler = lazy_attribute(f"{_HANDLERS_PACKAGE}.alphafold", "alphafold_handler")
+rfdiffusion_handler = lazy_attribute(f"{_HANDLERS_PACKAGE}.rfdiffusion", "rfdiffusion_handler")
+proteinmpnn_handler = lazy_attribute(f"{_HANDLERS_PACKAGE}.proteinmpnn", "proteinmpnn_handler")
+openfold2_handler = lazy_attribute(f"{_HANDLERS_PACKAGE}.openfold2", "openfold2_handler")
+
 DEBUG_API = os.getenv("DEBUG_API", "0") == "1"
+# Move oversized inline execution payloads to the blob store after startup
+PAYLOAD_MIGRATION_ON_STARTUP = os.getenv("PAYLOAD_MIGRATION_ON_STARTUP", "1") == "1"
+# /api/health/ready fails once compute pools hold this many tasks per worker
+READY_MAX_COMPUTE_BACKLOG = float(os.getenv("READY_MAX_COMPUTE_BACKLOG", "4"))
+# Bearer token required by /metrics when set
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
 
 
 def _summarize_json(raw: str, max_len: int = 200) -> str:
     """Truncate a JSON string for LLM context, preserving structure hints."""
+    raw = payload_text(raw) if is_blob_ref(raw) else raw
     if not raw:
         return ""
     try:
@@ -138,7 +204,8 @@ def _langsmith_context(langsmith_config: Optional[Dict[str, Any]]):
     - enabled=True, no apiKey: use env (no-op context, default behavior)
     - no config: use env (no-op context)
     """
-    if tracing_context is None:
+    langsmith = load_langsmith()
+    if langsmith is None:
         from contextlib import nullcontext
         return nullcontext()
 
@@ -146,16 +213,16 @@ def _langsmith_context(langsmith_config: Optional[Dict[str, Any]]):
     enabled = cfg.get("enabled", True)
 
     if enabled is False:
-        return tracing_context(enabled=False)
+        return langsmith.tracing_context(enabled=False)
 
     api_key = (cfg.get("apiKey") or "").strip()
-    if api_key and LangSmithClient:
+    if api_key:
         project = cfg.get("project") or "novoprotein-agent"
-        client = LangSmithClient(
+        client = langsmith.Client(
             api_key=api_key,
             api_url="https://api.smith.langchain.com",
         )
-        return tracing_context(client=client, project_name=project)
+        return langsmith.tracing_context(client=client, project_name=project)
 
     from contextlib import nullcontext
     return nullcontext()
@@ -204,6 +271,7 @@ async def _invoke_route_and_agent(
         model_override=model_override,
         user_id=user.get("id") if user else None,
         pdb_content=body.get("pdb_content"),
+        session_id=body.get("sessionId"),
     )
     return {"agentId": agent_id, **res, "reason": reason}
 
@@ -228,15 +296,45 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Added last so it wraps the other middleware
+app.add_middleware(RequestMetricsMiddleware)
+
+
+async def _warm_up() -> None:
+    """Embed the agents for semantic routing and preload deferred imports.
+
+    Runs as a background task so the server takes requests straight away;
+    until the router is ready, requests are routed by the rule-based path.
+    """
+    started = time.perf_counter()
+    try:
+        await init_router(list(agents.values()))
+    except Exception as e:
+        log_line("router_warmup_failed", {"error": str(e)}, level="error")
+    router_seconds = time.perf_counter() - started
+    startup_profile.record("router_warmup", router_seconds)
+    loaded = await asyncio.to_thread(startup_profile.warm_imports)
+    log_line("startup_warmup", {
+        "router_seconds": round(router_seconds, 4),
+        "router_embeddings": bool(routerGraph.agent_vecs),
+        "warm_imports": loaded,
+    })
 
 
 @app.on_event("startup")
 async def startup():
-    await init_router(list(agents.values()))
+    stats = startup_profile.get_stats()
+    log_line("startup_imports", {
+        "seconds": stats.get("imports_seconds"),
+        "modules_loaded": stats.get("modules_loaded"),
+    })
+    import_report = startup_profile.format_imports()
+    if import_report:
+        log_line("startup_import_report", {"report": import_report})
+    app.state.warmup = asyncio.create_task(_warm_up())
     
     # Suppress harmless Windows asyncio connection reset errors
     # These occur when clients close connections abruptly (browser refresh, tab close, etc.)
-    import asyncio
     import logging
     import sys
     
@@ -290,6 +388,28 @@ async def startup():
             # If we can't set the handler, continue anyway
             pass
 
+    if PAYLOAD_MIGRATION_ON_STARTUP:
+        app.state.payload_migration = asyncio.create_task(run_payload_migration())
+    if FILE_RECONCILE_INTERVAL_SECONDS > 0:
+        app.state.file_reconciler = asyncio.create_task(run_file_reconciler())
+    if BLOB_GC_INTERVAL_SECONDS > 0:
+        app.state.blob_gc = asyncio.create_task(run_blob_gc())
+    if METRICS_COMPACT_INTERVAL_SECONDS > 0:
+        app.state.metrics_compactor = asyncio.create_task(run_metrics_compactor())
+    app.state.export_cleanup = asyncio.create_task(run_export_cleanup())
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    for name in ("warmup", "payload_migration", "file_reconciler", "blob_gc", "metrics_compactor", "export_cleanup"):
+        task = getattr(app.state, name, None)
+        if task is not None and not task.done():
+            task.cancel()
+    audit_log_writer.stop()
+    password_hasher.shutdown()
+    shutdown_pools()
+
+
 # Register API routers
 app.include_router(auth.router)
 app.include_router(chat_sessions.router)
@@ -308,6 +428,91 @@ def health() -> Dict[str, Any]:
     return {"ok": True}
 
 
+RESOURCE_SATURATION = metrics_registry.gauge(
+    "novoprotein_resource_saturation",
+    "Work held by a worker pool or queue divided by its capacity.",
+    ("resource",),
+)
+RESOURCE_IN_USE = metrics_registry.gauge(
+    "novoprotein_resource_in_use",
+    "Work items running or queued in a worker pool or queue.",
+    ("resource",),
+)
+
+
+def _resource_usage() -> Dict[str, Dict[str, Any]]:
+    """In-use count, capacity and saturation of the pools and queues requests wait on.
+
+    ``limit`` is the saturation at which the instance stops reporting ready:
+    bounded queues reject or drop work once full, compute pools queue
+    without bound so they get a backlog allowance.
+    """
+    compute = compute_executor.get_stats()
+    hashing = password_hasher.get_metrics()
+    audit = audit_log_writer.get_stats()
+    resources = {
+        "compute_thread": (compute["in_flight"]["thread"], compute["thread_workers"], READY_MAX_COMPUTE_BACKLOG),
+        "compute_process": (compute["in_flight"]["process"], compute["process_workers"], READY_MAX_COMPUTE_BACKLOG),
+        "password_hashing": (hashing["pending"], hashing["max_pending"], 1.0),
+        "audit_log_queue": (audit["queued"], audit["capacity"], 1.0),
+    }
+    return {
+        name: {
+            "in_use": in_use,
+            "capacity": capacity,
+            "saturation": round(in_use / capacity, 3) if capacity else 0.0,
+            "limit": limit,
+        }
+        for name, (in_use, capacity, limit) in resources.items()
+    }
+
+
+def _collect_resource_metrics() -> None:
+    for name, usage in _resource_usage().items():
+        RESOURCE_SATURATION.set(usage["saturation"], resource=name)
+        RESOURCE_IN_USE.set(usage["in_use"], resource=name)
+
+
+metrics_registry.add_collector(_collect_resource_metrics)
+
+
+@app.get("/api/health/ready")
+def health_ready() -> JSONResponse:
+    """Readiness: database reachable and no pool or queue saturated (503 otherwise)."""
+    started = time.perf_counter()
+    try:
+        with get_db() as conn:
+            conn.execute("SELECT 1").fetchone()
+        database = {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 2)}
+    except Exception as e:
+        database = {"ok": False, "error": str(e)}
+
+    resources = _resource_usage()
+    for usage in resources.values():
+        usage["ok"] = usage["saturation"] < usage["limit"]
+    ready = database["ok"] and all(usage["ok"] for usage in resources.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "ready": ready,
+            "database": database,
+            "resources": resources,
+            # Informational: routing falls back to rules until warmup finishes
+            "router": {"ready": routerGraph.ready, "embeddings": bool(routerGraph.agent_vecs)},
+        },
+    )
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request) -> Response:
+    """Prometheus scrape endpoint (text exposition format 0.0.4)."""
+    if METRICS_TOKEN:
+        supplied = request.headers.get("authorization", "")
+        if not hmac.compare_digest(supplied, f"Bearer {METRICS_TOKEN}"):
+            raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
 @app.post("/api/logs/error")
 @limiter.limit("100/minute")
 async def log_error(request: Request, user: Optional[Dict[str, Any]] = Depends(get_current_user_optional)):
@@ -426,41 +631,13 @@ async def route(request: Request, user: Dict[str, Any] = Depends(get_current_use
         # Fetch pipeline data from DB only if not already provided and user is authenticated
         if pipeline_id and pipeline_data is None and user:
             try:
-                from .database.db import get_db
-                import json
                 with get_db() as conn:
                     row = conn.execute(
                         "SELECT * FROM pipelines WHERE id = ? AND user_id = ?",
                         (pipeline_id, user["id"]),
                     ).fetchone()
                     if row:
-                        # Assemble pipeline from normalized tables
-                        node_rows = conn.execute(
-                            "SELECT * FROM pipeline_nodes WHERE pipeline_id = ? ORDER BY created_at",
-                            (pipeline_id,),
-                        ).fetchall()
-                        edge_rows = conn.execute(
-                            "SELECT * FROM pipeline_edges WHERE pipeline_id = ?",
-                            (pipeline_id,),
-                        ).fetchall()
-                        nodes = []
-                        for n in node_rows:
-                            nd = dict(n)
-                            nodes.append({
-                                "id": nd["id"],
-                                "type": nd["type"],
-                                "label": nd["label"],
-                                "config": json.loads(nd["config"]) if nd.get("config") else {},
-                                "inputs": json.loads(nd["inputs"]) if nd.get("inputs") else {},
-                                "status": nd["status"],
-                                "result_metadata": json.loads(nd["result_metadata"]) if nd.get("result_metadata") else None,
-                                "error": nd.get("error"),
-                                "position": {"x": nd.get("position_x", 0), "y": nd.get("position_y", 0)},
-                            })
-                        edges = [
-                            {"source": dict(e)["source_node_id"], "target": dict(e)["target_node_id"]}
-                            for e in edge_rows
-                        ]
+                        graph = load_pipeline_graphs(conn, [row])[pipeline_id]
                         pipeline_data = {
                             "id": row["id"],
                             "name": row["name"],
@@ -468,8 +645,8 @@ async def route(request: Request, user: Dict[str, Any] = Depends(get_current_use
                             "status": row["status"],
                             "created_at": row["created_at"],
                             "updated_at": row["updated_at"],
-                            "nodes": nodes,
-                            "edges": edges,
+                            "nodes": graph["nodes"],
+                            "edges": graph["edges"],
                         }
 
                         # --- Fetch execution history & file references ---
@@ -838,6 +1015,9 @@ async def alphafold3_cancel(request: Request, job_id: str, user: Dict[str, Any]
 
 # PDB upload utilities -----------------------------------------------------
 
+# Allowance for multipart boundaries and headers on top of the file itself
+PDB_UPLOAD_MULTIPART_SLACK = 64 * 1024
+
 
 @app.post("/api/upload/pdb")
 @limiter.limit("20/minute")
@@ -846,13 +1026,15 @@ async def upload_pdb(
     file: UploadFile = File(...),
     user: Dict[str, Any] = Depends(get_current_user)
 ):
-    _ = request
     try:
-        contents = await file.read()
+        # Reject obviously oversized bodies before reading anything
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > PDB_UPLOAD_MAX_BYTES + PDB_UPLOAD_MULTIPART_SLACK:
+            raise HTTPException(status_code=413, detail="PDB file exceeds the upload limit")
         user_id = user.get("id")
         if not user_id:
             raise HTTPException(status_code=401, detail="User ID not found")
-        metadata = save_uploaded_pdb(file.filename, contents, user_id)
+        metadata = await save_uploaded_pdb_stream(file.filename, file, user_id)
         log_line(
             "pdb_upload_success",
             {
@@ -879,6 +1061,10 @@ async def upload_pdb(
         }
     except HTTPException as exc:
         raise exc
+    except ComputeTimeoutError:
+        raise HTTPException(status_code=504, detail="PDB analysis timed out")
+    except ComputeCancelledError:
+        raise HTTPException(status_code=499, detail="Client disconnected")
     except Exception as e:
         log_line("pdb_upload_failed", {"error": str(e), "trace": traceback.format_exc()})
         raise HTTPException(status_code=500, detail="Failed to upload PDB file")
@@ -904,7 +1090,7 @@ async def upload_pdb_from_content(
         if not user_id:
             raise HTTPException(status_code=401, detail="User ID not found")
         contents = pdb_content.encode("utf-8") if isinstance(pdb_content, str) else pdb_content
-        metadata = save_uploaded_pdb(filename, contents, user_id)
+        metadata = await save_uploaded_pdb_async(filename, contents, user_id, is_disconnected=request.is_disconnected)
         return {
             "status": "success",
             "message": "PDB stored",
@@ -918,6 +1104,10 @@ async def upload_pdb_from_content(
         }
     except HTTPException:
         raise
+    except ComputeTimeoutError:
+        raise HTTPException(status_code=504, detail="PDB analysis timed out")
+    except ComputeCancelledError:
+        raise HTTPException(status_code=499, detail="Client disconnected")
     except Exception as e:
         log_line("pdb_from_content_failed", {"error": str(e), "trace": traceback.format_exc()})
         raise HTTPException(status_code=500, detail="Failed to store PDB content")
@@ -926,11 +1116,11 @@ async def upload_pdb_from_content(
 @app.get("/api/upload/pdb/{file_id}")
 @limiter.limit("30/minute")
 async def download_uploaded_pdb(request: Request, file_id: str, user: Dict[str, Any] = Depends(get_current_user)):
-    _ = request
     metadata = get_uploaded_pdb(file_id, user["id"])
     if not metadata:
         raise HTTPException(status_code=404, detail="Uploaded file not found")
-    return FileResponse(
+    return await serve_file(
+        request,
         metadata["absolute_path"],
         media_type="chemical/x-pdb",
         filename=metadata.get("filename") or f"{file_id}.pdb",
@@ -942,89 +1132,43 @@ async def download_uploaded_pdb(request: Request, file_id: str, user: Dict[str,
 
 @app.get("/api/files")
 @limiter.limit("30/minute")
-async def get_user_files_endpoint(request: Request, user: Dict[str, Any] = Depends(get_current_user)):
-    """List all files for the current user. Files are already user-scoped in the database."""
+async def get_user_files_endpoint(
+    request: Request,
+    type: Optional[str] = Query(None, description="Filter by file type, e.g. upload or rfdiffusion"),
+    job_id: Optional[str] = None,
+    created_after: Optional[str] = Query(None, description="ISO date/time, inclusive"),
+    created_before: Optional[str] = Query(None, description="ISO date/time, exclusive"),
+    limit: Optional[int] = Query(None, ge=1, le=FILE_PAGE_MAX),
+    cursor: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    user: Dict[str, Any] = Depends(get_current_user),
+):
+    """List the current user's files, newest first.
+
+    Filtering and pagination happen in SQL and nothing is read from disk;
+    files the background reconciler found missing are left out. Without
+    ``limit`` every file is returned. ``format=ndjson`` streams one file per line.
+    """
     _ = request
+    filters = {
+        "file_type": type,
+        "job_id": job_id,
+        "created_after": created_after,
+        "created_before": created_before,
+        "cursor": cursor,
+    }
+    if format == "ndjson":
+        return StreamingResponse(iter_user_files_ndjson(user["id"], **filters), media_type="application/x-ndjson")
     try:
-        log_line("user_files_request", {"user_id": user["id"]})
-        base_dir = Path(__file__).parent
-        all_files = []
-        
-        # Get all user files (already filtered by user_id in list_user_files)
-        user_files = list_user_files(user["id"])
-        log_line("user_files_raw", {"user_id": user["id"], "count": len(user_files)})
-        
-        for file_entry in user_files:
-            file_type = file_entry.get("file_type", "")
-            file_id = file_entry.get("id", "")
-            stored_path_str = file_entry.get("stored_path", "")
-            filename = file_entry.get("original_filename", f"{file_id}")
-            
-            log_line("processing_file", {
-                "file_id": file_id,
-                "file_type": file_type,
-                "stored_path": stored_path_str,
-                "filename": filename
-            })
-            
-            if stored_path_str:
-                file_path = base_dir / stored_path_str
-                file_exists = file_path.exists()
-                log_line("file_path_check", {
-                    "file_id": file_id,
-                    "stored_path": stored_path_str,
-                    "absolute_path": str(file_path),
-                    "exists": file_exists
-                })
-                
-                if file_exists:
-                    # Determine download URL based on file type
-                    if file_type == "upload":
-                        download_url = f"/api/upload/pdb/{file_id}"
-                    elif file_type == "proteinmpnn":
-                        download_url = f"/api/proteinmpnn/result/{file_id}"
-                    elif file_type == "openfold2":
-                        download_url = f"/api/openfold2/result/{file_id}"
-                    else:
-                        # For other types, use generic download endpoint
-                        download_url = f"/api/files/{file_id}/download"
-                    
-                    # Parse metadata if it's a JSON string
-                    metadata = file_entry.get("metadata", {})
-                    if isinstance(metadata, str):
-                        try:
-                            metadata = json.loads(metadata)
-                        except json.JSONDecodeError:
-                            metadata = {}
-                    
-                    file_size = file_entry.get("size", 0)
-                    if file_size == 0:
-                        try:
-                            file_size = file_path.stat().st_size
-                        except OSError:
-                            file_size = 0
-                    
-                    all_files.append({
-                        "file_id": file_id,
-                        "type": file_type,
-                        "filename": filename,
-                        "file_path": stored_path_str,
-                        "size": file_size,
-                        "download_url": download_url,
-                        "metadata": metadata,
-                    })
-                else:
-                    log_line("file_not_found", {
-                        "file_id": file_id,
-                        "expected_path": str(file_path)
-                    })
-        
-        log_line("user_files_loaded", {"user_id": user["id"], "file_count": len(all_files)})
-        
+        with get_db() as conn:
+            files, next_cursor = query_user_files(conn, user["id"], limit=limit, **filters)
         return {
             "status": "success",
-            "files": all_files,
+            "files": files,
+            "next_cursor": next_cursor,
         }
+    except HTTPException:
+        raise
     except Exception as e:
         log_line("user_files_list_failed", {"error": str(e), "trace": traceback.format_exc(), "user_id": user["id"]})
         content = {"error": "Failed to list user files"}
@@ -1037,10 +1181,9 @@ async def get_user_files_endpoint(request: Request, user: Dict[str, Any] = Depen
 @limiter.limit("30/minute")
 async def download_user_file(request: Request, file_id: str, user: Dict[str, Any] = Depends(get_current_user)):
     """Download a user file. Verifies ownership."""
-    _ = request
     try:
         # Get file path with ownership verification
-        file_path = get_user_file_path(file_id, user["id"])
+        file_path = await get_user_file_path_async(file_id, user["id"])
         
         # Get file metadata for filename
         file_metadata = get_file_metadata(file_id, user["id"])
@@ -1049,13 +1192,7 @@ async def download_user_file(request: Request, file_id: str, user: Dict[str, Any
         # Determine media type based on file extension
         media_type = "chemical/x-pdb" if filename.lower().endswith(".pdb") else "application/octet-stream"
         
-        log_line("file_downloaded", {"file_id": file_id, "user_id": user["id"], "path": str(file_path)})
-        
-        return FileResponse(
-            file_path,
-            media_type=media_type,
-            filename=filename,
-        )
+        return await serve_file(request, file_path, media_type=media_type, filename=filename)
     except HTTPException:
         raise
     except Exception as e:
@@ -1065,43 +1202,54 @@ async def download_user_file(request: Request, file_id: str, user: Dict[str, Any
 
 @app.get("/api/files/{file_id}")
 @limiter.limit("30/minute")
-async def get_user_file_content(request: Request, file_id: str, user: Dict[str, Any] = Depends(get_current_user)):
-    """Get file content as JSON (for editor/viewer). Verifies ownership."""
-    _ = request
+async def get_user_file_content(
+    request: Request,
+    file_id: str,
+    format: str = Query("json", pattern="^(json|raw)$"),
+    user: Dict[str, Any] = Depends(get_current_user),
+):
+    """Get file content for the editor/viewer. Verifies ownership.
+
+    ``format=json`` (default) wraps the text in a JSON body; binary files are
+    not inlined and point at ``download_url`` instead. ``format=raw`` serves
+    the bytes directly with Range/ETag support.
+    """
     try:
         # Get file path with ownership verification
-        file_path = get_user_file_path(file_id, user["id"])
+        file_path = await get_user_file_path_async(file_id, user["id"])
         
         # Get file metadata
         file_metadata = get_file_metadata(file_id, user["id"])
         if not file_metadata:
             raise HTTPException(status_code=404, detail="File not found")
-        
-        # Read file content
-        try:
-            content = file_path.read_text(encoding="utf-8")
-        except UnicodeDecodeError:
-            # If text decoding fails, return as base64
-            import base64
-            content = base64.b64encode(file_path.read_bytes()).decode("utf-8")
-            return {
-                "status": "success",
-                "file_id": file_id,
-                "filename": file_metadata.get("original_filename", f"{file_id}.pdb"),
-                "content": content,
-                "encoding": "base64",
-                "type": file_metadata.get("file_type", "unknown")
-            }
-        
-        log_line("file_content_accessed", {"file_id": file_id, "user_id": user["id"], "path": str(file_path)})
-        
-        return {
+        filename = file_metadata.get("original_filename") or f"{file_id}.pdb"
+
+        if format == "raw":
+            media_type = "chemical/x-pdb" if filename.lower().endswith(".pdb") else "text/plain"
+            return await serve_file(request, file_path, media_type=media_type, filename=filename, content_disposition_type="inline")
+
+        etag = await file_etag(file_path)
+        headers = {"etag": etag, "cache-control": "private, no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        body = {
             "status": "success",
             "file_id": file_id,
-            "filename": file_metadata.get("original_filename", f"{file_id}.pdb"),
-            "content": content,
+            "filename": filename,
             "type": file_metadata.get("file_type", "unknown")
         }
+        try:
+            body["content"] = await compute_executor.run(
+                read_result_text, file_path, kind="thread", label="file_content", timeout=None
+            )
+        except UnicodeDecodeError:
+            body.update({
+                "content": None,
+                "encoding": "binary",
+                "download_url": f"/api/files/{file_id}?format=raw",
+            })
+        return JSONResponse(content=body, headers=headers)
     except HTTPException:
         raise
     except Exception as e:
@@ -1109,6 +1257,18 @@ async def get_user_file_content(request: Request, file_id: str, user: Dict[str,
         raise HTTPException(status_code=500, detail="Failed to read file content")
 
 
+def _delete_stored_file(stored_path: str) -> bool:
+    """Delete a user file from storage; False if it was already gone."""
+    backend = get_storage_backend()
+    if not backend.exists(stored_path):
+        return False
+    backend.delete(stored_path)
+    if backend.is_local:
+        # The cached backend drops the siblings of its own copy
+        remove_precompressed(backend.path_for(stored_path))
+    return True
+
+
 @app.delete("/api/files/{file_id}")
 @limiter.limit("10/minute")
 async def delete_user_file(request: Request, file_id: str, user: Dict[str, Any] = Depends(get_current_user)):
@@ -1124,14 +1284,12 @@ async def delete_user_file(request: Request, file_id: str, user: Dict[str, Any]
         if not file_metadata:
             raise HTTPException(status_code=404, detail="File not found")
         
-        base_dir = Path(__file__).parent
         stored_path = file_metadata.get("stored_path")
         
-        if stored_path:
-            file_path = base_dir / stored_path
-            if file_path.exists():
-                file_path.unlink()
-                log_line("file_deleted", {"file_id": file_id, "user_id": user["id"], "path": str(file_path)})
+        if stored_path and await compute_executor.run(
+            _delete_stored_file, stored_path, kind="thread", label="storage_delete", timeout=None
+        ):
+            log_line("file_deleted", {"file_id": file_id, "user_id": user["id"], "path": stored_path})
         
         # Delete from database
         with get_db() as conn:
@@ -1258,6 +1416,14 @@ async def proteinmpnn_status(request: Request, job_id: str, user: Dict[str, Any]
         return JSONResponse(status_code=500, content=content)
 
 
+def _proteinmpnn_output_path(job_id: str, user_id: Optional[str], filename: str) -> Optional[Path]:
+    """Local copy of one output file of a job (None if absent); 404 if the job has no results."""
+    result_dir = proteinmpnn_handler.get_result_dir(job_id, user_id=user_id)
+    if not result_dir:
+        raise HTTPException(status_code=404, detail="ProteinMPNN result not found")
+    return result_local_path(result_dir / filename)
+
+
 @app.get("/api/proteinmpnn/result/{job_id}")
 @limiter.limit("30/minute")
 async def proteinmpnn_result(request: Request, job_id: str, user: Dict[str, Any] = Depends(get_current_user), fmt: str = "json"):
@@ -1270,24 +1436,26 @@ async def proteinmpnn_result(request: Request, job_id: str, user: Dict[str, Any]
         if fmt == "json":
             return result
         if fmt == "fasta":
-            result_dir = proteinmpnn_handler.get_result_dir(job_id, user_id=user_id)
-            if not result_dir:
-                raise HTTPException(status_code=404, detail="ProteinMPNN result not found")
-            fasta_path = result_dir / "designed_sequences.fasta"
-            if not fasta_path.exists():
+            fasta_path = await compute_executor.run(
+                _proteinmpnn_output_path, job_id, user_id, "designed_sequences.fasta",
+                kind="thread", label="proteinmpnn_output", timeout=None,
+            )
+            if not fasta_path:
                 raise HTTPException(status_code=404, detail="FASTA output not available")
-            return FileResponse(
+            return await serve_file(
+                request,
                 fasta_path,
                 media_type="text/plain",
                 filename=f"proteinmpnn_{job_id}.fasta",
             )
         if fmt == "raw":
-            result_dir = proteinmpnn_handler.get_result_dir(job_id, user_id=user_id)
-            if not result_dir:
-                raise HTTPException(status_code=404, detail="ProteinMPNN result not found")
-            raw_path = result_dir / "raw_data.json"
-            if raw_path.exists():
-                return FileResponse(
+            raw_path = await compute_executor.run(
+                _proteinmpnn_output_path, job_id, user_id, "raw_data.json",
+                kind="thread", label="proteinmpnn_output", timeout=None,
+            )
+            if raw_path:
+                return await serve_file(
+                    request,
                     raw_path,
                     media_type="application/json",
                     filename=f"proteinmpnn_{job_id}_raw.json",
@@ -1348,6 +1516,11 @@ Original API error: {original_error}{param_context}
 IMPORTANT: Be specific about what went wrong. If residues are mentioned, explain what that means. If parameters are wrong, say which ones.
 Do NOT use markdown formatting. Write plain text only. Do NOT repeat the error code."""
 
+        messages = [{"role": "user", "content": prompt}]
+        cached = llm_response_cache.get(model_id, messages, 0, 200)
+        if cached is not None:
+            return cached
+
         async with httpx.AsyncClient(timeout=8.0) as client:
             response = await client.post(
                 "https://openrouter.ai/api/v1/chat/completions",
@@ -1359,14 +1532,16 @@ Do NOT use markdown formatting. Write plain text only. Do NOT repeat the error c
                 },
                 json={
                     "model": model_id,
-                    "messages": [{"role": "user", "content": prompt}],
+                    "messages": messages,
                     "max_tokens": 200,
-                    "temperature": 0.3,
+                    "temperature": 0,
                 },
             )
             response.raise_for_status()
             data = response.json()
             summary = data["choices"][0]["message"]["content"].strip()
+            if summary:
+                llm_response_cache.put(model_id, messages, 0, summary, 200)
             return summary
     except Exception as e:
         log_line("ai_error_summary_failed", {"error": str(e)})
@@ -1640,8 +1815,9 @@ async def openfold2_predict(request: Request, user: Dict[str, Any] = Depends(get
 @limiter.limit("30/minute")
 async def openfold2_result(request: Request, job_id: str, user: Dict[str, Any] = Depends(get_current_user)):
     try:
-        file_path = get_user_file_path(job_id, user["id"])
-        return FileResponse(
+        file_path = await get_user_file_path_async(job_id, user["id"])
+        return await serve_file(
+            request,
             file_path,
             media_type="chemical/x-pdb",
             filename=f"openfold2_{job_id}.pdb",
@@ -1679,6 +1855,7 @@ async def validate_structure_endpoint(request: Request, user: Dict[str, Any] = D
                 "user_id": user_id,
                 "session_id": session_id,
             },
+            is_disconnected=request.is_disconnected,
         )
 
         if result.get("action") == "error":
@@ -1693,6 +1870,59 @@ async def validate_structure_endpoint(request: Request, user: Dict[str, Any] = D
         return JSONResponse(status_code=500, content=content)
 
 
+@app.post("/api/validation/validate-batch")
+@limiter.limit("5/minute")
+async def validate_batch_endpoint(request: Request, user: Dict[str, Any] = Depends(get_current_user)):
+    """Validate many structures in parallel and return a ranked summary.
+
+    With ``"stream": true`` the response is NDJSON: one ``result`` line per
+    structure as it finishes, then a final ``summary`` line with the ranking.
+    """
+    try:
+        from agents.handlers.validation import validation_handler
+        from tools.validation.batch_validator import (
+            rank_results,
+            stream_validate_structures,
+            validate_structures_batch,
+        )
+    except ImportError:
+        from .agents.handlers.validation import validation_handler
+        from .tools.validation.batch_validator import (
+            rank_results,
+            stream_validate_structures,
+            validate_structures_batch,
+        )
+
+    try:
+        body = await request.json()
+        user_id = user.get("id") if user else None
+        try:
+            structures = await validation_handler.load_batch_structures(body.get("structures"), user_id)
+        except ValueError as e:
+            return JSONResponse(status_code=400, content={"action": "error", "error": str(e)})
+
+        log_line("validation_batch_request", {"user_id": user_id, "count": len(structures), "stream": bool(body.get("stream"))})
+
+        if body.get("stream"):
+            async def ndjson_results():
+                results = []
+                async for result in stream_validate_structures(structures):
+                    results.append(result)
+                    yield json.dumps({"type": "result", **result.to_dict()}) + "\n"
+                yield json.dumps({"type": "summary", "ranking": rank_results(results)}) + "\n"
+
+            return StreamingResponse(ndjson_results(), media_type="application/x-ndjson")
+
+        result = await validate_structures_batch(structures)
+        return JSONResponse(status_code=200, content={"action": "batch_validation_result", **result})
+    except Exception as e:
+        log_line("validation_batch_failed", {"error": str(e), "trace": traceback.format_exc()})
+        content = {"error": "validation_batch_failed"}
+        if DEBUG_API:
+            content["detail"] = str(e)
+        return JSONResponse(status_code=500, content=content)
+
+
 # Back-compat endpoints
 @app.post("/api/generate")
 async def generate(request: Request, user: Dict[str, Any] = Depends(get_current_user)):
@@ -1782,6 +2012,11 @@ Return ONLY the title text, no quotes, no explanation. Make it specific and mean
             log_line("title_generation_failed", {"error": "API key missing"})
             return {"title": "New Chat"}
         
+        title_messages = [{"role": "user", "content": title_prompt}]
+        cached_title = llm_response_cache.get(model_id, title_messages, 0, 30)
+        if cached_title is not None:
+            return {"title": cached_title}
+        
         # Call OpenRouter API using httpx for async
         async with httpx.AsyncClient(timeout=10.0) as client:
             response = await client.post(
@@ -1794,11 +2029,9 @@ Return ONLY the title text, no quotes, no explanation. Make it specific and mean
                 },
                 json={
                     "model": model_id,
-                    "messages": [
-                        {"role": "user", "content": title_prompt}
-                    ],
+                    "messages": title_messages,
                     "max_tokens": 30,
-                    "temperature": 0.3,
+                    "temperature": 0,
                 }
             )
             response.raise_for_status()
@@ -1811,6 +2044,8 @@ Return ONLY the title text, no quotes, no explanation. Make it specific and mean
                 title = title[:57] + "..."
             
             log_line("title_generated", {"title": title, "model": model_id})
+            if title:
+                llm_response_cache.put(model_id, title_messages, 0, title, 30)
             return {"title": title or "New Chat"}
             
     except httpx.HTTPStatusError as e:
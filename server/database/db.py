@@ -1,6 +1,7 @@
 """Database connection and initialization."""
 
 import sqlite3
+import time
 from pathlib import Path
 from contextlib import contextmanager
 from typing import Generator
@@ -13,14 +14,43 @@ except ImportError:
     # Fallback to absolute import (when running directly)
     from infrastructure.config import get_server_dir
 
+try:
+    from ..infrastructure.instrumentation import observe_db_query
+except ImportError:
+    try:
+        from infrastructure.instrumentation import observe_db_query
+    except ImportError:
+        # Migration scripts stub out ``infrastructure`` with only ``config``;
+        # statements simply go untimed there.
+        def observe_db_query(sql: str, seconds: float) -> None:
+            return None
+
 # Database path - can be overridden by environment variable
 DB_PATH = Path(os.getenv("DATABASE_PATH", get_server_dir() / "novoprotein.db"))
 
 
+class TimedConnection(sqlite3.Connection):
+    """Connection that records how long each ``execute`` takes (see infrastructure.instrumentation)."""
+
+    def execute(self, sql, parameters=(), /):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            observe_db_query(sql, time.perf_counter() - started)
+
+    def executemany(self, sql, seq_of_parameters, /):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            observe_db_query(sql, time.perf_counter() - started)
+
+
 @contextmanager
 def get_db() -> Generator[sqlite3.Connection, None, None]:
     """Context manager for database connections."""
-    conn = sqlite3.connect(str(DB_PATH))
+    conn = sqlite3.connect(str(DB_PATH), factory=TimedConnection)
     conn.row_factory = sqlite3.Row
     try:
         yield conn
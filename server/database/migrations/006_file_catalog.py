@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Migration 006: File catalog columns.
+
+Adds user_files.missing_at (maintained by the background reconciler so file
+listings no longer stat every file) and the (user_id, created_at, id) index
+used for filtered, cursor-paginated listings. Backfills sizes that were
+never recorded at write time.
+"""
+
+import sqlite3
+from pathlib import Path
+import sys
+import traceback
+
+# Add server directory to path
+migration_file_dir = Path(__file__).parent  # server/database/migrations/
+server_dir = migration_file_dir.parent.parent  # server/
+
+sys.path.insert(0, str(server_dir))
+
+# Mock infrastructure.config before importing db
+import types
+infra_module = types.ModuleType('infrastructure')
+config_module = types.ModuleType('infrastructure.config')
+config_module.get_server_dir = lambda: server_dir
+infra_module.config = config_module
+sys.modules['infrastructure'] = infra_module
+sys.modules['infrastructure.config'] = config_module
+
+try:
+    from database.db import DB_PATH
+except ImportError:
+    DB_PATH = server_dir / "novoprotein.db"
+
+
+def _backfill_sizes(conn: sqlite3.Connection) -> int:
+    rows = conn.execute(
+        "SELECT id, stored_path FROM user_files WHERE size IS NULL OR size = 0"
+    ).fetchall()
+    updates = []
+    for row in rows:
+        try:
+            updates.append(((server_dir / row["stored_path"]).stat().st_size, row["id"]))
+        except OSError:
+            continue
+    conn.executemany("UPDATE user_files SET size = ? WHERE id = ?", updates)
+    return len(updates)
+
+
+def run_migration():
+    """Add missing_at and the catalog index to user_files."""
+    try:
+        print("Running migration 006: File catalog columns...")
+        print(f"Database path: {DB_PATH}")
+
+        conn = sqlite3.connect(str(DB_PATH))
+        conn.row_factory = sqlite3.Row
+
+        try:
+            conn.execute("ALTER TABLE user_files ADD COLUMN missing_at TIMESTAMP")
+            print("  ✓ Added missing_at column")
+        except sqlite3.OperationalError as e:
+            if "duplicate column" in str(e).lower():
+                print("  ✓ missing_at column already exists")
+            else:
+                raise
+
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_user_files_catalog "
+            "ON user_files(user_id, created_at DESC, id DESC)"
+        )
+        print(f"  ✓ Backfilled {_backfill_sizes(conn)} file sizes")
+
+        conn.commit()
+        conn.close()
+
+        print("✓ Migration 006 completed successfully")
+    except Exception as e:
+        print(f"✗ Migration 006 failed: {e}")
+        traceback.print_exc()
+        raise
+
+
+if __name__ == "__main__":
+    run_migration()
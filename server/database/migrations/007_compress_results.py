@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Migration 007: Compress stored results.
+
+Rewrites plain result structures under storage/<user>/*_results as .pdb.gz and
+ProteinMPNN result/raw_data/metadata JSON as compact .json.zst (.json.gz
+without zstandard), then repoints user_files.stored_path. Readers accept both
+layouts, so this can run while the server is up and be re-run safely.
+"""
+
+from pathlib import Path
+import sys
+import traceback
+
+# Add server directory to path
+migration_file_dir = Path(__file__).parent  # server/database/migrations/
+server_dir = migration_file_dir.parent.parent  # server/
+
+# The real infrastructure package is imported here (storage backends need it)
+sys.path.insert(0, str(server_dir))
+
+from domain.storage.result_storage import compress_existing_results
+
+
+def run_migration(dry_run: bool = False):
+    """Compress existing result files in place."""
+    try:
+        print(f"Running migration 007: Compress stored results{' (dry run)' if dry_run else ''}...")
+        stats = compress_existing_results(dry_run=dry_run)
+        print(f"  ✓ {stats['files']} files, {stats['bytes_before']} bytes before")
+        if not dry_run:
+            print(f"  ✓ {stats['bytes_after']} bytes after, {stats['rows_updated']} user_files rows updated")
+        print("✓ Migration 007 completed successfully")
+    except Exception as e:
+        print(f"✗ Migration 007 failed: {e}")
+        traceback.print_exc()
+        raise
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Migration 007: Compress stored results")
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be compressed")
+    args = parser.parse_args()
+    run_migration(dry_run=args.dry_run)
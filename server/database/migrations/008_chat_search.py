@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Migration 008: Chat message search index.
+
+Creates the chat_messages_fts FTS5 table (external content over
+chat_messages) with the triggers that keep it in sync, then builds the index
+from existing messages. Re-running it rebuilds the index, which is also what
+to do after a VACUUM.
+"""
+
+import sqlite3
+from pathlib import Path
+import sys
+import traceback
+
+# Add server directory to path
+migration_file_dir = Path(__file__).parent  # server/database/migrations/
+server_dir = migration_file_dir.parent.parent  # server/
+
+sys.path.insert(0, str(server_dir))
+
+# Mock infrastructure.config before importing db
+import types
+infra_module = types.ModuleType('infrastructure')
+config_module = types.ModuleType('infrastructure.config')
+config_module.get_server_dir = lambda: server_dir
+infra_module.config = config_module
+sys.modules['infrastructure'] = infra_module
+sys.modules['infrastructure.config'] = config_module
+
+try:
+    from database.db import DB_PATH
+except ImportError:
+    DB_PATH = server_dir / "novoprotein.db"
+
+
+SEARCH_SCHEMA_SQL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS chat_messages_fts USING fts5(
+    content,
+    content='chat_messages',
+    content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS chat_messages_fts_insert AFTER INSERT ON chat_messages BEGIN
+    INSERT INTO chat_messages_fts(rowid, content) VALUES (new.rowid, new.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS chat_messages_fts_delete AFTER DELETE ON chat_messages BEGIN
+    INSERT INTO chat_messages_fts(chat_messages_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS chat_messages_fts_update AFTER UPDATE OF content ON chat_messages BEGIN
+    INSERT INTO chat_messages_fts(chat_messages_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+    INSERT INTO chat_messages_fts(rowid, content) VALUES (new.rowid, new.content);
+END;
+"""
+
+
+def run_migration():
+    """Create and populate the chat message search index."""
+    try:
+        print("Running migration 008: Chat message search index...")
+        print(f"Database path: {DB_PATH}")
+
+        conn = sqlite3.connect(str(DB_PATH))
+        conn.executescript(SEARCH_SCHEMA_SQL)
+        print("  ✓ chat_messages_fts table and triggers in place")
+
+        conn.execute("INSERT INTO chat_messages_fts(chat_messages_fts) VALUES ('rebuild')")
+        conn.execute("INSERT INTO chat_messages_fts(chat_messages_fts) VALUES ('optimize')")
+        count = conn.execute("SELECT COUNT(*) FROM chat_messages").fetchone()[0]
+        print(f"  ✓ Indexed {count} messages")
+
+        conn.commit()
+        conn.close()
+
+        print("✓ Migration 008 completed successfully")
+    except Exception as e:
+        print(f"✗ Migration 008 failed: {e}")
+        traceback.print_exc()
+        raise
+
+
+if __name__ == "__main__":
+    run_migration()
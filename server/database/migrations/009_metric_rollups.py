@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Migration 009: Pre-aggregated admin metrics.
+
+Creates metric_counters, metric_rollups and the triggers that maintain them
+(the "metric rollups" block of schema.sql), then backfills both tables from
+existing users, credits, reports, messages and jobs. Safe to re-run: the
+backfill replaces whatever the tables held.
+"""
+
+import sqlite3
+from pathlib import Path
+import sys
+import traceback
+
+# Add server directory to path
+migration_file_dir = Path(__file__).parent  # server/database/migrations/
+server_dir = migration_file_dir.parent.parent  # server/
+
+# The real infrastructure package is imported here (the metrics module needs it)
+sys.path.insert(0, str(server_dir))
+
+from database.db import DB_PATH
+from domain.admin.metrics import rebuild_metrics
+
+BEGIN_MARKER = "-- BEGIN metric rollups"
+END_MARKER = "-- END metric rollups"
+
+
+def _rollup_schema_sql() -> str:
+    """The metric tables and triggers, as declared in schema.sql."""
+    schema = (server_dir / "database" / "schema.sql").read_text(encoding="utf-8")
+    start = schema.index(BEGIN_MARKER)
+    end = schema.index(END_MARKER, start)
+    return schema[start:end]
+
+
+def run_migration():
+    """Create the metric tables and triggers and backfill them."""
+    try:
+        print("Running migration 009: Pre-aggregated admin metrics...")
+        print(f"Database path: {DB_PATH}")
+
+        conn = sqlite3.connect(str(DB_PATH))
+        conn.executescript(_rollup_schema_sql())
+        print("  ✓ metric_counters, metric_rollups and triggers in place")
+
+        rebuild_metrics(conn)
+        counters = conn.execute("SELECT COUNT(*) FROM metric_counters").fetchone()[0]
+        rollups = conn.execute("SELECT COUNT(*) FROM metric_rollups").fetchone()[0]
+        print(f"  ✓ Backfilled {counters} counters and {rollups} rollup buckets")
+
+        conn.commit()
+        conn.close()
+
+        print("✓ Migration 009 completed successfully")
+    except Exception as e:
+        print(f"✗ Migration 009 failed: {e}")
+        traceback.print_exc()
+        raise
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Migration 010: Admin exports.
+
+Creates the admin_exports table that tracks background user and chat
+exports (status, progress and the storage key of the finished file).
+"""
+
+import sqlite3
+from pathlib import Path
+import sys
+import traceback
+
+# Add server directory to path
+migration_file_dir = Path(__file__).parent  # server/database/migrations/
+server_dir = migration_file_dir.parent.parent  # server/
+
+sys.path.insert(0, str(server_dir))
+
+# Mock infrastructure.config before importing db
+import types
+infra_module = types.ModuleType('infrastructure')
+config_module = types.ModuleType('infrastructure.config')
+config_module.get_server_dir = lambda: server_dir
+infra_module.config = config_module
+sys.modules['infrastructure'] = infra_module
+sys.modules['infrastructure.config'] = config_module
+
+try:
+    from database.db import DB_PATH
+except ImportError:
+    DB_PATH = server_dir / "novoprotein.db"
+
+EXPORTS_SQL = """
+CREATE TABLE IF NOT EXISTS admin_exports (
+    id TEXT PRIMARY KEY,
+    admin_id TEXT NOT NULL,
+    export_type TEXT NOT NULL,
+    format TEXT NOT NULL,
+    compression TEXT NOT NULL DEFAULT 'gzip',
+    status TEXT NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'running', 'completed', 'failed', 'cancelled')),
+    params TEXT,
+    storage_key TEXT,
+    rows_total INTEGER,
+    rows_written INTEGER NOT NULL DEFAULT 0,
+    bytes_written INTEGER NOT NULL DEFAULT 0,
+    error_message TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    completed_at TIMESTAMP,
+    FOREIGN KEY (admin_id) REFERENCES users(id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_admin_exports_admin_id ON admin_exports(admin_id, created_at DESC);
+"""
+
+
+def run_migration():
+    """Create the admin_exports table."""
+    try:
+        print("Running migration 010: Admin exports...")
+        print(f"Database path: {DB_PATH}")
+
+        conn = sqlite3.connect(str(DB_PATH))
+        conn.executescript(EXPORTS_SQL)
+        print("  ✓ admin_exports table in place")
+        conn.commit()
+        conn.close()
+
+        print("✓ Migration 010 completed successfully")
+    except Exception as e:
+        print(f"✗ Migration 010 failed: {e}")
+        traceback.print_exc()
+        raise
+
+
+if __name__ == "__main__":
+    run_migration()
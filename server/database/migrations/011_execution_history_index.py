@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Migration 011: Execution history index.
+
+Adds the (pipeline_id, started_at DESC, id DESC) index on
+pipeline_executions that the keyset-paginated execution history query
+walks. Databases created from schema.sql already have it.
+"""
+
+import sqlite3
+from pathlib import Path
+import sys
+import traceback
+
+# Add server directory to path
+migration_file_dir = Path(__file__).parent  # server/database/migrations/
+server_dir = migration_file_dir.parent.parent  # server/
+
+sys.path.insert(0, str(server_dir))
+
+# Mock infrastructure.config before importing db
+import types
+infra_module = types.ModuleType('infrastructure')
+config_module = types.ModuleType('infrastructure.config')
+config_module.get_server_dir = lambda: server_dir
+infra_module.config = config_module
+sys.modules['infrastructure'] = infra_module
+sys.modules['infrastructure.config'] = config_module
+
+try:
+    from database.db import DB_PATH
+except ImportError:
+    DB_PATH = server_dir / "novoprotein.db"
+
+HISTORY_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_pipeline_executions_history
+    ON pipeline_executions(pipeline_id, started_at DESC, id DESC);
+"""
+
+
+def run_migration():
+    """Create the execution history index."""
+    try:
+        print("Running migration 011: Execution history index...")
+        print(f"Database path: {DB_PATH}")
+
+        conn = sqlite3.connect(str(DB_PATH))
+        conn.executescript(HISTORY_INDEX_SQL)
+        print("  ✓ idx_pipeline_executions_history in place")
+        conn.commit()
+        conn.close()
+
+        print("✓ Migration 011 completed successfully")
+    except Exception as e:
+        print(f"✗ Migration 011 failed: {e}")
+        traceback.print_exc()
+        raise
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -113,12 +113,14 @@ CREATE TABLE IF NOT EXISTS user_files (
     metadata TEXT, -- JSON: atoms, chains, chain_residue_counts, etc.
     job_id TEXT, -- For result files (links to job)
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    missing_at TIMESTAMP, -- Set by the background reconciler when the stored file is gone
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
 CREATE INDEX idx_user_files_user_id ON user_files(user_id);
 CREATE INDEX idx_user_files_type ON user_files(file_type);
 CREATE INDEX idx_user_files_job_id ON user_files(job_id);
+CREATE INDEX IF NOT EXISTS idx_user_files_catalog ON user_files(user_id, created_at DESC, id DESC);
 
 -- Chat sessions (migrate from frontend localStorage)
 -- Keep for backward compatibility during migration
@@ -171,6 +173,29 @@ CREATE INDEX idx_chat_messages_user_id ON chat_messages(user_id);
 CREATE INDEX idx_chat_messages_sender_id ON chat_messages(sender_id);
 CREATE INDEX idx_chat_messages_created_at ON chat_messages(created_at);
 
+-- Full-text index over chat message content (external content, keyed by rowid).
+-- Triggers keep it in sync; rebuild it after VACUUM, which may renumber rowids:
+--   INSERT INTO chat_messages_fts(chat_messages_fts) VALUES ('rebuild');
+CREATE VIRTUAL TABLE IF NOT EXISTS chat_messages_fts USING fts5(
+    content,
+    content='chat_messages',
+    content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS chat_messages_fts_insert AFTER INSERT ON chat_messages BEGIN
+    INSERT INTO chat_messages_fts(rowid, content) VALUES (new.rowid, new.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS chat_messages_fts_delete AFTER DELETE ON chat_messages BEGIN
+    INSERT INTO chat_messages_fts(chat_messages_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS chat_messages_fts_update AFTER UPDATE OF content ON chat_messages BEGIN
+    INSERT INTO chat_messages_fts(chat_messages_fts, rowid, content) VALUES ('delete', old.rowid, old.content);
+    INSERT INTO chat_messages_fts(rowid, content) VALUES (new.rowid, new.content);
+END;
+
 -- Session-file associations (replaces session_files.json)
 CREATE TABLE IF NOT EXISTS session_files (
     session_id TEXT NOT NULL,
@@ -277,6 +302,7 @@ CREATE INDEX IF NOT EXISTS idx_pipeline_executions_pipeline_id ON pipeline_execu
 CREATE INDEX IF NOT EXISTS idx_pipeline_executions_user_id ON pipeline_executions(user_id);
 CREATE INDEX IF NOT EXISTS idx_pipeline_executions_status ON pipeline_executions(status);
 CREATE INDEX IF NOT EXISTS idx_pipeline_executions_started_at ON pipeline_executions(started_at);
+CREATE INDEX IF NOT EXISTS idx_pipeline_executions_history ON pipeline_executions(pipeline_id, started_at DESC, id DESC);
 
 -- Pipeline node executions (per-node execution results)
 CREATE TABLE IF NOT EXISTS pipeline_node_executions (
@@ -451,6 +477,29 @@ CREATE INDEX idx_admin_audit_admin_id ON admin_audit_log(admin_id);
 CREATE INDEX idx_admin_audit_action_type ON admin_audit_log(action_type);
 CREATE INDEX idx_admin_audit_created_at ON admin_audit_log(created_at);
 
+-- Admin exports (written in the background, see domain/admin/exports.py)
+CREATE TABLE IF NOT EXISTS admin_exports (
+    id TEXT PRIMARY KEY,
+    admin_id TEXT NOT NULL,
+    export_type TEXT NOT NULL, -- 'users' | 'chat'
+    format TEXT NOT NULL, -- 'csv' | 'ndjson' | 'parquet'
+    compression TEXT NOT NULL DEFAULT 'gzip', -- 'gzip' | 'zstd' | 'none'
+    status TEXT NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'running', 'completed', 'failed', 'cancelled')),
+    params TEXT, -- JSON: columns, filters
+    storage_key TEXT, -- storage/admin_exports/<id>.<ext>
+    rows_total INTEGER,
+    rows_written INTEGER NOT NULL DEFAULT 0,
+    bytes_written INTEGER NOT NULL DEFAULT 0,
+    error_message TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    started_at TIMESTAMP,
+    completed_at TIMESTAMP,
+    FOREIGN KEY (admin_id) REFERENCES users(id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_admin_exports_admin_id ON admin_exports(admin_id, created_at DESC);
+
 -- Admin preferences table
 CREATE TABLE IF NOT EXISTS admin_preferences (
     admin_id TEXT PRIMARY KEY,
@@ -490,3 +539,190 @@ CREATE INDEX idx_alphafold_jobs_status ON alphafold_jobs(status);
 CREATE INDEX idx_alphafold_jobs_created_at ON alphafold_jobs(created_at);
 CREATE INDEX idx_alphafold_jobs_nvidia_req_id ON alphafold_jobs(nvidia_req_id);
 
+
+-- BEGIN metric rollups
+-- Dashboard counters and hourly/daily aggregates, maintained incrementally by
+-- the triggers below so admin dashboards never aggregate the source tables.
+-- scope is '' for system-wide values or a user id for per-user values.
+CREATE TABLE IF NOT EXISTS metric_counters (
+    metric TEXT NOT NULL,
+    scope TEXT NOT NULL DEFAULT '',
+    value REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (metric, scope)
+);
+
+CREATE TABLE IF NOT EXISTS metric_rollups (
+    metric TEXT NOT NULL,
+    scope TEXT NOT NULL DEFAULT '',
+    granularity TEXT NOT NULL CHECK (granularity IN ('hour', 'day')),
+    bucket TEXT NOT NULL, -- 'YYYY-MM-DD HH:00:00' (hour) or 'YYYY-MM-DD' (day), UTC
+    value REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (metric, scope, granularity, bucket)
+);
+
+CREATE TRIGGER IF NOT EXISTS metrics_users_insert AFTER INSERT ON users BEGIN
+    INSERT INTO metric_counters (metric, scope, value) VALUES ('users_total', '', 1)
+        ON CONFLICT(metric, scope) DO UPDATE SET value = value + excluded.value;
+    INSERT INTO metric_counters (metric, scope, value) VALUES ('users_active', '', COALESCE(new.is_active, 1))
+        ON CONFLICT(metric, scope) DO UPDATE SET value = value + excluded.value;
+    INSERT INTO metric_rollups (metric, scope, granularity, bucket, value)
+        VALUES ('signups', '', 'hour', strftime('%Y-%m-%d %H:00:00', COALESCE(new.created_at, CURRENT_TIMESTAMP)), 1)
+        ON CONFLICT(metric, scope, granularity, bucket) DO UPDATE SET value = value + excluded.value;
+    INSERT INTO metric_rollups (metric, scope, granularity, bucket, value)
+        VALUES ('signups', '', 'day', date(COALESCE(new.created_at, CURRENT_TIMESTAMP)), 1)
+        ON CONFLICT(metric, scope, granularity, bucket) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS metrics_users_delete AFTER DELETE ON users BEGIN
+    INSERT INTO metric_counters (metric, scope, value) VALUES ('users_total', '', -1)
+        ON CONFLICT(metric, scope) DO UPDATE SET value = value + excluded.value;
+    INSERT INTO metric_counters (metric, scope, value) VALUES ('users_active', '', -COALESCE(old.is_active, 1))
+        ON CONFLICT(metric, scope) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS metrics_users_active AFTER UPDATE OF is_active ON users
+    WHEN COALESCE(new.is_active, 1) != COALESCE(old.is_active, 1) BEGIN
+    INSERT INTO metric_counters (metric, scope, value) VALUES ('users_active', '', COALESCE(new.is_active, 1) - COALESCE(old.is_active, 1))
+        ON CONFLICT(metric, scope) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS metrics_credits_insert AFTER INSERT ON user_credits BEGIN
+    INSERT INTO metric_counters (metric, scope, value) VALUES ('credits_total', '', COALESCE(new.credits, 0))
+        ON CONFLICT(metric, scope) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS metrics_credits_update AFTER UPDATE OF credits ON user_credits BEGIN
+    INSERT INTO metric_counters (metric, scope, value) VALUES ('credits_total', '', COALESCE(new.credits, 0) - COALESCE(old.credits, 0))
+        ON CONFLICT(metric, scope) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS metrics_credits_delete AFTER DELETE ON user_credits BEGIN
+    INSERT INTO metric_counters (metric, scope, value) VALUES ('credits_total', '', -COALESCE(old.credits, 0))
+        ON CONFLICT(metric, scope) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS metrics_credit_spent AFTER INSERT ON credit_transactions
+    WHEN new.amount < 0 BEGIN
+    INSERT INTO metric_rollups (metric, scope, granularity, bucket, value)
+        VALUES ('credits_spent', '', 'hour', strftime('%Y-%m-%d %H:00:00', COALESCE(new.created_at, CURRENT_TIMESTAMP)), -new.amount)
+        ON CONFLICT(metric, scope, granularity, bucket) DO UPDATE SET value = value + excluded.value;
+    INSERT INTO metric_rollups (metric, scope, granularity, bucket, value)
+        VALUES ('credits_spent', '', 'day', date(COALESCE(new.created_at, CURRENT_TIMESTAMP)), -new.amount)
+        ON CONFLICT(metric, scope, granularity, bucket) DO UPDATE SET value = value + excluded.value;
+    INSERT INTO metric_rollups (metric, scope, granularity, bucket, value)
+        VALUES ('credits_spent', new.user_id, 'day', date(COALESCE(new.created_at, CURRENT_TIMESTAMP)), -new.amount)
+        ON CONFLICT(metric, scope, granularity, bucket) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS metrics_credit_earned AFTER INSERT ON credit_transactions
+    WHEN new.amount > 0 BEGIN
+    INSERT INTO metric_rollups (metric, scope, granularity, bucket, value)
+        VALUES ('credits_earned', '', 'hour', strftime('%Y-%m-%d %H:00:00', COALESCE(new.created_at, CURRENT_TIMESTAMP)), new.amount)
+        ON CONFLICT(metric, scope, granularity, bucket) DO UPDATE SET value = value + excluded.value;
+    INSERT INTO metric_rollups (metric, scope, granularity, bucket, value)
+        VALUES ('credits_earned', '', 'day', date(COALESCE(new.created_at, CURRENT_TIMESTAMP)), new.amount)
+        ON CONFLICT(metric, scope, granularity, bucket) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS metrics_reports_insert AFTER INSERT ON user_reports
+    WHEN COALESCE(new.status, 'pending') = 'pending' BEGIN
+    INSERT INTO metric_counters (metric, scope, value) VALUES ('reports_pending', '', 1)
+        ON CONFLICT(metric, scope) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS metrics_reports_status AFTER UPDATE OF status ON user_reports
+    WHEN COALESCE(new.status, 'pending') != COALESCE(old.status, 'pending') BEGIN
+    INSERT INTO metric_counters (metric, scope, value) VALUES ('reports_pending', '', (COALESCE(new.status, 'pending') = 'pending') - (COALESCE(old.status, 'pending') = 'pending'))
+        ON CONFLICT(metric, scope) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS metrics_reports_delete AFTER DELETE ON user_reports
+    WHEN COALESCE(old.status, 'pending') = 'pending' BEGIN
+    INSERT INTO metric_counters (metric, scope, value) VALUES ('reports_pending', '', -1)
+        ON CONFLICT(metric, scope) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS metrics_sessions_insert AFTER INSERT ON chat_sessions BEGIN
+    INSERT INTO metric_counters (metric, scope, value) VALUES ('sessions', new.user_id, 1)
+        ON CONFLICT(metric, scope) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS metrics_sessions_delete AFTER DELETE ON chat_sessions BEGIN
+    INSERT INTO metric_counters (metric, scope, value) VALUES ('sessions', old.user_id, -1)
+        ON CONFLICT(metric, scope) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS metrics_messages_insert AFTER INSERT ON chat_messages BEGIN
+    INSERT INTO metric_counters (metric, scope, value) VALUES ('messages', '', 1)
+        ON CONFLICT(metric, scope) DO UPDATE SET value = value + excluded.value;
+    INSERT INTO metric_counters (metric, scope, value) VALUES ('messages', new.user_id, 1)
+        ON CONFLICT(metric, scope) DO UPDATE SET value = value + excluded.value;
+    INSERT INTO metric_rollups (metric, scope, granularity, bucket, value)
+        VALUES ('messages', '', 'hour', strftime('%Y-%m-%d %H:00:00', COALESCE(new.created_at, CURRENT_TIMESTAMP)), 1)
+        ON CONFLICT(metric, scope, granularity, bucket) DO UPDATE SET value = value + excluded.value;
+    INSERT INTO metric_rollups (metric, scope, granularity, bucket, value)
+        VALUES ('messages', '', 'day', date(COALESCE(new.created_at, CURRENT_TIMESTAMP)), 1)
+        ON CONFLICT(metric, scope, granularity, bucket) DO UPDATE SET value = value + excluded.value;
+    INSERT INTO metric_rollups (metric, scope, granularity, bucket, value)
+        VALUES ('messages', new.user_id, 'day', date(COALESCE(new.created_at, CURRENT_TIMESTAMP)), 1)
+        ON CONFLICT(metric, scope, granularity, bucket) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS metrics_messages_delete AFTER DELETE ON chat_messages BEGIN
+    INSERT INTO metric_counters (metric, scope, value) VALUES ('messages', '', -1)
+        ON CONFLICT(metric, scope) DO UPDATE SET value = value + excluded.value;
+    INSERT INTO metric_counters (metric, scope, value) VALUES ('messages', old.user_id, -1)
+        ON CONFLICT(metric, scope) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS metrics_messages_agent_insert AFTER INSERT ON chat_messages
+    WHEN json_valid(new.metadata) AND COALESCE(json_extract(new.metadata, '$.agentId'), json_extract(new.metadata, '$.agent_id')) IS NOT NULL BEGIN
+    INSERT INTO metric_counters (metric, scope, value) VALUES ('agent:' || COALESCE(json_extract(new.metadata, '$.agentId'), json_extract(new.metadata, '$.agent_id')), new.user_id, 1)
+        ON CONFLICT(metric, scope) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS metrics_messages_agent_delete AFTER DELETE ON chat_messages
+    WHEN json_valid(old.metadata) AND COALESCE(json_extract(old.metadata, '$.agentId'), json_extract(old.metadata, '$.agent_id')) IS NOT NULL BEGIN
+    INSERT INTO metric_counters (metric, scope, value) VALUES ('agent:' || COALESCE(json_extract(old.metadata, '$.agentId'), json_extract(old.metadata, '$.agent_id')), old.user_id, -1)
+        ON CONFLICT(metric, scope) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS metrics_alphafold_submitted AFTER INSERT ON alphafold_jobs BEGIN
+    INSERT INTO metric_rollups (metric, scope, granularity, bucket, value)
+        VALUES ('jobs_submitted', '', 'hour', strftime('%Y-%m-%d %H:00:00', COALESCE(new.created_at, CURRENT_TIMESTAMP)), 1)
+        ON CONFLICT(metric, scope, granularity, bucket) DO UPDATE SET value = value + excluded.value;
+    INSERT INTO metric_rollups (metric, scope, granularity, bucket, value)
+        VALUES ('jobs_submitted', '', 'day', date(COALESCE(new.created_at, CURRENT_TIMESTAMP)), 1)
+        ON CONFLICT(metric, scope, granularity, bucket) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS metrics_alphafold_finished AFTER UPDATE OF status ON alphafold_jobs
+    WHEN new.status != old.status AND new.status IN ('completed', 'error', 'failed') BEGIN
+    INSERT INTO metric_rollups (metric, scope, granularity, bucket, value)
+        VALUES (CASE WHEN new.status = 'completed' THEN 'jobs_completed' ELSE 'jobs_failed' END, '', 'hour', strftime('%Y-%m-%d %H:00:00', COALESCE(new.completed_at, CURRENT_TIMESTAMP)), 1)
+        ON CONFLICT(metric, scope, granularity, bucket) DO UPDATE SET value = value + excluded.value;
+    INSERT INTO metric_rollups (metric, scope, granularity, bucket, value)
+        VALUES (CASE WHEN new.status = 'completed' THEN 'jobs_completed' ELSE 'jobs_failed' END, '', 'day', date(COALESCE(new.completed_at, CURRENT_TIMESTAMP)), 1)
+        ON CONFLICT(metric, scope, granularity, bucket) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS metrics_pipeline_submitted AFTER INSERT ON pipeline_executions BEGIN
+    INSERT INTO metric_rollups (metric, scope, granularity, bucket, value)
+        VALUES ('jobs_submitted', '', 'hour', strftime('%Y-%m-%d %H:00:00', COALESCE(new.started_at, CURRENT_TIMESTAMP)), 1)
+        ON CONFLICT(metric, scope, granularity, bucket) DO UPDATE SET value = value + excluded.value;
+    INSERT INTO metric_rollups (metric, scope, granularity, bucket, value)
+        VALUES ('jobs_submitted', '', 'day', date(COALESCE(new.started_at, CURRENT_TIMESTAMP)), 1)
+        ON CONFLICT(metric, scope, granularity, bucket) DO UPDATE SET value = value + excluded.value;
+END;
+
+CREATE TRIGGER IF NOT EXISTS metrics_pipeline_finished AFTER UPDATE OF status ON pipeline_executions
+    WHEN new.status != old.status AND new.status IN ('completed', 'failed') BEGIN
+    INSERT INTO metric_rollups (metric, scope, granularity, bucket, value)
+        VALUES (CASE WHEN new.status = 'completed' THEN 'jobs_completed' ELSE 'jobs_failed' END, '', 'hour', strftime('%Y-%m-%d %H:00:00', COALESCE(new.completed_at, CURRENT_TIMESTAMP)), 1)
+        ON CONFLICT(metric, scope, granularity, bucket) DO UPDATE SET value = value + excluded.value;
+    INSERT INTO metric_rollups (metric, scope, granularity, bucket, value)
+        VALUES (CASE WHEN new.status = 'completed' THEN 'jobs_completed' ELSE 'jobs_failed' END, '', 'day', date(COALESCE(new.completed_at, CURRENT_TIMESTAMP)), 1)
+        ON CONFLICT(metric, scope, granularity, bucket) DO UPDATE SET value = value + excluded.value;
+END;
+
+-- END metric rollups
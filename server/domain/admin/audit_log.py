@@ -0,0 +1,223 @@
+"""Buffered writer for the admin audit log.
+
+``log_admin_action`` runs inside every admin request, read-only ones
+included, so it only stamps the entry (id and ``created_at`` are taken at
+call time) and puts it on a bounded in-memory queue. A writer thread
+inserts queued entries with one ``executemany`` per batch, flushing when
+``AUDIT_BATCH_SIZE`` entries are waiting or ``AUDIT_FLUSH_INTERVAL_SECONDS``
+after the oldest one arrived. Failed batches are retried with backoff.
+
+When the queue is full the entry is dropped and counted instead of making
+the request wait. Entries written more than ``AUDIT_LATE_SECONDS`` after
+they were logged are counted as late. ``stop`` drains the queue and writes
+everything before returning; it runs on app shutdown and at exit.
+
+Environment:
+    AUDIT_BATCH_SIZE                entries per insert batch
+    AUDIT_FLUSH_INTERVAL_SECONDS    longest an entry waits for its batch
+    AUDIT_QUEUE_SIZE                entries buffered before new ones are dropped
+    AUDIT_LATE_SECONDS              write delay counted as late
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from ...database.db import get_db
+    from ...infrastructure.utils import log_line
+except ImportError:
+    from database.db import get_db
+    from infrastructure.utils import log_line
+
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "200"))
+AUDIT_FLUSH_INTERVAL_SECONDS = float(os.getenv("AUDIT_FLUSH_INTERVAL_SECONDS", "1.0"))
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_LATE_SECONDS = float(os.getenv("AUDIT_LATE_SECONDS", "5.0"))
+AUDIT_WRITE_ATTEMPTS = 3
+
+_INSERT_SQL = """INSERT INTO admin_audit_log
+    (id, admin_id, action_type, target_type, target_id, details, ip_address, user_agent, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+
+# Row values plus the monotonic time the entry was queued
+AuditEntry = Tuple[Tuple[Any, ...], float]
+
+
+class AuditLogWriter:
+    """Bounded queue of audit rows drained in batches by one writer thread."""
+
+    def __init__(
+        self,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL_SECONDS,
+        queue_size: int = AUDIT_QUEUE_SIZE,
+        late_seconds: float = AUDIT_LATE_SECONDS,
+        db_factory: Optional[Callable[[], Any]] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.late_seconds = late_seconds
+        self._db_factory = db_factory
+        self._sleep = sleep  # retry backoff
+        self._queue: "queue.Queue[Optional[AuditEntry]]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._stats = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "failed": 0,
+            "late": 0,
+            "batches": 0,
+            "retries": 0,
+            "max_delay_ms": 0.0,
+        }
+
+    def log(
+        self,
+        admin_id: str,
+        action_type: str,
+        target_type: Optional[str] = None,
+        target_id: Optional[str] = None,
+        details: Optional[Dict[str, Any]] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None,
+    ) -> bool:
+        """Queue one entry; False if it was dropped because the queue is full."""
+        row = (
+            str(uuid.uuid4()),
+            admin_id,
+            action_type,
+            target_type,
+            target_id,
+            json.dumps(details, default=str) if details else None,
+            ip_address,
+            user_agent,
+            # Same format as CURRENT_TIMESTAMP, taken now rather than at flush
+            datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"),
+        )
+        if self._thread is None:
+            self.start()
+        try:
+            self._queue.put_nowait((row, time.monotonic()))
+        except queue.Full:
+            with self._lock:
+                self._stats["dropped"] += 1
+            return False
+        with self._lock:
+            self._stats["enqueued"] += 1
+        return True
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+                self._thread.start()
+
+    def _collect(self) -> List[AuditEntry]:
+        try:
+            first = self._queue.get(timeout=self.flush_interval)
+        except queue.Empty:
+            return []
+        if first is None:  # stop() wake-up
+            self._queue.task_done()
+            return []
+        batch = [first]
+        deadline = first[1] + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = 0 if self._stopping.is_set() else deadline - time.monotonic()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is None:
+                self._queue.task_done()
+                continue
+            batch.append(entry)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            if batch:
+                self._write(batch)
+            if self._stopping.is_set() and self._queue.empty():
+                return
+
+    def _write(self, batch: List[AuditEntry]) -> None:
+        rows = [row for row, _ in batch]
+        db_factory = self._db_factory or get_db
+        error: Optional[Exception] = None
+        for attempt in range(AUDIT_WRITE_ATTEMPTS):
+            try:
+                with db_factory() as conn:
+                    conn.executemany(_INSERT_SQL, rows)
+                error = None
+                break
+            except Exception as exc:
+                error = exc
+                if attempt + 1 < AUDIT_WRITE_ATTEMPTS:
+                    with self._lock:
+                        self._stats["retries"] += 1
+                    self._sleep(0.05 * 2 ** attempt)
+
+        now = time.monotonic()
+        delays = [now - queued_at for _, queued_at in batch]
+        with self._lock:
+            self._stats["batches"] += 1
+            if error is None:
+                self._stats["written"] += len(rows)
+                self._stats["late"] += sum(1 for d in delays if d > self.late_seconds)
+                self._stats["max_delay_ms"] = max(self._stats["max_delay_ms"], round(max(delays) * 1000, 1))
+            else:
+                self._stats["failed"] += len(rows)
+        if error is not None:
+            log_line("audit_log_write_failed", {"entries": len(rows), "error": str(error)}, level="error")
+        for _ in batch:
+            self._queue.task_done()
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued entry has been written; False on timeout."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if self._thread is None or time.monotonic() >= deadline:
+                return False
+            time.sleep(0.005)
+        return True
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Write everything still queued, then stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._stopping.set()
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass  # the thread is busy and will see the stop flag
+        thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["queued"] = self._queue.qsize()
+        stats["capacity"] = self._queue.maxsize
+        stats["running"] = self._thread is not None
+        return stats
+
+
+audit_log_writer = AuditLogWriter()
+atexit.register(audit_log_writer.stop)
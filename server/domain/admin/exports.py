@@ -0,0 +1,531 @@
+"""Background admin exports of users and chat messages.
+
+An export request is recorded in ``admin_exports`` and written by a
+background task on the compute thread pool. Rows are read in fixed-size
+keyset batches (``rowid > last``), each batch on a short-lived connection,
+so no read transaction stays open across the export and blocks writers;
+each batch is encoded and appended to a compressed file as it arrives, so
+memory stays bounded by one batch whatever the table size. Progress is
+stored on the export row after every batch, which is also where a
+cancellation is noticed.
+
+Formats: ``csv``, ``ndjson`` (``json`` is accepted as an alias) and
+``parquet`` (one row group per batch; needs ``pyarrow``). CSV and NDJSON
+are gzip-compressed by default, or zstd when ``zstandard`` is installed;
+Parquet uses its own column compression. Finished files go to the storage
+backend under ``storage/admin_exports/`` and are downloaded with Range
+support through ``serve_file``.
+
+At startup ``recover_exports`` fails exports left ``running`` by a previous
+process and restarts the ones still ``queued``. Finished exports (and their
+files) are removed ``EXPORT_RETENTION_SECONDS`` after they complete by
+``run_export_cleanup``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import gzip
+import io
+import json
+import os
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import pyarrow
+    import pyarrow.parquet as pyarrow_parquet
+except ImportError:  # optional; parquet exports are then rejected
+    pyarrow = None
+    pyarrow_parquet = None
+
+try:
+    import zstandard
+except ImportError:  # optional; gzip is used instead
+    zstandard = None
+
+try:
+    from ...database.db import get_db
+    from ...infrastructure.compute import compute_executor
+    from ...infrastructure.utils import log_line
+    from ..storage.backends import StorageBackend, get_storage_backend
+except ImportError:
+    from database.db import get_db
+    from infrastructure.compute import compute_executor
+    from infrastructure.utils import log_line
+    from domain.storage.backends import StorageBackend, get_storage_backend
+
+EXPORT_BATCH_ROWS = int(os.getenv("EXPORT_BATCH_ROWS", "5000"))
+# Exports written at the same time; further requests wait their turn
+EXPORT_MAX_CONCURRENT = int(os.getenv("EXPORT_MAX_CONCURRENT", "2"))
+EXPORT_KEY_PREFIX = "storage/admin_exports"
+# Finished exports are deleted this long after completing (0 keeps them)
+EXPORT_RETENTION_SECONDS = int(os.getenv("EXPORT_RETENTION_SECONDS", str(7 * 24 * 3600)))
+EXPORT_CLEANUP_INTERVAL_SECONDS = int(os.getenv("EXPORT_CLEANUP_INTERVAL_SECONDS", "3600"))
+
+EXPORT_FORMATS = ("csv", "ndjson", "parquet")
+_FORMAT_ALIASES = {"json": "ndjson", "jsonl": "ndjson"}
+EXPORT_COMPRESSIONS = ("gzip", "zstd", "none")
+
+_EXTENSIONS = {"csv": ".csv", "ndjson": ".ndjson", "parquet": ".parquet"}
+_COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst", "none": ""}
+MEDIA_TYPES = {
+    "gzip": "application/gzip",
+    "zstd": "application/zstd",
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Exportable columns, the filters each source accepts, and which columns
+# are only included on request. Password hashes are never exportable.
+EXPORT_SOURCES: Dict[str, Dict[str, Any]] = {
+    "users": {
+        "table": "users",
+        "columns": (
+            "id", "email", "username", "user_type", "role", "email_verified",
+            "is_active", "created_at", "updated_at", "last_login",
+        ),
+        "content_columns": (),
+        "filters": {
+            "role": "role = ?",
+            "user_type": "user_type = ?",
+            "is_active": "is_active = ?",
+            "created_from": "created_at >= ?",
+            "created_to": "created_at <= ?",
+        },
+    },
+    "chat": {
+        "table": "chat_messages",
+        "columns": (
+            "id", "session_id", "conversation_id", "user_id", "sender_id",
+            "message_type", "role", "created_at",
+        ),
+        "content_columns": ("content", "metadata"),
+        "filters": {
+            "user_id": "user_id = ?",
+            "session_id": "session_id = ?",
+            "conversation_id": "conversation_id = ?",
+            "message_type": "message_type = ?",
+            "date_from": "created_at >= ?",
+            "date_to": "created_at <= ?",
+        },
+    },
+}
+
+_tasks: set = set()
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+class ExportCancelled(Exception):
+    """The export row left the ``running`` state while it was being written."""
+
+
+def normalize_format(fmt: str) -> str:
+    fmt = (fmt or "").lower()
+    fmt = _FORMAT_ALIASES.get(fmt, fmt)
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format {fmt!r}; choose from {list(EXPORT_FORMATS)}")
+    if fmt == "parquet" and pyarrow is None:
+        raise ValueError("Parquet exports require pyarrow")
+    return fmt
+
+
+def normalize_compression(fmt: str, compression: Optional[str]) -> str:
+    if fmt == "parquet":
+        return "none"
+    compression = (compression or "gzip").lower()
+    if compression not in EXPORT_COMPRESSIONS:
+        raise ValueError(f"Unsupported compression {compression!r}; choose from {list(EXPORT_COMPRESSIONS)}")
+    if compression == "zstd" and zstandard is None:
+        raise ValueError("zstd compression requires zstandard")
+    return compression
+
+
+def resolve_columns(export_type: str, fields: Optional[Sequence[str]] = None, include_content: bool = False) -> List[str]:
+    source = EXPORT_SOURCES[export_type]
+    allowed = list(source["columns"]) + (list(source["content_columns"]) if include_content else [])
+    if not fields:
+        return allowed
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise ValueError(f"Cannot export fields {unknown}; allowed: {allowed}")
+    return list(dict.fromkeys(fields))
+
+
+def _where(export_type: str, filters: Optional[Dict[str, Any]]) -> Tuple[List[str], List[Any]]:
+    known = EXPORT_SOURCES[export_type]["filters"]
+    unknown = [k for k in (filters or {}) if k not in known]
+    if unknown:
+        raise ValueError(f"Unknown filters {unknown}; allowed: {list(known)}")
+    clauses, params = [], []
+    for key, value in (filters or {}).items():
+        if value is None or value == "":
+            continue
+        clauses.append(known[key])
+        params.append(int(value) if isinstance(value, bool) else value)
+    return clauses, params
+
+
+def export_key(export_id: str, fmt: str, compression: str) -> str:
+    return f"{EXPORT_KEY_PREFIX}/{export_id}{_EXTENSIONS[fmt]}{_COMPRESSION_SUFFIXES[compression]}"
+
+
+def export_filename(export: Dict[str, Any]) -> str:
+    suffix = _EXTENSIONS[export["format"]] + _COMPRESSION_SUFFIXES[export["compression"]]
+    return f"{export['export_type']}-export-{export['id'][:8]}{suffix}"
+
+
+def export_media_type(export: Dict[str, Any]) -> str:
+    if export["compression"] != "none":
+        return MEDIA_TYPES[export["compression"]]
+    return MEDIA_TYPES[export["format"]]
+
+
+def create_export(
+    conn,
+    admin_id: str,
+    export_type: str,
+    fmt: str,
+    filters: Optional[Dict[str, Any]] = None,
+    fields: Optional[Sequence[str]] = None,
+    include_content: bool = False,
+    compression: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Validate a request and record it as ``queued``; raises ValueError."""
+    if export_type not in EXPORT_SOURCES:
+        raise ValueError(f"Unknown export type {export_type!r}")
+    fmt = normalize_format(fmt)
+    compression = normalize_compression(fmt, compression)
+    columns = resolve_columns(export_type, fields, include_content)
+    _where(export_type, filters)
+
+    export_id = str(uuid.uuid4())
+    params = {"columns": columns, "filters": filters or {}}
+    conn.execute(
+        """INSERT INTO admin_exports (id, admin_id, export_type, format, compression, params, storage_key)
+           VALUES (?, ?, ?, ?, ?, ?, ?)""",
+        (export_id, admin_id, export_type, fmt, compression, json.dumps(params),
+         export_key(export_id, fmt, compression)),
+    )
+    return get_export(conn, export_id)
+
+
+def get_export(conn, export_id: str) -> Optional[Dict[str, Any]]:
+    row = conn.execute("SELECT * FROM admin_exports WHERE id = ?", (export_id,)).fetchone()
+    if row is None:
+        return None
+    export = dict(row)
+    export["params"] = json.loads(export["params"] or "{}")
+    total = export.get("rows_total")
+    export["progress"] = 1.0 if export["status"] == "completed" else (
+        round(export["rows_written"] / total, 4) if total else 0.0
+    )
+    return export
+
+
+def list_exports(conn, admin_id: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+    sql = "SELECT id FROM admin_exports"
+    params: List[Any] = []
+    if admin_id:
+        sql += " WHERE admin_id = ?"
+        params.append(admin_id)
+    sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+    params.append(limit)
+    return [get_export(conn, row["id"]) for row in conn.execute(sql, params).fetchall()]
+
+
+def cancel_export(conn, export_id: str) -> bool:
+    cursor = conn.execute(
+        "UPDATE admin_exports SET status = 'cancelled', completed_at = CURRENT_TIMESTAMP "
+        "WHERE id = ? AND status IN ('queued', 'running')",
+        (export_id,),
+    )
+    return cursor.rowcount > 0
+
+
+def iter_export_batches(
+    export_type: str,
+    columns: Sequence[str],
+    filters: Optional[Dict[str, Any]] = None,
+    batch_size: int = EXPORT_BATCH_ROWS,
+    db_factory: Callable[[], Any] = get_db,
+) -> Iterator[List[Tuple]]:
+    """Matching rows in ``rowid`` order, ``batch_size`` at a time."""
+    table = EXPORT_SOURCES[export_type]["table"]
+    clauses, params = _where(export_type, filters)
+    column_sql = ", ".join(columns)
+    where = " AND ".join(clauses + ["rowid > ?"])
+    sql = f"SELECT rowid, {column_sql} FROM {table} WHERE {where} ORDER BY rowid LIMIT ?"
+    last_rowid = 0
+    while True:
+        with db_factory() as conn:
+            rows = conn.execute(sql, params + [last_rowid, batch_size]).fetchall()
+        if not rows:
+            return
+        last_rowid = rows[-1][0]
+        yield [tuple(row)[1:] for row in rows]
+        if len(rows) < batch_size:
+            return
+
+
+def count_export_rows(conn, export_type: str, filters: Optional[Dict[str, Any]] = None) -> int:
+    clauses, params = _where(export_type, filters)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    return conn.execute(f"SELECT COUNT(*) FROM {EXPORT_SOURCES[export_type]['table']}{where}", params).fetchone()[0]
+
+
+class _ByteCounter(io.RawIOBase):
+    """Write-through wrapper counting the bytes that reach the file."""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.count = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.count += len(data)
+        return self.raw.write(data)
+
+    def close(self) -> None:
+        if not self.closed:
+            self.raw.close()
+        super().close()
+
+
+class _RowWriter:
+    """Encodes batches of rows into one (optionally compressed) file."""
+
+    def __init__(self, path: Path, fmt: str, compression: str, columns: Sequence[str]):
+        self.fmt = fmt
+        self.columns = list(columns)
+        self.sink = _ByteCounter(open(path, "wb"))
+        self._parquet = None
+        if fmt == "parquet":
+            self.stream = self.sink
+            return
+        if compression == "gzip":
+            self.stream = gzip.GzipFile(fileobj=self.sink, mode="wb", compresslevel=6)
+        elif compression == "zstd":
+            self.stream = zstandard.ZstdCompressor(level=6).stream_writer(self.sink, closefd=False)
+        else:
+            self.stream = self.sink
+        self.text = io.TextIOWrapper(self.stream, encoding="utf-8", newline="", write_through=False)
+        if fmt == "csv":
+            self.csv = csv.writer(self.text)
+            self.csv.writerow(self.columns)
+
+    @property
+    def bytes_written(self) -> int:
+        return self.sink.count
+
+    def write_batch(self, rows: List[Tuple]) -> None:
+        if self.fmt == "csv":
+            self.csv.writerows(rows)
+        elif self.fmt == "ndjson":
+            self.text.write("".join(
+                json.dumps(dict(zip(self.columns, row)), ensure_ascii=False, default=str) + "\n" for row in rows
+            ))
+        else:
+            table = pyarrow.table({c: [row[i] for row in rows] for i, c in enumerate(self.columns)})
+            if self._parquet is None:
+                self._parquet = pyarrow_parquet.ParquetWriter(self.sink, table.schema, compression="zstd")
+            self._parquet.write_table(table.cast(self._parquet.schema, safe=False))
+        if self.fmt != "parquet":
+            self.text.flush()
+
+    def close(self) -> None:
+        if self.fmt == "parquet":
+            if self._parquet is not None:
+                self._parquet.close()
+        else:
+            self.text.flush()
+            self.text.detach()
+            self.stream.close()
+        self.sink.close()
+
+
+def _update_progress(export_id: str, rows_written: int, bytes_written: int, db_factory) -> None:
+    with db_factory() as conn:
+        cursor = conn.execute(
+            "UPDATE admin_exports SET rows_written = ?, bytes_written = ? WHERE id = ? AND status = 'running'",
+            (rows_written, bytes_written, export_id),
+        )
+        if cursor.rowcount == 0:
+            raise ExportCancelled(export_id)
+
+
+def write_export(
+    export_id: str,
+    db_factory: Callable[[], Any] = get_db,
+    backend: Optional[StorageBackend] = None,
+    batch_size: int = EXPORT_BATCH_ROWS,
+) -> Dict[str, Any]:
+    """Write one queued export to storage (blocking); returns the final row."""
+    backend = backend or get_storage_backend()
+    with db_factory() as conn:
+        export = get_export(conn, export_id)
+        if export is None or export["status"] != "queued":
+            return export
+        rows_total = count_export_rows(conn, export["export_type"], export["params"]["filters"])
+        cursor = conn.execute(
+            "UPDATE admin_exports SET status = 'running', started_at = CURRENT_TIMESTAMP, rows_total = ? "
+            "WHERE id = ? AND status = 'queued'",
+            (rows_total, export_id),
+        )
+        if cursor.rowcount == 0:  # cancelled or picked up meanwhile
+            return get_export(conn, export_id)
+
+    columns = export["params"]["columns"]
+    fd, staging_name = tempfile.mkstemp(prefix="export-", suffix=".part")
+    os.close(fd)
+    staging = Path(staging_name)
+    rows_written = 0
+    stored = False
+    try:
+        writer = _RowWriter(staging, export["format"], export["compression"], columns)
+        try:
+            for batch in iter_export_batches(
+                export["export_type"], columns, export["params"]["filters"], batch_size, db_factory
+            ):
+                writer.write_batch(batch)
+                rows_written += len(batch)
+                _update_progress(export_id, rows_written, writer.bytes_written, db_factory)
+        finally:
+            writer.close()
+        bytes_written = staging.stat().st_size
+        backend.write_file(export["storage_key"], staging)
+        stored = True
+        with db_factory() as conn:
+            cursor = conn.execute(
+                """UPDATE admin_exports SET status = 'completed', rows_written = ?, bytes_written = ?,
+                   completed_at = CURRENT_TIMESTAMP WHERE id = ? AND status = 'running'""",
+                (rows_written, bytes_written, export_id),
+            )
+            if cursor.rowcount == 0:
+                raise ExportCancelled(export_id)
+        stored = False
+        log_line("admin_export_done", {"export_id": export_id, "rows": rows_written, "bytes": bytes_written})
+    except ExportCancelled:
+        log_line("admin_export_cancelled", {"export_id": export_id, "rows": rows_written})
+    except Exception as exc:
+        with db_factory() as conn:
+            conn.execute(
+                """UPDATE admin_exports SET status = 'failed', error_message = ?,
+                   completed_at = CURRENT_TIMESTAMP WHERE id = ?""",
+                (str(exc), export_id),
+            )
+        log_line("admin_export_failed", {"export_id": export_id, "error": str(exc)}, level="error")
+    finally:
+        staging.unlink(missing_ok=True)
+        if stored:
+            _delete_file(backend, export["storage_key"])
+
+    with db_factory() as conn:
+        return get_export(conn, export_id)
+
+
+def _delete_file(backend: StorageBackend, key: Optional[str]) -> None:
+    if not key:
+        return
+    try:
+        backend.delete(key)
+    except OSError as exc:
+        log_line("admin_export_delete_failed", {"key": key, "error": str(exc)})
+
+
+def recover_exports(
+    db_factory: Callable[[], Any] = get_db,
+    backend: Optional[StorageBackend] = None,
+) -> List[str]:
+    """Fail exports a previous process left ``running``; return the ``queued`` ones.
+
+    Call once at startup, before any export is started, so nothing this
+    process is writing can be mistaken for an interrupted export.
+    """
+    backend = backend or get_storage_backend()
+    with db_factory() as conn:
+        interrupted = conn.execute(
+            "SELECT id, storage_key FROM admin_exports WHERE status = 'running'"
+        ).fetchall()
+        conn.executemany(
+            """UPDATE admin_exports SET status = 'failed', error_message = 'Interrupted by a server restart',
+               completed_at = CURRENT_TIMESTAMP WHERE id = ? AND status = 'running'""",
+            [(row["id"],) for row in interrupted],
+        )
+        queued = [row["id"] for row in conn.execute(
+            "SELECT id FROM admin_exports WHERE status = 'queued' ORDER BY created_at, id"
+        ).fetchall()]
+    # The file is only stored once complete, but a restart between storing
+    # it and marking the row completed would leave it behind
+    for row in interrupted:
+        _delete_file(backend, row["storage_key"])
+    if interrupted:
+        log_line("admin_exports_interrupted", {"export_ids": [row["id"] for row in interrupted]})
+    return queued
+
+
+def delete_expired_exports(
+    retention_seconds: float = EXPORT_RETENTION_SECONDS,
+    db_factory: Callable[[], Any] = get_db,
+    backend: Optional[StorageBackend] = None,
+) -> int:
+    """Delete finished exports (rows and files) older than ``retention_seconds``."""
+    backend = backend or get_storage_backend()
+    with db_factory() as conn:
+        expired = conn.execute(
+            """SELECT id, storage_key FROM admin_exports
+               WHERE status IN ('completed', 'failed', 'cancelled')
+                 AND completed_at < datetime('now', ?)""",
+            (f"-{int(retention_seconds)} seconds",),
+        ).fetchall()
+    for row in expired:
+        _delete_file(backend, row["storage_key"])
+    with db_factory() as conn:
+        conn.executemany("DELETE FROM admin_exports WHERE id = ?", [(row["id"],) for row in expired])
+    return len(expired)
+
+
+async def run_export(export_id: str) -> None:
+    """Write an export off the event loop, at most EXPORT_MAX_CONCURRENT at a time."""
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(EXPORT_MAX_CONCURRENT)
+    async with _semaphore:
+        await compute_executor.run(write_export, export_id, kind="thread", label="admin_export", timeout=None)
+
+
+def start_export(export_id: str) -> asyncio.Task:
+    """Schedule ``run_export`` on the running loop."""
+    task = asyncio.get_running_loop().create_task(run_export(export_id))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return task
+
+
+async def run_export_cleanup(interval: float = EXPORT_CLEANUP_INTERVAL_SECONDS) -> None:
+    """Recover interrupted exports, then delete expired ones forever, ``interval`` seconds apart."""
+    try:
+        for export_id in await compute_executor.run(
+            recover_exports, kind="thread", label="admin_export_recover", timeout=None
+        ):
+            start_export(export_id)
+    except Exception as exc:
+        log_line("admin_export_recover_failed", {"error": str(exc)})
+    while EXPORT_RETENTION_SECONDS > 0:
+        try:
+            deleted = await compute_executor.run(
+                delete_expired_exports, kind="thread", label="admin_export_cleanup", timeout=None
+            )
+            if deleted:
+                log_line("admin_export_cleanup_done", {"deleted": deleted})
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            log_line("admin_export_cleanup_failed", {"error": str(exc)})
+        await asyncio.sleep(interval)
@@ -0,0 +1,286 @@
+"""Pre-aggregated admin dashboard metrics.
+
+Triggers in schema.sql (the "metric rollups" block) keep two tables current
+as rows are written:
+
+- ``metric_counters``: running totals such as users, active users, credits in
+  circulation and pending reports, plus per-user session, message and agent
+  counts (``scope`` is the user id).
+- ``metric_rollups``: hourly and daily sums of events (signups, credit spend,
+  messages, job submissions and completions) for time-series charts.
+
+Dashboard reads are therefore primary-key lookups instead of COUNT/SUM over
+the source tables. A background compactor prunes hourly buckets past their
+retention (daily buckets are kept) and re-derives the system-wide counters
+from their source tables, so they stay exact even if rows changed while the
+triggers were absent. ``rebuild_metrics`` recomputes everything and is used
+by migration 009 to backfill existing data.
+
+Counters follow deletes; rollups record events and are not decremented.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Sequence
+
+try:
+    from ...database.db import get_db
+    from ...infrastructure.compute import compute_executor
+    from ...infrastructure.utils import log_line
+except ImportError:
+    from database.db import get_db
+    from infrastructure.compute import compute_executor
+    from infrastructure.utils import log_line
+
+# Hourly buckets older than this are deleted by the compactor
+METRICS_HOURLY_RETENTION_DAYS = int(os.getenv("METRICS_HOURLY_RETENTION_DAYS", "14"))
+# Seconds between compactor runs; 0 disables the background task
+METRICS_COMPACT_INTERVAL_SECONDS = int(os.getenv("METRICS_COMPACT_INTERVAL_SECONDS", "3600"))
+# Largest number of buckets one time-series request may return
+TIMESERIES_MAX_POINTS = 1000
+
+SERIES_METRICS = (
+    "signups",
+    "credits_spent",
+    "credits_earned",
+    "messages",
+    "jobs_submitted",
+    "jobs_completed",
+    "jobs_failed",
+)
+
+_HOUR_FORMAT = "%Y-%m-%d %H:00:00"
+_DAY_FORMAT = "%Y-%m-%d"
+
+_BUCKET_SQL = {
+    "hour": "strftime('%Y-%m-%d %H:00:00', {ts})",
+    "day": "date({ts})",
+}
+
+# System-wide counters and the query that derives each from its source table
+_GLOBAL_COUNTERS = {
+    "users_total": "SELECT COUNT(*) FROM users",
+    "users_active": "SELECT COALESCE(SUM(COALESCE(is_active, 1)), 0) FROM users",
+    "credits_total": "SELECT COALESCE(SUM(credits), 0) FROM user_credits",
+    "reports_pending": "SELECT COUNT(*) FROM user_reports WHERE COALESCE(status, 'pending') = 'pending'",
+    "messages": "SELECT COUNT(*) FROM chat_messages",
+}
+
+_AGENT_SQL = "COALESCE(json_extract(metadata, '$.agentId'), json_extract(metadata, '$.agent_id'))"
+
+# (metric, scope, table, timestamp, value, where, granularities) for rebuilds;
+# mirrors what the triggers add per row
+_ROLLUP_SOURCES = (
+    ("signups", "''", "users", "created_at", "1", "1", ("hour", "day")),
+    ("credits_spent", "''", "credit_transactions", "created_at", "-amount", "amount < 0", ("hour", "day")),
+    ("credits_spent", "user_id", "credit_transactions", "created_at", "-amount", "amount < 0", ("day",)),
+    ("credits_earned", "''", "credit_transactions", "created_at", "amount", "amount > 0", ("hour", "day")),
+    ("messages", "''", "chat_messages", "created_at", "1", "1", ("hour", "day")),
+    ("messages", "user_id", "chat_messages", "created_at", "1", "1", ("day",)),
+    ("jobs_submitted", "''", "alphafold_jobs", "created_at", "1", "1", ("hour", "day")),
+    ("jobs_submitted", "''", "pipeline_executions", "started_at", "1", "1", ("hour", "day")),
+    ("jobs_completed", "''", "alphafold_jobs", "completed_at", "1", "status = 'completed'", ("hour", "day")),
+    ("jobs_completed", "''", "pipeline_executions", "completed_at", "1", "status = 'completed'", ("hour", "day")),
+    ("jobs_failed", "''", "alphafold_jobs", "completed_at", "1", "status IN ('error', 'failed')", ("hour", "day")),
+    ("jobs_failed", "''", "pipeline_executions", "completed_at", "1", "status = 'failed'", ("hour", "day")),
+)
+
+
+def reconcile_counters(conn) -> Dict[str, float]:
+    """Re-derive the system-wide counters; returns the corrections applied."""
+    corrections: Dict[str, float] = {}
+    current = read_counters(conn, _GLOBAL_COUNTERS)
+    for metric, sql in _GLOBAL_COUNTERS.items():
+        actual = conn.execute(sql).fetchone()[0] or 0
+        if actual != current[metric]:
+            corrections[metric] = actual - current[metric]
+            conn.execute(
+                "INSERT INTO metric_counters (metric, scope, value) VALUES (?, '', ?) "
+                "ON CONFLICT(metric, scope) DO UPDATE SET value = excluded.value",
+                (metric, actual),
+            )
+    return corrections
+
+
+def rebuild_metrics(conn) -> None:
+    """Recompute every counter and rollup from the source tables."""
+    conn.execute("DELETE FROM metric_counters")
+    conn.execute("DELETE FROM metric_rollups")
+    reconcile_counters(conn)
+    conn.execute(
+        "INSERT INTO metric_counters (metric, scope, value) "
+        "SELECT 'messages', user_id, COUNT(*) FROM chat_messages GROUP BY user_id"
+    )
+    conn.execute(
+        "INSERT INTO metric_counters (metric, scope, value) "
+        "SELECT 'sessions', user_id, COUNT(*) FROM chat_sessions GROUP BY user_id"
+    )
+    conn.execute(
+        "INSERT INTO metric_counters (metric, scope, value) "
+        "SELECT 'agent:' || agent, user_id, COUNT(*) FROM "
+        f"(SELECT user_id, {_AGENT_SQL} AS agent FROM chat_messages WHERE json_valid(metadata)) "
+        "WHERE agent IS NOT NULL GROUP BY agent, user_id"
+    )
+    for metric, scope, table, ts, value, where, granularities in _ROLLUP_SOURCES:
+        for granularity in granularities:
+            bucket = _BUCKET_SQL[granularity].format(ts=ts)
+            conn.execute(
+                "INSERT INTO metric_rollups (metric, scope, granularity, bucket, value) "
+                f"SELECT ?, {scope}, ?, {bucket}, SUM({value}) FROM {table} "
+                f"WHERE {where} AND {ts} IS NOT NULL GROUP BY {scope}, {bucket} "
+                "ON CONFLICT(metric, scope, granularity, bucket) DO UPDATE SET value = value + excluded.value",
+                (metric, granularity),
+            )
+    compact_rollups(conn)
+
+
+def compact_rollups(conn, now: Optional[datetime] = None) -> int:
+    """Delete hourly buckets past retention; returns the number removed."""
+    cutoff = (now or datetime.utcnow()) - timedelta(days=METRICS_HOURLY_RETENTION_DAYS)
+    cursor = conn.execute(
+        "DELETE FROM metric_rollups WHERE granularity = 'hour' AND bucket < ?",
+        (cutoff.strftime(_HOUR_FORMAT),),
+    )
+    return cursor.rowcount
+
+
+def read_counters(conn, metrics: Sequence[str], scope: str = "") -> Dict[str, float]:
+    """Counter values by name (0 for counters never written)."""
+    metrics = list(metrics)
+    placeholders = ", ".join("?" for _ in metrics)
+    rows = conn.execute(
+        f"SELECT metric, value FROM metric_counters WHERE scope = ? AND metric IN ({placeholders})",
+        [scope] + metrics,
+    ).fetchall()
+    values = {m: 0 for m in metrics}
+    values.update({row[0]: row[1] for row in rows})
+    return values
+
+
+def _as_number(value: float):
+    return int(value) if float(value).is_integer() else value
+
+
+def sum_rollup(conn, metric: str, granularity: str, since: str, scope: str = "") -> float:
+    """Sum of one rollup from bucket ``since`` (inclusive) onward."""
+    row = conn.execute(
+        "SELECT COALESCE(SUM(value), 0) FROM metric_rollups "
+        "WHERE metric = ? AND scope = ? AND granularity = ? AND bucket >= ?",
+        (metric, scope, granularity, since),
+    ).fetchone()
+    return row[0]
+
+
+def get_dashboard_stats(conn, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Values for the admin dashboard cards."""
+    now = now or datetime.utcnow()
+    counters = read_counters(conn, ("users_total", "users_active", "credits_total", "reports_pending"))
+    # The current (partial) hour bucket counts, so the window is 7 days to the hour
+    week_ago = (now - timedelta(days=7)).strftime(_HOUR_FORMAT)
+    return {
+        "total_users": _as_number(counters["users_total"]),
+        "active_users": _as_number(counters["users_active"]),
+        "total_credits": _as_number(counters["credits_total"]),
+        "pending_reports": _as_number(counters["reports_pending"]),
+        "recent_signups": _as_number(sum_rollup(conn, "signups", "hour", week_ago)),
+    }
+
+
+def get_user_activity(conn, user_id: str, now: Optional[datetime] = None, days: int = 30) -> Dict[str, Any]:
+    """Per-user counters and recent daily rates."""
+    since = ((now or datetime.utcnow()) - timedelta(days=days)).strftime(_DAY_FORMAT)
+    counters = read_counters(conn, ("sessions", "messages"), scope=user_id)
+    top_agent = conn.execute(
+        "SELECT metric FROM metric_counters WHERE scope = ? AND metric LIKE 'agent:%' AND value > 0 "
+        "ORDER BY value DESC, metric LIMIT 1",
+        (user_id,),
+    ).fetchone()
+    recent_messages = sum_rollup(conn, "messages", "day", since, scope=user_id)
+    recent_spend = sum_rollup(conn, "credits_spent", "day", since, scope=user_id)
+    return {
+        "total_sessions": _as_number(counters["sessions"]),
+        "total_messages": _as_number(counters["messages"]),
+        "most_used_agent": top_agent[0][len("agent:"):] if top_agent else None,
+        "messages_per_day": round(recent_messages / days, 2),
+        "credit_usage_rate": round(recent_spend / days, 2),
+    }
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.strip().replace("Z", "").replace(" ", "T"))
+
+
+def get_timeseries(
+    conn,
+    metrics: Sequence[str],
+    granularity: str = "day",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Zero-filled buckets for each metric between ``start`` and ``end``.
+
+    Defaults to the last 30 days (daily) or 48 hours (hourly). Raises
+    ValueError for unknown metrics, granularities or oversized ranges.
+    """
+    unknown = [m for m in metrics if m not in SERIES_METRICS]
+    if unknown or not metrics:
+        raise ValueError(f"Unknown metrics {unknown}; choose from {list(SERIES_METRICS)}")
+    if granularity not in _BUCKET_SQL:
+        raise ValueError("granularity must be 'hour' or 'day'")
+
+    step = timedelta(hours=1) if granularity == "hour" else timedelta(days=1)
+    fmt = _HOUR_FORMAT if granularity == "hour" else _DAY_FORMAT
+    end_at = _parse_time(end) if end else (now or datetime.utcnow())
+    start_at = _parse_time(start) if start else end_at - step * (48 if granularity == "hour" else 30)
+    # Truncate both ends to bucket boundaries
+    end_at = datetime.strptime(end_at.strftime(fmt), fmt)
+    start_at = datetime.strptime(start_at.strftime(fmt), fmt)
+    if start_at > end_at:
+        raise ValueError("start must not be after end")
+    points = int((end_at - start_at) / step) + 1
+    if points > TIMESERIES_MAX_POINTS:
+        raise ValueError(f"Range covers {points} buckets; the maximum is {TIMESERIES_MAX_POINTS}")
+
+    buckets = [(start_at + step * i).strftime(fmt) for i in range(points)]
+    placeholders = ", ".join("?" for _ in metrics)
+    rows = conn.execute(
+        "SELECT metric, bucket, value FROM metric_rollups "
+        f"WHERE scope = '' AND granularity = ? AND metric IN ({placeholders}) AND bucket BETWEEN ? AND ?",
+        [granularity, *metrics, buckets[0], buckets[-1]],
+    ).fetchall()
+    values: Dict[str, Dict[str, float]] = {m: {} for m in metrics}
+    for metric, bucket, value in rows:
+        values[metric][bucket] = value
+    return {
+        "granularity": granularity,
+        "buckets": buckets,
+        "series": {m: [_as_number(values[m].get(b, 0)) for b in buckets] for m in metrics},
+    }
+
+
+def compact_metrics() -> Dict[str, Any]:
+    """One compactor pass on its own connection."""
+    with get_db() as conn:
+        pruned = compact_rollups(conn)
+        corrections = reconcile_counters(conn)
+    return {"pruned": pruned, "corrections": corrections}
+
+
+async def run_metrics_compactor(interval: float = METRICS_COMPACT_INTERVAL_SECONDS) -> None:
+    """Compact forever, sleeping ``interval`` seconds between passes."""
+    while True:
+        try:
+            result = await compute_executor.run(
+                compact_metrics, kind="thread", label="metrics_compact", timeout=None
+            )
+            if result["pruned"] or result["corrections"]:
+                log_line("metrics_compact_done", result)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            log_line("metrics_compact_failed", {"error": str(exc)})
+        await asyncio.sleep(interval)
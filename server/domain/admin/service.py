@@ -1,16 +1,19 @@
 """Admin service functions for user metrics, masking, and audit logging."""
 
 import json
-import uuid
 from typing import Dict, Any, Optional, List
-from datetime import datetime, timedelta
+from datetime import datetime
 
 try:
     from ...database.db import get_db
     from ...infrastructure.utils import log_line
+    from .audit_log import audit_log_writer
+    from .metrics import get_user_activity
 except ImportError:
     from database.db import get_db
     from infrastructure.utils import log_line
+    from domain.admin.audit_log import audit_log_writer
+    from domain.admin.metrics import get_user_activity
 
 
 def mask_email(email: Optional[str]) -> str:
@@ -61,47 +64,9 @@ def mask_user_data(user: Dict[str, Any], privacy_mode: bool = False) -> Dict[str
 
 
 def calculate_user_metrics(user_id: str) -> Dict[str, Any]:
-    """Calculate user activity metrics."""
+    """Calculate user activity metrics from the pre-aggregated counters."""
     with get_db() as conn:
-        # Messages per day (last 30 days)
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        messages_count = conn.execute(
-            """SELECT COUNT(*) as count FROM chat_messages 
-               WHERE user_id = ? AND created_at > ?""",
-            (user_id, thirty_days_ago)
-        ).fetchone()["count"]
-        messages_per_day = round(messages_count / 30, 2) if messages_count > 0 else 0
-        
-        # Total sessions
-        total_sessions = conn.execute(
-            "SELECT COUNT(*) as count FROM chat_sessions WHERE user_id = ?",
-            (user_id,)
-        ).fetchone()["count"]
-        
-        # Total messages
-        total_messages = conn.execute(
-            "SELECT COUNT(*) as count FROM chat_messages WHERE user_id = ?",
-            (user_id,)
-        ).fetchone()["count"]
-        
-        # Most used agent (from message metadata)
-        agent_usage = conn.execute(
-            """SELECT metadata FROM chat_messages 
-               WHERE user_id = ? AND metadata IS NOT NULL""",
-            (user_id,)
-        ).fetchall()
-        
-        agent_counts = {}
-        for row in agent_usage:
-            try:
-                metadata = json.loads(row["metadata"]) if isinstance(row["metadata"], str) else row["metadata"]
-                agent_id = metadata.get("agentId") or metadata.get("agent_id")
-                if agent_id:
-                    agent_counts[agent_id] = agent_counts.get(agent_id, 0) + 1
-            except:
-                pass
-        
-        most_used_agent = max(agent_counts.items(), key=lambda x: x[1])[0] if agent_counts else None
+        activity = get_user_activity(conn, user_id)
         
         # Account age in days
         user = conn.execute(
@@ -110,27 +75,19 @@ def calculate_user_metrics(user_id: str) -> Dict[str, Any]:
         ).fetchone()
         
         account_age_days = 0
-        if user and user.get("created_at"):
+        if user and user["created_at"]:
             created_at = user["created_at"]
             if isinstance(created_at, str):
                 created_at = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
             account_age_days = (datetime.utcnow() - created_at.replace(tzinfo=None)).days
         
-        # Credit usage rate (spent per day)
-        credit_transactions = conn.execute(
-            """SELECT SUM(ABS(amount)) as total FROM credit_transactions 
-               WHERE user_id = ? AND amount < 0 AND created_at > ?""",
-            (user_id, thirty_days_ago)
-        ).fetchone()["total"] or 0
-        credit_usage_rate = round(credit_transactions / 30, 2) if credit_transactions > 0 else 0
-        
         return {
-            "messages_per_day": messages_per_day,
-            "total_sessions": total_sessions,
-            "total_messages": total_messages,
-            "most_used_agent": most_used_agent,
+            "messages_per_day": activity["messages_per_day"],
+            "total_sessions": activity["total_sessions"],
+            "total_messages": activity["total_messages"],
+            "most_used_agent": activity["most_used_agent"],
             "account_age_days": account_age_days,
-            "credit_usage_rate": credit_usage_rate
+            "credit_usage_rate": activity["credit_usage_rate"]
         }
 
 
@@ -143,25 +100,20 @@ def log_admin_action(
     ip_address: Optional[str] = None,
     user_agent: Optional[str] = None
 ) -> None:
-    """Log admin action to audit log."""
-    audit_id = str(uuid.uuid4())
-    
-    with get_db() as conn:
-        conn.execute(
-            """INSERT INTO admin_audit_log 
-               (id, admin_id, action_type, target_type, target_id, details, ip_address, user_agent)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-            (
-                audit_id,
-                admin_id,
-                action_type,
-                target_type,
-                target_id,
-                json.dumps(details) if details else None,
-                ip_address,
-                user_agent
-            )
-        )
+    """Log admin action to audit log.
+
+    The row is queued for the batched audit writer rather than inserted
+    inline, so requests do not wait on the database for it.
+    """
+    audit_log_writer.log(
+        admin_id=admin_id,
+        action_type=action_type,
+        target_type=target_type,
+        target_id=target_id,
+        details=details,
+        ip_address=ip_address,
+        user_agent=user_agent
+    )
     
     # Also log to infrastructure logger
     log_line("admin_action", {
@@ -0,0 +1,179 @@
+"""Full-text search over chat messages.
+
+Message content is indexed by the ``chat_messages_fts`` FTS5 table, which
+triggers in schema.sql keep in sync on insert, update and delete. Searches
+are ranked by BM25, return an HTML-safe snippet with ``<mark>`` around the
+matched terms, and page with a keyset cursor on ``(score, rowid)``.
+
+Databases that predate migration 008 (or SQLite builds without FTS5) fall
+back to a ``LIKE`` scan, newest first, with the same response shape.
+"""
+
+from __future__ import annotations
+
+import base64
+import html
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+SEARCH_PAGE_MAX = 100
+# Tokens in a query; more than this is not a search box query
+SEARCH_MAX_TERMS = 16
+SNIPPET_TOKENS = 24
+
+# Control characters never appear in message text, so they can mark matches
+# until the snippet has been HTML-escaped
+_OPEN, _CLOSE = "\x02", "\x03"
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+_MESSAGE_COLUMNS = (
+    "cm.id, cm.session_id, cm.conversation_id, cm.user_id, cm.sender_id, cm.content, "
+    "cm.message_type, cm.role, cm.metadata, cm.created_at, "
+    "u.username AS sender_username, u.email AS sender_email"
+)
+
+
+def build_match_query(text: Optional[str]) -> Optional[str]:
+    """FTS5 MATCH expression for free text typed into a search box.
+
+    Every word is quoted, so FTS5 operators and punctuation in the input are
+    matched literally, and all words must appear. The last word is a prefix
+    match, so results follow the user as they type. Returns None when the
+    input has no searchable words.
+    """
+    terms = _TERM_RE.findall(text or "")[:SEARCH_MAX_TERMS]
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def fts_available(conn) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'chat_messages_fts'"
+    ).fetchone() is not None
+
+
+def rebuild_index(conn) -> None:
+    """Re-read every message into the index (after VACUUM or a bulk import)."""
+    conn.execute("INSERT INTO chat_messages_fts(chat_messages_fts) VALUES ('rebuild')")
+
+
+def encode_search_cursor(score: float, rowid: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([score, rowid]).encode()).decode()
+
+
+def decode_search_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        score, rowid = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return float(score), int(rowid)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _render_snippet(marked: str) -> str:
+    return html.escape(marked).replace(_OPEN, "<mark>").replace(_CLOSE, "</mark>")
+
+
+def search_messages(
+    conn,
+    query: str,
+    user_id: Optional[str] = None,
+    session_id: Optional[str] = None,
+    conversation_id: Optional[str] = None,
+    message_type: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    limit: int = 25,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page of messages matching ``query``, best match first.
+
+    Each result is the message row plus ``snippet`` and ``score`` (BM25;
+    lower is better). Returns ``(results, next_cursor)``; ``next_cursor`` is
+    None on the last page.
+    """
+    limit = max(1, min(limit, SEARCH_PAGE_MAX))
+    match = build_match_query(query)
+    if match is None:
+        return [], None
+
+    clauses: List[str] = []
+    params: List[Any] = []
+    for column, value in (
+        ("cm.user_id", user_id),
+        ("cm.session_id", session_id),
+        ("cm.conversation_id", conversation_id),
+        ("cm.message_type", message_type),
+    ):
+        if value:
+            clauses.append(f"{column} = ?")
+            params.append(value)
+    if date_from:
+        clauses.append("cm.created_at >= ?")
+        params.append(date_from)
+    if date_to:
+        clauses.append("cm.created_at <= ?")
+        params.append(date_to)
+    after = decode_search_cursor(cursor) if cursor else None
+
+    if fts_available(conn):
+        rows = _fts_page(conn, match, clauses, params, after, limit)
+    else:
+        rows = _like_page(conn, _TERM_RE.findall(query)[:SEARCH_MAX_TERMS], clauses, params, after, limit)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_search_cursor(rows[-1]["score"], rows[-1]["rowid"])
+
+    results = []
+    for row in rows:
+        item = dict(row)
+        item.pop("rowid")
+        item["snippet"] = _render_snippet(item["snippet"])
+        results.append(item)
+    return results, next_cursor
+
+
+def _fts_page(conn, match, clauses, params, after, limit):
+    where = ["chat_messages_fts MATCH ?"] + clauses
+    args: List[Any] = [match] + params
+    if after:
+        where.append("(score > ? OR (score = ? AND cm.rowid < ?))")
+        args.extend([after[0], after[0], after[1]])
+    sql = (
+        f"SELECT {_MESSAGE_COLUMNS}, cm.rowid AS rowid, bm25(chat_messages_fts) AS score, "
+        f"snippet(chat_messages_fts, 0, '{_OPEN}', '{_CLOSE}', '…', {SNIPPET_TOKENS}) AS snippet "
+        "FROM chat_messages_fts "
+        "JOIN chat_messages cm ON cm.rowid = chat_messages_fts.rowid "
+        "LEFT JOIN users u ON cm.sender_id = u.id "
+        f"WHERE {' AND '.join(where)} "
+        "ORDER BY score, cm.rowid DESC LIMIT ?"
+    )
+    args.append(limit + 1)
+    return conn.execute(sql, args).fetchall()
+
+
+def _like_page(conn, terms, clauses, params, after, limit):
+    where = list(clauses)
+    args: List[Any] = list(params)
+    for term in terms:
+        where.append("cm.content LIKE ?")
+        args.append(f"%{term}%")
+    if after:
+        where.append("cm.rowid < ?")
+        args.append(after[1])
+    sql = (
+        f"SELECT {_MESSAGE_COLUMNS}, cm.rowid AS rowid, 0.0 AS score, "
+        "substr(cm.content, 1, 200) AS snippet "
+        "FROM chat_messages cm LEFT JOIN users u ON cm.sender_id = u.id "
+        f"WHERE {' AND '.join(where) or '1=1'} "
+        "ORDER BY cm.rowid DESC LIMIT ?"
+    )
+    args.append(limit + 1)
+    return conn.execute(sql, args).fetchall()
@@ -0,0 +1,446 @@
+"""
+Loading pipeline graphs (nodes and edges) from the normalized tables.
+
+Routes that show pipelines used to run two queries per pipeline. This module
+loads the graphs for any number of pipelines with one bulk query for nodes
+and one for edges, and caches assembled graphs keyed by ``pipelines.updated_at``.
+Every write to a pipeline's nodes or edges bumps ``updated_at``, so a changed
+timestamp is enough to detect a stale entry.
+
+Saving goes the other way: ``save_pipeline_graph`` diffs an incoming canvas
+against the stored rows and writes only what changed, batched with
+``executemany`` inside the caller's transaction.
+
+Returned graphs are shared with the cache and must be treated as read-only.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+PIPELINE_GRAPH_CACHE_SIZE = int(os.getenv("PIPELINE_GRAPH_CACHE_SIZE", "256"))
+
+# Stay well below SQLite's bound-parameter limit for IN (...) lists
+_IN_CHUNK_SIZE = 500
+
+Graph = Dict[str, List[Dict[str, Any]]]
+
+
+def assemble_node(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Reconstruct a PipelineNode dict from a pipeline_nodes row."""
+    return {
+        "id": row["id"],
+        "type": row["type"],
+        "label": row["label"],
+        "config": json.loads(row["config"]) if row.get("config") else {},
+        "inputs": json.loads(row["inputs"]) if row.get("inputs") else {},
+        "status": row["status"],
+        "result_metadata": json.loads(row["result_metadata"]) if row.get("result_metadata") else None,
+        "error": row.get("error"),
+        "position": {"x": row.get("position_x", 0), "y": row.get("position_y", 0)},
+    }
+
+
+def assemble_pipeline(pipeline_row: Any, graph: Graph) -> Dict[str, Any]:
+    """Reconstruct a full Pipeline object from its row and loaded graph."""
+    p = dict(pipeline_row)
+    return {
+        "id": p["id"],
+        "name": p.get("name"),
+        "description": p.get("description"),
+        "status": p.get("status", "draft"),
+        "createdAt": p.get("created_at"),
+        "updatedAt": p.get("updated_at"),
+        "message_id": p.get("message_id"),
+        "conversation_id": p.get("conversation_id"),
+        "nodes": graph["nodes"],
+        "edges": graph["edges"],
+    }
+
+
+class PipelineGraphCache:
+    """LRU of assembled graphs, valid while ``updated_at`` is unchanged."""
+
+    def __init__(self, max_size: int = PIPELINE_GRAPH_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[Any, Graph]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, pipeline_id: str, updated_at: Any) -> Optional[Graph]:
+        with self._lock:
+            entry = self._entries.get(pipeline_id)
+            if entry is None or entry[0] != updated_at:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(pipeline_id)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, pipeline_id: str, updated_at: Any, graph: Graph) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[pipeline_id] = (updated_at, graph)
+            self._entries.move_to_end(pipeline_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, pipeline_id: str) -> None:
+        with self._lock:
+            self._entries.pop(pipeline_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+pipeline_graph_cache = PipelineGraphCache()
+
+
+def _chunks(items: Sequence[str], size: int = _IN_CHUNK_SIZE) -> Iterable[Sequence[str]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _fetch_graphs(conn: sqlite3.Connection, pipeline_ids: Sequence[str]) -> Dict[str, Graph]:
+    """Load nodes and edges for ``pipeline_ids`` with one query per table."""
+    graphs: Dict[str, Graph] = {pid: {"nodes": [], "edges": []} for pid in pipeline_ids}
+    for chunk in _chunks(pipeline_ids):
+        placeholders = ",".join("?" * len(chunk))
+        node_rows = conn.execute(
+            f"SELECT * FROM pipeline_nodes WHERE pipeline_id IN ({placeholders}) "
+            "ORDER BY pipeline_id, created_at",
+            list(chunk),
+        ).fetchall()
+        for row in node_rows:
+            nd = dict(row)
+            graphs[nd["pipeline_id"]]["nodes"].append(assemble_node(nd))
+
+        edge_rows = conn.execute(
+            f"SELECT pipeline_id, source_node_id, target_node_id FROM pipeline_edges "
+            f"WHERE pipeline_id IN ({placeholders}) ORDER BY rowid",
+            list(chunk),
+        ).fetchall()
+        for row in edge_rows:
+            graphs[row["pipeline_id"]]["edges"].append(
+                {"source": row["source_node_id"], "target": row["target_node_id"]}
+            )
+    return graphs
+
+
+def load_pipeline_graphs(conn: sqlite3.Connection, pipeline_rows: Sequence[Any]) -> Dict[str, Graph]:
+    """Return ``{pipeline_id: {"nodes": [...], "edges": [...]}}`` for the given rows.
+
+    Rows must include ``id`` and ``updated_at``; cached graphs are reused when
+    ``updated_at`` matches and only the rest are queried.
+    """
+    graphs: Dict[str, Graph] = {}
+    missing: List[str] = []
+    versions: Dict[str, Any] = {}
+    for row in pipeline_rows:
+        pid = row["id"]
+        versions[pid] = row["updated_at"]
+        cached = pipeline_graph_cache.get(pid, row["updated_at"])
+        if cached is not None:
+            graphs[pid] = cached
+        else:
+            missing.append(pid)
+
+    if missing:
+        for pid, graph in _fetch_graphs(conn, missing).items():
+            pipeline_graph_cache.put(pid, versions[pid], graph)
+            graphs[pid] = graph
+    return graphs
+
+
+def load_pipelines(conn: sqlite3.Connection, pipeline_rows: Sequence[Any]) -> List[Dict[str, Any]]:
+    """Assemble full pipelines for ``pipeline_rows``, preserving their order."""
+    graphs = load_pipeline_graphs(conn, pipeline_rows)
+    return [assemble_pipeline(row, graphs[row["id"]]) for row in pipeline_rows]
+
+
+def load_pipeline(conn: sqlite3.Connection, pipeline_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    """Assemble one pipeline owned by ``user_id``, or None if not found."""
+    row = conn.execute(
+        "SELECT * FROM pipelines WHERE id = ? AND user_id = ?",
+        (pipeline_id, user_id),
+    ).fetchone()
+    if not row:
+        return None
+    return load_pipelines(conn, [row])[0]
+
+
+# ---------------------------------------------------------------------------
+# Saving
+# ---------------------------------------------------------------------------
+
+_NODE_CONTENT_FIELDS = ("type", "label", "config", "inputs", "status", "result_metadata", "error")
+
+
+def _json_field(value: Any, default: Optional[str]) -> Optional[str]:
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value or default
+
+
+def _node_row(node: Dict[str, Any]) -> Dict[str, Any]:
+    """Serialize an incoming canvas node the way it is stored in pipeline_nodes."""
+    position = node.get("position") or {}
+    result_meta = node.get("result_metadata")
+    return {
+        "id": node["id"],
+        "type": node.get("type", "input_node"),
+        "label": node.get("label", ""),
+        "config": _json_field(node.get("config", {}), "{}"),
+        "inputs": _json_field(node.get("inputs", {}), "{}"),
+        "status": node.get("status", "idle"),
+        "result_metadata": json.dumps(result_meta) if result_meta else None,
+        "error": node.get("error"),
+        "position_x": position.get("x", 0),
+        "position_y": position.get("y", 0),
+    }
+
+
+def _node_file_rows(nodes: Sequence[Dict[str, Any]]) -> List[Tuple[Any, ...]]:
+    """File references implied by node configs and results.
+
+    Each row is ``(node_id, role, filename, file_url, file_path, file_id, metadata)``.
+    """
+    rows: List[Tuple[Any, ...]] = []
+    for node in nodes:
+        config = node.get("config", {})
+        if isinstance(config, str):
+            try:
+                config = json.loads(config)
+            except (json.JSONDecodeError, TypeError):
+                config = {}
+        node_type = node.get("type", "")
+        node_id = node.get("id", "")
+
+        # Input node files
+        if node_type == "input_node" and isinstance(config, dict) and config.get("file_id"):
+            file_meta = {}
+            for key in ["atoms", "chains", "chain_residue_counts", "total_residues", "suggested_contigs"]:
+                if key in config:
+                    file_meta[key] = config[key]
+            rows.append((
+                node_id, "input",
+                config.get("filename"),
+                config.get("file_url"),
+                None,
+                config.get("file_id"),
+                json.dumps(file_meta) if file_meta else None,
+            ))
+
+        # Output file references from result_metadata
+        result_meta = node.get("result_metadata")
+        if isinstance(result_meta, str):
+            try:
+                result_meta = json.loads(result_meta)
+            except (json.JSONDecodeError, TypeError):
+                result_meta = None
+        if result_meta and isinstance(result_meta, dict):
+            output_file = result_meta.get("output_file")
+            if output_file and isinstance(output_file, dict):
+                rows.append((
+                    node_id, "output",
+                    output_file.get("filename"),
+                    output_file.get("file_url"),
+                    output_file.get("filepath"),
+                    output_file.get("file_id"),
+                    None,
+                ))
+    return rows
+
+
+def sync_node_files(conn: sqlite3.Connection, pipeline_id: str, nodes: Sequence[Dict[str, Any]]) -> Dict[str, int]:
+    """Bring the pipeline's non-execution file references in line with ``nodes``.
+
+    Only references that appeared or disappeared are written.
+    """
+    desired = _node_file_rows(nodes)
+    existing: Dict[Tuple[Any, ...], List[str]] = {}
+    for row in conn.execute(
+        """SELECT id, node_id, role, filename, file_url, file_path, file_id, metadata
+           FROM pipeline_node_files WHERE pipeline_id = ? AND execution_id IS NULL""",
+        (pipeline_id,),
+    ).fetchall():
+        key = tuple(row)[1:]
+        existing.setdefault(key, []).append(row["id"])
+
+    to_insert = []
+    for key in desired:
+        ids = existing.get(key)
+        if ids:
+            ids.pop()
+        else:
+            to_insert.append(key)
+    stale_ids = [file_id for ids in existing.values() for file_id in ids]
+
+    if stale_ids:
+        conn.executemany("DELETE FROM pipeline_node_files WHERE id = ?", [(i,) for i in stale_ids])
+    if to_insert:
+        conn.executemany(
+            """INSERT INTO pipeline_node_files
+                   (id, pipeline_id, node_id, role, file_type, filename, file_url, file_path, file_id, metadata)
+               VALUES (?, ?, ?, ?, 'pdb', ?, ?, ?, ?, ?)""",
+            [(str(uuid.uuid4()), pipeline_id) + key for key in to_insert],
+        )
+    return {"inserted": len(to_insert), "deleted": len(stale_ids)}
+
+
+def save_pipeline_graph(
+    conn: sqlite3.Connection,
+    pipeline_id: str,
+    nodes: Sequence[Dict[str, Any]],
+    edges: Sequence[Dict[str, Any]],
+    now: Any,
+) -> Dict[str, int]:
+    """Diff the incoming canvas against stored rows and write only the changes.
+
+    Nodes whose content is unchanged but that moved get a position-only
+    update; unchanged nodes and edges are not touched at all. Runs inside the
+    caller's transaction and returns counts of what was written.
+    """
+    incoming: Dict[str, Dict[str, Any]] = {}
+    for node in nodes:
+        if node.get("id"):
+            incoming[node["id"]] = _node_row(node)
+
+    stored = {
+        row["id"]: dict(row)
+        for row in conn.execute(
+            """SELECT id, type, label, config, inputs, status, result_metadata, error, position_x, position_y
+               FROM pipeline_nodes WHERE pipeline_id = ?""",
+            (pipeline_id,),
+        ).fetchall()
+    }
+
+    to_insert, to_update, to_move = [], [], []
+    for node_id, row in incoming.items():
+        old = stored.get(node_id)
+        if old is None:
+            to_insert.append(row)
+        elif any(old[f] != row[f] for f in _NODE_CONTENT_FIELDS):
+            to_update.append(row)
+        elif old["position_x"] != row["position_x"] or old["position_y"] != row["position_y"]:
+            to_move.append(row)
+    removed = [node_id for node_id in stored if node_id not in incoming]
+
+    # Edges are keyed by their endpoints; handles keep their defaults
+    incoming_edges = {
+        (edge.get("source", ""), edge.get("target", ""))
+        for edge in edges
+        if edge.get("source") and edge.get("target")
+    }
+    stored_edges = {
+        (row["source_node_id"], row["target_node_id"])
+        for row in conn.execute(
+            "SELECT source_node_id, target_node_id FROM pipeline_edges WHERE pipeline_id = ?",
+            (pipeline_id,),
+        ).fetchall()
+    }
+    removed_edges = stored_edges - incoming_edges
+    added_edges = incoming_edges - stored_edges
+
+    if removed_edges:
+        conn.executemany(
+            "DELETE FROM pipeline_edges WHERE pipeline_id = ? AND source_node_id = ? AND target_node_id = ?",
+            [(pipeline_id, source, target) for source, target in removed_edges],
+        )
+    if removed:
+        conn.executemany(
+            "DELETE FROM pipeline_nodes WHERE pipeline_id = ? AND id = ?",
+            [(pipeline_id, node_id) for node_id in removed],
+        )
+    if to_insert:
+        conn.executemany(
+            """INSERT INTO pipeline_nodes
+                   (id, pipeline_id, type, label, config, inputs, status,
+                    result_metadata, error, position_x, position_y, created_at, updated_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            [
+                (r["id"], pipeline_id, r["type"], r["label"], r["config"], r["inputs"], r["status"],
+                 r["result_metadata"], r["error"], r["position_x"], r["position_y"], now, now)
+                for r in to_insert
+            ],
+        )
+    if to_update:
+        conn.executemany(
+            """UPDATE pipeline_nodes SET
+                   type = ?, label = ?, config = ?, inputs = ?, status = ?,
+                   result_metadata = ?, error = ?, position_x = ?, position_y = ?, updated_at = ?
+               WHERE id = ? AND pipeline_id = ?""",
+            [
+                (r["type"], r["label"], r["config"], r["inputs"], r["status"], r["result_metadata"],
+                 r["error"], r["position_x"], r["position_y"], now, r["id"], pipeline_id)
+                for r in to_update
+            ],
+        )
+    if to_move:
+        _update_positions(conn, pipeline_id, [(r["id"], r["position_x"], r["position_y"]) for r in to_move])
+    if added_edges:
+        conn.executemany(
+            """INSERT OR IGNORE INTO pipeline_edges (id, pipeline_id, source_node_id, target_node_id)
+               VALUES (?, ?, ?, ?)""",
+            [(str(uuid.uuid4()), pipeline_id, source, target) for source, target in added_edges],
+        )
+
+    files = sync_node_files(conn, pipeline_id, list(nodes))
+    pipeline_graph_cache.invalidate(pipeline_id)
+    return {
+        "nodes_inserted": len(to_insert),
+        "nodes_updated": len(to_update),
+        "nodes_moved": len(to_move),
+        "nodes_deleted": len(removed),
+        "edges_inserted": len(added_edges),
+        "edges_deleted": len(removed_edges),
+        "files_inserted": files["inserted"],
+        "files_deleted": files["deleted"],
+    }
+
+
+def _update_positions(conn: sqlite3.Connection, pipeline_id: str, positions: Sequence[Tuple[str, Any, Any]]) -> int:
+    cursor = conn.executemany(
+        "UPDATE pipeline_nodes SET position_x = ?, position_y = ? WHERE id = ? AND pipeline_id = ?",
+        [(x, y, node_id, pipeline_id) for node_id, x, y in positions],
+    )
+    return cursor.rowcount
+
+
+def update_node_positions(
+    conn: sqlite3.Connection,
+    pipeline_id: str,
+    positions: Dict[str, Dict[str, Any]],
+    now: Any,
+) -> int:
+    """Move nodes without touching anything else; returns the rows updated.
+
+    ``positions`` maps node id to ``{"x": ..., "y": ...}``. The pipeline's
+    ``updated_at`` is bumped so cached graphs are refreshed.
+    """
+    if not positions:
+        return 0
+    updated = _update_positions(
+        conn,
+        pipeline_id,
+        [(node_id, pos.get("x", 0), pos.get("y", 0)) for node_id, pos in positions.items()],
+    )
+    conn.execute("UPDATE pipelines SET updated_at = ? WHERE id = ?", (now, pipeline_id))
+    pipeline_graph_cache.invalidate(pipeline_id)
+    return updated
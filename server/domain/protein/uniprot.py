@@ -1,5 +1,12 @@
 from typing import Any, Dict, List
-import httpx
+
+try:
+    from ...infrastructure.lazy_imports import lazy_module
+except ImportError:
+    from infrastructure.lazy_imports import lazy_module
+
+# Imported on first search; httpx is slow to import
+httpx = lazy_module("httpx")
 
 UNIPROT_BASE = "https://rest.uniprot.org/uniprotkb/search"
 
@@ -0,0 +1,542 @@
+"""Storage backends for the per-user storage tree.
+
+Uploads, generated results and payload blobs are addressed by a *key*: the
+path relative to the server directory with ``/`` separators, i.e. the same
+string kept in ``user_files.stored_path``
+(``storage/<user_id>/uploads/pdb/<id>.pdb``). Which backend holds the bytes
+is chosen by ``STORAGE_BACKEND``:
+
+- ``local`` (default): files under the server directory, as before.
+- ``s3``: an S3-compatible bucket (AWS, MinIO, ...) through ``boto3``,
+  fronted by a size-bounded read-through cache on local disk so repeated
+  reads and ``FileResponse`` serving stay local.
+
+Every backend offers a blocking API (used from the compute thread pool and
+existing sync helpers) and async wrappers with chunked streaming.
+"""
+
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    import boto3
+except ImportError:  # optional; only needed for STORAGE_BACKEND=s3
+    boto3 = None
+
+try:
+    from ...infrastructure.compute import compute_executor
+    from ...infrastructure.exceptions import ApplicationError
+    from ...infrastructure.file_serving import remove_precompressed
+except ImportError:
+    from infrastructure.compute import compute_executor
+    from infrastructure.exceptions import ApplicationError
+    from infrastructure.file_serving import remove_precompressed
+
+BASE_DIR = Path(__file__).parent.parent.parent
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "local").lower()
+S3_BUCKET = os.getenv("S3_BUCKET", "")
+S3_PREFIX = os.getenv("S3_PREFIX", "")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL") or None
+STORAGE_CACHE_DIR = Path(os.getenv("STORAGE_CACHE_DIR", str(BASE_DIR / ".storage_cache")))
+STORAGE_CACHE_MAX_BYTES = int(os.getenv("STORAGE_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+# Cached files used this recently are kept even when the cache is over size
+STORAGE_CACHE_EVICT_GRACE_SECONDS = float(os.getenv("STORAGE_CACHE_EVICT_GRACE_SECONDS", "30"))
+
+STREAM_CHUNK_BYTES = 1024 * 1024
+
+
+class StorageError(ApplicationError):
+    """Raised when a storage backend is misconfigured or unreachable."""
+    pass
+
+
+def storage_key(path: Union[str, Path]) -> str:
+    """Key for ``path``: relative to the server directory when inside it.
+
+    Paths outside the server directory keep their absolute form, which only
+    the local backend accepts.
+    """
+    path = Path(path)
+    if not path.is_absolute():
+        return path.as_posix()
+    try:
+        return path.relative_to(BASE_DIR).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+def _fsync_dir(directory: Path) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:  # directories cannot be opened on some platforms
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class StorageBackend(ABC):
+    """Interface shared by all backends; keys are described in the module docstring."""
+
+    is_local = False
+
+    @abstractmethod
+    def read_bytes(self, key: str) -> bytes:
+        pass
+
+    @abstractmethod
+    def write_bytes(self, key: str, data: bytes) -> None:
+        pass
+
+    @abstractmethod
+    def write_file(self, key: str, source: Path) -> None:
+        """Store a finished local file under ``key``; ``source`` is consumed."""
+        pass
+
+    def write_many(self, items: List[Tuple[str, bytes]], fsync: bool = False) -> None:
+        """Write several objects as one batch; ``fsync`` asks for durability on return."""
+        for key, data in items:
+            self.write_bytes(key, data)
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        pass
+
+    @abstractmethod
+    def size(self, key: str) -> Optional[int]:
+        """Stored size in bytes, or None when the key does not exist."""
+        pass
+
+    @abstractmethod
+    def modified(self, key: str) -> Optional[float]:
+        """Last modified time in epoch seconds, or None when the key does not exist."""
+        pass
+
+    @abstractmethod
+    def touch(self, key: str) -> bool:
+        """Set the modified time to now; False when the key does not exist."""
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+    @abstractmethod
+    def list_keys(self, prefix: str) -> Iterator[Tuple[str, float]]:
+        """Yield ``(key, modified)`` for every object under ``prefix``; mtime in epoch seconds."""
+        pass
+
+    @abstractmethod
+    def local_path(self, key: str) -> Path:
+        """A readable local file with the key's content; FileNotFoundError if absent."""
+        pass
+
+    def iter_chunks(self, key: str, chunk_size: int = STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+        with open(self.local_path(key), "rb") as f:
+            yield from iter(lambda: f.read(chunk_size), b"")
+
+    # -- async wrappers ---------------------------------------------------
+
+    async def read(self, key: str) -> bytes:
+        return await compute_executor.run(self.read_bytes, key, kind="thread", label="storage_read", timeout=None)
+
+    async def write(self, key: str, data: bytes) -> None:
+        await compute_executor.run(self.write_bytes, key, data, kind="thread", label="storage_write", timeout=None)
+
+    async def fetch_local(self, key: str) -> Path:
+        return await compute_executor.run(self.local_path, key, kind="thread", label="storage_fetch", timeout=None)
+
+    async def stream(self, key: str, chunk_size: int = STREAM_CHUNK_BYTES) -> AsyncIterator[bytes]:
+        """Yield the content in chunks, reading each one on a worker thread."""
+        chunks = self.iter_chunks(key, chunk_size)
+        sentinel = object()
+        try:
+            while True:
+                chunk = await compute_executor.run(
+                    next, chunks, sentinel, kind="thread", label="storage_stream", timeout=None
+                )
+                if chunk is sentinel:
+                    return
+                yield chunk
+        finally:
+            chunks.close()
+
+    async def write_stream(self, key: str, chunks: AsyncIterable[bytes]) -> int:
+        """Spool ``chunks`` to a temporary file, then store it; returns the size."""
+        fd, tmp_name = tempfile.mkstemp(prefix="storage-", suffix=".part")
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as f:
+                async for chunk in chunks:
+                    await compute_executor.run(f.write, chunk, kind="thread", label="storage_spool", timeout=None)
+                    size += len(chunk)
+            await compute_executor.run(
+                self.write_file, key, Path(tmp_name), kind="thread", label="storage_write", timeout=None
+            )
+        finally:
+            Path(tmp_name).unlink(missing_ok=True)
+        return size
+
+
+class LocalStorageBackend(StorageBackend):
+    """Files under ``root`` (the server directory by default)."""
+
+    is_local = True
+
+    def __init__(self, root: Path = BASE_DIR):
+        self.root = Path(root)
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key
+
+    def read_bytes(self, key: str) -> bytes:
+        return self.path_for(key).read_bytes()
+
+    def write_bytes(self, key: str, data: bytes) -> None:
+        _atomic_write(self.path_for(key), data)
+
+    def write_many(self, items: List[Tuple[str, bytes]], fsync: bool = False) -> None:
+        """Stage every item as a temp file, then rename them all into place.
+
+        With ``fsync`` each file is synced before its rename and each parent
+        directory once after all renames, instead of once per file.
+        """
+        staged: List[Tuple[Path, Path]] = []
+        try:
+            for key, data in items:
+                target = self.path_for(key)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = target.with_name(f"{target.name}.{uuid.uuid4().hex}.tmp")
+                staged.append((tmp_path, target))
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                    if fsync:
+                        f.flush()
+                        os.fsync(f.fileno())
+            for tmp_path, target in staged:
+                os.replace(tmp_path, target)
+        finally:
+            for tmp_path, _ in staged:
+                tmp_path.unlink(missing_ok=True)
+        if fsync:
+            for directory in {target.parent for _, target in staged}:
+                _fsync_dir(directory)
+
+    def write_file(self, key: str, source: Path) -> None:
+        target = self.path_for(key)
+        if Path(source).resolve() == target.resolve():
+            return
+        target.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(str(source), str(target))
+
+    def exists(self, key: str) -> bool:
+        return self.path_for(key).is_file()
+
+    def size(self, key: str) -> Optional[int]:
+        try:
+            return self.path_for(key).stat().st_size
+        except OSError:
+            return None
+
+    def modified(self, key: str) -> Optional[float]:
+        try:
+            return self.path_for(key).stat().st_mtime
+        except OSError:
+            return None
+
+    def touch(self, key: str) -> bool:
+        try:
+            os.utime(self.path_for(key))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def delete(self, key: str) -> None:
+        self.path_for(key).unlink(missing_ok=True)
+
+    def list_keys(self, prefix: str) -> Iterator[Tuple[str, float]]:
+        base = self.path_for(prefix)
+        for path in base.rglob("*"):
+            if path.name.endswith(".tmp"):
+                continue
+            try:
+                stat = path.stat()
+            except OSError:  # deleted while listing
+                continue
+            if path.is_file():
+                yield f"{prefix.rstrip('/')}/{path.relative_to(base).as_posix()}", stat.st_mtime
+
+    def local_path(self, key: str) -> Path:
+        path = self.path_for(key)
+        if not path.is_file():
+            raise FileNotFoundError(key)
+        return path
+
+
+def _is_not_found(exc: Exception) -> bool:
+    error = getattr(exc, "response", {}) or {}
+    code = str(error.get("Error", {}).get("Code", ""))
+    return code in {"404", "NoSuchKey", "NotFound"}
+
+
+class S3StorageBackend(StorageBackend):
+    """Objects in an S3-compatible bucket; ``client`` follows the boto3 S3 API."""
+
+    def __init__(self, bucket: str, prefix: str = "", client: Any = None, endpoint_url: Optional[str] = None):
+        if not bucket:
+            raise StorageError("S3_BUCKET is required for the s3 storage backend")
+        if client is None:
+            if boto3 is None:
+                raise StorageError("boto3 is required for the s3 storage backend")
+            client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.client = client
+
+    def object_key(self, key: str) -> str:
+        if key.startswith("/"):
+            raise ValueError(f"Absolute storage keys are not supported by S3: {key}")
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def read_bytes(self, key: str) -> bytes:
+        try:
+            response = self.client.get_object(Bucket=self.bucket, Key=self.object_key(key))
+        except Exception as exc:
+            if _is_not_found(exc):
+                raise FileNotFoundError(key) from exc
+            raise
+        return response["Body"].read()
+
+    def iter_chunks(self, key: str, chunk_size: int = STREAM_CHUNK_BYTES) -> Iterator[bytes]:
+        try:
+            body = self.client.get_object(Bucket=self.bucket, Key=self.object_key(key))["Body"]
+        except Exception as exc:
+            if _is_not_found(exc):
+                raise FileNotFoundError(key) from exc
+            raise
+        yield from iter(lambda: body.read(chunk_size), b"")
+
+    def write_bytes(self, key: str, data: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=self.object_key(key), Body=data)
+
+    def write_file(self, key: str, source: Path) -> None:
+        self.client.upload_file(str(source), self.bucket, self.object_key(key))
+        Path(source).unlink(missing_ok=True)
+
+    def _head(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self.object_key(key))
+        except Exception as exc:
+            if _is_not_found(exc):
+                return None
+            raise
+
+    def size(self, key: str) -> Optional[int]:
+        head = self._head(key)
+        return int(head["ContentLength"]) if head else None
+
+    def modified(self, key: str) -> Optional[float]:
+        head = self._head(key)
+        return head["LastModified"].timestamp() if head else None
+
+    def touch(self, key: str) -> bool:
+        object_key = self.object_key(key)
+        try:
+            # Copying an object onto itself is how S3 refreshes LastModified
+            self.client.copy_object(
+                Bucket=self.bucket,
+                Key=object_key,
+                CopySource={"Bucket": self.bucket, "Key": object_key},
+                MetadataDirective="REPLACE",
+            )
+        except Exception as exc:
+            if _is_not_found(exc):
+                return False
+            raise
+        return True
+
+    def exists(self, key: str) -> bool:
+        return self.size(key) is not None
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self.object_key(key))
+
+    def list_keys(self, prefix: str) -> Iterator[Tuple[str, float]]:
+        strip = len(self.prefix) + 1 if self.prefix else 0
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.object_key(prefix.rstrip("/") + "/")):
+            for item in page.get("Contents", []):
+                yield item["Key"][strip:], item["LastModified"].timestamp()
+
+    def local_path(self, key: str) -> Path:
+        raise StorageError("S3 objects have no local path; wrap the backend in CachedStorageBackend")
+
+
+class CachedStorageBackend(StorageBackend):
+    """Read-through, write-through local cache in front of a remote backend.
+
+    Cached files are evicted least-recently-used once the cache grows past
+    ``max_bytes``. Sizes and last use are kept in an in-memory index, built
+    from the cache directory once and then updated on every fill, hit and
+    delete, so eviction never rescans the directory. Files used within the
+    last ``evict_grace`` seconds are never evicted, since a ``FileResponse``
+    may still be streaming them; the cache can overshoot meanwhile. Evicting
+    or deleting a file also removes the ``.gz``/``.br`` siblings built next
+    to it for serving.
+    """
+
+    def __init__(self, remote: StorageBackend, cache_dir: Path = STORAGE_CACHE_DIR,
+                 max_bytes: int = STORAGE_CACHE_MAX_BYTES,
+                 evict_grace: float = STORAGE_CACHE_EVICT_GRACE_SECONDS):
+        self.remote = remote
+        self.cache = LocalStorageBackend(cache_dir)
+        self.max_bytes = max_bytes
+        self.evict_grace = evict_grace
+        self._lock = threading.Lock()
+        # key -> (size, last used), least recently used first
+        self._index: Optional["OrderedDict[str, Tuple[int, float]]"] = None
+        self._total = 0
+
+    def _load_index(self) -> "OrderedDict[str, Tuple[int, float]]":
+        """Index of the files already in the cache directory (caller holds the lock)."""
+        if self._index is None:
+            entries = []
+            if self.cache.root.is_dir():
+                for key, _ in self.cache.list_keys(""):
+                    key = key.lstrip("/")
+                    try:
+                        stat = self.cache.path_for(key).stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_atime, key, stat.st_size))
+            self._index = OrderedDict((key, (size, used)) for used, key, size in sorted(entries))
+            self._total = sum(size for size, _ in self._index.values())
+        return self._index
+
+    def _touch(self, key: str, size: Optional[int] = None) -> None:
+        """Record ``key`` as just used; ``size`` when its file was (re)written."""
+        with self._lock:
+            index = self._load_index()
+            previous = index.pop(key, None)
+            if size is None:
+                if previous is None:
+                    return
+                size = previous[0]
+            self._total += size - (previous[0] if previous else 0)
+            index[key] = (size, time.time())
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            previous = self._load_index().pop(key, None)
+            if previous is not None:
+                self._total -= previous[0]
+
+    def _fill(self, key: str, data: bytes) -> Path:
+        self.cache.write_bytes(key, data)
+        self._touch(key, len(data))
+        self._evict()
+        return self.cache.path_for(key)
+
+    def _evict(self) -> None:
+        with self._lock:
+            index = self._load_index()
+            cutoff = time.time() - self.evict_grace
+            while self._total > self.max_bytes and index:
+                key, (size, used) = next(iter(index.items()))
+                if used > cutoff:
+                    break  # everything left was used more recently
+                del index[key]
+                self._total -= size
+                self._drop_local(key)
+
+    def _drop_local(self, key: str) -> None:
+        self.cache.delete(key)
+        remove_precompressed(self.cache.path_for(key))
+
+    def local_path(self, key: str) -> Path:
+        path = self.cache.path_for(key)
+        if path.is_file():
+            os.utime(path)  # mark as recently used
+            self._touch(key)
+            return path
+        return self._fill(key, self.remote.read_bytes(key))
+
+    def read_bytes(self, key: str) -> bytes:
+        return self.local_path(key).read_bytes()
+
+    def write_bytes(self, key: str, data: bytes) -> None:
+        self.remote.write_bytes(key, data)
+        self._fill(key, data)
+
+    def write_many(self, items: List[Tuple[str, bytes]], fsync: bool = False) -> None:
+        self.remote.write_many(items, fsync)
+        for key, data in items:
+            self.cache.write_bytes(key, data)
+            self._touch(key, len(data))
+        self._evict()
+
+    def write_file(self, key: str, source: Path) -> None:
+        fd, upload_name = tempfile.mkstemp(prefix="storage-", suffix=".part")
+        os.close(fd)
+        try:
+            shutil.copyfile(source, upload_name)
+            self.remote.write_file(key, Path(upload_name))
+        finally:
+            Path(upload_name).unlink(missing_ok=True)
+        self.cache.write_file(key, source)
+        self._touch(key, self.cache.size(key) or 0)
+        self._evict()
+
+    def exists(self, key: str) -> bool:
+        return self.cache.exists(key) or self.remote.exists(key)
+
+    def size(self, key: str) -> Optional[int]:
+        return self.remote.size(key)
+
+    def modified(self, key: str) -> Optional[float]:
+        return self.remote.modified(key)
+
+    def touch(self, key: str) -> bool:
+        return self.remote.touch(key)
+
+    def delete(self, key: str) -> None:
+        self.remote.delete(key)
+        self._drop_local(key)
+        self._forget(key)
+
+    def list_keys(self, prefix: str) -> Iterator[Tuple[str, float]]:
+        return self.remote.list_keys(prefix)
+
+
+def create_storage_backend(kind: str = STORAGE_BACKEND) -> StorageBackend:
+    if kind == "local":
+        return LocalStorageBackend()
+    if kind == "s3":
+        return CachedStorageBackend(S3StorageBackend(S3_BUCKET, S3_PREFIX, endpoint_url=S3_ENDPOINT_URL))
+    raise StorageError(f"Unknown STORAGE_BACKEND: {kind}")
+
+
+storage_backend: StorageBackend = create_storage_backend()
+
+
+def get_storage_backend() -> StorageBackend:
+    return storage_backend
@@ -0,0 +1,329 @@
+"""Content-addressed, compressed storage for large JSON payloads.
+
+Pipeline node executions record request bodies, responses and node
+inputs/outputs. Most are small, but MSAs and long sequences can be hundreds
+of kilobytes and bloat every scan of ``pipeline_node_executions``. Payloads
+above ``PAYLOAD_INLINE_MAX_BYTES`` are written once to
+``storage/blobs/<aa>/<sha256>.<ext>`` (zstd when available, gzip otherwise)
+and the column keeps only a reference string:
+
+    @blob:v1:<codec>:<sha256>:<size>
+
+Small payloads stay inline as plain JSON text, so existing rows and readers
+keep working. Blob bytes go through the configured storage backend.
+
+Blobs are shared between rows with identical payloads, so they are not
+deleted with a row. ``run_blob_gc`` periodically deletes blobs that no row
+references any more (after pipeline deletes or node execution updates);
+blobs written or reused within ``BLOB_GC_GRACE_SECONDS`` are left alone so
+a payload stored just before its row is committed is never collected.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+try:
+    import zstandard
+except ImportError:  # optional; gzip is used instead
+    zstandard = None
+
+try:
+    from ...database.db import get_db
+    from ...infrastructure.compute import compute_executor
+    from ...infrastructure.utils import log_line
+    from .backends import StorageBackend, get_storage_backend, storage_key
+except ImportError:
+    from database.db import get_db
+    from infrastructure.compute import compute_executor
+    from infrastructure.utils import log_line
+    from domain.storage.backends import StorageBackend, get_storage_backend, storage_key
+
+BASE_DIR = Path(__file__).parent.parent.parent
+BLOB_DIR = Path(os.getenv("BLOB_STORE_DIR", str(BASE_DIR / "storage" / "blobs")))
+
+# Payloads larger than this (UTF-8 bytes) go to the blob store
+PAYLOAD_INLINE_MAX_BYTES = int(os.getenv("PAYLOAD_INLINE_MAX_BYTES", str(16 * 1024)))
+
+BLOB_REF_PREFIX = "@blob:v1:"
+
+# Columns of pipeline_node_executions that may hold large payloads
+PAYLOAD_COLUMNS = ("input_data", "output_data", "request_body", "response_data")
+
+# Seconds between sweeps for unreferenced blobs (0 disables the sweep)
+BLOB_GC_INTERVAL_SECONDS = float(os.getenv("BLOB_GC_INTERVAL_SECONDS", str(6 * 3600)))
+# Blobs written more recently than this are never collected
+BLOB_GC_GRACE_SECONDS = float(os.getenv("BLOB_GC_GRACE_SECONDS", "3600"))
+
+_CODEC_EXTENSIONS = {"zstd": "zst", "gzip": "gz"}
+_EXTENSION_CODECS = {ext: codec for codec, ext in _CODEC_EXTENSIONS.items()}
+
+
+def _default_codec() -> str:
+    return "zstd" if zstandard is not None else "gzip"
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=6).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd blobs")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class BlobStore:
+    """Immutable blobs addressed by the SHA-256 of their uncompressed bytes."""
+
+    def __init__(self, root: Path = BLOB_DIR, codec: Optional[str] = None,
+                 backend: Optional[StorageBackend] = None):
+        self.root = Path(root)
+        self.codec = codec or _default_codec()
+        self._backend = backend
+        # Orders a dedup hit in put() against the GC's last check before delete
+        self._lock = threading.Lock()
+
+    @property
+    def backend(self) -> StorageBackend:
+        return self._backend or get_storage_backend()
+
+    def path_for(self, digest: str, codec: str) -> Path:
+        return self.root / digest[:2] / f"{digest}.{_CODEC_EXTENSIONS[codec]}"
+
+    def put(self, data: bytes) -> Tuple[str, str, int]:
+        """Store ``data`` if not already present; returns (sha256, codec, size)."""
+        digest = hashlib.sha256(data).hexdigest()
+        key = storage_key(self.path_for(digest, self.codec))
+        with self._lock:
+            # A reused blob is touched so the GC grace period covers the new reference
+            reused = self.backend.touch(key)
+        if not reused:
+            self.backend.write_bytes(key, _compress(data, self.codec))
+        return digest, self.codec, len(data)
+
+    def get(self, digest: str, codec: str) -> bytes:
+        return _decompress(self.backend.read_bytes(storage_key(self.path_for(digest, codec))), codec)
+
+    def iter_blobs(self) -> Iterator[Tuple[str, str, str, float]]:
+        """Yield ``(key, sha256, codec, modified)`` for every stored blob."""
+        for key, modified in self.backend.list_keys(storage_key(self.root)):
+            digest, _, ext = key.rsplit("/", 1)[-1].partition(".")
+            codec = _EXTENSION_CODECS.get(ext)
+            if codec is not None:
+                yield key, digest, codec, modified
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(key)
+
+    def delete_if_older(self, key: str, cutoff: float) -> bool:
+        """Delete ``key`` unless it was written or reused at or after ``cutoff``."""
+        with self._lock:
+            modified = self.backend.modified(key)
+            if modified is None or modified >= cutoff:
+                return False
+            self.backend.delete(key)
+        return True
+
+
+blob_store = BlobStore()
+
+
+def is_blob_ref(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith(BLOB_REF_PREFIX)
+
+
+def parse_blob_ref(ref: str) -> Dict[str, Any]:
+    """Split a reference into ``{"codec", "sha256", "size"}``."""
+    codec, digest, size = ref[len(BLOB_REF_PREFIX):].split(":")
+    return {"codec": codec, "sha256": digest, "size": int(size)}
+
+
+def store_payload_text(text: Optional[str], store: Optional[BlobStore] = None) -> Optional[str]:
+    """Return the value to write to a payload column for JSON ``text``."""
+    if text is None or is_blob_ref(text):
+        return text
+    data = text.encode("utf-8")
+    if len(data) <= PAYLOAD_INLINE_MAX_BYTES:
+        return text
+    digest, codec, size = (store or blob_store).put(data)
+    return f"{BLOB_REF_PREFIX}{codec}:{digest}:{size}"
+
+
+def encode_payload(value: Any, store: Optional[BlobStore] = None) -> Optional[str]:
+    """Serialize a payload for storage; empty values are stored as NULL."""
+    if not value:
+        return None
+    return store_payload_text(json.dumps(value), store)
+
+
+def encode_payloads(values: Sequence[Any], store: Optional[BlobStore] = None) -> List[Optional[str]]:
+    """``encode_payload`` for each value; run it on the compute thread pool."""
+    return [encode_payload(value, store) for value in values]
+
+
+def payload_text(stored: Optional[str], store: Optional[BlobStore] = None) -> Optional[str]:
+    """JSON text for a stored column value, reading the blob if needed."""
+    if not is_blob_ref(stored):
+        return stored
+    ref = parse_blob_ref(stored)
+    try:
+        return (store or blob_store).get(ref["sha256"], ref["codec"]).decode("utf-8")
+    except (OSError, RuntimeError) as exc:
+        log_line("blob_read_failed", {"sha256": ref["sha256"], "error": str(exc)})
+        return None
+
+
+def decode_payload(stored: Optional[str], store: Optional[BlobStore] = None) -> Any:
+    """Parsed payload for a stored column value, or None if empty/unreadable."""
+    text = payload_text(stored, store)
+    if not text:
+        return None
+    try:
+        return json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        return None
+
+
+# ---------------------------------------------------------------------------
+# Migration of existing inline rows
+# ---------------------------------------------------------------------------
+
+PAYLOAD_MIGRATION_BATCH = 100
+# Pause between batches so the migration never monopolizes the database
+PAYLOAD_MIGRATION_PAUSE_SECONDS = 0.5
+
+
+def migrate_payload_batch(
+    batch_size: int = PAYLOAD_MIGRATION_BATCH,
+    store: Optional[BlobStore] = None,
+    db_factory: Callable[[], Any] = get_db,
+) -> int:
+    """Move one batch of oversized inline payloads to the blob store.
+
+    Returns the number of rows rewritten; 0 means nothing is left to migrate.
+    """
+    length_checks = " OR ".join(
+        f"(length({col}) > ? AND {col} NOT LIKE '{BLOB_REF_PREFIX}%')" for col in PAYLOAD_COLUMNS
+    )
+    with db_factory() as conn:
+        rows = conn.execute(
+            f"SELECT id, {', '.join(PAYLOAD_COLUMNS)} FROM pipeline_node_executions "
+            f"WHERE {length_checks} LIMIT ?",
+            [PAYLOAD_INLINE_MAX_BYTES] * len(PAYLOAD_COLUMNS) + [batch_size],
+        ).fetchall()
+        updates = []
+        for row in rows:
+            values = [store_payload_text(row[col], store) for col in PAYLOAD_COLUMNS]
+            updates.append(values + [row["id"]])
+        if updates:
+            conn.executemany(
+                f"UPDATE pipeline_node_executions SET {', '.join(c + ' = ?' for c in PAYLOAD_COLUMNS)} "
+                "WHERE id = ?",
+                updates,
+            )
+    return len(updates)
+
+
+async def run_payload_migration(
+    batch_size: int = PAYLOAD_MIGRATION_BATCH,
+    pause: float = PAYLOAD_MIGRATION_PAUSE_SECONDS,
+) -> int:
+    """Migrate all oversized inline payloads in small batches off the event loop."""
+    total = 0
+    try:
+        while True:
+            migrated = await compute_executor.run(
+                migrate_payload_batch, batch_size, kind="thread", label="payload_migration", timeout=None
+            )
+            total += migrated
+            if migrated < batch_size:
+                break
+            await asyncio.sleep(pause)
+    except Exception as exc:
+        log_line("payload_migration_failed", {"error": str(exc), "migrated": total})
+        return total
+    if total:
+        log_line("payload_migration_done", {"migrated": total})
+    return total
+
+
+# ---------------------------------------------------------------------------
+# Garbage collection of unreferenced blobs
+# ---------------------------------------------------------------------------
+
+def referenced_blobs(db_factory: Callable[[], Any] = get_db) -> Set[Tuple[str, str]]:
+    """``(sha256, codec)`` of every blob a node execution row still points to."""
+    referenced: Set[Tuple[str, str]] = set()
+    with db_factory() as conn:
+        for column in PAYLOAD_COLUMNS:
+            rows = conn.execute(
+                f"SELECT DISTINCT {column} FROM pipeline_node_executions WHERE {column} LIKE ?",
+                (f"{BLOB_REF_PREFIX}%",),
+            ).fetchall()
+            for row in rows:
+                ref = parse_blob_ref(row[0])
+                referenced.add((ref["sha256"], ref["codec"]))
+    return referenced
+
+
+def sweep_unreferenced_blobs(
+    store: Optional[BlobStore] = None,
+    db_factory: Callable[[], Any] = get_db,
+    grace_seconds: float = BLOB_GC_GRACE_SECONDS,
+) -> int:
+    """Delete blobs older than ``grace_seconds`` that no row references.
+
+    Blobs are listed before references are read, so anything written during
+    the sweep is not a candidate, and each candidate's age is checked again
+    just before it is deleted, since ``put`` touches a blob it reuses.
+    Returns the number of blobs deleted.
+    """
+    store = store or blob_store
+    cutoff = time.time() - grace_seconds
+    candidates = [
+        (key, digest, codec) for key, digest, codec, modified in store.iter_blobs() if modified < cutoff
+    ]
+    if not candidates:
+        return 0
+    referenced = referenced_blobs(db_factory)
+    deleted = 0
+    for key, digest, codec in candidates:
+        if (digest, codec) in referenced:
+            continue
+        try:
+            if not store.delete_if_older(key, cutoff):
+                continue
+        except OSError as exc:
+            log_line("blob_gc_delete_failed", {"key": key, "error": str(exc)})
+            continue
+        deleted += 1
+    return deleted
+
+
+async def run_blob_gc(interval: float = BLOB_GC_INTERVAL_SECONDS) -> None:
+    """Sweep forever, sleeping ``interval`` seconds between sweeps."""
+    while True:
+        try:
+            deleted = await compute_executor.run(
+                sweep_unreferenced_blobs, kind="thread", label="blob_gc", timeout=None
+            )
+            if deleted:
+                log_line("blob_gc_done", {"deleted": deleted})
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            log_line("blob_gc_failed", {"error": str(exc)})
+        await asyncio.sleep(interval)
@@ -12,9 +12,15 @@ from fastapi import HTTPException, status
 try:
     # Try relative import first (when running as module)
     from ...database.db import get_db
+    from ...infrastructure.compute import compute_executor
+    from .backends import get_storage_backend
+    from .result_storage import write_result, write_result_async
 except ImportError:
     # Fallback to absolute import (when running directly)
     from database.db import get_db
+    from infrastructure.compute import compute_executor
+    from domain.storage.backends import get_storage_backend
+    from domain.storage.result_storage import write_result, write_result_async
 
 BASE_DIR = Path(__file__).parent.parent.parent
 
@@ -39,8 +45,8 @@ def verify_file_ownership(file_id: str, user_id: str) -> bool:
         return row is not None
 
 
-def get_user_file_path(file_id: str, user_id: str) -> Path:
-    """Get file path with ownership check. Raises HTTPException if access denied."""
+def _stored_path(file_id: str, user_id: str) -> str:
+    """Storage key of a file the user owns. Raises HTTPException if access denied."""
     with get_db() as conn:
         row = conn.execute(
             "SELECT stored_path FROM user_files WHERE id = ? AND user_id = ?",
@@ -52,15 +58,32 @@ def get_user_file_path(file_id: str, user_id: str) -> Path:
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="File not found or access denied",
             )
-        
-        file_path = BASE_DIR / row["stored_path"]
-        if not file_path.exists():
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="File not found on disk",
-            )
-        
-        return file_path
+        return row["stored_path"]
+
+
+def _missing_on_disk() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="File not found on disk",
+    )
+
+
+def get_user_file_path(file_id: str, user_id: str) -> Path:
+    """Get file path with ownership check. Raises HTTPException if access denied."""
+    stored_path = _stored_path(file_id, user_id)
+    try:
+        return get_storage_backend().local_path(stored_path)
+    except FileNotFoundError:
+        raise _missing_on_disk()
+
+
+async def get_user_file_path_async(file_id: str, user_id: str) -> Path:
+    """``get_user_file_path`` for coroutines: a remote download runs on a worker thread."""
+    stored_path = _stored_path(file_id, user_id)
+    try:
+        return await get_storage_backend().fetch_local(stored_path)
+    except FileNotFoundError:
+        raise _missing_on_disk()
 
 
 def get_file_metadata(file_id: str, user_id: Optional[str] = None) -> Optional[Dict]:
@@ -118,31 +141,22 @@ def list_user_files(user_id: str, file_type: Optional[str] = None) -> List[Dict]
                 except json.JSONDecodeError:
                     pass
             
-            # Check if file exists
-            file_path = BASE_DIR / metadata["stored_path"]
-            metadata["exists"] = file_path.exists()
+            # Existence is tracked by the background file reconciler
+            metadata["exists"] = metadata.get("missing_at") is None
             
             results.append(metadata)
         
         return results
 
 
-def save_result_file(
-    user_id: str,
-    file_id: str,
-    file_type: str,
-    filename: str,
-    content: bytes,
-    job_id: Optional[str] = None,
-    metadata: Optional[Dict] = None,
-) -> str:
-    """Save a result file (RFdiffusion, ProteinMPNN, AlphaFold) in user-scoped directory."""
-    # Determine storage directory based on file type
+def _result_file_path(user_id: str, file_id: str, file_type: str, filename: str) -> Path:
+    """Logical location of a result file in the user-scoped directory."""
     storage_dir = BASE_DIR / "storage" / user_id
     
     if file_type == "rfdiffusion":
         result_dir = storage_dir / "rfdiffusion_results"
     elif file_type == "proteinmpnn":
+        # ProteinMPNN stores in subdirectory
         result_dir = storage_dir / "proteinmpnn_results" / file_id
     elif file_type == "alphafold":
         result_dir = storage_dir / "alphafold_results"
@@ -151,18 +165,20 @@ def save_result_file(
     else:
         result_dir = storage_dir / "results"
     
-    result_dir.mkdir(parents=True, exist_ok=True)
-    
-    # Save file
-    if file_type == "proteinmpnn":
-        # ProteinMPNN stores in subdirectory
-        file_path = result_dir / filename
-    else:
-        file_path = result_dir / filename
-    
-    file_path.write_bytes(content)
-    
-    # Store metadata in database
+    return result_dir / filename
+
+
+def _record_result_file(
+    user_id: str,
+    file_id: str,
+    file_type: str,
+    filename: str,
+    file_path: Path,
+    size: int,
+    job_id: Optional[str],
+    metadata: Optional[Dict],
+) -> str:
+    """Insert the ``user_files`` row for a written result; returns its stored path."""
     stored_path_rel = str(file_path.relative_to(BASE_DIR))
     metadata_json = json.dumps(metadata or {})
     
@@ -177,7 +193,7 @@ def save_result_file(
                 file_type,
                 filename,
                 stored_path_rel,
-                len(content),
+                size,
                 metadata_json,
                 job_id,
             ),
@@ -185,3 +201,43 @@ def save_result_file(
     
     return stored_path_rel
 
+
+def save_result_file(
+    user_id: str,
+    file_id: str,
+    file_type: str,
+    filename: str,
+    content: bytes,
+    job_id: Optional[str] = None,
+    metadata: Optional[Dict] = None,
+) -> str:
+    """Save a result file (RFdiffusion, ProteinMPNN, AlphaFold) in user-scoped directory."""
+    # Structures are stored compressed (e.g. name.pdb.gz); size stays the logical size
+    file_path = write_result(_result_file_path(user_id, file_id, file_type, filename), content)
+    return _record_result_file(user_id, file_id, file_type, filename, file_path, len(content), job_id, metadata)
+
+
+async def save_result_file_async(
+    user_id: str,
+    file_id: str,
+    file_type: str,
+    filename: str,
+    content: bytes,
+    job_id: Optional[str] = None,
+    metadata: Optional[Dict] = None,
+) -> str:
+    """``save_result_file`` for coroutines: the write and the DB insert run off the event loop."""
+    file_path = await write_result_async(_result_file_path(user_id, file_id, file_type, filename), content)
+    return await compute_executor.run(
+        _record_result_file,
+        user_id,
+        file_id,
+        file_type,
+        filename,
+        file_path,
+        len(content),
+        job_id,
+        metadata,
+        kind="thread",
+        label="record_result_file",
+    )
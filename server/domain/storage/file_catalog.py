@@ -0,0 +1,238 @@
+"""User file catalog: filtered, paginated listings served from the database.
+
+Listings never touch the filesystem. Sizes are recorded when files are
+written, and a background reconciler stamps ``user_files.missing_at`` for
+rows whose file has disappeared (clearing it if the file comes back), so a
+request only has to read indexed rows.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import os
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+try:
+    from ...database.db import get_db
+    from ...infrastructure.compute import compute_executor
+    from ...infrastructure.utils import log_line
+    from .backends import StorageBackend, get_storage_backend
+except ImportError:
+    from database.db import get_db
+    from infrastructure.compute import compute_executor
+    from infrastructure.utils import log_line
+    from domain.storage.backends import StorageBackend, get_storage_backend
+
+FILE_PAGE_MAX = 500
+# Rows fetched per query while streaming NDJSON
+FILE_STREAM_BATCH = 200
+
+FILE_RECONCILE_BATCH = 200
+# Seconds between reconciler sweeps; 0 disables the background task
+FILE_RECONCILE_INTERVAL_SECONDS = int(os.getenv("FILE_RECONCILE_INTERVAL_SECONDS", "600"))
+# Pause between batches within a sweep so it never monopolizes the database
+FILE_RECONCILE_PAUSE_SECONDS = 0.2
+
+_CATALOG_COLUMNS = "id, file_type, original_filename, stored_path, size, metadata, job_id, created_at"
+
+_DOWNLOAD_ROUTES = {
+    "upload": "/api/upload/pdb/{}",
+    "proteinmpnn": "/api/proteinmpnn/result/{}",
+    "openfold2": "/api/openfold2/result/{}",
+}
+
+
+def download_url_for(file_type: str, file_id: str) -> str:
+    return _DOWNLOAD_ROUTES.get(file_type, "/api/files/{}/download").format(file_id)
+
+
+def catalog_entry(row) -> Dict[str, Any]:
+    """Shape a ``user_files`` row for the /api/files response."""
+    try:
+        metadata = json.loads(row["metadata"]) if row["metadata"] else {}
+    except json.JSONDecodeError:
+        metadata = {}
+    return {
+        "file_id": row["id"],
+        "type": row["file_type"],
+        "filename": row["original_filename"] or row["id"],
+        "file_path": row["stored_path"],
+        "size": row["size"] or 0,
+        "job_id": row["job_id"],
+        "created_at": row["created_at"],
+        "download_url": download_url_for(row["file_type"], row["id"]),
+        "metadata": metadata,
+    }
+
+
+def encode_file_cursor(created_at: str, file_id: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([created_at, file_id]).encode()).decode()
+
+
+def decode_file_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        created_at, file_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(created_at), str(file_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _normalize_timestamp(value: str) -> str:
+    """Match SQLite's ``CURRENT_TIMESTAMP`` format so string comparison works."""
+    return value.strip().replace("T", " ").rstrip("Z")
+
+
+def query_user_files(
+    conn,
+    user_id: str,
+    file_type: Optional[str] = None,
+    job_id: Optional[str] = None,
+    created_after: Optional[str] = None,
+    created_before: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page of a user's files, newest first.
+
+    Returns ``(entries, next_cursor)``; ``next_cursor`` is None on the last
+    page or when ``limit`` is None (everything is returned).
+    """
+    clauses = ["user_id = ?", "missing_at IS NULL"]
+    params: List[Any] = [user_id]
+    if file_type:
+        clauses.append("file_type = ?")
+        params.append(file_type)
+    if job_id:
+        clauses.append("job_id = ?")
+        params.append(job_id)
+    if created_after:
+        clauses.append("created_at >= ?")
+        params.append(_normalize_timestamp(created_after))
+    if created_before:
+        clauses.append("created_at < ?")
+        params.append(_normalize_timestamp(created_before))
+    if cursor:
+        created_at, file_id = decode_file_cursor(cursor)
+        clauses.append("(created_at < ? OR (created_at = ? AND id < ?))")
+        params.extend([created_at, created_at, file_id])
+
+    sql = (
+        f"SELECT {_CATALOG_COLUMNS} FROM user_files WHERE {' AND '.join(clauses)} "
+        "ORDER BY created_at DESC, id DESC"
+    )
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit + 1)
+    rows = conn.execute(sql, params).fetchall()
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_file_cursor(rows[-1]["created_at"], rows[-1]["id"])
+    return [catalog_entry(row) for row in rows], next_cursor
+
+
+def iter_user_files_ndjson(
+    user_id: str,
+    batch_size: int = FILE_STREAM_BATCH,
+    db_factory: Callable[[], Any] = get_db,
+    **filters: Any,
+) -> Iterator[str]:
+    """Iterate every matching file as one JSON line, reading in keyset batches.
+
+    The cursor is validated before anything is streamed. Each batch opens its
+    own connection: Starlette advances sync iterators on worker threads, and
+    SQLite connections must stay on the thread that made them.
+    """
+    cursor = filters.pop("cursor", None)
+    if cursor:
+        decode_file_cursor(cursor)
+
+    def lines(cursor: Optional[str]) -> Iterator[str]:
+        while True:
+            with db_factory() as conn:
+                entries, cursor = query_user_files(conn, user_id, limit=batch_size, cursor=cursor, **filters)
+            for entry in entries:
+                yield json.dumps(entry) + "\n"
+            if cursor is None:
+                return
+
+    return lines(cursor)
+
+
+# ---------------------------------------------------------------------------
+# Background existence reconciliation
+# ---------------------------------------------------------------------------
+
+
+def reconcile_file_batch(
+    after_id: str = "",
+    batch_size: int = FILE_RECONCILE_BATCH,
+    backend: Optional[StorageBackend] = None,
+    db_factory: Callable[[], Any] = get_db,
+) -> Tuple[Optional[str], int]:
+    """Check one batch of files in storage, ordered by id.
+
+    Marks vanished files missing, clears the mark on files that reappeared and
+    backfills sizes that were never recorded. Returns ``(last_id, changed)``;
+    ``last_id`` is None once every row has been visited.
+    """
+    backend = backend or get_storage_backend()
+    with db_factory() as conn:
+        rows = conn.execute(
+            "SELECT id, stored_path, size, missing_at FROM user_files WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, batch_size),
+        ).fetchall()
+        missing, present = [], []
+        for row in rows:
+            size = backend.size(row["stored_path"])
+            if size is None:
+                if row["missing_at"] is None:
+                    missing.append((row["id"],))
+                continue
+            if row["missing_at"] is not None or not row["size"]:
+                present.append((size, row["id"]))
+        if missing:
+            conn.executemany("UPDATE user_files SET missing_at = CURRENT_TIMESTAMP WHERE id = ?", missing)
+        if present:
+            conn.executemany(
+                "UPDATE user_files SET missing_at = NULL, size = CASE WHEN size > 0 THEN size ELSE ? END WHERE id = ?",
+                present,
+            )
+    last_id = rows[-1]["id"] if len(rows) == batch_size else None
+    return last_id, len(missing) + len(present)
+
+
+async def reconcile_user_files(
+    batch_size: int = FILE_RECONCILE_BATCH,
+    pause: float = FILE_RECONCILE_PAUSE_SECONDS,
+) -> int:
+    """Run one full sweep over ``user_files`` off the event loop."""
+    after_id: Optional[str] = ""
+    changed = 0
+    while after_id is not None:
+        after_id, batch_changed = await compute_executor.run(
+            reconcile_file_batch, after_id, batch_size, kind="thread", label="file_reconcile", timeout=None
+        )
+        changed += batch_changed
+        if after_id is not None:
+            await asyncio.sleep(pause)
+    return changed
+
+
+async def run_file_reconciler(interval: float = FILE_RECONCILE_INTERVAL_SECONDS) -> None:
+    """Sweep forever, sleeping ``interval`` seconds between sweeps."""
+    while True:
+        try:
+            changed = await reconcile_user_files()
+            if changed:
+                log_line("file_reconcile_done", {"changed": changed})
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            log_line("file_reconcile_failed", {"error": str(exc)})
+        await asyncio.sleep(interval)
@@ -6,21 +6,39 @@ import json
 import os
 import sqlite3
 import uuid
+import zlib
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 from fastapi import HTTPException
 
 try:
     # Try relative import first (when running as module)
     from ...database.db import get_db
+    from ...infrastructure.compute import compute_executor
+    from .backends import get_storage_backend, storage_key
 except ImportError:
     # Fallback to absolute import (when running directly)
     from database.db import get_db
+    from infrastructure.compute import compute_executor
+    from domain.storage.backends import get_storage_backend, storage_key
 
 BASE_DIR = Path(__file__).parent.parent.parent
 STORAGE_DIR = BASE_DIR / "storage"
 
+# Largest accepted upload, measured after gzip decompression
+PDB_UPLOAD_MAX_BYTES = int(os.getenv("PDB_UPLOAD_MAX_BYTES", str(100 * 1024 * 1024)))
+# Size of each read from the incoming upload
+PDB_UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+# Standard amino acid three-letter codes
+_AA_CODES = frozenset({
+    'ALA', 'ARG', 'ASN', 'ASP', 'CYS', 'GLN', 'GLU', 'GLY', 'HIS', 'ILE',
+    'LEU', 'LYS', 'MET', 'PHE', 'PRO', 'SER', 'THR', 'TRP', 'TYR', 'VAL'
+})
+
 
 def _row_to_dict(row) -> Dict[str, object]:
     """Convert sqlite3.Row to dict safely."""
@@ -39,6 +57,11 @@ def _get_user_storage_dir(user_id: str) -> Path:
     return user_dir
 
 
+def _upload_path(user_id: str, file_id: str) -> Path:
+    """Logical location of an upload; the bytes live in the storage backend."""
+    return STORAGE_DIR / user_id / "uploads" / "pdb" / f"{file_id}.pdb"
+
+
 def _get_user_upload_dir(user_id: str) -> Path:
     """Get user-specific upload directory."""
     upload_dir = _get_user_storage_dir(user_id) / "uploads" / "pdb"
@@ -46,47 +69,142 @@ def _get_user_upload_dir(user_id: str) -> Path:
     return upload_dir
 
 
+class PDBStreamAnalyzer:
+    """Incrementally count atoms, chains and per-chain residues from PDB bytes.
+
+    Feed arbitrary chunks with ``feed``; lines split across chunks are buffered
+    until complete. ``finish`` returns the same tuple as ``_analyze_pdb``.
+    """
+
+    def __init__(self) -> None:
+        self.atoms = 0
+        self._chains: set = set()
+        self._chain_residues: Dict[str, set] = {}
+        self._partial = b""
+
+    def feed(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        data = self._partial + chunk if self._partial else chunk
+        lines = data.split(b"\n")
+        self._partial = lines.pop()
+        for raw in lines:
+            self._process_line(raw)
+
+    def _process_line(self, raw: bytes) -> None:
+        # Check the record name on bytes so non-atom lines are never decoded
+        if raw[:6].strip().upper() not in (b"ATOM", b"HETATM"):
+            return
+        line = raw.decode("utf-8", errors="ignore").rstrip("\r")
+        self.atoms += 1
+        if len(line) >= 22:
+            chain_id = line[21].strip() or "?"
+            self._chains.add(chain_id)
+
+            # Extract residue information for CA atoms (protein residues)
+            if len(line) >= 26 and line[12:16].strip() == 'CA':
+                res_name = line[17:20].strip()
+                if res_name in _AA_CODES:
+                    try:
+                        res_seq = int(line[22:26].strip())
+                        self._chain_residues.setdefault(chain_id, set()).add(res_seq)
+                    except (ValueError, IndexError):
+                        pass
+
+    def finish(self) -> Tuple[int, List[str], Dict[str, int]]:
+        if self._partial:
+            self._process_line(self._partial)
+            self._partial = b""
+        # Convert sets to counts
+        chain_residue_counts = {
+            chain: len(residues)
+            for chain, residues in self._chain_residues.items()
+        }
+        return self.atoms, sorted(chain for chain in self._chains if chain), chain_residue_counts
+
+
 def _analyze_pdb(content: str) -> Tuple[int, List[str], Dict[str, int]]:
     """Return atom count, list of chain identifiers, and residue counts per chain."""
-    atoms = 0
-    chains = set()
-    chain_residues: Dict[str, set] = {}
-    
-    # Standard amino acid three-letter codes
-    aa_codes = {
-        'ALA', 'ARG', 'ASN', 'ASP', 'CYS', 'GLN', 'GLU', 'GLY', 'HIS', 'ILE',
-        'LEU', 'LYS', 'MET', 'PHE', 'PRO', 'SER', 'THR', 'TRP', 'TYR', 'VAL'
-    }
-    
-    for line in content.splitlines():
-        if not line:
-            continue
-        record = line[:6].strip().upper()
-        if record in {"ATOM", "HETATM"}:
-            atoms += 1
-            if len(line) >= 22:
-                chain_id = line[21].strip() or "?"
-                chains.add(chain_id)
-                
-                # Extract residue information for CA atoms (protein residues)
-                if len(line) >= 26 and line[12:16].strip() == 'CA':
-                    res_name = line[17:20].strip()
-                    if res_name in aa_codes:
-                        try:
-                            res_seq = int(line[22:26].strip())
-                            if chain_id not in chain_residues:
-                                chain_residues[chain_id] = set()
-                            chain_residues[chain_id].add(res_seq)
-                        except (ValueError, IndexError):
-                            pass
-    
-    # Convert sets to counts
-    chain_residue_counts = {
-        chain: len(residues) 
-        for chain, residues in chain_residues.items()
-    }
-    
-    return atoms, sorted(chain for chain in chains if chain), chain_residue_counts
+    analyzer = PDBStreamAnalyzer()
+    analyzer.feed(content.encode("utf-8"))
+    return analyzer.finish()
+
+
+class PDBUploadTooLarge(HTTPException):
+    """413 raised as soon as an upload crosses ``PDB_UPLOAD_MAX_BYTES``."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(
+            status_code=413,
+            detail=f"PDB file exceeds the {max_bytes // (1024 * 1024)} MB upload limit",
+        )
+
+
+class PDBUploadSink:
+    """Write an upload to disk chunk by chunk while analyzing it.
+
+    gzip input (by ``.gz`` name or magic bytes) is decompressed on the fly, so
+    the stored file is always plain PDB. Data goes to a ``.part`` file that is
+    only renamed into place by ``finish``.
+    """
+
+    def __init__(self, dest: Path, max_bytes: int = PDB_UPLOAD_MAX_BYTES, compressed: Optional[bool] = None):
+        self.dest = dest
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.raw_size = 0
+        self._compressed = compressed
+        self._decompressor: Optional[Any] = None
+        self._analyzer = PDBStreamAnalyzer()
+        self._tmp_path = dest.with_name(dest.name + ".part")
+        self._fh = open(self._tmp_path, "wb")
+
+    def write(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        if self._compressed is None:
+            self._compressed = chunk[:2] == _GZIP_MAGIC
+        self.raw_size += len(chunk)
+        if self._compressed:
+            if self._decompressor is None:
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            # Cap output per call so a zip bomb cannot expand past the limit in memory
+            data = self._decompressor.decompress(chunk, self.max_bytes - self.size + 1)
+            self._consume(data)
+            while self._decompressor.unconsumed_tail:
+                data = self._decompressor.decompress(
+                    self._decompressor.unconsumed_tail, self.max_bytes - self.size + 1
+                )
+                self._consume(data)
+        else:
+            self._consume(chunk)
+
+    def _consume(self, data: bytes) -> None:
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            raise PDBUploadTooLarge(self.max_bytes)
+        self._analyzer.feed(data)
+        self._fh.write(data)
+
+    def finish(self) -> Tuple[int, List[str], Dict[str, int]]:
+        """Flush, move the file into place and return the analysis."""
+        if self._decompressor is not None:
+            if not self._decompressor.eof:
+                self.abort()
+                raise HTTPException(status_code=400, detail="Truncated gzip upload")
+            self._consume(self._decompressor.flush())
+        self._fh.close()
+        os.replace(self._tmp_path, self.dest)
+        return self._analyzer.finish()
+
+    def abort(self) -> None:
+        """Discard the partially written file."""
+        if not self._fh.closed:
+            self._fh.close()
+        try:
+            self._tmp_path.unlink()
+        except FileNotFoundError:
+            pass
 
 
 def _suggest_rfdiffusion_contigs(chain_residue_counts: Dict[str, int]) -> str:
@@ -117,24 +235,40 @@ def _suggest_rfdiffusion_contigs(chain_residue_counts: Dict[str, int]) -> str:
         return f"{first_chain}{start}-{end}"
 
 
-def save_uploaded_pdb(filename: str, content: bytes, user_id: str) -> Dict[str, object]:
-    """Persist an uploaded PDB file and return metadata about it."""
-    if not filename.lower().endswith(".pdb"):
-        raise HTTPException(status_code=400, detail="Only .pdb files are supported")
+def _analyze_pdb_bytes(content: bytes) -> Tuple[int, List[str], Dict[str, int]]:
+    """Analyze raw upload bytes without decoding them as one string."""
+    analyzer = PDBStreamAnalyzer()
+    view = memoryview(content)
+    for offset in range(0, len(view), PDB_UPLOAD_CHUNK_BYTES):
+        analyzer.feed(bytes(view[offset:offset + PDB_UPLOAD_CHUNK_BYTES]))
+    return analyzer.finish()
+
+
+def _normalize_pdb_filename(filename: str, allow_gzip: bool = False) -> str:
+    """Validate the upload name; ``.pdb.gz`` uploads are stored as ``.pdb``."""
+    lower = (filename or "").lower()
+    if allow_gzip and lower.endswith(".pdb.gz"):
+        return filename[:-3]
+    if not lower.endswith(".pdb"):
+        raise HTTPException(status_code=400, detail="Only .pdb or .pdb.gz files are supported")
+    return filename
 
-    text_content = content.decode("utf-8", errors="ignore")
-    atoms, chains, chain_residue_counts = _analyze_pdb(text_content)
+
+def _record_uploaded_pdb(
+    file_id: str,
+    filename: str,
+    stored_path: Path,
+    size: int,
+    user_id: str,
+    analysis: Tuple[int, List[str], Dict[str, int]],
+) -> Dict[str, object]:
+    """Record a stored upload in ``user_files`` and return its metadata."""
+    atoms, chains, chain_residue_counts = analysis
     
     # Calculate suggested RFdiffusion parameters
     suggested_contigs = _suggest_rfdiffusion_contigs(chain_residue_counts)
     total_residues = sum(chain_residue_counts.values())
 
-    file_id = uuid.uuid4().hex
-    stored_name = f"{file_id}.pdb"
-    upload_dir = _get_user_upload_dir(user_id)
-    stored_path = upload_dir / stored_name
-    stored_path.write_bytes(content)
-
     # Store metadata in database
     metadata_dict = {
         "atoms": atoms,
@@ -157,7 +291,7 @@ def save_uploaded_pdb(filename: str, content: bytes, user_id: str) -> Dict[str,
                 "upload",
                 filename,
                 stored_path_rel,
-                len(content),
+                size,
                 json.dumps(metadata_dict),
             ),
         )
@@ -166,7 +300,7 @@ def save_uploaded_pdb(filename: str, content: bytes, user_id: str) -> Dict[str,
         "file_id": file_id,
         "filename": filename,
         "stored_path": stored_path_rel,
-        "size": len(content),
+        "size": size,
         "atoms": atoms,
         "chains": chains,
         "chain_residue_counts": chain_residue_counts,
@@ -175,6 +309,104 @@ def save_uploaded_pdb(filename: str, content: bytes, user_id: str) -> Dict[str,
     }
 
 
+def _store_uploaded_pdb(
+    filename: str,
+    content: bytes,
+    user_id: str,
+    analysis: Tuple[int, List[str], Dict[str, int]],
+) -> Dict[str, object]:
+    """Write in-memory upload bytes to user storage and record them."""
+    file_id = uuid.uuid4().hex
+    stored_path = _upload_path(user_id, file_id)
+    get_storage_backend().write_bytes(storage_key(stored_path), content)
+    return _record_uploaded_pdb(file_id, filename, stored_path, len(content), user_id, analysis)
+
+
+def save_uploaded_pdb(filename: str, content: bytes, user_id: str) -> Dict[str, object]:
+    """Persist an uploaded PDB file and return metadata about it."""
+    filename = _normalize_pdb_filename(filename)
+    if len(content) > PDB_UPLOAD_MAX_BYTES:
+        raise PDBUploadTooLarge(PDB_UPLOAD_MAX_BYTES)
+    return _store_uploaded_pdb(filename, content, user_id, _analyze_pdb_bytes(content))
+
+
+async def save_uploaded_pdb_async(
+    filename: str,
+    content: bytes,
+    user_id: str,
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+) -> Dict[str, object]:
+    """Async variant of ``save_uploaded_pdb`` for content already in memory.
+
+    Parsing runs on the compute process pool and the disk/DB writes on its
+    thread pool, so large uploads never block the event loop.
+    """
+    filename = _normalize_pdb_filename(filename)
+    if len(content) > PDB_UPLOAD_MAX_BYTES:
+        raise PDBUploadTooLarge(PDB_UPLOAD_MAX_BYTES)
+    analysis = await compute_executor.run(
+        _analyze_pdb_bytes,
+        content,
+        kind="process",
+        label="analyze_pdb",
+        is_disconnected=is_disconnected,
+    )
+    return await compute_executor.run(
+        _store_uploaded_pdb, filename, content, user_id, analysis, kind="thread", label="store_uploaded_pdb"
+    )
+
+
+async def save_uploaded_pdb_stream(
+    filename: str,
+    upload: Any,
+    user_id: str,
+    max_bytes: int = PDB_UPLOAD_MAX_BYTES,
+) -> Dict[str, object]:
+    """Stream an ``UploadFile`` (or anything with async ``read(n)``) to storage.
+
+    Each chunk is decompressed if needed, analyzed and appended to disk on the
+    compute thread pool, so memory stays at roughly one chunk regardless of
+    file size and oversized uploads are rejected as soon as they cross
+    ``max_bytes``. The finished file is then handed to the storage backend
+    (a no-op move for local storage).
+    """
+    stored_name = _normalize_pdb_filename(filename, allow_gzip=True)
+    file_id = uuid.uuid4().hex
+    stored_path = _get_user_upload_dir(user_id) / f"{file_id}.pdb"
+    compressed = True if filename.lower().endswith(".gz") else None
+    sink = await compute_executor.run(
+        PDBUploadSink, stored_path, max_bytes, compressed, kind="thread", label="pdb_upload_open"
+    )
+    try:
+        while True:
+            chunk = await upload.read(PDB_UPLOAD_CHUNK_BYTES)
+            if not chunk:
+                break
+            await compute_executor.run(sink.write, chunk, kind="thread", label="pdb_upload_chunk")
+        analysis = await compute_executor.run(sink.finish, kind="thread", label="pdb_upload_finish")
+    except BaseException:
+        sink.abort()
+        raise
+    await compute_executor.run(
+        get_storage_backend().write_file,
+        storage_key(stored_path),
+        stored_path,
+        kind="thread",
+        label="pdb_upload_store",
+    )
+    return await compute_executor.run(
+        _record_uploaded_pdb,
+        file_id,
+        stored_name,
+        stored_path,
+        sink.size,
+        user_id,
+        analysis,
+        kind="thread",
+        label="store_uploaded_pdb",
+    )
+
+
 def get_uploaded_pdb(file_id: str, user_id: Optional[str] = None) -> Optional[Dict[str, object]]:
     """Get uploaded PDB file metadata. If user_id provided, verifies ownership."""
     with get_db() as conn:
@@ -191,8 +423,9 @@ def get_uploaded_pdb(file_id: str, user_id: Optional[str] = None) -> Optional[Di
         # Convert Row to dict safely
         metadata = _row_to_dict(row)
         
-        stored_path = BASE_DIR / metadata["stored_path"]
-        if not stored_path.exists():
+        try:
+            stored_path = get_storage_backend().local_path(metadata["stored_path"])
+        except FileNotFoundError:
             return None
         
         # Parse JSON metadata
@@ -217,13 +450,13 @@ def list_uploaded_pdbs(user_id: str) -> List[Dict[str, object]]:
             (user_id,),
         ).fetchall()
         
+        backend = get_storage_backend()
         results: List[Dict[str, object]] = []
         for row in rows:
             # Convert Row to dict safely
             metadata = _row_to_dict(row)
             
-            stored_path = BASE_DIR / metadata["stored_path"]
-            if not stored_path.exists():
+            if not backend.exists(metadata["stored_path"]):
                 continue
             
             # Parse JSON metadata
@@ -234,11 +467,12 @@ def list_uploaded_pdbs(user_id: str) -> List[Dict[str, object]]:
                 except json.JSONDecodeError:
                     pass
             
-            try:
-                stat = stored_path.stat()
-                metadata["modified"] = stat.st_mtime
-            except OSError:
-                metadata["modified"] = None
+            metadata["modified"] = None
+            if backend.is_local:
+                try:
+                    metadata["modified"] = backend.local_path(metadata["stored_path"]).stat().st_mtime
+                except OSError:
+                    pass
             
             metadata["file_id"] = metadata["id"]
             results.append(metadata)
@@ -259,13 +493,11 @@ def delete_uploaded_pdb(file_id: str, user_id: str) -> None:
         if not row:
             return
         
-        # Delete file from filesystem
-        stored_path = BASE_DIR / row["stored_path"]
-        if stored_path.exists():
-            try:
-                stored_path.unlink()
-            except OSError:
-                pass
+        # Delete file from storage
+        try:
+            get_storage_backend().delete(row["stored_path"])
+        except OSError:
+            pass
         
         # Delete from database
         conn.execute(
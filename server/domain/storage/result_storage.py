@@ -0,0 +1,335 @@
+"""Compressed on-disk format for generated results.
+
+Predicted and designed structures are written as ``.pdb.gz`` and ProteinMPNN
+JSON artefacts as compact ``.json.zst`` (``.json.gz`` when ``zstandard`` is
+not installed). Callers keep using the logical name (``model.pdb``,
+``result.json``): ``write_*`` returns the path actually written and the
+``read_*``/``locate_result`` helpers find either the compressed or the legacy
+plain file and decompress transparently.
+
+Bytes go through the configured storage backend (``backends``). Coroutines
+use the ``*_async`` writers, which hand serialization, compression and the
+atomic write to ``result_writer``'s worker thread and fsync in batches.
+``compress_existing_results`` converts an existing local storage tree in
+place and repoints ``user_files.stored_path``; see migration 007.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import queue
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # optional; gzip is used instead
+    zstandard = None
+
+try:
+    from ...database.db import get_db
+    from ...infrastructure.config import get_bool_env_var, get_env_var
+    from ...infrastructure.utils import log_line
+    from .backends import StorageBackend, get_storage_backend, storage_key
+except ImportError:
+    from database.db import get_db
+    from infrastructure.config import get_bool_env_var, get_env_var
+    from infrastructure.utils import log_line
+    from domain.storage.backends import StorageBackend, get_storage_backend, storage_key
+
+BASE_DIR = Path(__file__).parent.parent.parent
+
+# "gzip" (default) or "none" to keep writing plain files
+RESULT_COMPRESSION = get_env_var("RESULT_COMPRESSION", "gzip").lower()
+# Set to 0 to skip fsync on background result writes (e.g. on tmpfs)
+RESULT_FSYNC = get_bool_env_var("RESULT_FSYNC", True)
+# Most writes flushed together by the result writer
+RESULT_WRITE_BATCH = 64
+
+STRUCTURE_SUFFIXES = (".pdb", ".cif", ".mmcif", ".ent")
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+
+
+def _compression_enabled() -> bool:
+    return RESULT_COMPRESSION != "none"
+
+
+def _json_suffix() -> str:
+    return ".zst" if zstandard is not None else ".gz"
+
+
+def _compress(data: bytes, suffix: str) -> bytes:
+    if suffix == ".zst":
+        return zstandard.ZstdCompressor(level=6).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data: bytes, suffix: str) -> bytes:
+    if suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst results")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if suffix == ".gz":
+        return gzip.decompress(data)
+    return data
+
+
+def is_compressed(path: Path) -> bool:
+    return Path(path).suffix in COMPRESSED_SUFFIXES
+
+
+def logical_name(path: Path) -> str:
+    """File name without a compression suffix (``model.pdb.gz`` -> ``model.pdb``)."""
+    path = Path(path)
+    return path.stem if is_compressed(path) else path.name
+
+
+def _target_suffix(path: Path) -> Optional[str]:
+    if not _compression_enabled():
+        return None
+    suffix = path.suffix.lower()
+    if suffix in STRUCTURE_SUFFIXES:
+        return ".gz"
+    if suffix == ".json":
+        return _json_suffix()
+    return None
+
+
+def _prepare_result(path: Path, data: bytes) -> Tuple[Path, bytes]:
+    """Stored path and (compressed) bytes for logical ``path``."""
+    suffix = _target_suffix(path)
+    if not suffix:
+        return path, data
+    return path.with_name(path.name + suffix), _compress(data, suffix)
+
+
+def _remove_stale(backend: StorageBackend, path: Path, target: Path) -> None:
+    for other in (path, *(path.with_name(path.name + s) for s in COMPRESSED_SUFFIXES)):
+        if other != target and backend.exists(storage_key(other)):
+            backend.delete(storage_key(other))
+
+
+def _encode_text(text: str) -> bytes:
+    return text.encode("utf-8")
+
+
+def _encode_json(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+def write_result(path: Path, data: bytes) -> Path:
+    """Write ``data`` for logical ``path``; returns the path actually written.
+
+    A stale copy in another format is removed so readers never see two versions.
+    """
+    path = Path(path)
+    backend = get_storage_backend()
+    target, payload = _prepare_result(path, data)
+    backend.write_bytes(storage_key(target), payload)
+    _remove_stale(backend, path, target)
+    return target
+
+
+def write_result_text(path: Path, text: str) -> Path:
+    return write_result(path, _encode_text(text))
+
+
+def write_result_json(path: Path, value: Any) -> Path:
+    return write_result(path, _encode_json(value))
+
+
+def _settle(future: asyncio.Future, outcome: Any) -> None:
+    if future.done():  # the awaiting coroutine was cancelled
+        return
+    if isinstance(outcome, BaseException):
+        future.set_exception(outcome)
+    else:
+        future.set_result(outcome)
+
+
+class ResultWriter:
+    """Persist results from coroutines on a dedicated worker thread.
+
+    Encoding, compression and the atomic temp-file-and-rename write all run
+    off the event loop. Writes queued while the worker is busy are flushed
+    together, so one batch pays for one round of directory fsyncs.
+    """
+
+    def __init__(self, fsync: bool = RESULT_FSYNC, max_batch: int = RESULT_WRITE_BATCH):
+        self.fsync = fsync
+        self.max_batch = max_batch
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    async def write(self, path: Path, value: Any, encode: Optional[Callable[[Any], bytes]] = None) -> Path:
+        """Queue ``value`` for logical ``path`` and wait until it is on disk."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put((Path(path), value, encode, loop, future))
+        self._ensure_worker()
+        return await future
+
+    def _ensure_worker(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="result-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                outcomes = self.write_batch([(path, value, encode) for path, value, encode, _, _ in batch])
+            except Exception as exc:  # keep the worker alive whatever happens
+                log_line("result_write_failed", {"error": str(exc), "files": len(batch)})
+                outcomes = [exc] * len(batch)
+            for (_, _, _, loop, future), outcome in zip(batch, outcomes):
+                try:
+                    loop.call_soon_threadsafe(_settle, future, outcome)
+                except RuntimeError:  # event loop already closed
+                    pass
+
+    def write_batch(self, items: List[Tuple[Path, Any, Optional[Callable[[Any], bytes]]]]) -> List[Any]:
+        """Write ``items`` synchronously; returns the written path or exception per item."""
+        backend = get_storage_backend()
+        outcomes: List[Any] = [None] * len(items)
+        prepared: List[Tuple[int, Path, Path, bytes]] = []
+        for index, (path, value, encode) in enumerate(items):
+            try:
+                target, payload = _prepare_result(path, encode(value) if encode else value)
+                prepared.append((index, path, target, payload))
+            except Exception as exc:
+                outcomes[index] = exc
+        try:
+            backend.write_many([(storage_key(target), payload) for _, _, target, payload in prepared], self.fsync)
+        except Exception:
+            # Retry one by one so a single bad path does not fail the whole batch
+            for index, _, target, payload in prepared:
+                try:
+                    backend.write_bytes(storage_key(target), payload)
+                except Exception as exc:
+                    outcomes[index] = exc
+        for index, path, target, _ in prepared:
+            if outcomes[index] is None:
+                try:
+                    _remove_stale(backend, path, target)
+                    outcomes[index] = target
+                except Exception as exc:
+                    outcomes[index] = exc
+        return outcomes
+
+
+result_writer = ResultWriter()
+
+
+async def write_result_async(path: Path, data: bytes) -> Path:
+    return await result_writer.write(path, data)
+
+
+async def write_result_text_async(path: Path, text: str) -> Path:
+    return await result_writer.write(path, text, _encode_text)
+
+
+async def write_result_json_async(path: Path, value: Any) -> Path:
+    return await result_writer.write(path, value, _encode_json)
+
+
+def locate_result(path: Path) -> Optional[Path]:
+    """The stored file for logical or stored ``path``, or None if absent."""
+    path = Path(path)
+    backend = get_storage_backend()
+    if backend.exists(storage_key(path)):
+        return path
+    if not is_compressed(path):
+        for suffix in COMPRESSED_SUFFIXES:
+            candidate = path.with_name(path.name + suffix)
+            if backend.exists(storage_key(candidate)):
+                return candidate
+    return None
+
+
+def result_local_path(path: Path) -> Optional[Path]:
+    """Local file for a result (fetched into the cache for remote backends)."""
+    found = locate_result(path)
+    return get_storage_backend().local_path(storage_key(found)) if found else None
+
+
+def read_result_bytes(path: Path) -> bytes:
+    """Decompressed content of a result; raises FileNotFoundError if absent."""
+    found = locate_result(path)
+    if found is None:
+        raise FileNotFoundError(str(path))
+    return _decompress(get_storage_backend().read_bytes(storage_key(found)), found.suffix)
+
+
+def read_result_text(path: Path) -> str:
+    return read_result_bytes(path).decode("utf-8")
+
+
+def read_result_json(path: Path) -> Any:
+    return json.loads(read_result_bytes(path))
+
+
+# ---------------------------------------------------------------------------
+# Migration of existing plain results
+# ---------------------------------------------------------------------------
+
+# Directories under a user's storage folder that hold generated results
+RESULT_DIRS = ("rfdiffusion_results", "alphafold_results", "openfold2_results", "proteinmpnn_results", "results")
+
+_JSON_ARTEFACTS = {"result.json", "raw_data.json", "metadata.json"}
+
+
+def _migratable(path: Path) -> bool:
+    if not path.is_file() or is_compressed(path):
+        return False
+    return path.suffix.lower() in STRUCTURE_SUFFIXES or path.name in _JSON_ARTEFACTS
+
+
+def compress_existing_results(
+    storage_root: Path = BASE_DIR / "storage",
+    base_dir: Path = BASE_DIR,
+    dry_run: bool = False,
+    db_factory: Callable[[], Any] = get_db,
+) -> Dict[str, int]:
+    """Compress plain result files under ``storage/<user>/<result dir>``.
+
+    Rows in ``user_files`` pointing at a converted file are updated to the new
+    path. Returns counts of files converted and bytes before/after.
+    """
+    stats = {"files": 0, "bytes_before": 0, "bytes_after": 0, "rows_updated": 0}
+    if not _compression_enabled():
+        return stats
+    renamed: Dict[str, str] = {}
+    for user_dir in sorted(p for p in Path(storage_root).iterdir() if p.is_dir()):
+        for result_dir in RESULT_DIRS:
+            for path in sorted((user_dir / result_dir).rglob("*")):
+                if not _migratable(path):
+                    continue
+                data = path.read_bytes()
+                stats["files"] += 1
+                stats["bytes_before"] += len(data)
+                if dry_run:
+                    continue
+                written = write_result(path, data)
+                stats["bytes_after"] += written.stat().st_size
+                try:
+                    renamed[str(path.relative_to(base_dir))] = str(written.relative_to(base_dir))
+                except ValueError:
+                    pass
+    if renamed:
+        with db_factory() as conn:
+            for old, new in renamed.items():
+                stats["rows_updated"] += conn.execute(
+                    "UPDATE user_files SET stored_path = ? WHERE stored_path = ?", (new, old)
+                ).rowcount
+    return stats
@@ -8,18 +8,24 @@ import json
 try:
     # Try relative import first (when running as module)
     from ...database.db import get_db
-    from ...infrastructure.auth import hash_password, verify_password, create_access_token, create_refresh_token
+    from ...infrastructure.auth import create_access_token, create_refresh_token
+    from ...infrastructure.password_hashing import password_hasher
 except ImportError:
     # Fallback to absolute import (when running directly)
     from database.db import get_db
-    from infrastructure.auth import hash_password, verify_password, create_access_token, create_refresh_token
+    from infrastructure.auth import create_access_token, create_refresh_token
+    from infrastructure.password_hashing import password_hasher
 from .models import UserCreate, UserLogin, UserRole
 
 
-def create_user(user_data: UserCreate) -> Dict[str, Any]:
-    """Create new user with email/username validation."""
+async def create_user(user_data: UserCreate) -> Dict[str, Any]:
+    """Create new user with email/username validation.
+
+    Raises:
+        PasswordHashBusyError: If the hashing pool is saturated.
+    """
     user_id = str(uuid.uuid4())
-    password_hash = hash_password(user_data.password)
+    password_hash = await password_hasher.hash(user_data.password)
     
     with get_db() as conn:
         # Check if email or username exists
@@ -55,36 +61,50 @@ def create_user(user_data: UserCreate) -> Dict[str, Any]:
     return {"user_id": user_id, "message": "User created successfully"}
 
 
-def authenticate_user(login_data: UserLogin) -> Dict[str, Any]:
-    """Authenticate user and return tokens."""
+async def authenticate_user(login_data: UserLogin) -> Dict[str, Any]:
+    """Authenticate user and return tokens.
+
+    bcrypt runs on the password hashing pool, so no DB connection is held while
+    it works. Hashes made with an outdated cost factor are upgraded in place.
+
+    Raises:
+        PasswordHashBusyError: If the hashing pool is saturated.
+    """
     with get_db() as conn:
         user = conn.execute(
             """SELECT id, email, username, password_hash, role, email_verified, is_active
                FROM users WHERE email = ?""",
             (login_data.email,)
         ).fetchone()
-        
-        if not user:
-            raise ValueError("Invalid email or password")
-        
-        # Check if user is active
-        if user["is_active"] not in (1, True):
-            raise ValueError("Account is deactivated")
-        
-        # Verify password
-        password_hash = user["password_hash"]
-        if not password_hash:
-            raise ValueError("Password hash not found in database")
-        
-        password_valid = verify_password(login_data.password, password_hash)
-        
-        if not password_valid:
-            # Log for debugging (without exposing sensitive info)
-            import sys
-            print(f"[AUTH DEBUG] Password verification failed for user: {user['email']}", file=sys.stderr)
-            print(f"[AUTH DEBUG] Hash length: {len(password_hash) if password_hash else 0}", file=sys.stderr)
-            print(f"[AUTH DEBUG] Hash starts with: {password_hash[:10] if password_hash else 'None'}...", file=sys.stderr)
-            raise ValueError("Invalid email or password")
+    
+    if not user:
+        raise ValueError("Invalid email or password")
+    
+    # Check if user is active
+    if user["is_active"] not in (1, True):
+        raise ValueError("Account is deactivated")
+    
+    # Verify password
+    password_hash = user["password_hash"]
+    if not password_hash:
+        raise ValueError("Password hash not found in database")
+    
+    password_valid, new_hash = await password_hasher.verify_and_rehash(login_data.password, password_hash)
+    
+    if not password_valid:
+        # Log for debugging (without exposing sensitive info)
+        import sys
+        print(f"[AUTH DEBUG] Password verification failed for user: {user['email']}", file=sys.stderr)
+        print(f"[AUTH DEBUG] Hash length: {len(password_hash) if password_hash else 0}", file=sys.stderr)
+        print(f"[AUTH DEBUG] Hash starts with: {password_hash[:10] if password_hash else 'None'}...", file=sys.stderr)
+        raise ValueError("Invalid email or password")
+    
+    with get_db() as conn:
+        if new_hash:
+            conn.execute(
+                "UPDATE users SET password_hash = ?, updated_at = ? WHERE id = ? AND password_hash = ?",
+                (new_hash, datetime.utcnow(), user["id"], password_hash)
+            )
         
         # Update last login
         conn.execute(
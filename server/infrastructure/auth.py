@@ -14,11 +14,14 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
 REFRESH_TOKEN_EXPIRE_DAYS = 30
 
+# bcrypt cost factor; stored hashes with a different cost are upgraded on login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
 
-def hash_password(password: str) -> str:
+
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
     """Hash password using bcrypt."""
     password_bytes = password.encode("utf-8")
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=rounds or BCRYPT_ROUNDS)
     hash_bytes = bcrypt.hashpw(password_bytes, salt)
     # Return as string for database storage
     return hash_bytes.decode("utf-8")
@@ -0,0 +1,276 @@
+"""Managed executor for CPU-bound and blocking work.
+
+Parsing and scoring PDB files holds the GIL for long stretches, so running it
+inside an async route stalls every other request on that uvicorn worker. Such
+work goes through ``compute_executor`` instead, which owns one thread pool (for
+blocking I/O and light parsing) and one process pool (for heavy analysis),
+both sized from configuration and shared by the whole server.
+
+Every task can carry a timeout and a disconnect check, and the executor records
+how long tasks waited for a worker versus how long they actually ran.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from .config import get_env_var
+from .exceptions import ApplicationError
+
+COMPUTE_THREAD_WORKERS = int(get_env_var("COMPUTE_THREAD_WORKERS", str(min(8, (os.cpu_count() or 1) + 4))))
+COMPUTE_PROCESS_WORKERS = int(get_env_var("COMPUTE_PROCESS_WORKERS", str(min(4, os.cpu_count() or 1))))
+COMPUTE_TASK_TIMEOUT = float(get_env_var("COMPUTE_TASK_TIMEOUT", "120"))
+
+# How often (seconds) to poll the client connection while a task runs
+DISCONNECT_POLL_INTERVAL = 0.5
+# How often (seconds) to check whether a queued task has started, so its
+# timeout can begin
+QUEUE_POLL_INTERVAL = 0.05
+
+
+class ComputeTimeoutError(ApplicationError):
+    """Raised when a compute task exceeds its timeout."""
+    pass
+
+
+class ComputeCancelledError(ApplicationError):
+    """Raised when a compute task is abandoned because the client disconnected."""
+    pass
+
+
+def _timed_call(fn: Callable[..., Any], args: tuple, kwargs: dict) -> tuple:
+    """Run ``fn`` in a worker and report wall-clock start/end alongside the result.
+
+    Wall-clock time is used because the worker may be a separate process.
+    """
+    started = time.time()
+    result = fn(*args, **kwargs)
+    return started, time.time(), result
+
+
+class _TaskStats:
+    """Per-label counters for queue wait and run time."""
+
+    __slots__ = ("count", "errors", "timeouts", "cancelled", "wait_ms", "run_ms", "max_wait_ms", "max_run_ms")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.wait_ms = 0.0
+        self.run_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.max_run_ms = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        done = max(1, self.count)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "cancelled": self.cancelled,
+            "avg_wait_ms": round(self.wait_ms / done, 2),
+            "avg_run_ms": round(self.run_ms / done, 2),
+            "max_wait_ms": round(self.max_wait_ms, 2),
+            "max_run_ms": round(self.max_run_ms, 2),
+        }
+
+
+class ComputeExecutor:
+    """Thread and process pools with timeouts, cancellation and instrumentation."""
+
+    def __init__(
+        self,
+        thread_workers: int = COMPUTE_THREAD_WORKERS,
+        process_workers: int = COMPUTE_PROCESS_WORKERS,
+        default_timeout: Optional[float] = COMPUTE_TASK_TIMEOUT,
+    ):
+        self.thread_workers = max(1, thread_workers)
+        self.process_workers = max(1, process_workers)
+        self.default_timeout = default_timeout
+        self._thread_pool: Optional[ThreadPoolExecutor] = None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._stats: Dict[str, _TaskStats] = {}
+        self._in_flight = {"thread": 0, "process": 0}
+        # Separate from _lock: cancelling futures in shutdown() runs _release
+        self._in_flight_lock = threading.Lock()
+
+    @property
+    def thread_pool(self) -> ThreadPoolExecutor:
+        if self._thread_pool is None:
+            with self._lock:
+                if self._thread_pool is None:
+                    self._thread_pool = ThreadPoolExecutor(
+                        max_workers=self.thread_workers, thread_name_prefix="compute"
+                    )
+        return self._thread_pool
+
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        if self._process_pool is None:
+            with self._lock:
+                if self._process_pool is None:
+                    # spawn avoids forking a process that holds event-loop and DB state
+                    self._process_pool = ProcessPoolExecutor(
+                        max_workers=self.process_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+        return self._process_pool
+
+    def _pool(self, kind: str) -> Executor:
+        if kind == "thread":
+            return self.thread_pool
+        if kind == "process":
+            return self.process_pool
+        raise ValueError(f"Unknown executor kind: {kind}")
+
+    def _stats_for(self, label: str) -> _TaskStats:
+        stats = self._stats.get(label)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(label, _TaskStats())
+        return stats
+
+    async def run(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        kind: str = "thread",
+        label: Optional[str] = None,
+        timeout: Optional[float] = -1,
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Run ``fn(*args, **kwargs)`` on the thread or process pool.
+
+        Args:
+            kind: ``"thread"`` for blocking I/O and light parsing, ``"process"``
+                for heavy CPU work. Process tasks need picklable functions/args.
+            label: Name used for instrumentation; defaults to the function name.
+            timeout: Seconds the task may run before ``ComputeTimeoutError``
+                (time spent queued for a worker does not count); -1 uses the
+                configured default and None disables the timeout.
+            is_disconnected: Optional coroutine function (e.g.
+                ``request.is_disconnected``); when it returns True the task is
+                abandoned with ``ComputeCancelledError``.
+        """
+        label = label or getattr(fn, "__name__", "task")
+        if timeout == -1:
+            timeout = self.default_timeout
+        stats = self._stats_for(label)
+
+        submitted = time.time()
+        job = self._pool(kind).submit(_timed_call, fn, args, kwargs)
+        self._track(kind, job)
+        try:
+            started, finished, result = await self._await(job, timeout, is_disconnected, stats)
+        except (ComputeTimeoutError, ComputeCancelledError, asyncio.CancelledError):
+            raise
+        except Exception:
+            stats.errors += 1
+            raise
+
+        wait_ms = max(0.0, (started - submitted) * 1000)
+        run_ms = max(0.0, (finished - started) * 1000)
+        stats.count += 1
+        stats.wait_ms += wait_ms
+        stats.run_ms += run_ms
+        stats.max_wait_ms = max(stats.max_wait_ms, wait_ms)
+        stats.max_run_ms = max(stats.max_run_ms, run_ms)
+        return result
+
+    def _track(self, kind: str, job: "Future[Any]") -> None:
+        """Count ``job`` as in flight until it finishes or is cancelled.
+
+        An abandoned job keeps its worker until it returns, so it keeps
+        counting even after the caller has given up on it.
+        """
+        def _release(_: "Future[Any]") -> None:
+            with self._in_flight_lock:
+                self._in_flight[kind] -= 1
+
+        with self._in_flight_lock:
+            self._in_flight[kind] += 1
+        job.add_done_callback(_release)
+
+    async def _await(
+        self,
+        job: "Future[Any]",
+        timeout: Optional[float],
+        is_disconnected: Optional[Callable[[], Awaitable[bool]]],
+        stats: _TaskStats,
+    ) -> Any:
+        # The timeout covers running time only; the clock starts once a worker
+        # picks the job up (for process pools, once it is handed to the pool's
+        # call queue), so a busy pool does not turn queued jobs into timeouts.
+        future = asyncio.wrap_future(job)
+        deadline = None
+        try:
+            while True:
+                if deadline is None and timeout is not None and (job.running() or job.done()):
+                    deadline = time.monotonic() + timeout
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    job.cancel()
+                    stats.timeouts += 1
+                    raise ComputeTimeoutError(f"Compute task exceeded {timeout}s")
+
+                step = remaining
+                if deadline is None and timeout is not None:
+                    step = QUEUE_POLL_INTERVAL
+                if is_disconnected is not None:
+                    step = DISCONNECT_POLL_INTERVAL if step is None else min(step, DISCONNECT_POLL_INTERVAL)
+                done, _ = await asyncio.wait({future}, timeout=step)
+                if done:
+                    return future.result()
+
+                if is_disconnected is not None and await is_disconnected():
+                    # Only drops jobs still queued; a running worker finishes on its own
+                    job.cancel()
+                    stats.cancelled += 1
+                    raise ComputeCancelledError("Client disconnected")
+        except asyncio.CancelledError:
+            # The caller was cancelled (e.g. a batch stream closing): drop the
+            # job if it has not started yet rather than leave it in the queue
+            if job.cancel():
+                stats.cancelled += 1
+            raise
+
+    def in_flight(self) -> Dict[str, int]:
+        """Jobs submitted and not yet finished (queued or running), per pool."""
+        with self._in_flight_lock:
+            return dict(self._in_flight)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Pool sizes, in-flight counts and per-label timings."""
+        return {
+            "thread_workers": self.thread_workers,
+            "process_workers": self.process_workers,
+            "in_flight": self.in_flight(),
+            "tasks": {label: stats.to_dict() for label, stats in sorted(self._stats.items())},
+        }
+
+    def shutdown(self) -> None:
+        """Shut down both pools (called on application shutdown)."""
+        with self._lock:
+            if self._thread_pool is not None:
+                self._thread_pool.shutdown(wait=False, cancel_futures=True)
+                self._thread_pool = None
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=False, cancel_futures=True)
+                self._process_pool = None
+
+
+# Shared instance used by routes and handlers
+compute_executor = ComputeExecutor()
+
+
+def shutdown_pools() -> None:
+    """Shut down the shared pools (called on application shutdown)."""
+    compute_executor.shutdown()
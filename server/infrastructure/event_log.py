@@ -0,0 +1,238 @@
+"""Structured event logging behind ``log_line``.
+
+An event is a section name plus a payload (usually a dict). On the calling
+thread an event is only checked against the level, section filters and
+sampling rate, then handed unserialized to a bounded queue. A listener
+thread renders it as ``[section] <utc timestamp> <json>``, capped at
+``LOG_MAX_CHARS``, and prints it. Payloads may also be zero-argument
+callables, which are only invoked if the event is kept. When the queue is
+full, new events are dropped and counted rather than blocking the caller.
+
+Environment:
+    LOG_AI                  "0" disables events entirely
+    LOG_LEVEL               minimum level: debug, info (default), warning, error
+    LOG_SECTIONS            comma-separated allowlist; ``runner:*`` matches a prefix
+    LOG_EXCLUDE_SECTIONS    comma-separated sections to drop, same syntax
+    LOG_SAMPLE_RATES        ``section=rate`` pairs, e.g. ``runner:stream:*=0.01``
+    LOG_MAX_CHARS           cap on the rendered payload (default 8000)
+    LOG_QUEUE_SIZE          events buffered before new ones are dropped
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+LEVELS = {"debug": logging.DEBUG, "info": logging.INFO, "warning": logging.WARNING, "error": logging.ERROR}
+
+LOG_AI = os.getenv("LOG_AI", "1") != "0"
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info").lower()
+LOG_SECTIONS = os.getenv("LOG_SECTIONS", "")
+LOG_EXCLUDE_SECTIONS = os.getenv("LOG_EXCLUDE_SECTIONS", "")
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "")
+LOG_MAX_CHARS = int(os.getenv("LOG_MAX_CHARS", "8000"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+
+def _parse_patterns(value: str) -> Tuple[str, ...]:
+    return tuple(p.strip() for p in value.split(",") if p.strip())
+
+
+def _parse_rates(value: str) -> Dict[str, float]:
+    rates: Dict[str, float] = {}
+    for item in _parse_patterns(value):
+        pattern, _, rate = item.partition("=")
+        try:
+            rates[pattern.strip()] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            continue
+    return rates
+
+
+def _matches(section: str, pattern: str) -> bool:
+    if pattern.endswith("*"):
+        return section.startswith(pattern[:-1])
+    return section == pattern
+
+
+def render_payload(message: Any, max_chars: int = LOG_MAX_CHARS) -> str:
+    """JSON text for a payload, truncated to ``max_chars``."""
+    try:
+        if callable(message):
+            message = message()
+        text = message if isinstance(message, str) else json.dumps(message, ensure_ascii=False, default=str)
+    except Exception:
+        text = str(message)
+    if len(text) > max_chars:
+        return text[:max_chars] + "... [truncated]"
+    return text
+
+
+class EventFilter:
+    """Level, section and sampling decisions; section lookups are memoized."""
+
+    def __init__(
+        self,
+        level: str = LOG_LEVEL,
+        sections: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+        sample_rates: Optional[Dict[str, float]] = None,
+    ):
+        self.level = LEVELS.get(level, logging.INFO)
+        self.sections = tuple(sections)
+        self.exclude = tuple(exclude)
+        self.sample_rates = dict(sample_rates or {})
+        self._rates: Dict[str, float] = {}
+
+    def _rate_for(self, section: str) -> float:
+        rate = self._rates.get(section)
+        if rate is None:
+            if self.sections and not any(_matches(section, p) for p in self.sections):
+                rate = 0.0
+            elif any(_matches(section, p) for p in self.exclude):
+                rate = 0.0
+            else:
+                rate = next((r for p, r in self.sample_rates.items() if _matches(section, p)), 1.0)
+            self._rates[section] = rate
+        return rate
+
+    def accept(self, section: str, level: int) -> bool:
+        if level < self.level:
+            return False
+        rate = self._rate_for(section)
+        return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+
+class _EventFormatter(logging.Formatter):
+    def __init__(self, max_chars: int):
+        super().__init__()
+        self.max_chars = max_chars
+
+    def format(self, record: logging.LogRecord) -> str:
+        ts = datetime.fromtimestamp(record.created, timezone.utc).replace(tzinfo=None).isoformat()
+        return f"[{record.section}] {ts} {render_payload(record.msg, self.max_chars)}"
+
+
+class _ConsoleHandler(logging.Handler):
+    """Print to the current ``sys.stdout``, degrading to ASCII on narrow consoles."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            output = self.format(record)
+            try:
+                print(output)
+            except UnicodeEncodeError:
+                print(output.encode("ascii", errors="replace").decode("ascii"))
+        except Exception:
+            self.handleError(record)
+
+
+class _EventQueueHandler(QueueHandler):
+    """Enqueue records as they are; formatting happens on the listener thread."""
+
+    def __init__(self, event_queue: queue.Queue):
+        super().__init__(event_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class EventLogger:
+    """Non-blocking event sink with a lazily started listener thread."""
+
+    def __init__(
+        self,
+        event_filter: Optional[EventFilter] = None,
+        enabled: bool = LOG_AI,
+        max_chars: int = LOG_MAX_CHARS,
+        queue_size: int = LOG_QUEUE_SIZE,
+        handler: Optional[logging.Handler] = None,
+    ):
+        self.filter = event_filter or EventFilter(
+            LOG_LEVEL,
+            _parse_patterns(LOG_SECTIONS),
+            _parse_patterns(LOG_EXCLUDE_SECTIONS),
+            _parse_rates(LOG_SAMPLE_RATES),
+        )
+        self.enabled = enabled
+        self.accepted = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._queue_handler = _EventQueueHandler(self._queue)
+        self._output = handler or _ConsoleHandler()
+        self._output.setFormatter(_EventFormatter(max_chars))
+        self._listener: Optional[QueueListener] = None
+        self._lock = threading.Lock()
+
+    def log(self, section: str, message: Any, level: str = "info") -> None:
+        if not self.enabled:
+            return
+        levelno = LEVELS.get(level, logging.INFO)
+        if not self.filter.accept(section, levelno):
+            return
+        if self._listener is None:
+            self.start()
+        record = logging.LogRecord("events", levelno, "", 0, message, None, None)
+        record.section = section
+        self.accepted += 1
+        self._queue_handler.enqueue(record)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._listener is None:
+                self._listener = QueueListener(self._queue, self._output)
+                self._listener.start()
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Wait until queued events have been written (for tests and shutdown)."""
+        deadline = time.monotonic() + timeout
+        while self._listener is not None and self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.005)
+
+    def stop(self) -> None:
+        with self._lock:
+            listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.stop()  # drains the queue before returning
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "accepted": self.accepted,
+            "dropped": self._queue_handler.dropped,
+            "queued": self._queue.qsize(),
+        }
+
+
+event_logger = EventLogger()
+atexit.register(event_logger.stop)
+
+
+class LazyJson:
+    """Defer ``render_payload`` until a stdlib log record is actually formatted.
+
+    ``logger.debug("Body: %s", LazyJson(body))`` costs nothing when DEBUG is off.
+    """
+
+    __slots__ = ("value", "max_chars")
+
+    def __init__(self, value: Any, max_chars: int = LOG_MAX_CHARS):
+        self.value = value
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        return render_payload(self.value, self.max_chars)
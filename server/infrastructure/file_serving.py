@@ -0,0 +1,366 @@
+"""Conditional, ranged and pre-compressed serving of stored files.
+
+Structure files can be tens of megabytes and the viewer re-requests them
+often, so file routes go through ``serve_file`` instead of reading content
+into memory:
+
+- ``ETag`` is derived from a SHA-256 of the file content (computed once per
+  mtime/size and cached), and ``If-None-Match`` is answered with 304.
+- A single ``Range: bytes=...`` is answered with 206 (or 416), honouring
+  ``If-Range``; multi-range requests get the full file.
+- Full responses use Starlette's ``FileResponse``, which hands the path to the
+  server (``http.response.pathsend``) when it supports zero-copy sends and
+  otherwise streams 64 KB chunks.
+- Large PDB/mmCIF files get ``.gz`` (and ``.br`` when ``brotli`` is
+  installed) siblings, built in the background after the first full
+  download and served to clients that accept the encoding.
+- Files stored compressed (``.gz``/``.zst``, see
+  ``domain.storage.result_storage``) are sent as-is with
+  ``Content-Encoding: gzip`` when accepted, and decompressed otherwise.
+"""
+
+import gzip
+import hashlib
+import os
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+from fastapi import Request
+from starlette.background import BackgroundTask
+from starlette.responses import FileResponse, Response
+
+try:
+    import brotli
+except ImportError:  # optional; only gzip variants are built
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional; .zst results are then unreadable
+    zstandard = None
+
+from .compute import compute_executor
+from .config import get_env_var
+from .utils import log_line
+
+# Build compressed siblings for structure files at least this large
+PRECOMPRESS_MIN_BYTES = int(get_env_var("FILE_PRECOMPRESS_MIN_BYTES", str(128 * 1024)))
+PRECOMPRESS_ENABLED = get_env_var("FILE_PRECOMPRESS", "1") == "1"
+PRECOMPRESS_SUFFIXES = (".pdb", ".cif", ".mmcif", ".ent")
+
+ETAG_CACHE_SIZE = 4096
+RANGE_CHUNK_BYTES = 64 * 1024
+
+# Preferred first when the client accepts several
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# Encodings of files that are stored compressed
+_STORED_ENCODINGS = {".gz": "gzip", ".zst": "zstd"}
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class _EtagCache:
+    """Content hashes keyed by (path, mtime_ns, size) so edits invalidate them."""
+
+    def __init__(self, max_size: int = ETAG_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, int, int]) -> Optional[str]:
+        with self._lock:
+            etag = self._entries.get(key)
+            if etag is not None:
+                self._entries.move_to_end(key)
+            return etag
+
+    def put(self, key: Tuple[str, int, int], etag: str) -> None:
+        with self._lock:
+            self._entries[key] = etag
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+etag_cache = _EtagCache()
+
+
+def _hash_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+
+def content_etag(path: Path, stat_result: os.stat_result) -> str:
+    """Strong ETag for the file's current content."""
+    key = (str(path), stat_result.st_mtime_ns, stat_result.st_size)
+    etag = etag_cache.get(key)
+    if etag is None:
+        etag = f'"{_hash_file(path)}"'
+        etag_cache.put(key, etag)
+    return etag
+
+
+async def file_etag(path: Path) -> str:
+    """Content ETag for ``path``, hashed off the event loop on a cache miss."""
+    stat_result = await anyio.to_thread.run_sync(os.stat, path)
+    return await compute_executor.run(content_etag, path, stat_result, kind="thread", label="etag", timeout=None)
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """ETag of the ``encoding``-encoded representation of content tagged ``etag``."""
+    return '"%s-%s"' % (etag.strip('"'), encoding)
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """``If-None-Match`` comparison (weak, as RFC 9110 requires for GET).
+
+    Encoded variants carry ``"<hash>-gzip"`` style tags; they validate against
+    the same content hash.
+    """
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    bare = etag.strip('"')
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate.strip('"').split("-", 1)[0] == bare:
+            return True
+    return False
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single byte range into inclusive ``(start, end)``.
+
+    Returns None when the header is absent or is something we serve in full
+    (multiple ranges, other units, malformed). Raises ValueError when the
+    range cannot be satisfied.
+    """
+    if not header:
+        return None
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("unsatisfiable range")
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError("unsatisfiable range")
+    return start, min(end, size - 1)
+
+
+def _accepted_encodings(request: Request) -> List[str]:
+    accepted = []
+    for part in request.headers.get("accept-encoding", "").split(","):
+        token, _, params = part.partition(";")
+        token = token.strip().lower()
+        q = params.replace(" ", "")
+        if token and not re.fullmatch(r"q=0(\.0*)?", q):
+            accepted.append(token)
+    return accepted
+
+
+def _content_disposition(filename: str, disposition_type: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"{disposition_type}; filename*=utf-8''{quoted}"
+    return f'{disposition_type}; filename="{filename}"'
+
+
+def variant_path(path: Path, suffix: str) -> Path:
+    return path.with_name(path.name + suffix)
+
+
+def _wants_variants(path: Path, size: int) -> bool:
+    return (
+        PRECOMPRESS_ENABLED
+        and size >= PRECOMPRESS_MIN_BYTES
+        and path.suffix.lower() in PRECOMPRESS_SUFFIXES
+    )
+
+
+def _fresh_variant(path: Path, stat_result: os.stat_result, encoding: str, suffix: str) -> Optional[Path]:
+    candidate = variant_path(path, suffix)
+    try:
+        variant_stat = candidate.stat()
+    except OSError:
+        return None
+    if variant_stat.st_mtime_ns < stat_result.st_mtime_ns:
+        return None
+    if encoding == "br" and brotli is None:
+        return None
+    return candidate
+
+
+def build_precompressed(path: Path) -> Dict[str, int]:
+    """Write ``.gz`` (and ``.br``) siblings of ``path``; returns their sizes."""
+    data = path.read_bytes()
+    encoders = {".gz": lambda b: gzip.compress(b, compresslevel=6)}
+    if brotli is not None:
+        encoders[".br"] = lambda b: brotli.compress(b, quality=5)
+    sizes = {}
+    for suffix, encode in encoders.items():
+        target = variant_path(path, suffix)
+        tmp_path = target.with_name(f"{target.name}.{uuid.uuid4().hex}.tmp")
+        tmp_path.write_bytes(encode(data))
+        os.replace(tmp_path, target)
+        sizes[suffix] = target.stat().st_size
+    return sizes
+
+
+def remove_precompressed(path: Path) -> None:
+    """Delete compressed siblings, e.g. when the source file is deleted."""
+    for _, suffix in _ENCODINGS:
+        variant_path(path, suffix).unlink(missing_ok=True)
+
+
+async def _build_precompressed_later(path: Path) -> None:
+    try:
+        await compute_executor.run(build_precompressed, path, kind="thread", label="precompress", timeout=None)
+    except Exception as exc:
+        log_line("precompress_failed", {"path": str(path), "error": str(exc)})
+
+
+def _decompress_stored(path: Path) -> bytes:
+    data = path.read_bytes()
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read .zst files")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+async def _serve_stored_compressed(
+    path: Path, headers: Dict[str, str], media_type: str, encoded: bool
+) -> Response:
+    """Serve a file that is compressed at rest; ranges are not offered."""
+    headers.update({"accept-ranges": "none", "vary": "Accept-Encoding"})
+    if encoded:
+        headers["content-encoding"] = _STORED_ENCODINGS[path.suffix]
+        return FileResponse(path, headers=headers, media_type=media_type)
+    body = await compute_executor.run(_decompress_stored, path, kind="thread", label="decompress", timeout=None)
+    return Response(content=body, headers=headers, media_type=media_type)
+
+
+class RangeFileResponse(Response):
+    """206 response streaming ``[start, end]`` of a file."""
+
+    def __init__(self, path: Path, start: int, end: int, size: int, headers: Dict[str, str], media_type: str):
+        super().__init__(status_code=206, headers=headers, media_type=media_type)
+        self.path = path
+        self.start = start
+        self.end = end
+        self.headers["content-range"] = f"bytes {start}-{end}/{size}"
+        self.headers["content-length"] = str(end - start + 1)
+
+    async def __call__(self, scope, receive, send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        remaining = self.end - self.start + 1
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(self.start)
+            while remaining > 0:
+                chunk = await file.read(min(RANGE_CHUNK_BYTES, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+async def serve_file(
+    request: Request,
+    path: Path,
+    media_type: str,
+    filename: Optional[str] = None,
+    content_disposition_type: str = "attachment",
+    decode_stored: bool = True,
+) -> Response:
+    """Serve ``path`` honouring If-None-Match, Range/If-Range and Accept-Encoding.
+
+    With ``decode_stored=False`` a ``.gz``/``.zst`` file is sent as the
+    compressed bytes themselves (a download of the archive, range-able).
+    """
+    path = Path(path)
+    stat_result = await anyio.to_thread.run_sync(os.stat, path)
+    etag = await compute_executor.run(content_etag, path, stat_result, kind="thread", label="etag", timeout=None)
+    size = stat_result.st_size
+
+    headers = {"etag": etag, "accept-ranges": "bytes", "cache-control": "private, no-cache"}
+    if filename:
+        headers["content-disposition"] = _content_disposition(filename, content_disposition_type)
+    wants_variants = _wants_variants(path, size)
+    if wants_variants:
+        headers["vary"] = "Accept-Encoding"
+    stored_encoding = _STORED_ENCODINGS.get(path.suffix) if decode_stored else None
+    send_encoded = stored_encoding is not None and stored_encoding in _accepted_encodings(request)
+    if send_encoded:
+        # The encoded bytes are a different representation from the decoded body
+        headers["etag"] = encoded_etag(etag, stored_encoding)
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={k: v for k, v in headers.items() if k != "content-disposition"})
+
+    if stored_encoding is not None:
+        return await _serve_stored_compressed(path, headers, media_type, send_encoded)
+
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and (not if_range or if_range.strip() == etag):
+        try:
+            byte_range = parse_range(range_header, size)
+        except ValueError:
+            return Response(status_code=416, headers={"content-range": f"bytes */{size}", "etag": etag})
+        if byte_range is not None:
+            return RangeFileResponse(path, *byte_range, size, headers, media_type)
+
+    if wants_variants:
+        accepted = _accepted_encodings(request)
+        for encoding, suffix in _ENCODINGS:
+            if encoding not in accepted:
+                continue
+            variant = _fresh_variant(path, stat_result, encoding, suffix)
+            if variant is not None:
+                # Encoded bytes are a different representation, so not range-able
+                headers.update({
+                    "content-encoding": encoding,
+                    "accept-ranges": "none",
+                    "etag": encoded_etag(etag, encoding),
+                })
+                return FileResponse(variant, headers=headers, media_type=media_type)
+        if _fresh_variant(path, stat_result, "gzip", ".gz") is None:
+            return FileResponse(
+                path,
+                headers=headers,
+                media_type=media_type,
+                stat_result=stat_result,
+                background=BackgroundTask(_build_precompressed_later, path),
+            )
+
+    return FileResponse(path, headers=headers, media_type=media_type, stat_result=stat_result)
@@ -0,0 +1,293 @@
+"""Latency histograms, counters and gauges exposed in Prometheus text format.
+
+``metrics_registry`` holds every metric in the process; ``/metrics`` renders
+it with ``render()``. Request latency and in-flight counts are recorded by
+``RequestMetricsMiddleware`` (api/middleware/instrumentation.py); code paths
+worth timing on their own are wrapped in a span:
+
+    with span("nims.submit"):
+        response = await session.post(...)
+
+    @timed("validate_structure")
+    def validate_structure(...): ...
+
+Spans land in ``novoprotein_span_duration_seconds`` labelled with the span
+name and ``outcome`` (``ok`` or ``error``). SQLite statements run through
+``database.db.get_db`` are timed into ``novoprotein_db_query_duration_seconds``
+by statement type (the time to run ``execute``, not to fetch the rows).
+
+Gauges that mirror state owned elsewhere (pool and queue depth) are filled
+in by collectors registered with ``add_collector``, which run just before
+each render.
+"""
+
+import bisect
+import functools
+import inspect
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Seconds; covers fast SQLite reads through multi-minute NIMS polls
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+DB_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (last is +Inf)], sum, count
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self, **labels: Any) -> Optional[Dict[str, Any]]:
+        """Count, sum and cumulative bucket counts for one label set."""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            if series is None:
+                return None
+            counts, total, count = list(series[0]), series[1], series[2]
+        cumulative, running = {}, 0
+        for bound, n in zip(self.buckets + (float("inf"),), counts):
+            running += n
+            cumulative[bound] = running
+        return {"count": count, "sum": total, "buckets": cumulative}
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(s[0]), s[1], s[2]) for key, s in self._series.items())
+        lines = []
+        for key, counts, total, count in items:
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                running += n
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {running}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named metrics plus collectors that refresh gauges before rendering."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif type(metric) is not cls:
+                raise ValueError(f"{name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets)
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        with self._lock:
+            if collector not in self._collectors:
+                self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (0.0.4)."""
+        with self._lock:
+            collectors = list(self._collectors)
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        for collector in collectors:
+            try:
+                collector()
+            except Exception:
+                # A broken collector must not take the whole scrape down
+                pass
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+SPAN_SECONDS = metrics_registry.histogram(
+    "novoprotein_span_duration_seconds",
+    "Duration of instrumented operations.",
+    ("span", "outcome"),
+)
+DB_QUERY_SECONDS = metrics_registry.histogram(
+    "novoprotein_db_query_duration_seconds",
+    "Time to execute SQLite statements.",
+    ("operation",),
+    buckets=DB_BUCKETS,
+)
+
+_DB_OPERATIONS = frozenset({"select", "insert", "update", "delete", "replace", "with", "pragma"})
+
+
+class span:
+    """Time a block into ``novoprotein_span_duration_seconds``.
+
+    Usable as ``with`` or ``async with``; an exception leaving the block is
+    recorded with ``outcome="error"`` and re-raised.
+    """
+
+    __slots__ = ("name", "_started")
+
+    def __init__(self, name: str):
+        self.name = name
+        self._started = 0.0
+
+    def __enter__(self) -> "span":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        SPAN_SECONDS.observe(
+            time.perf_counter() - self._started,
+            span=self.name,
+            outcome="ok" if exc_type is None else "error",
+        )
+
+    async def __aenter__(self) -> "span":
+        return self.__enter__()
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.__exit__(exc_type, exc, tb)
+
+
+def timed(name: str):
+    """Decorator form of ``span`` for plain and ``async`` functions."""
+
+    def decorate(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+
+def observe_db_query(sql: str, seconds: float) -> None:
+    words = sql.lstrip().split(None, 1)
+    operation = words[0].lower() if words else ""
+    DB_QUERY_SECONDS.observe(seconds, operation=operation if operation in _DB_OPERATIONS else "other")
+
@@ -7,8 +7,14 @@ To enable tracing, set these environment variables (in .env or your environment)
   - LANGCHAIN_PROJECT=<name>    (optional; defaults to "novoprotein-agent")
 
 Traces appear at https://smith.langchain.com
+
+``langsmith.traceable`` pulls in the LangSmith client and its HTTP stack
+(a few hundred milliseconds), so agent code decorates with ``traceable``
+from this module instead; langsmith is imported on the first traced call.
 """
 
+import functools
+import inspect
 import os
 
 
@@ -40,3 +46,59 @@ def setup_langsmith() -> bool:
         else:
             print("[LangSmith] Tracing requested but LANGCHAIN_API_KEY/LANGSMITH_API_KEY not set")
     return enabled
+
+
+def traceable(*args, **kwargs):
+    """``langsmith.traceable`` that imports langsmith on the first call.
+
+    Takes the same arguments. Without langsmith installed the function is
+    left untraced.
+    """
+    if len(args) == 1 and callable(args[0]) and not kwargs:
+        return traceable()(args[0])
+
+    def decorate(func):
+        traced = None
+
+        def resolve():
+            nonlocal traced
+            if traced is None:
+                try:
+                    from langsmith import traceable as langsmith_traceable
+                    traced = langsmith_traceable(*args, **kwargs)(func)
+                except ImportError:
+                    traced = func
+            return traced
+
+        if inspect.isasyncgenfunction(func):
+            @functools.wraps(func)
+            async def agen_wrapper(*f_args, **f_kwargs):
+                agen = resolve()(*f_args, **f_kwargs)
+                try:
+                    async for item in agen:
+                        yield item
+                finally:
+                    await agen.aclose()
+            return agen_wrapper
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*f_args, **f_kwargs):
+                return await resolve()(*f_args, **f_kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*f_args, **f_kwargs):
+            return resolve()(*f_args, **f_kwargs)
+        return wrapper
+
+    return decorate
+
+
+def load_langsmith():
+    """The langsmith module, or None when it is not installed."""
+    try:
+        import langsmith
+    except ImportError:
+        return None
+    return langsmith
@@ -0,0 +1,96 @@
+"""Deferred imports for heavy optional dependencies.
+
+``aiohttp``, ``httpx`` and similar client libraries take tens to hundreds
+of milliseconds to import, and every worker pays that at boot even though
+most requests never touch them. ``lazy_module`` returns a stand-in that
+imports the real module on first attribute access, so module-level code can
+keep writing ``aiohttp.ClientSession(...)`` or ``except httpx.HTTPError``.
+
+Annotations that name the module must not be evaluated at import time
+(use ``from __future__ import annotations``), or the import happens anyway.
+
+``lazy_attribute`` does the same for a module-level object such as a
+handler singleton: attribute access on the stand-in imports the module and
+is forwarded to the real object.
+"""
+
+import importlib
+import threading
+from types import ModuleType
+from typing import Any, Optional
+
+
+class LazyModule(ModuleType):
+    """Module stand-in that imports ``name`` the first time it is used."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self) -> ModuleType:
+        module: Optional[ModuleType] = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.__dict__["_lazy_module"] is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+class LazyAttribute:
+    """Stand-in for ``from module import attr`` that imports on first use."""
+
+    def __init__(self, module: str, attr: str):
+        object.__setattr__(self, "_lazy_source", (module, attr))
+        object.__setattr__(self, "_lazy_target", None)
+        object.__setattr__(self, "_lazy_lock", threading.Lock())
+
+    def _load(self) -> Any:
+        target = object.__getattribute__(self, "_lazy_target")
+        if target is None:
+            with object.__getattribute__(self, "_lazy_lock"):
+                target = object.__getattribute__(self, "_lazy_target")
+                if target is None:
+                    module, attr = object.__getattribute__(self, "_lazy_source")
+                    target = getattr(importlib.import_module(module), attr)
+                    object.__setattr__(self, "_lazy_target", target)
+        return target
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self._load(), attr, value)
+
+    def __repr__(self) -> str:
+        module, attr = object.__getattribute__(self, "_lazy_source")
+        return f"<lazy {module}.{attr}>"
+
+
+def lazy_module(name: str) -> ModuleType:
+    """Stand-in for ``import name`` that defers the import to first use.
+
+    A missing module raises ``ImportError`` at first use rather than here.
+    """
+    return LazyModule(name)
+
+
+def lazy_attribute(module: str, attr: str) -> Any:
+    """Stand-in for ``from module import attr`` that defers the import to first use."""
+    return LazyAttribute(module, attr)
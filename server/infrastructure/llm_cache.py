@@ -0,0 +1,218 @@
+"""In-process cache for deterministic LLM responses.
+
+Chat titles, error summaries and code-builder requests are often sent again
+with exactly the same prompt. Such calls are looked up here first, keyed by
+the model, the normalized messages (whitespace collapsed), the temperature
+and ``max_tokens``. Only temperature-0 calls and calls from agents listed in
+``LLM_CACHE_AGENTS`` are cached; anything sampled at a higher temperature is
+expected to vary and always goes to the provider.
+
+Entries expire after ``LLM_CACHE_TTL_SECONDS`` and the least recently used
+are evicted once the cache holds more than ``LLM_CACHE_MAX_BYTES``.
+
+An optional near-duplicate tier (``LLM_CACHE_NEAR_THRESHOLD`` > 0) also
+serves a cached response when everything but the final message is identical
+and the final messages' word-trigram Jaccard similarity reaches the
+threshold, e.g. the same title prompt with a trailing punctuation change.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from .config import get_env_var, get_bool_env_var
+
+LLM_CACHE_ENABLED = get_bool_env_var("LLM_CACHE_ENABLED", True)
+LLM_CACHE_TTL_SECONDS = float(get_env_var("LLM_CACHE_TTL_SECONDS", "3600"))
+LLM_CACHE_MAX_BYTES = int(get_env_var("LLM_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+LLM_CACHE_AGENTS = frozenset(
+    a.strip() for a in (get_env_var("LLM_CACHE_AGENTS", "code-builder") or "").split(",") if a.strip()
+)
+# 0 disables the near-duplicate tier; 0.9 is a reasonable starting point
+LLM_CACHE_NEAR_THRESHOLD = float(get_env_var("LLM_CACHE_NEAR_THRESHOLD", "0"))
+
+# Candidates compared per near-duplicate lookup (most recent first)
+NEAR_CANDIDATES = 32
+
+
+def _normalize_content(content: Any) -> Any:
+    if isinstance(content, str):
+        return " ".join(content.split())
+    return content
+
+
+def _digest(value: Any) -> str:
+    text = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _shingles(text: str) -> FrozenSet[str]:
+    words = text.lower().split()
+    if len(words) < 3:
+        return frozenset(words)
+    return frozenset(" ".join(words[i:i + 3]) for i in range(len(words) - 2))
+
+
+def _jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+class _Entry:
+    __slots__ = ("value", "size", "expires", "context", "shingles")
+
+    def __init__(self, value: Any, size: int, expires: float, context: str, shingles: Optional[FrozenSet[str]]):
+        self.value = value
+        self.size = size
+        self.expires = expires
+        self.context = context
+        self.shingles = shingles
+
+
+class LLMResponseCache:
+    """LRU response cache with a TTL, a byte budget and hit/miss counters."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+        max_bytes: int = LLM_CACHE_MAX_BYTES,
+        cacheable_agents: Iterable[str] = LLM_CACHE_AGENTS,
+        near_threshold: float = LLM_CACHE_NEAR_THRESHOLD,
+        enabled: bool = LLM_CACHE_ENABLED,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.cacheable_agents = frozenset(cacheable_agents)
+        self.near_threshold = near_threshold
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._by_context: Dict[str, List[str]] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "near_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+
+    def is_cacheable(self, temperature: float, agent_id: Optional[str] = None) -> bool:
+        """Whether a call may be served from (and stored in) the cache."""
+        return self.enabled and (temperature == 0 or (agent_id is not None and agent_id in self.cacheable_agents))
+
+    def _keys(self, model: str, messages: List[Dict[str, Any]], temperature: float, max_tokens: Optional[int]) -> Tuple[str, str, str]:
+        """``(exact key, context key, final message text)`` for a request."""
+        normalized = [
+            {"role": m.get("role"), "content": _normalize_content(m.get("content"))} for m in messages
+        ]
+        params = {"model": model, "temperature": temperature, "max_tokens": max_tokens}
+        last = normalized[-1]["content"] if normalized else ""
+        context = _digest({**params, "messages": normalized[:-1], "role": normalized[-1]["role"] if normalized else None})
+        return _digest({**params, "messages": normalized}), context, last if isinstance(last, str) else ""
+
+    def get(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        temperature: float,
+        max_tokens: Optional[int] = None,
+    ) -> Optional[Any]:
+        """Cached response for the request, or None on a miss."""
+        key, context, last = self._keys(model, messages, temperature, max_tokens)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._live(key, now)
+            if entry is not None:
+                self._counts["hits"] += 1
+                return entry.value
+            if self.near_threshold > 0:
+                entry = self._nearest(context, _shingles(last), now)
+                if entry is not None:
+                    self._counts["near_hits"] += 1
+                    return entry.value
+            self._counts["misses"] += 1
+            return None
+
+    def put(
+        self,
+        model: str,
+        messages: List[Dict[str, Any]],
+        temperature: float,
+        value: Any,
+        max_tokens: Optional[int] = None,
+        size: Optional[int] = None,
+    ) -> None:
+        """Store ``value``; ``size`` defaults to the length of its JSON encoding."""
+        if size is None:
+            size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+        key, context, last = self._keys(model, messages, temperature, max_tokens)
+        shingles = _shingles(last) if self.near_threshold > 0 else None
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = _Entry(value, size, time.monotonic() + self.ttl_seconds, context, shingles)
+            self._by_context.setdefault(context, []).append(key)
+            self._bytes += size
+            self._counts["stores"] += 1
+            while self._bytes > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+                self._counts["evictions"] += 1
+
+    def _live(self, key: str, now: float) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires <= now:
+            self._remove(key)
+            self._counts["expired"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _nearest(self, context: str, shingles: FrozenSet[str], now: float) -> Optional[_Entry]:
+        best, best_score = None, self.near_threshold
+        for key in reversed(self._by_context.get(context, [])[-NEAR_CANDIDATES:]):
+            entry = self._live(key, now)
+            if entry is None or entry.shingles is None:
+                continue
+            score = _jaccard(shingles, entry.shingles)
+            if score >= best_score:
+                best, best_score = entry, score
+        return best
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry.size
+        keys = self._by_context.get(entry.context)
+        if keys is not None:
+            keys.remove(key)
+            if not keys:
+                del self._by_context[entry.context]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_context.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Entry count, bytes held and hit/miss counters."""
+        with self._lock:
+            lookups = self._counts["hits"] + self._counts["near_hits"] + self._counts["misses"]
+            served = self._counts["hits"] + self._counts["near_hits"]
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "near_threshold": self.near_threshold,
+                **self._counts,
+                "hit_rate": round(served / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Shared instance used by the agent runner and the app's helper LLM calls
+llm_response_cache = LLMResponseCache()
@@ -0,0 +1,184 @@
+"""Bounded worker pool for bcrypt password hashing.
+
+bcrypt is deliberately slow, so calling it from an async route blocks the event
+loop for the whole hash. Async callers go through ``password_hasher`` instead,
+which runs bcrypt on a small dedicated thread pool, caps how many requests may
+wait for a worker, and fails fast with ``PasswordHashBusyError`` when a login
+burst would otherwise queue indefinitely.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Deque, Dict, Optional
+
+from .auth import BCRYPT_ROUNDS, hash_password, verify_password
+from .exceptions import ApplicationError
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "32"))
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "5"))
+
+# Number of recent samples kept for latency percentiles
+_LATENCY_WINDOW = 256
+
+
+class PasswordHashBusyError(ApplicationError):
+    """Raised when the hashing pool is saturated or a request waited too long."""
+    pass
+
+
+def get_hash_rounds(hashed: str) -> Optional[int]:
+    """Return the bcrypt cost factor encoded in a hash, or None if unparseable."""
+    if isinstance(hashed, bytes):
+        hashed = hashed.decode("utf-8", errors="replace")
+    parts = (hashed or "").split("$")
+    # Format: $2b$<rounds>$<salt+hash>
+    if len(parts) < 4:
+        return None
+    try:
+        return int(parts[2])
+    except ValueError:
+        return None
+
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread pool with admission control and metrics."""
+
+    def __init__(
+        self,
+        workers: int = PASSWORD_HASH_WORKERS,
+        max_pending: int = PASSWORD_HASH_MAX_PENDING,
+        queue_timeout: float = PASSWORD_HASH_QUEUE_TIMEOUT,
+        rounds: int = BCRYPT_ROUNDS,
+    ):
+        self.workers = max(1, workers)
+        self.max_pending = max(self.workers, max_pending)
+        self.queue_timeout = queue_timeout
+        self.rounds = rounds
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending = 0
+        self._stats_lock = threading.Lock()
+        self._counts = {"hash": 0, "verify": 0, "rehash": 0, "rejected": 0, "timed_out": 0}
+        self._run_ms: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        self._wait_ms: Deque[float] = deque(maxlen=_LATENCY_WINDOW)
+        self._max_run_ms = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix="bcrypt"
+                    )
+        return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Semaphores are bound to a loop; rebuild if the server (or a test) runs a new one
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.workers)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def _run(self, kind: str, fn, *args):
+        if self._pending >= self.max_pending:
+            self._bump("rejected")
+            raise PasswordHashBusyError("Password hashing queue is full")
+
+        self._pending += 1
+        queued_at = time.perf_counter()
+        semaphore = self._get_semaphore()
+        try:
+            try:
+                await asyncio.wait_for(semaphore.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self._bump("timed_out")
+                raise PasswordHashBusyError("Timed out waiting for a password hashing worker")
+
+            started_at = time.perf_counter()
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._get_executor(), fn, *args)
+            finally:
+                semaphore.release()
+                self._record(kind, (started_at - queued_at) * 1000, (time.perf_counter() - started_at) * 1000)
+        finally:
+            self._pending -= 1
+
+    def _bump(self, key: str) -> None:
+        with self._stats_lock:
+            self._counts[key] += 1
+
+    def _record(self, kind: str, wait_ms: float, run_ms: float) -> None:
+        with self._stats_lock:
+            self._counts[kind] += 1
+            self._wait_ms.append(wait_ms)
+            self._run_ms.append(run_ms)
+            self._max_run_ms = max(self._max_run_ms, run_ms)
+
+    async def hash(self, password: str) -> str:
+        """Hash a password at the configured cost factor."""
+        return await self._run("hash", hash_password, password, self.rounds)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        """Verify a password against a stored hash."""
+        return await self._run("verify", verify_password, password, hashed)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True when a stored hash was produced with a different cost factor."""
+        rounds = get_hash_rounds(hashed)
+        return rounds is not None and rounds != self.rounds
+
+    async def verify_and_rehash(self, password: str, hashed: str) -> tuple[bool, Optional[str]]:
+        """Verify a password and, if valid but hashed at an old cost, return a new hash.
+
+        Returns:
+            Tuple of (is_valid, new_hash). ``new_hash`` is None unless a rehash happened.
+        """
+        if not await self.verify(password, hashed):
+            return False, None
+        if not self.needs_rehash(hashed):
+            return True, None
+        new_hash = await self._run("rehash", hash_password, password, self.rounds)
+        return True, new_hash
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Snapshot of pool configuration, counters and latency percentiles."""
+        with self._stats_lock:
+            run = sorted(self._run_ms)
+            wait = sorted(self._wait_ms)
+            counts = dict(self._counts)
+            max_run = self._max_run_ms
+
+        def pct(samples, q):
+            if not samples:
+                return 0.0
+            return round(samples[min(len(samples) - 1, int(q * len(samples)))], 2)
+
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "queue_timeout_s": self.queue_timeout,
+            "rounds": self.rounds,
+            "pending": self._pending,
+            "counts": counts,
+            "run_ms": {"p50": pct(run, 0.5), "p95": pct(run, 0.95), "max": round(max_run, 2)},
+            "queue_wait_ms": {"p50": pct(wait, 0.5), "p95": pct(wait, 0.95)},
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker threads (used on application shutdown)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+# Singleton used by the user service
+password_hasher = PasswordHasher()
@@ -0,0 +1,222 @@
+"""Boot-time profiling: module import times and startup phases.
+
+``begin_imports``/``end_imports`` bracket the imports at the top of
+``app.py``; the total and the number of modules loaded are always recorded.
+With ``STARTUP_IMPORT_PROFILE=1`` an import hook also times every module
+executed in between, and ``format_imports`` renders the result like
+``python -X importtime``:
+
+    import time: self [us] | cumulative | imported package
+    import time:       472 |     554924 |   server.agents.router
+
+Times cover module execution (the body of the module and everything it
+imports), not finding the file. Only modules with a cumulative time of at
+least ``STARTUP_IMPORT_PROFILE_MIN_MS`` are listed, so the tree stays short.
+Other startup phases (e.g. router warmup) are recorded with ``record``.
+
+Modules deferred with ``lazy_module`` or imported on first use can be
+loaded by ``warm_imports`` in a background thread once the server is up, so
+the first request does not pay for them either.
+
+Environment:
+    STARTUP_IMPORT_PROFILE          1 to time each imported module
+    STARTUP_IMPORT_PROFILE_MIN_MS   smallest cumulative time listed in the report
+    STARTUP_WARM_IMPORTS            comma-separated modules to import after startup
+"""
+
+import importlib
+import os
+import sys
+import threading
+import time
+from importlib.abc import MetaPathFinder
+from typing import Any, Dict, List, Optional
+
+STARTUP_IMPORT_PROFILE = os.getenv("STARTUP_IMPORT_PROFILE", "0") == "1"
+STARTUP_IMPORT_PROFILE_MIN_MS = float(os.getenv("STARTUP_IMPORT_PROFILE_MIN_MS", "5"))
+STARTUP_WARM_IMPORTS = [
+    name.strip()
+    for name in os.getenv("STARTUP_WARM_IMPORTS", "langsmith.run_helpers,aiohttp,httpx").split(",")
+    if name.strip()
+]
+
+
+class _TimedLoader:
+    """Wraps a loader so ``exec_module`` is timed; everything else passes through."""
+
+    def __init__(self, loader, profiler: "ImportProfiler", name: str):
+        self._loader = loader
+        self._profiler = profiler
+        self._name = name
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        # Put the real loader back so nothing after the import sees the wrapper
+        module.__loader__ = self._loader
+        if getattr(module, "__spec__", None) is not None:
+            module.__spec__.loader = self._loader
+        self._profiler._enter()
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._leave(self._name, time.perf_counter() - started)
+
+
+class ImportProfiler(MetaPathFinder):
+    """``sys.meta_path`` hook recording self and cumulative time per module."""
+
+    def __init__(self) -> None:
+        self.records: List[Dict[str, Any]] = []
+        self._local = threading.local()
+
+    def _stack(self) -> List[float]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._local, "finding", False):
+            return None
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.finding = False
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self, fullname)
+        return spec
+
+    def _enter(self) -> None:
+        self._stack().append(0.0)
+
+    def _leave(self, name: str, elapsed: float) -> None:
+        stack = self._stack()
+        children = stack.pop()
+        if stack:
+            stack[-1] += elapsed
+        # Children finish first; the parent's entry goes in front of them
+        # when the report is rendered, using the depth recorded here.
+        self.records.append({
+            "module": name,
+            "depth": len(stack),
+            "self_us": int((elapsed - children) * 1_000_000),
+            "cumulative_us": int(elapsed * 1_000_000),
+        })
+
+    def install(self) -> None:
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def tree(self) -> List[Dict[str, Any]]:
+        """Records in import order, parents before their children."""
+        ordered: List[Dict[str, Any]] = []
+        pending: List[List[Dict[str, Any]]] = [[]]
+        for record in self.records:
+            depth = record["depth"]
+            while len(pending) <= depth + 1:
+                pending.append([])
+            children = pending[depth + 1]
+            pending[depth + 1] = []
+            pending[depth].append(record)
+            pending[depth].extend(children)
+        for group in pending:
+            ordered.extend(group)
+        return ordered
+
+
+def format_importtime(records: List[Dict[str, Any]], min_ms: float = 0.0) -> str:
+    """Render records in the ``python -X importtime`` layout."""
+    lines = ["import time: self [us] | cumulative | imported package"]
+    for record in records:
+        if record["cumulative_us"] < min_ms * 1000:
+            continue
+        lines.append(
+            f"import time: {record['self_us']:>9} | {record['cumulative_us']:>10} | "
+            f"{'  ' * record['depth']}{record['module']}"
+        )
+    return "\n".join(lines)
+
+
+class StartupProfile:
+    """Import time and startup phase durations for the current process."""
+
+    def __init__(self) -> None:
+        self.profiler: Optional[ImportProfiler] = None
+        self._imports_started: Optional[float] = None
+        self._modules_before = 0
+        self._phases: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def begin_imports(self, profile: bool = STARTUP_IMPORT_PROFILE) -> None:
+        self._imports_started = time.perf_counter()
+        self._modules_before = len(sys.modules)
+        if profile and self.profiler is None:
+            self.profiler = ImportProfiler()
+            self.profiler.install()
+
+    def end_imports(self) -> None:
+        if self._imports_started is None:
+            return
+        self.record("imports", time.perf_counter() - self._imports_started)
+        with self._lock:
+            self._phases["modules_loaded"] = len(sys.modules) - self._modules_before
+        if self.profiler is not None:
+            self.profiler.uninstall()
+
+    def record(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self._phases[f"{phase}_seconds"] = round(seconds, 4)
+
+    def top_imports(self, limit: int = 20) -> List[Dict[str, Any]]:
+        if self.profiler is None:
+            return []
+        return sorted(self.profiler.records, key=lambda r: r["cumulative_us"], reverse=True)[:limit]
+
+    def format_imports(self, min_ms: float = STARTUP_IMPORT_PROFILE_MIN_MS) -> Optional[str]:
+        if self.profiler is None:
+            return None
+        return format_importtime(self.profiler.tree(), min_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._phases)
+        stats["import_profile"] = self.profiler is not None
+        stats["top_imports"] = self.top_imports()
+        return stats
+
+    def warm_imports(self, modules: Optional[List[str]] = None) -> List[str]:
+        """Import ``modules`` now (call from a worker thread); returns those loaded.
+
+        Missing optional modules are skipped.
+        """
+        started = time.perf_counter()
+        loaded = []
+        for name in STARTUP_WARM_IMPORTS if modules is None else modules:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                continue
+            loaded.append(name)
+        self.record("warm_imports", time.perf_counter() - started)
+        return loaded
+
+
+startup_profile = StartupProfile()
@@ -1,40 +1,20 @@
 import json
-import os
 from typing import Any, Dict, List, Optional
 
+try:
+    from .event_log import event_logger
+except ImportError:
+    from infrastructure.event_log import event_logger
 
-LOG_AI = os.getenv("LOG_AI", "1") != "0"
 
+def log_line(section: str, message: Any, level: str = "info") -> None:
+    """Emit a structured event; see ``infrastructure.event_log``.
 
-def _truncate(value: Any, max_len: int = 8000) -> str:
-    try:
-        if isinstance(value, str):
-            s = value
-        else:
-            s = json.dumps(value, ensure_ascii=False, default=str)
-    except Exception:
-        s = str(value)
-    if len(s) > max_len:
-        return s[:max_len] + "... [truncated]"
-    return s
-
-
-def _safe_for_console(s: str) -> str:
-    """Ensure string can be printed on consoles with limited encoding (e.g. Windows cp1252)."""
-    return s.encode("ascii", errors="replace").decode("ascii")
-
-
-def log_line(section: str, message: Any) -> None:
-    if not LOG_AI:
-        return
-    from datetime import datetime
-
-    ts = datetime.utcnow().isoformat()
-    output = f"[{section}] {ts} {_truncate(message)}"
-    try:
-        print(output)
-    except UnicodeEncodeError:
-        print(_safe_for_console(output))
+    ``message`` is serialized on the log thread, so hot paths may pass a
+    dict (or a zero-argument callable building one) at almost no cost.
+    Use ``level="debug"`` for per-chunk or per-item events.
+    """
+    event_logger.log(section, message, level)
 
 
 def get_text_from_completion(completion: Any) -> str:
@@ -115,12 +95,12 @@ def trim_history(history: Optional[List[Dict[str, Any]]], max_turns: int = 6, ma
     if not history:
         return []
     trimmed = history[-max_turns:]
-    # Cap serialized size
-    s = _truncate(trimmed, max_len=max_chars)
-    try:
-        # Reparse to ensure valid JSON shape after truncation attempt
-        json.loads(s)
-        return trimmed
-    except Exception:
-        return trimmed
+    # Cap serialized size by dropping the oldest turns
+    sizes = [len(json.dumps(turn, ensure_ascii=False, default=str)) for turn in trimmed]
+    total = sum(sizes)
+    start = 0
+    while start < len(trimmed) - 1 and total > max_chars:
+        total -= sizes[start]
+        start += 1
+    return trimmed[start:]
 
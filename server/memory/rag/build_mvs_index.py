@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Build the local MVS example index used by the mvs-builder RAG.
+
+Ingests example files and writes vectors.npy, idf.npy and records.json.
+
+Example files:
+    *.js / *.ts   MVS code, optionally preceded by header comments:
+                      // use_case: Label the ligand
+                      // features: ligand, label, color
+                      // complexity: basic
+    *.json        a record or a list of records
+    *.jsonl       one record per line
+Records have ``code`` (or ``code_text``, as in Pinecone metadata),
+``use_case``, ``features`` and ``complexity``.
+
+Usage:
+    python memory/rag/build_mvs_index.py                      # bundled examples
+    python memory/rag/build_mvs_index.py examples/ more.jsonl --out /tmp/mvs_index
+"""
+
+import json
+import re
+import sys
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+try:
+    from .mvs_rag import MVS_INDEX_DIR, extract_intent_keywords
+    from .vector_index import VectorIndex
+except ImportError:
+    server_dir = Path(__file__).parent.parent.parent  # server/
+    sys.path.insert(0, str(server_dir))
+    from memory.rag.mvs_rag import MVS_INDEX_DIR, extract_intent_keywords
+    from memory.rag.vector_index import VectorIndex
+
+EXAMPLES_DIR = Path(__file__).parent / "mvs_examples"
+CODE_SUFFIXES = (".js", ".ts")
+_HEADER_RE = re.compile(r"^\s*//\s*(use_case|features|complexity)\s*:\s*(.*)$")
+
+
+def _split_features(value: Any) -> List[str]:
+    if isinstance(value, str):
+        return [f.strip() for f in value.split(",") if f.strip()]
+    return [str(f) for f in value or []]
+
+
+def parse_code_example(path: Path) -> Dict[str, Any]:
+    """Record from a code file with optional ``// key: value`` header lines."""
+    meta: Dict[str, Any] = {}
+    lines = path.read_text(encoding="utf-8").splitlines()
+    body_start = 0
+    for body_start, line in enumerate(lines):
+        match = _HEADER_RE.match(line)
+        if not match:
+            break
+        meta[match.group(1)] = match.group(2).strip()
+    else:
+        body_start = len(lines)
+    return {
+        "code": "\n".join(lines[body_start:]).strip(),
+        "use_case": meta.get("use_case") or path.stem.replace("_", " "),
+        "features": _split_features(meta.get("features")),
+        "complexity": meta.get("complexity") or "basic",
+        "source": path.name,
+    }
+
+
+def _normalize_record(raw: Dict[str, Any], source: str) -> Dict[str, Any]:
+    return {
+        "code": raw.get("code") or raw.get("code_text") or "",
+        "use_case": raw.get("use_case") or "",
+        "features": _split_features(raw.get("features")),
+        "complexity": raw.get("complexity") or "basic",
+        "source": source,
+    }
+
+
+def load_examples(paths: Iterable[Path]) -> List[Dict[str, Any]]:
+    records: List[Dict[str, Any]] = []
+    for path in paths:
+        path = Path(path)
+        files = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+        for file in files:
+            suffix = file.suffix.lower()
+            if suffix in CODE_SUFFIXES:
+                records.append(parse_code_example(file))
+            elif suffix == ".json":
+                data = json.loads(file.read_text(encoding="utf-8"))
+                for raw in data if isinstance(data, list) else [data]:
+                    records.append(_normalize_record(raw, file.name))
+            elif suffix == ".jsonl":
+                for line in file.read_text(encoding="utf-8").splitlines():
+                    if line.strip():
+                        records.append(_normalize_record(json.loads(line), file.name))
+    return [r for r in records if r["code"]]
+
+
+def example_text(record: Dict[str, Any]) -> str:
+    return f"{record['use_case']}\n{' '.join(record['features'])}\n{record['code']}"
+
+
+def build_index(paths: Iterable[Path]) -> VectorIndex:
+    records = load_examples(paths)
+    for record in records:
+        # Intents drive keyword reranking at query time
+        intents = set(extract_intent_keywords(f"{record['use_case']} {' '.join(record['features'])} {record['code']}"))
+        intents.update(record["features"])
+        record["intents"] = sorted(intents)
+    return VectorIndex.build([example_text(r) for r in records], records)
+
+
+def main(argv: List[str] = None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description="Build the local MVS example vector index")
+    parser.add_argument("paths", nargs="*", type=Path, default=[EXAMPLES_DIR], help="Example files or directories")
+    parser.add_argument("--out", type=Path, default=MVS_INDEX_DIR, help="Index directory to write")
+    args = parser.parse_args(argv)
+
+    index = build_index(args.paths)
+    if not len(index):
+        print("✗ No examples found")
+        return 1
+    index.save(args.out)
+    print(f"✓ Indexed {len(index)} examples into {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
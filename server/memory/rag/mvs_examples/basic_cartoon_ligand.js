@@ -0,0 +1,10 @@
+// use_case: Show protein as cartoon and ligand as ball-and-stick with a label
+// features: polymer, ligand, cartoon, ball_and_stick, color, label, focus
+// complexity: basic
+try {
+  const structure = mvs.download({url: 'https://www.ebi.ac.uk/pdbe/entry-files/download/1cbs_updated.cif'}).parse({format: 'mmcif'}).modelStructure({});
+  structure.component({selector: 'polymer'}).representation({type: 'cartoon'}).color({color: 'teal'});
+  structure.component({selector: 'ligand'}).representation({type: 'ball_and_stick'}).color({color: 'orange'});
+  structure.component({selector: 'ligand'}).label({text: 'Retinoic Acid'}).focus({});
+  await mvs.apply();
+} catch (e) { console.error('Failed:', e); }
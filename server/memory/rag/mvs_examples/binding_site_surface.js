@@ -0,0 +1,16 @@
+// use_case: Binding site with semi-transparent surface on a dark background
+// features: canvas, surface, opacity, residue_range, label, tooltip, ligand
+// complexity: intermediate
+try {
+  mvs.canvas({background_color: '#1a1a2e'});
+  const structure = mvs.download({url: 'https://www.ebi.ac.uk/pdbe/entry-files/download/1cbs_updated.cif'}).parse({format: 'mmcif'}).modelStructure({});
+  structure.component({selector: 'polymer'}).representation({type: 'surface'}).color({color: '#4a9eff'}).opacity({opacity: 0.25});
+  structure.component({selector: 'polymer'}).representation({type: 'cartoon'}).color({color: 'white'});
+  const bindingSite = {label_asym_id: 'A', beg_label_seq_id: 130, end_label_seq_id: 140};
+  structure.component({selector: bindingSite}).representation({type: 'ball_and_stick'}).color({color: 'yellow'});
+  structure.component({selector: bindingSite}).label({text: 'Binding Site'}).focus({});
+  structure.component({selector: bindingSite}).tooltip({text: 'Retinol binding pocket residues 130-140'});
+  structure.component({selector: 'ligand'}).representation({type: 'ball_and_stick'}).color({color: '#ff6b6b'});
+  structure.component({selector: 'ligand'}).label({text: 'Retinoic Acid'});
+  await mvs.apply();
+} catch (e) { console.error('Failed:', e); }
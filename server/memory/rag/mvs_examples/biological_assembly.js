@@ -0,0 +1,11 @@
+// use_case: Show the biological assembly and symmetry mates
+// features: assembly, symmetry, cartoon, color
+// complexity: intermediate
+try {
+  const parsed = mvs.download({url: 'https://www.ebi.ac.uk/pdbe/entry-files/download/1hda_updated.cif'}).parse({format: 'mmcif'});
+  const assembly = parsed.assemblyStructure({assembly_id: '1'});
+  assembly.component({selector: 'polymer'}).representation({type: 'cartoon'}).color({custom: {molstar_color_theme_name: 'chain-id'}});
+  const mates = parsed.symmetryMatesStructure({radius: 5});
+  mates.component({selector: 'polymer'}).representation({type: 'cartoon'}).color({color: 'gray'}).opacity({opacity: 0.4});
+  await mvs.apply();
+} catch (e) { console.error('Failed:', e); }
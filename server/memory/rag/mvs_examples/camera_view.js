@@ -0,0 +1,10 @@
+// use_case: Set the camera angle and background color
+// features: camera, canvas, cartoon
+// complexity: intermediate
+try {
+  mvs.canvas({background_color: 'black'});
+  const structure = mvs.download({url: 'https://www.ebi.ac.uk/pdbe/entry-files/download/1cbs_updated.cif'}).parse({format: 'mmcif'}).modelStructure({});
+  structure.component({selector: 'polymer'}).representation({type: 'cartoon'}).color({custom: {molstar_color_theme_name: 'chain-id'}});
+  mvs.camera({target: [17, 21, 27], position: [17, 21, 110], up: [0, 1, 0]});
+  await mvs.apply();
+} catch (e) { console.error('Failed:', e); }
@@ -0,0 +1,12 @@
+// use_case: Color each chain a different color
+// features: polymer, chain, cartoon, color
+// complexity: basic
+try {
+  const structure = mvs.download({url: 'https://www.ebi.ac.uk/pdbe/entry-files/download/4hhb_updated.cif'}).parse({format: 'mmcif'}).modelStructure({});
+  structure.component({selector: {label_asym_id: 'A'}}).representation({type: 'cartoon'}).color({color: 'red'});
+  structure.component({selector: {label_asym_id: 'B'}}).representation({type: 'cartoon'}).color({color: 'blue'});
+  structure.component({selector: {label_asym_id: 'C'}}).representation({type: 'cartoon'}).color({color: 'green'});
+  structure.component({selector: {label_asym_id: 'D'}}).representation({type: 'cartoon'}).color({color: 'orange'});
+  structure.component({selector: 'ligand'}).representation({type: 'ball_and_stick'}).color({custom: {molstar_color_theme_name: 'element-symbol'}});
+  await mvs.apply();
+} catch (e) { console.error('Failed:', e); }
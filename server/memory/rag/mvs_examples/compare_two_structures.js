@@ -0,0 +1,13 @@
+// use_case: Compare two structures side by side with a transform
+// features: multi_structure, transform, compare, cartoon, color
+// complexity: advanced
+try {
+  const s1 = mvs.download({url: 'https://www.ebi.ac.uk/pdbe/entry-files/download/1cbs_updated.cif'}).parse({format: 'mmcif'}).modelStructure({});
+  const s2 = mvs.download({url: 'https://www.ebi.ac.uk/pdbe/entry-files/download/1cbr_updated.cif'}).parse({format: 'mmcif'}).modelStructure({});
+  s1.component({selector: 'polymer'}).representation({type: 'cartoon'}).color({color: 'blue'});
+  s2.transform({rotation: [1, 0, 0, 0, 1, 0, 0, 0, 1], translation: [40, 0, 0]});
+  s2.component({selector: 'polymer'}).representation({type: 'cartoon'}).color({color: 'red'});
+  s1.component({selector: 'polymer'}).label({text: '1CBS'});
+  s2.component({selector: 'polymer'}).label({text: '1CBR'});
+  await mvs.apply();
+} catch (e) { console.error('Failed:', e); }
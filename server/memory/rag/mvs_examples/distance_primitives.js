@@ -0,0 +1,13 @@
+// use_case: Measure a distance and draw arrows and spheres as primitives
+// features: primitives, distance, arrow, sphere, label
+// complexity: advanced
+try {
+  const structure = mvs.download({url: 'https://www.ebi.ac.uk/pdbe/entry-files/download/1cbs_updated.cif'}).parse({format: 'mmcif'}).modelStructure({});
+  structure.component({selector: 'polymer'}).representation({type: 'cartoon'}).color({color: 'white'});
+  const prims = mvs.primitives({color: '#ff0000', opacity: 0.8});
+  prims.distance({start: [10, 12, 20], end: [18, 15, 24], color: 'yellow', label_template: '{{distance}} A'});
+  prims.arrow({start: [0, 0, 0], end: [10, 12, 20], color: 'red'});
+  prims.sphere({position: [18, 15, 24], radius: 2, color: 'green'});
+  prims.label({position: [14, 14, 22], text: 'Measured gap'});
+  await mvs.apply();
+} catch (e) { console.error('Failed:', e); }
@@ -0,0 +1,11 @@
+// use_case: Highlight several specific residues such as disulfide cysteines
+// features: residue, union selector, ball_and_stick, color, label
+// complexity: intermediate
+try {
+  const structure = mvs.download({url: 'https://www.ebi.ac.uk/pdbe/entry-files/download/4ins_updated.cif'}).parse({format: 'mmcif'}).modelStructure({});
+  structure.component({selector: 'polymer'}).representation({type: 'cartoon'}).color({color: 'lightgray'});
+  const cysResidues = [{label_asym_id: 'A', label_seq_id: 6}, {label_asym_id: 'A', label_seq_id: 7}, {label_asym_id: 'B', label_seq_id: 19}];
+  structure.component({selector: cysResidues}).representation({type: 'ball_and_stick'}).color({color: 'yellow'});
+  structure.component({selector: cysResidues}).label({text: 'Disulfide cysteines'});
+  await mvs.apply();
+} catch (e) { console.error('Failed:', e); }
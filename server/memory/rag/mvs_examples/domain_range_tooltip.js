@@ -0,0 +1,12 @@
+// use_case: Color a domain by residue range with auth numbering and hover tooltips
+// features: residue_range, domain, tooltip, color, cartoon
+// complexity: intermediate
+try {
+  const structure = mvs.download({url: 'https://www.ebi.ac.uk/pdbe/entry-files/download/1tqn_updated.cif'}).parse({format: 'mmcif'}).modelStructure({});
+  structure.component({selector: 'polymer'}).representation({type: 'cartoon'}).color({color: 'lightgray'});
+  const domain = {auth_asym_id: 'A', beg_auth_seq_id: 50, end_auth_seq_id: 100};
+  structure.component({selector: domain}).representation({type: 'cartoon'}).color({color: 'magenta'});
+  structure.component({selector: domain}).tooltip({text: 'Domain 1 (residues 50-100)'});
+  structure.component({selector: domain}).label({text: 'Domain 1'});
+  await mvs.apply();
+} catch (e) { console.error('Failed:', e); }
@@ -0,0 +1,10 @@
+// use_case: Show electron density as an isosurface around the model
+// features: volume, density, isosurface, opacity
+// complexity: advanced
+try {
+  const structure = mvs.download({url: 'https://www.ebi.ac.uk/pdbe/entry-files/download/1cbs_updated.cif'}).parse({format: 'mmcif'}).modelStructure({});
+  structure.component({selector: 'all'}).representation({type: 'ball_and_stick'}).color({custom: {molstar_color_theme_name: 'element-symbol'}});
+  const vol = mvs.download({url: 'https://www.ebi.ac.uk/pdbe/entry-files/1cbs.ccp4'}).parse({format: 'map'}).volume({channel_id: 0});
+  vol.representation({type: 'isosurface', relative_isovalue: 1.5}).color({color: 'blue'}).opacity({opacity: 0.5});
+  await mvs.apply();
+} catch (e) { console.error('Failed:', e); }
@@ -0,0 +1,11 @@
+// use_case: Label and focus a specific residue on a chain
+// features: label, focus, residue, chain
+// complexity: basic
+try {
+  const structure = mvs.download({url: 'https://www.ebi.ac.uk/pdbe/entry-files/download/1cbs_updated.cif'}).parse({format: 'mmcif'}).modelStructure({});
+  structure.component({selector: 'polymer'}).representation({type: 'cartoon'}).color({color: 'white'});
+  const site = {label_asym_id: 'A', label_seq_id: 120};
+  structure.component({selector: site}).representation({type: 'ball_and_stick'}).color({color: 'red'});
+  structure.component({selector: site}).label({text: 'Active site'}).focus({});
+  await mvs.apply();
+} catch (e) { console.error('Failed:', e); }
@@ -0,0 +1,10 @@
+// use_case: Show water molecules and ions around the protein
+// features: water, ion, polymer, spacefill, color
+// complexity: basic
+try {
+  const structure = mvs.download({url: 'https://www.ebi.ac.uk/pdbe/entry-files/download/1cbs_updated.cif'}).parse({format: 'mmcif'}).modelStructure({});
+  structure.component({selector: 'polymer'}).representation({type: 'cartoon'}).color({color: 'teal'});
+  structure.component({selector: 'water'}).representation({type: 'ball_and_stick'}).color({color: 'lightblue'}).opacity({opacity: 0.6});
+  structure.component({selector: 'ion'}).representation({type: 'spacefill'}).color({color: 'purple'});
+  await mvs.apply();
+} catch (e) { console.error('Failed:', e); }
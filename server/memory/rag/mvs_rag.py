@@ -1,18 +1,193 @@
 """
 MVS RAG (Retrieval-Augmented Generation) System
-Integrates Pinecone vector database for intelligent MVS code generation
+Retrieves MVS examples for intelligent MVS code generation.
+
+By default examples come from the bundled local vector index (see
+``vector_index`` and ``build_mvs_index``), searched in-process. Set
+MVS_RAG_BACKEND=pinecone to query the Pinecone index instead.
 """
 
 import os
 import asyncio
+from pathlib import Path
 from typing import List, Dict, Any, Optional
-from pinecone import Pinecone
-import openai
 
-class MVSRAGRetriever:
+try:
+    from ...infrastructure.compute import compute_executor
+    from .vector_index import VectorIndex, keyword_overlap
+except ImportError:
+    from infrastructure.compute import compute_executor
+    from memory.rag.vector_index import VectorIndex, keyword_overlap
+
+# "local" (bundled index) or "pinecone"
+MVS_RAG_BACKEND = os.getenv("MVS_RAG_BACKEND", "local").lower()
+MVS_INDEX_DIR = Path(os.getenv("MVS_INDEX_DIR", str(Path(__file__).parent / "mvs_index")))
+# Minimum reranked score for a local example to be used
+MVS_RAG_MIN_SCORE = float(os.getenv("MVS_RAG_MIN_SCORE", "0.15"))
+# Weight of the intent keyword overlap added to the cosine score
+KEYWORD_RERANK_WEIGHT = 0.3
+# Candidates fetched per requested example before reranking
+RERANK_CANDIDATES = 4
+
+
+def extract_intent_keywords(user_query: str) -> List[str]:
+    """Extract key intent words from user query for better retrieval"""
+    intent_keywords = []
+    low = user_query.lower()
+
+    # Component keywords
+    if any(word in low for word in ['ligand', 'small molecule', 'drug', 'inhibitor']):
+        intent_keywords.append('ligand')
+    if any(word in low for word in ['protein', 'polymer', 'chain']):
+        intent_keywords.append('polymer')
+    if any(word in low for word in ['water', 'solvent']):
+        intent_keywords.append('water')
+
+    # Feature keywords
+    if any(word in low for word in ['label', 'text', 'name', 'annotate']):
+        intent_keywords.append('label')
+    if any(word in low for word in ['color', 'colour', 'red', 'blue', 'green', 'orange']):
+        intent_keywords.append('color')
+    if any(word in low for word in ['surface', 'molecular surface']):
+        intent_keywords.append('surface')
+    if any(word in low for word in ['cartoon', 'ribbon']):
+        intent_keywords.append('cartoon')
+    if any(word in low for word in ['ball', 'stick', 'atomic']):
+        intent_keywords.append('ball_and_stick')
+    if any(word in low for word in ['focus', 'zoom', 'center']):
+        intent_keywords.append('focus')
+
+    # Canvas/background keywords
+    if any(word in low for word in ['background', 'canvas', 'dark mode', 'dark background']):
+        intent_keywords.append('canvas')
+    # Camera keywords
+    if any(word in low for word in ['camera', 'angle', 'perspective', 'viewpoint']):
+        intent_keywords.append('camera')
+    # Opacity/transparency keywords
+    if any(word in low for word in ['transparent', 'opacity', 'semi-transparent', 'translucent']):
+        intent_keywords.append('opacity')
+    # Tooltip keywords
+    if any(word in low for word in ['tooltip', 'hover', 'mouseover']):
+        intent_keywords.append('tooltip')
+    # Assembly keywords
+    if any(word in low for word in ['assembly', 'biological assembly', 'symmetry', 'unit cell']):
+        intent_keywords.append('assembly')
+    # Primitives keywords
+    if any(word in low for word in ['arrow', 'distance', 'measurement', 'sphere', 'box', 'primitive']):
+        intent_keywords.append('primitives')
+    # Transform keywords
+    if any(word in low for word in ['rotate', 'translate', 'transform']):
+        intent_keywords.append('transform')
+    # Multi-structure keywords
+    if any(word in low for word in ['compare', 'comparison', 'overlay', 'superpose', 'two structures']):
+        intent_keywords.append('multi_structure')
+    # Residue range keywords
+    if any(word in low for word in ['range', 'residues', 'domain', 'region', 'loop', 'helix']):
+        intent_keywords.append('residue_range')
+    # Volume/density keywords
+    if any(word in low for word in ['volume', 'density', 'isosurface', 'electron density']):
+        intent_keywords.append('volume')
+
+    return intent_keywords
+
+
+def format_examples_section(relevant_examples: List[Dict[str, Any]]) -> str:
+    """Prompt section presenting retrieved examples."""
+    examples_text = "\n\nRELEVANT WORKING EXAMPLES:\n"
+    
+    for i, example in enumerate(relevant_examples, 1):
+        examples_text += f"\nExample {i} - {example['use_case']} (Score: {example['score']:.2f}):\n"
+        examples_text += f"```javascript\n{example['code']}\n```\n"
+        if example['features']:
+            examples_text += f"Features: {', '.join(example['features'])}\n"
+    
+    examples_text += "\n" + "="*50 + "\n"
+    examples_text += "IMPORTANT: Follow these proven patterns exactly. Pay attention to:\n"
+    examples_text += "- Separate .color() and .label() into different component chains\n"
+    examples_text += "- .color() only works after .representation()\n"
+    examples_text += "- .label() only works after .component()\n"
+    examples_text += "- Always end with await mvs.apply();\n"
+    examples_text += "="*50 + "\n\n"
+    return examples_text
+
+
+class _ExamplePromptMixin:
+    """Shared prompt building for both retrievers."""
+
+    def extract_intent_keywords(self, user_query: str) -> List[str]:
+        return extract_intent_keywords(user_query)
+
+    async def build_enhanced_prompt(self, user_query: str, base_prompt: str) -> str:
+        """Build enhanced prompt with retrieved examples"""
+        
+        relevant_examples = await self.retrieve_relevant_examples(user_query)
+        
+        if not relevant_examples:
+            print("[RAG] No relevant examples found, using base prompt")
+            return base_prompt
+        
+        enhanced_prompt = base_prompt + format_examples_section(relevant_examples)
+        
+        print(f"[RAG] Enhanced prompt with {len(relevant_examples)} examples")
+        return enhanced_prompt
+
+
+class LocalMVSRAGRetriever(_ExamplePromptMixin):
+    """Retrieves MVS examples from the bundled on-disk vector index"""
+
+    def __init__(self, index_dir: Path = MVS_INDEX_DIR, min_score: float = MVS_RAG_MIN_SCORE):
+        self.index_dir = Path(index_dir)
+        self.min_score = min_score
+        self.index: Optional[VectorIndex] = None
+
+    async def initialize(self):
+        """Load (memory-map) the index"""
+        try:
+            self.index = VectorIndex.load(self.index_dir)
+            print(f"[RAG] Loaded local MVS index: {len(self.index)} examples from {self.index_dir}")
+            return True
+        except Exception as e:
+            print(f"[RAG] Failed to load local MVS index: {e}")
+            return False
+
+    def search(self, user_query: str, top_k: int = 3) -> List[Dict[str, Any]]:
+        """Vector search reranked by intent keyword overlap; synchronous, in-process."""
+        if not self.index:
+            return []
+        intent_keywords = extract_intent_keywords(user_query)
+        query = f"{user_query} {' '.join(intent_keywords)}"
+        ranked = []
+        for row, similarity in self.index.search(query, top_k * RERANK_CANDIDATES):
+            record = self.index.records[row]
+            score = similarity + KEYWORD_RERANK_WEIGHT * keyword_overlap(intent_keywords, record.get('intents', []))
+            if score >= self.min_score:
+                ranked.append((score, row))
+        ranked.sort(key=lambda item: -item[0])
+        return [
+            {
+                'code': self.index.records[row].get('code', ''),
+                'use_case': self.index.records[row].get('use_case', ''),
+                'features': self.index.records[row].get('features', []),
+                'complexity': self.index.records[row].get('complexity', 'basic'),
+                'score': score,
+            }
+            for score, row in ranked[:top_k]
+        ]
+
+    async def retrieve_relevant_examples(self, user_query: str, top_k: int = 3) -> List[Dict[str, Any]]:
+        """Retrieve most relevant MVS examples based on user intent"""
+        examples = self.search(user_query, top_k)
+        print(f"[RAG] Found {len(examples)} relevant examples")
+        return examples
+
+
+class MVSRAGRetriever(_ExamplePromptMixin):
     """Retrieves relevant MVS examples from Pinecone for enhanced code generation"""
     
     def __init__(self, pinecone_api_key: str, openai_api_key: str, index_name: str = "mvs-examples"):
+        from pinecone import Pinecone
+        import openai
+
         self.pc = Pinecone(api_key=pinecone_api_key)
         self.openai_client = openai.OpenAI(api_key=openai_api_key)
         self.index_name = index_name
@@ -28,66 +203,6 @@ class MVSRAGRetriever:
             print(f"[RAG] Failed to connect to Pinecone: {e}")
             return False
     
-    def extract_intent_keywords(self, user_query: str) -> List[str]:
-        """Extract key intent words from user query for better retrieval"""
-        intent_keywords = []
-        low = user_query.lower()
-
-        # Component keywords
-        if any(word in low for word in ['ligand', 'small molecule', 'drug', 'inhibitor']):
-            intent_keywords.append('ligand')
-        if any(word in low for word in ['protein', 'polymer', 'chain']):
-            intent_keywords.append('polymer')
-        if any(word in low for word in ['water', 'solvent']):
-            intent_keywords.append('water')
-
-        # Feature keywords
-        if any(word in low for word in ['label', 'text', 'name', 'annotate']):
-            intent_keywords.append('label')
-        if any(word in low for word in ['color', 'colour', 'red', 'blue', 'green', 'orange']):
-            intent_keywords.append('color')
-        if any(word in low for word in ['surface', 'molecular surface']):
-            intent_keywords.append('surface')
-        if any(word in low for word in ['cartoon', 'ribbon']):
-            intent_keywords.append('cartoon')
-        if any(word in low for word in ['ball', 'stick', 'atomic']):
-            intent_keywords.append('ball_and_stick')
-        if any(word in low for word in ['focus', 'zoom', 'center']):
-            intent_keywords.append('focus')
-
-        # Canvas/background keywords
-        if any(word in low for word in ['background', 'canvas', 'dark mode', 'dark background']):
-            intent_keywords.append('canvas')
-        # Camera keywords
-        if any(word in low for word in ['camera', 'angle', 'perspective', 'viewpoint']):
-            intent_keywords.append('camera')
-        # Opacity/transparency keywords
-        if any(word in low for word in ['transparent', 'opacity', 'semi-transparent', 'translucent']):
-            intent_keywords.append('opacity')
-        # Tooltip keywords
-        if any(word in low for word in ['tooltip', 'hover', 'mouseover']):
-            intent_keywords.append('tooltip')
-        # Assembly keywords
-        if any(word in low for word in ['assembly', 'biological assembly', 'symmetry', 'unit cell']):
-            intent_keywords.append('assembly')
-        # Primitives keywords
-        if any(word in low for word in ['arrow', 'distance', 'measurement', 'sphere', 'box', 'primitive']):
-            intent_keywords.append('primitives')
-        # Transform keywords
-        if any(word in low for word in ['rotate', 'translate', 'transform']):
-            intent_keywords.append('transform')
-        # Multi-structure keywords
-        if any(word in low for word in ['compare', 'comparison', 'overlay', 'superpose', 'two structures']):
-            intent_keywords.append('multi_structure')
-        # Residue range keywords
-        if any(word in low for word in ['range', 'residues', 'domain', 'region', 'loop', 'helix']):
-            intent_keywords.append('residue_range')
-        # Volume/density keywords
-        if any(word in low for word in ['volume', 'density', 'isosurface', 'electron density']):
-            intent_keywords.append('volume')
-
-        return intent_keywords
-    
     async def retrieve_relevant_examples(self, user_query: str, top_k: int = 3) -> List[Dict[str, Any]]:
         """Retrieve most relevant MVS examples based on user intent"""
         
@@ -97,7 +212,7 @@ class MVSRAGRetriever:
             
         try:
             # Extract intent for enhanced query
-            intent_keywords = self.extract_intent_keywords(user_query)
+            intent_keywords = extract_intent_keywords(user_query)
             
             # Build enhanced query with context
             enhanced_query = f"MVS molecular visualization {user_query}"
@@ -107,21 +222,26 @@ class MVSRAGRetriever:
             print(f"[RAG] Searching for: {enhanced_query}")
             
             # Search Pinecone with text query (assuming index has integrated embeddings)
-            results = self.index.query(
+            # The Pinecone and OpenAI clients are blocking; run them on the thread pool
+            results = await compute_executor.run(
+                self.index.query,
                 vector=None,  # Use text query if index supports it
                 top_k=top_k,
                 include_metadata=True,
-                namespace="mvs-examples"
+                namespace="mvs-examples",
+                label="rag:pinecone_query",
             )
             
             # If direct text query doesn't work, try with OpenAI embeddings
             if not results.get('matches'):
                 embedding = await self.get_embedding(enhanced_query)
-                results = self.index.query(
+                results = await compute_executor.run(
+                    self.index.query,
                     vector=embedding,
                     top_k=top_k,
                     include_metadata=True,
-                    namespace="mvs-examples"
+                    namespace="mvs-examples",
+                    label="rag:pinecone_query",
                 )
             
             relevant_examples = []
@@ -146,54 +266,31 @@ class MVSRAGRetriever:
     async def get_embedding(self, text: str) -> List[float]:
         """Generate embedding for text using OpenAI"""
         try:
-            response = self.openai_client.embeddings.create(
+            response = await compute_executor.run(
+                self.openai_client.embeddings.create,
                 input=text,
-                model="text-embedding-3-small"
+                model="text-embedding-3-small",
+                label="rag:embedding",
             )
             return response.data[0].embedding
         except Exception as e:
             print(f"[RAG] Error generating embedding: {e}")
             return []
-    
-    async def build_enhanced_prompt(self, user_query: str, base_prompt: str) -> str:
-        """Build enhanced prompt with retrieved examples"""
-        
-        relevant_examples = await self.retrieve_relevant_examples(user_query)
-        
-        if not relevant_examples:
-            print("[RAG] No relevant examples found, using base prompt")
-            return base_prompt
-            
-        # Build examples section
-        examples_text = "\n\nRELEVANT WORKING EXAMPLES:\n"
-        
-        for i, example in enumerate(relevant_examples, 1):
-            examples_text += f"\nExample {i} - {example['use_case']} (Score: {example['score']:.2f}):\n"
-            examples_text += f"```javascript\n{example['code']}\n```\n"
-            if example['features']:
-                examples_text += f"Features: {', '.join(example['features'])}\n"
-        
-        examples_text += "\n" + "="*50 + "\n"
-        examples_text += "IMPORTANT: Follow these proven patterns exactly. Pay attention to:\n"
-        examples_text += "- Separate .color() and .label() into different component chains\n"
-        examples_text += "- .color() only works after .representation()\n"
-        examples_text += "- .label() only works after .component()\n"
-        examples_text += "- Always end with await mvs.apply();\n"
-        examples_text += "="*50 + "\n\n"
-        
-        enhanced_prompt = base_prompt + examples_text
-        
-        print(f"[RAG] Enhanced prompt with {len(relevant_examples)} examples")
-        return enhanced_prompt
 
 
 # Global RAG instance
-_rag_retriever: Optional[MVSRAGRetriever] = None
+_rag_retriever = None
 
-async def get_rag_retriever() -> Optional[MVSRAGRetriever]:
+async def get_rag_retriever():
     """Get or create global RAG retriever instance"""
     global _rag_retriever
     
+    if _rag_retriever is None and MVS_RAG_BACKEND != "pinecone":
+        retriever = LocalMVSRAGRetriever()
+        if not await retriever.initialize():
+            return None
+        _rag_retriever = retriever
+    
     if _rag_retriever is None:
         pinecone_key = os.getenv("PINECONE_API_KEY")
         openai_key = os.getenv("OPENAI_API_KEY")
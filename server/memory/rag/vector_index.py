@@ -0,0 +1,174 @@
+"""On-disk vector index for retrieval without a remote vector database.
+
+Texts are embedded locally with ``HashingEmbedder``: words (camelCase and
+snake_case split) and word bigrams are hashed into a fixed number of
+buckets, weighted by log term frequency times the corpus IDF stored with the
+index, and L2-normalized. No model download and no network call is needed,
+and a query embeds in microseconds.
+
+An index directory holds ``vectors.npy`` (float32, one normalized row per
+record), ``idf.npy`` and ``records.json`` (metadata). Vectors are
+memory-mapped on load. Search is an exact inner product over the matrix; if
+``hnswlib`` is installed and the index holds at least ``HNSW_MIN_ITEMS``
+rows an HNSW graph is built at load time instead.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:  # optional; exact search is used instead
+    hnswlib = None
+
+EMBEDDER_NAME = "hashing-v1"
+EMBEDDING_DIM = 1024
+# Below this many rows exact search is faster than building a graph
+HNSW_MIN_ITEMS = int(os.getenv("VECTOR_INDEX_HNSW_MIN_ITEMS", "20000"))
+
+VECTORS_FILE = "vectors.npy"
+IDF_FILE = "idf.npy"
+RECORDS_FILE = "records.json"
+
+_WORD_RE = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from in is it of on or that the this to with const await try catch".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased words; ``labelAsymId`` and ``label_asym_id`` both give label/asym/id."""
+    return [w for w in (m.lower() for m in _WORD_RE.findall(text)) if w not in _STOPWORDS]
+
+
+@lru_cache(maxsize=65536)
+def _bucket(feature: str, dim: int) -> Tuple[int, float]:
+    digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+    value = int.from_bytes(digest, "little")
+    return value % dim, 1.0 if (value >> 63) & 1 else -1.0
+
+
+class HashingEmbedder:
+    """Signed feature hashing of words and word bigrams."""
+
+    name = EMBEDDER_NAME
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+
+    def features(self, text: str) -> Counter:
+        words = tokenize(text)
+        features = Counter(words)
+        features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+        return features
+
+    def raw(self, text: str) -> np.ndarray:
+        """Unweighted log-tf vector (before IDF and normalization)."""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature, count in self.features(text).items():
+            index, sign = _bucket(feature, self.dim)
+            vector[index] += sign * (1.0 + math.log(count))
+        return vector
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32)
+
+
+class VectorIndex:
+    """Normalized embedding matrix plus one metadata record per row."""
+
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        records: List[Dict[str, Any]],
+        idf: np.ndarray,
+        embedder: Optional[HashingEmbedder] = None,
+    ):
+        if len(vectors) != len(records):
+            raise ValueError("vectors and records must have the same length")
+        self.vectors = vectors
+        self.records = records
+        self.idf = idf
+        self.embedder = embedder or HashingEmbedder(vectors.shape[1] if vectors.ndim == 2 else EMBEDDING_DIM)
+        self._hnsw = None
+        if hnswlib is not None and len(records) >= HNSW_MIN_ITEMS:
+            self._hnsw = hnswlib.Index(space="ip", dim=self.embedder.dim)
+            self._hnsw.init_index(max_elements=len(records), ef_construction=200, M=16)
+            self._hnsw.add_items(np.asarray(vectors), np.arange(len(records)))
+            self._hnsw.set_ef(64)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    @classmethod
+    def build(
+        cls,
+        texts: Sequence[str],
+        records: List[Dict[str, Any]],
+        embedder: Optional[HashingEmbedder] = None,
+    ) -> "VectorIndex":
+        embedder = embedder or HashingEmbedder()
+        raw = np.stack([embedder.raw(t) for t in texts]) if texts else np.zeros((0, embedder.dim), np.float32)
+        document_frequency = np.count_nonzero(raw, axis=0)
+        idf = (np.log((1 + len(texts)) / (1 + document_frequency)) + 1.0).astype(np.float32)
+        return cls(_normalize(raw * idf), list(records), idf, embedder)
+
+    def save(self, directory: Path) -> None:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / VECTORS_FILE, np.asarray(self.vectors, dtype=np.float32))
+        np.save(directory / IDF_FILE, self.idf)
+        meta = {"embedder": self.embedder.name, "dim": self.embedder.dim, "records": self.records}
+        (directory / RECORDS_FILE).write_text(json.dumps(meta, indent=1, ensure_ascii=False), encoding="utf-8")
+
+    @classmethod
+    def load(cls, directory: Path, mmap: bool = True) -> "VectorIndex":
+        directory = Path(directory)
+        meta = json.loads((directory / RECORDS_FILE).read_text(encoding="utf-8"))
+        if meta.get("embedder") != EMBEDDER_NAME:
+            raise ValueError(f"index built with unsupported embedder {meta.get('embedder')!r}")
+        vectors = np.load(directory / VECTORS_FILE, mmap_mode="r" if mmap else None)
+        idf = np.load(directory / IDF_FILE)
+        return cls(vectors, meta["records"], idf, HashingEmbedder(int(meta["dim"])))
+
+    def embed(self, text: str) -> np.ndarray:
+        return _normalize(self.embedder.raw(text) * self.idf)
+
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[int, float]]:
+        """``(row, cosine score)`` pairs, best first."""
+        if not self.records or top_k <= 0:
+            return []
+        vector = self.embed(query)
+        top_k = min(top_k, len(self.records))
+        if self._hnsw is not None:
+            labels, distances = self._hnsw.knn_query(vector, k=top_k)
+            return [(int(i), float(1.0 - d)) for i, d in zip(labels[0], distances[0])]
+        scores = np.asarray(self.vectors) @ vector
+        if top_k < len(scores):
+            candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        else:
+            candidates = np.arange(len(scores))
+        ordered = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(int(i), float(scores[i])) for i in ordered]
+
+
+def keyword_overlap(query_keywords: Iterable[str], record_keywords: Iterable[str]) -> float:
+    """Fraction of the query's keywords that the record also has."""
+    wanted = set(query_keywords)
+    if not wanted:
+        return 0.0
+    return len(wanted & set(record_keywords)) / len(wanted)
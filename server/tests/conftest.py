@@ -22,6 +22,28 @@ def db():
     conn.close()
 
 
+@pytest.fixture
+def route_db(tmp_path, monkeypatch):
+    """File-backed database that ``database.db.get_db`` also connects to.
+
+    Tests that call route functions directly can override ``db`` with this
+    fixture so the insert factories and the routes see the same data.
+    """
+    from server.database import db as db_module
+
+    monkeypatch.setattr(db_module, "DB_PATH", tmp_path / "test.db")
+    db_module.init_db()
+    conn = sqlite3.connect(str(db_module.DB_PATH))
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    yield conn
+    conn.close()
+    # Write audit entries queued by admin routes while DB_PATH still points here
+    from server.domain.admin.audit_log import audit_log_writer
+
+    audit_log_writer.flush()
+
+
 @pytest.fixture
 def user_id():
     """A deterministic test user ID."""
@@ -167,3 +189,48 @@ def insert_execution(db, seed_user):
         return eid, ne_ids
 
     return _insert
+
+
+def _place_atom(a, b, c, bond, angle, torsion):
+    """NeRF: position atom D from A-B-C given |CD|, angle BCD and torsion ABCD (degrees)."""
+    import numpy as np
+
+    angle, torsion = np.radians(angle), np.radians(torsion)
+    bc = (c - b) / np.linalg.norm(c - b)
+    n = np.cross(b - a, bc)
+    n /= np.linalg.norm(n)
+    d = np.array([
+        -bond * np.cos(angle),
+        bond * np.sin(angle) * np.cos(torsion),
+        bond * np.sin(angle) * np.sin(torsion),
+    ])
+    return c + d[0] * bc + d[1] * np.cross(n, bc) + d[2] * n
+
+
+def make_backbone_pdb(n_residues=12, phi=-57.0, psi=-47.0, chain="A", bfactor=90.0, resname="ALA"):
+    """Build PDB text for an ideal N/CA/C backbone with constant phi/psi.
+
+    ``bfactor`` (used as pLDDT) may be a number or a per-residue list.
+    """
+    import numpy as np
+
+    coords = [np.array([0.0, 1.458, 0.0]), np.array([0.0, 0.0, 0.0])]
+    coords.append(_place_atom(np.array([1.0, 1.458, 0.0]), coords[0], coords[1], 1.525, 111.2, -60.0))
+    for _ in range(1, n_residues):
+        coords.append(_place_atom(coords[-3], coords[-2], coords[-1], 1.329, 116.2, psi))
+        coords.append(_place_atom(coords[-3], coords[-2], coords[-1], 1.458, 121.7, 180.0))
+        coords.append(_place_atom(coords[-3], coords[-2], coords[-1], 1.525, 111.2, phi))
+
+    bfactors = bfactor if isinstance(bfactor, (list, tuple)) else [bfactor] * n_residues
+    lines = []
+    serial = 1
+    for i in range(n_residues):
+        for j, name in enumerate(("N", "CA", "C")):
+            x, y, z = coords[3 * i + j]
+            lines.append(
+                f"ATOM  {serial:5d}  {name:<3s} {resname:3s} {chain}{i + 1:4d}    "
+                f"{x:8.3f}{y:8.3f}{z:8.3f}  1.00{bfactors[i]:6.2f}           {name[0]}"
+            )
+            serial += 1
+    lines.append("END")
+    return "\n".join(lines) + "\n"
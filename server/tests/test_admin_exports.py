@@ -0,0 +1,207 @@
+"""Tests for server.domain.admin.exports module."""
+import csv
+import gzip
+import io
+import json
+
+import pytest
+import zstandard
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from server.api.middleware.admin import require_super_admin_dep
+from server.api.routes import admin as admin_routes
+from server.domain.admin import exports
+from server.domain.admin.exports import (
+    cancel_export,
+    create_export,
+    delete_expired_exports,
+    get_export,
+    iter_export_batches,
+    recover_exports,
+    write_export,
+)
+from server.domain.storage.backends import LocalStorageBackend
+
+
+@pytest.fixture
+def db(route_db):
+    return route_db
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    backend = LocalStorageBackend(tmp_path / "store")
+    monkeypatch.setattr(exports, "get_storage_backend", lambda: backend)
+    monkeypatch.setattr(admin_routes, "get_storage_backend", lambda: backend)
+    return backend
+
+
+@pytest.fixture
+def people(db):
+    for i in range(5):
+        db.execute(
+            "INSERT INTO users (id, username, email, password_hash, role) VALUES (?, ?, ?, 'secret', ?)",
+            (f"u{i}", f"user{i}", f"user{i}@example.com", "admin" if i == 0 else "user"),
+        )
+    db.execute("INSERT INTO chat_sessions (id, user_id) VALUES ('s1', 'u1')")
+    for i in range(3):
+        db.execute(
+            "INSERT INTO chat_messages (id, session_id, user_id, content, metadata) VALUES (?, 's1', 'u1', ?, '{}')",
+            (f"m{i}", f"message {i}"),
+        )
+    db.commit()
+
+
+def _queue(db, *args, **kwargs):
+    export = create_export(db, "u0", *args, **kwargs)
+    db.commit()
+    return export
+
+
+class TestCreateExport:
+    @pytest.mark.parametrize("kwargs", [
+        {"export_type": "users", "fmt": "xml"},
+        {"export_type": "users", "fmt": "csv", "fields": ["password_hash"]},
+        {"export_type": "chat", "fmt": "csv", "fields": ["content"]},
+        {"export_type": "users", "fmt": "csv", "filters": {"email": "x"}},
+        {"export_type": "users", "fmt": "csv", "compression": "lz4"},
+        {"export_type": "tokens", "fmt": "csv"},
+    ])
+    def test_rejects_invalid_requests(self, db, kwargs):
+        with pytest.raises(ValueError):
+            create_export(db, "u0", kwargs.pop("export_type"), kwargs.pop("fmt"), **kwargs)
+
+    def test_records_queued_export(self, db, people):
+        export = _queue(db, "chat", "json", include_content=True)
+        assert export["status"] == "queued"
+        assert export["format"] == "ndjson" and export["compression"] == "gzip"
+        assert export["storage_key"] == f"storage/admin_exports/{export['id']}.ndjson.gz"
+        assert "content" in export["params"]["columns"]
+
+
+class TestWriteExport:
+    def test_csv_gzip_in_batches(self, db, people, backend):
+        export = _queue(db, "users", "csv", fields=["id", "username", "role"])
+        done = write_export(export["id"], batch_size=2)
+        assert done["status"] == "completed"
+        assert done["rows_total"] == done["rows_written"] == 5
+        assert done["progress"] == 1.0
+        data = gzip.decompress(backend.read_bytes(done["storage_key"])).decode()
+        rows = list(csv.reader(io.StringIO(data)))
+        assert rows[0] == ["id", "username", "role"]
+        assert [r[0] for r in rows[1:]] == ["u0", "u1", "u2", "u3", "u4"]
+        assert done["bytes_written"] == backend.size(done["storage_key"])
+
+    def test_ndjson_zstd_with_filters(self, db, people, backend):
+        export = _queue(db, "users", "ndjson", compression="zstd", filters={"role": "user"})
+        done = write_export(export["id"], batch_size=3)
+        raw = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(backend.read_bytes(done["storage_key"]))).read()
+        records = [json.loads(line) for line in raw.decode().splitlines()]
+        assert [r["id"] for r in records] == ["u1", "u2", "u3", "u4"]
+        assert "password_hash" not in records[0]
+
+    def test_cancelled_midway(self, db, people, backend, monkeypatch):
+        export = _queue(db, "users", "csv")
+        original = exports._RowWriter.write_batch
+
+        def cancel_after_first(self, rows):
+            original(self, rows)
+            with exports.get_db() as conn:
+                cancel_export(conn, export["id"])
+
+        monkeypatch.setattr(exports._RowWriter, "write_batch", cancel_after_first)
+        done = write_export(export["id"], batch_size=2)
+        assert done["status"] == "cancelled"
+        assert not backend.exists(done["storage_key"])
+
+    def test_cancelled_after_file_stored(self, db, people, backend, monkeypatch):
+        export = _queue(db, "users", "csv")
+        original = backend.write_file
+
+        def store_then_cancel(key, source):
+            original(key, source)
+            with exports.get_db() as conn:
+                cancel_export(conn, export["id"])
+
+        monkeypatch.setattr(backend, "write_file", store_then_cancel)
+        done = write_export(export["id"])
+        assert done["status"] == "cancelled"
+        assert not backend.exists(done["storage_key"])
+
+    def test_failure_is_recorded(self, db, people, backend, monkeypatch):
+        export = _queue(db, "users", "csv")
+        monkeypatch.setattr(backend, "write_file", lambda key, source: (_ for _ in ()).throw(OSError("disk full")))
+        done = write_export(export["id"])
+        assert done["status"] == "failed"
+        assert done["error_message"] == "disk full"
+
+    def test_batches_use_keyset_order(self, db, people):
+        batches = list(iter_export_batches("chat", ["id"], {"user_id": "u1"}, batch_size=2))
+        assert batches == [[("m0",), ("m1",)], [("m2",)]]
+
+
+class TestExportLifecycle:
+    def test_recover_fails_running_and_returns_queued(self, db, people, backend):
+        running = _queue(db, "users", "csv")
+        queued = _queue(db, "chat", "csv")
+        db.execute("UPDATE admin_exports SET status = 'running' WHERE id = ?", (running["id"],))
+        db.commit()
+        backend.write_bytes(running["storage_key"], b"partial")
+
+        assert recover_exports() == [queued["id"]]
+        interrupted = get_export(db, running["id"])
+        assert interrupted["status"] == "failed"
+        assert interrupted["error_message"] == "Interrupted by a server restart"
+        assert not backend.exists(running["storage_key"])
+        assert write_export(queued["id"])["status"] == "completed"
+
+    def test_expired_exports_are_deleted(self, db, people, backend):
+        old = write_export(_queue(db, "users", "csv")["id"])
+        recent = write_export(_queue(db, "users", "csv")["id"])
+        db.execute(
+            "UPDATE admin_exports SET completed_at = datetime('now', '-8 days') WHERE id = ?", (old["id"],)
+        )
+        db.commit()
+
+        assert delete_expired_exports(retention_seconds=7 * 24 * 3600) == 1
+        assert get_export(db, old["id"]) is None
+        assert not backend.exists(old["storage_key"])
+        assert backend.exists(recent["storage_key"])
+
+
+class TestExportRoutes:
+    @pytest.fixture
+    def client(self, db, people, backend, monkeypatch):
+        started = []
+        monkeypatch.setattr(exports, "start_export", started.append)
+        app = FastAPI()
+        app.include_router(admin_routes.router)
+        app.dependency_overrides[require_super_admin_dep] = lambda: {"id": "u0"}
+        client = TestClient(app)
+        client.started = started
+        return client
+
+    def test_queue_write_and_ranged_download(self, client):
+        response = client.post("/api/admin/export/chat", json={"format": "csv", "include_content": True})
+        export_id = response.json()["export_id"]
+        assert client.started == [export_id]
+        assert client.get(f"/api/admin/exports/{export_id}/download").status_code == 409
+
+        write_export(export_id)
+        status = client.get(f"/api/admin/exports/{export_id}").json()["export"]
+        assert status["status"] == "completed"
+
+        full = client.get(f"/api/admin/exports/{export_id}/download")
+        assert full.headers["content-type"] == "application/gzip"
+        assert "content-encoding" not in full.headers
+        assert "message 2" in gzip.decompress(full.content).decode()
+        part = client.get(f"/api/admin/exports/{export_id}/download", headers={"range": "bytes=0-9"})
+        assert part.status_code == 206
+        assert part.content == full.content[:10]
+
+    def test_cancel_and_validation(self, client):
+        assert client.post("/api/admin/export/users", json={"format": "xml"}).status_code == 400
+        export_id = client.post("/api/admin/export/users", json={"format": "csv"}).json()["export_id"]
+        assert client.delete(f"/api/admin/exports/{export_id}").status_code == 200
+        assert client.delete(f"/api/admin/exports/{export_id}").status_code == 409
+        assert client.get("/api/admin/exports/missing").status_code == 404
@@ -0,0 +1,133 @@
+"""Tests for server.domain.admin.metrics module."""
+import json
+from datetime import datetime
+
+import pytest
+from server.domain.admin.metrics import (
+    compact_rollups,
+    get_dashboard_stats,
+    get_timeseries,
+    get_user_activity,
+    read_counters,
+    rebuild_metrics,
+    reconcile_counters,
+)
+
+NOW = datetime(2026, 3, 10, 12, 30)
+
+
+@pytest.fixture
+def other_user(db):
+    db.execute("INSERT INTO users (id, username, created_at) VALUES ('u2', 'other', '2026-03-09 08:15:00')")
+    return "u2"
+
+
+@pytest.fixture
+def activity(db, other_user):
+    seed_user = "u1"
+    db.execute("INSERT INTO users (id, username, created_at) VALUES (?, 'first', '2026-02-01 10:00:00')", (seed_user,))
+    db.execute("INSERT INTO user_credits (user_id, credits) VALUES (?, 100), (?, 20)", (seed_user, other_user))
+    db.execute(
+        """INSERT INTO credit_transactions (id, user_id, amount, transaction_type, created_at) VALUES
+           ('t1', ?, -30, 'spent', '2026-03-10 09:00:00'),
+           ('t2', ?, -10, 'spent', '2026-03-08 09:00:00'),
+           ('t3', ?, 50, 'purchase', '2026-03-10 10:00:00')""",
+        (seed_user, seed_user, seed_user),
+    )
+    db.execute("INSERT INTO user_reports (id, user_id, report_type, title, description) VALUES ('r1', ?, 'bug', 't', 'd')",
+               (seed_user,))
+    db.execute("INSERT INTO chat_sessions (id, user_id) VALUES ('s1', ?)", (seed_user,))
+    for i, agent in enumerate(["code-builder", "code-builder", "bio-chat", None]):
+        metadata = json.dumps({"agentId": agent}) if agent else "not json"
+        db.execute(
+            """INSERT INTO chat_messages (id, session_id, user_id, content, metadata, created_at)
+               VALUES (?, 's1', ?, 'hi', ?, '2026-03-10 11:00:00')""",
+            (f"m{i}", seed_user, metadata),
+        )
+    db.execute(
+        """INSERT INTO alphafold_jobs (id, user_id, sequence, sequence_length, created_at)
+           VALUES ('j1', ?, 'MKT', 3, '2026-03-10 09:30:00')""",
+        (seed_user,),
+    )
+    db.execute("UPDATE alphafold_jobs SET status = 'completed', completed_at = '2026-03-10 10:45:00' WHERE id = 'j1'")
+    db.commit()
+    return seed_user
+
+
+class TestTriggers:
+    def test_counters_follow_writes(self, db, activity, other_user):
+        assert read_counters(db, ("users_total", "users_active", "credits_total", "reports_pending")) == {
+            "users_total": 2, "users_active": 2, "credits_total": 120, "reports_pending": 1,
+        }
+        db.execute("UPDATE users SET is_active = 0 WHERE id = ?", (other_user,))
+        db.execute("UPDATE user_credits SET credits = credits - 30 WHERE user_id = ?", (activity,))
+        db.execute("UPDATE user_reports SET status = 'resolved' WHERE id = 'r1'")
+        db.execute("DELETE FROM chat_messages WHERE id = 'm0'")
+        assert read_counters(db, ("users_active", "credits_total", "reports_pending", "messages")) == {
+            "users_active": 1, "credits_total": 90, "reports_pending": 0, "messages": 3,
+        }
+
+    def test_dashboard_stats(self, db, activity):
+        assert get_dashboard_stats(db, now=NOW) == {
+            "total_users": 2, "active_users": 2, "total_credits": 120, "pending_reports": 1, "recent_signups": 1,
+        }
+
+    def test_user_activity(self, db, activity):
+        result = get_user_activity(db, activity, now=NOW)
+        assert result["total_sessions"] == 1
+        assert result["total_messages"] == 4
+        assert result["most_used_agent"] == "code-builder"
+        assert result["messages_per_day"] == round(4 / 30, 2)
+        assert result["credit_usage_rate"] == round(40 / 30, 2)
+
+    def test_rebuild_matches_incremental_state(self, db, activity):
+        before_counters = db.execute("SELECT * FROM metric_counters ORDER BY metric, scope").fetchall()
+        before_rollups = db.execute("SELECT * FROM metric_rollups ORDER BY metric, scope, granularity, bucket").fetchall()
+        rebuild_metrics(db)
+        after_rollups = db.execute("SELECT * FROM metric_rollups ORDER BY metric, scope, granularity, bucket").fetchall()
+        assert [tuple(r) for r in db.execute("SELECT * FROM metric_counters ORDER BY metric, scope")] == \
+            [tuple(r) for r in before_counters]
+        # The rebuild prunes hourly buckets past retention relative to today
+        kept = {tuple(r) for r in after_rollups}
+        assert kept <= {tuple(r) for r in before_rollups}
+        assert {r for r in map(tuple, before_rollups) if r[2] == "day"} <= kept
+
+
+class TestCompaction:
+    def test_compact_prunes_old_hourly_buckets(self, db, activity):
+        removed = compact_rollups(db, now=datetime(2026, 4, 30))
+        assert removed > 0
+        assert db.execute("SELECT COUNT(*) FROM metric_rollups WHERE granularity = 'hour'").fetchone()[0] == 0
+        assert db.execute("SELECT COUNT(*) FROM metric_rollups WHERE granularity = 'day'").fetchone()[0] > 0
+
+    def test_reconcile_fixes_drift(self, db, activity):
+        db.execute("UPDATE metric_counters SET value = 99 WHERE metric = 'users_total' AND scope = ''")
+        assert reconcile_counters(db) == {"users_total": -97}
+        assert reconcile_counters(db) == {}
+
+
+class TestTimeseries:
+    def test_zero_filled_daily_series(self, db, activity):
+        result = get_timeseries(db, ["signups", "credits_spent", "jobs_completed"], start="2026-03-08", end="2026-03-10")
+        assert result["buckets"] == ["2026-03-08", "2026-03-09", "2026-03-10"]
+        assert result["series"] == {
+            "signups": [0, 1, 0],
+            "credits_spent": [10, 0, 30],
+            "jobs_completed": [0, 0, 1],
+        }
+
+    def test_hourly_defaults_to_last_48_hours(self, db, activity):
+        result = get_timeseries(db, ["messages"], granularity="hour", now=NOW)
+        assert len(result["buckets"]) == 49
+        assert result["buckets"][-1] == "2026-03-10 12:00:00"
+        assert result["series"]["messages"][-2] == 4
+
+    @pytest.mark.parametrize("kwargs", [
+        {"metrics": ["nope"]},
+        {"metrics": ["signups"], "granularity": "week"},
+        {"metrics": ["signups"], "start": "2026-03-10", "end": "2026-03-01"},
+        {"metrics": ["signups"], "granularity": "hour", "start": "2025-01-01", "end": "2026-01-01"},
+    ])
+    def test_rejects_bad_requests(self, db, kwargs):
+        with pytest.raises(ValueError):
+            get_timeseries(db, **kwargs)
@@ -0,0 +1,42 @@
+"""Tests for the startup and shutdown hooks in server.app."""
+import pytest
+from fastapi.testclient import TestClient
+
+from server import app as app_module
+from server.domain.storage import backends
+
+
+@pytest.fixture
+def app(route_db, monkeypatch):
+    async def init_router(agents):
+        return None
+
+    # Router warmup embeds every agent through the LLM API
+    monkeypatch.setattr(app_module, "init_router", init_router)
+    return app_module.app
+
+
+class TestLifecycle:
+    def test_startup_schedules_background_tasks(self, app):
+        with TestClient(app) as client:
+            assert client.get("/api/health").status_code == 200
+            assert not app.state.export_cleanup.done()
+            assert app.state.warmup is not None
+
+    def test_shutdown_cancels_background_tasks(self, app):
+        with TestClient(app):
+            task = app.state.export_cleanup
+        assert task.done()
+
+
+class TestDeleteStoredFile:
+    def test_local_file_and_served_siblings(self, tmp_path, monkeypatch):
+        local = backends.LocalStorageBackend(tmp_path)
+        monkeypatch.setattr(backends, "storage_backend", local)
+        local.write_bytes("storage/u1/a.pdb", b"ATOM")
+        local.write_bytes("storage/u1/a.pdb.gz", b"gz")
+
+        assert app_module._delete_stored_file("storage/u1/a.pdb")
+        assert not local.exists("storage/u1/a.pdb")
+        assert not local.exists("storage/u1/a.pdb.gz")
+        assert not app_module._delete_stored_file("storage/u1/a.pdb")
@@ -0,0 +1,129 @@
+"""Tests for server.domain.admin.audit_log module."""
+import contextlib
+import json
+import sqlite3
+import threading
+
+import pytest
+from server.domain.admin import audit_log
+from server.domain.admin.audit_log import AuditLogWriter
+from server.domain.admin.service import log_admin_action
+
+
+@pytest.fixture
+def db(route_db):
+    return route_db
+
+
+@pytest.fixture
+def writer():
+    w = AuditLogWriter(batch_size=50, flush_interval=0.05, queue_size=100, late_seconds=5.0)
+    yield w
+    w.stop()
+
+
+def _audit_rows(db):
+    return db.execute("SELECT * FROM admin_audit_log ORDER BY created_at, action_type").fetchall()
+
+
+class TestAuditLogWriter:
+    def test_flush_writes_batch(self, db, seed_user, writer):
+        for i in range(5):
+            assert writer.log(seed_user, f"view_{i}", "user", "target", {"page": i}, "127.0.0.1", "pytest")
+        assert writer.flush()
+
+        rows = _audit_rows(db)
+        assert len(rows) == 5
+        assert json.loads(rows[0]["details"]) == {"page": 0}
+        assert rows[0]["ip_address"] == "127.0.0.1"
+        assert rows[0]["created_at"] is not None
+        stats = writer.get_stats()
+        assert stats["enqueued"] == stats["written"] == 5
+        assert stats["dropped"] == stats["failed"] == 0
+        assert stats["queued"] == 0
+
+    def test_batches_by_size(self, db, seed_user):
+        w = AuditLogWriter(batch_size=3, flush_interval=0.2, queue_size=100)
+        try:
+            for i in range(7):
+                w.log(seed_user, "list_users")
+            assert w.flush()
+        finally:
+            w.stop()
+        assert w.get_stats()["written"] == 7
+        assert w.get_stats()["batches"] == 3
+
+    def test_full_queue_drops_entries(self, db, seed_user):
+        gate = threading.Event()
+
+        @contextlib.contextmanager
+        def blocked_db():
+            gate.wait(5)
+            with audit_log.get_db() as conn:
+                yield conn
+
+        w = AuditLogWriter(batch_size=1, flush_interval=0.01, queue_size=2, db_factory=blocked_db)
+        try:
+            results = [w.log(seed_user, "list_users") for _ in range(6)]
+            assert results.count(False) >= 3
+            assert w.get_stats()["dropped"] == results.count(False)
+        finally:
+            gate.set()
+            w.stop()
+        assert w.get_stats()["written"] == results.count(True)
+
+    def test_counts_late_entries(self, db, seed_user):
+        w = AuditLogWriter(batch_size=10, flush_interval=0.1, queue_size=10, late_seconds=0.0)
+        try:
+            w.log(seed_user, "list_users")
+            assert w.flush()
+        finally:
+            w.stop()
+        stats = w.get_stats()
+        assert stats["late"] == 1
+        assert stats["max_delay_ms"] > 0
+
+    def test_retries_then_counts_failures(self, seed_user):
+        calls = []
+        backoff = []
+
+        @contextlib.contextmanager
+        def broken_db():
+            calls.append(1)
+            raise sqlite3.OperationalError("database is locked")
+            yield
+
+        w = AuditLogWriter(
+            batch_size=10, flush_interval=0.01, queue_size=10, db_factory=broken_db, sleep=backoff.append
+        )
+        w.log(seed_user, "list_users")
+        w.log(seed_user, "view_user")
+        w.stop()
+        stats = w.get_stats()
+        assert len(calls) == audit_log.AUDIT_WRITE_ATTEMPTS
+        assert stats["retries"] == audit_log.AUDIT_WRITE_ATTEMPTS - 1
+        assert backoff == [0.05 * 2 ** i for i in range(audit_log.AUDIT_WRITE_ATTEMPTS - 1)]
+        assert stats["failed"] == 2
+        assert stats["written"] == 0
+
+    def test_stop_drains_queue(self, db, seed_user):
+        w = AuditLogWriter(batch_size=1000, flush_interval=60.0, queue_size=1000)
+        for _ in range(20):
+            w.log(seed_user, "list_users")
+        w.stop()
+        assert len(_audit_rows(db)) == 20
+        assert w.get_stats()["running"] is False
+
+
+class TestLogAdminAction:
+    def test_queues_instead_of_writing(self, db, seed_user, writer, monkeypatch):
+        from server.domain.admin import service
+
+        monkeypatch.setattr(service, "audit_log_writer", writer)
+        log_admin_action(seed_user, "view_user", "user", "test-user-002", {"reason": "support"})
+        assert writer.flush()
+
+        (row,) = _audit_rows(db)
+        assert row["admin_id"] == seed_user
+        assert row["target_id"] == "test-user-002"
+        assert json.loads(row["details"]) == {"reason": "support"}
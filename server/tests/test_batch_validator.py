@@ -0,0 +1,69 @@
+"""Tests for server.tools.validation.batch_validator module."""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from server.tools.validation.batch_validator import (
+    MAX_BATCH_SIZE,
+    rank_results,
+    stream_validate_structures,
+    validate_structures_batch,
+)
+from .conftest import make_backbone_pdb
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        yield pool
+
+
+@pytest.fixture
+def structures():
+    return [
+        ("low", make_backbone_pdb(bfactor=30.0)),
+        ("high", make_backbone_pdb(bfactor=95.0)),
+        ("broken", "not a pdb"),
+        ("mid", make_backbone_pdb(bfactor=65.0)),
+    ]
+
+
+class TestStreamValidateStructures:
+    @pytest.mark.asyncio
+    async def test_yields_one_result_per_structure(self, structures, executor):
+        results = [r async for r in stream_validate_structures(structures, executor=executor)]
+        assert sorted(r.index for r in results) == [0, 1, 2, 3]
+        by_name = {r.name: r for r in results}
+        assert by_name["high"].ok
+        assert not by_name["broken"].ok
+        assert by_name["broken"].error
+
+    @pytest.mark.asyncio
+    async def test_rejects_oversized_batch(self, executor):
+        too_many = [("s", "x")] * (MAX_BATCH_SIZE + 1)
+        with pytest.raises(ValueError):
+            async for _ in stream_validate_structures(too_many, executor=executor):
+                pass
+
+    @pytest.mark.asyncio
+    async def test_process_pool(self, structures):
+        from server.infrastructure.compute import shutdown_pools
+
+        try:
+            results = [r async for r in stream_validate_structures(structures[:2])]
+        finally:
+            shutdown_pools()
+        assert all(r.ok for r in results)
+
+
+class TestRankResults:
+    @pytest.mark.asyncio
+    async def test_ranked_best_first_with_failures_last(self, structures, executor):
+        batch = await validate_structures_batch(structures, executor=executor)
+        ranking = batch["ranking"]
+        assert [row["name"] for row in ranking] == ["high", "mid", "low", "broken"]
+        assert [row["rank"] for row in ranking] == [1, 2, 3, None]
+        assert ranking[0]["overall_score"] >= ranking[1]["overall_score"]
+        assert [r["index"] for r in batch["results"]] == [0, 1, 2, 3]
+
+    def test_empty(self):
+        assert rank_results([]) == []
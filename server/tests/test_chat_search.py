@@ -0,0 +1,95 @@
+"""Tests for server.domain.chat.search module."""
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from server.api.routes.chat_sessions import search_sessions
+from server.domain.chat.search import build_match_query, rebuild_index, search_messages
+
+
+@pytest.fixture
+def db(route_db):
+    return route_db
+
+
+@pytest.fixture
+def insert_message(db, seed_user, other_user):
+    db.execute("INSERT INTO chat_sessions (id, user_id) VALUES ('s1', ?)", (seed_user,))
+    db.execute("INSERT INTO chat_sessions (id, user_id) VALUES ('s2', ?)", (other_user,))
+
+    def _insert(message_id, content, session_id="s1", user_id=None, message_type="user"):
+        db.execute(
+            """INSERT INTO chat_messages (id, session_id, user_id, sender_id, content, message_type, role)
+               VALUES (?, ?, ?, ?, ?, ?, 'user')""",
+            (message_id, session_id, user_id or seed_user, user_id or seed_user, content, message_type),
+        )
+        db.commit()
+    return _insert
+
+
+@pytest.fixture
+def messages(insert_message, other_user):
+    insert_message("m1", "Fold this sequence with AlphaFold please")
+    insert_message("m2", "AlphaFold AlphaFold: the alphafold job finished", message_type="ai")
+    insert_message("m3", "Run ProteinMPNN on chain A")
+    insert_message("m4", "AlphaFold for someone else", session_id="s2", user_id=other_user)
+
+
+class TestMatchQuery:
+    def test_quotes_terms_and_prefixes_last(self):
+        assert build_match_query("alpha fold") == '"alpha" "fold"*'
+        assert build_match_query('NEAR(a b) OR "x') == '"NEAR" "a" "b" "OR" "x"*'
+        assert build_match_query("  ?! ") is None
+
+
+class TestSearchMessages:
+    def test_ranked_and_highlighted(self, db, messages):
+        results, next_cursor = search_messages(db, "alphafold")
+        assert [r["id"] for r in results] == ["m2", "m4", "m1"]
+        assert next_cursor is None
+        assert "<mark>AlphaFold</mark>" in results[2]["snippet"]
+        assert results[0]["score"] <= results[1]["score"]
+        assert results[0]["sender_username"] == "testuser"
+
+    def test_prefix_and_filters(self, db, messages, seed_user):
+        assert [r["id"] for r in search_messages(db, "protein")[0]] == ["m3"]
+        scoped, _ = search_messages(db, "alphafold", user_id=seed_user, message_type="user")
+        assert [r["id"] for r in scoped] == ["m1"]
+
+    def test_cursor_pages(self, db, messages):
+        first, cursor = search_messages(db, "alphafold", limit=2)
+        second, last = search_messages(db, "alphafold", limit=2, cursor=cursor)
+        assert [r["id"] for r in first + second] == ["m2", "m4", "m1"]
+        assert last is None
+        with pytest.raises(HTTPException):
+            search_messages(db, "alphafold", cursor="not-a-cursor")
+
+    def test_index_follows_updates_and_deletes(self, db, messages):
+        db.execute("UPDATE chat_messages SET content = 'Run RFdiffusion' WHERE id = 'm3'")
+        db.execute("DELETE FROM chat_messages WHERE id = 'm1'")
+        db.commit()
+        assert search_messages(db, "proteinmpnn")[0] == []
+        assert [r["id"] for r in search_messages(db, "rfdiffusion")[0]] == ["m3"]
+        assert "m1" not in [r["id"] for r in search_messages(db, "alphafold")[0]]
+        rebuild_index(db)
+        assert [r["id"] for r in search_messages(db, "rfdiffusion")[0]] == ["m3"]
+
+    def test_snippet_is_html_escaped(self, db, insert_message):
+        insert_message("m5", "<script>alphafold</script>")
+        snippet = search_messages(db, "alphafold")[0][0]["snippet"]
+        assert snippet == "&lt;script&gt;<mark>alphafold</mark>&lt;/script&gt;"
+
+    def test_like_fallback_without_index(self, db, messages):
+        db.execute("DROP TABLE chat_messages_fts")
+        for trigger in ("insert", "update", "delete"):
+            db.execute(f"DROP TRIGGER chat_messages_fts_{trigger}")
+        results, _ = search_messages(db, "alphafold job")
+        assert [r["id"] for r in results] == ["m2"]
+
+
+class TestUserSearchRoute:
+    def test_scoped_to_own_messages(self, db, messages, seed_user):
+        response = asyncio.run(search_sessions(q="alphafold", session_id=None, cursor=None, limit=20,
+                                               user={"id": seed_user}))
+        assert [r["message_id"] for r in response["results"]] == ["m2", "m1"]
+        assert response["has_more"] is False
@@ -0,0 +1,110 @@
+"""Tests for server.infrastructure.compute module."""
+import asyncio
+import time
+
+import pytest
+from server.infrastructure.compute import (
+    ComputeCancelledError,
+    ComputeExecutor,
+    ComputeTimeoutError,
+)
+
+
+@pytest.fixture
+def executor():
+    ex = ComputeExecutor(thread_workers=1, process_workers=1, default_timeout=5)
+    yield ex
+    ex.shutdown()
+
+
+def _add(a, b):
+    return a + b
+
+
+class TestComputeExecutor:
+    @pytest.mark.asyncio
+    async def test_thread_task_result_and_stats(self, executor):
+        assert await executor.run(_add, 2, 3, label="add") == 5
+        stats = executor.get_stats()["tasks"]["add"]
+        assert stats["count"] == 1
+        assert stats["errors"] == 0
+
+    @pytest.mark.asyncio
+    async def test_process_task(self, executor):
+        assert await executor.run(_add, 1, 1, kind="process") == 2
+
+    @pytest.mark.asyncio
+    async def test_errors_propagate_and_are_counted(self, executor):
+        with pytest.raises(ZeroDivisionError):
+            await executor.run(lambda: 1 / 0, label="boom")
+        assert executor.get_stats()["tasks"]["boom"]["errors"] == 1
+
+    @pytest.mark.asyncio
+    async def test_timeout(self, executor):
+        with pytest.raises(ComputeTimeoutError):
+            await executor.run(time.sleep, 0.5, label="slow", timeout=0.05)
+        assert executor.get_stats()["tasks"]["slow"]["timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancel_on_disconnect(self, executor):
+        async def disconnected():
+            return True
+
+        with pytest.raises(ComputeCancelledError):
+            await executor.run(time.sleep, 1.0, label="gone", is_disconnected=disconnected)
+        assert executor.get_stats()["tasks"]["gone"]["cancelled"] == 1
+
+    @pytest.mark.asyncio
+    async def test_queue_wait_is_measured(self, executor):
+        await asyncio.gather(
+            executor.run(time.sleep, 0.1, label="sleep"),
+            executor.run(time.sleep, 0.1, label="sleep"),
+        )
+        stats = executor.get_stats()["tasks"]["sleep"]
+        assert stats["count"] == 2
+        # Single worker: the second task must have queued behind the first
+        assert stats["max_wait_ms"] >= 50
+
+    @pytest.mark.asyncio
+    async def test_timeout_starts_when_task_runs(self, executor):
+        # The second task queues behind the first for longer than its timeout
+        results = await asyncio.gather(
+            executor.run(time.sleep, 0.3, label="first", timeout=1),
+            executor.run(_add, 1, 2, label="queued", timeout=0.1),
+        )
+        assert results == [None, 3]
+        assert executor.get_stats()["tasks"]["queued"]["timeouts"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelling_caller_drops_queued_tasks(self, executor):
+        ran = []
+
+        def record(i):
+            ran.append(i)
+
+        blocker = asyncio.ensure_future(executor.run(time.sleep, 0.2, label="blocker"))
+        waiting = [asyncio.ensure_future(executor.run(record, i, label="queued")) for i in range(3)]
+        await asyncio.sleep(0.05)
+        assert executor.in_flight()["thread"] == 4
+        for task in waiting:
+            task.cancel()
+        await asyncio.gather(*waiting, return_exceptions=True)
+        await blocker
+
+        assert ran == []
+        assert executor.get_stats()["tasks"]["queued"]["cancelled"] == 3
+        assert executor.in_flight()["thread"] == 0
+
+    @pytest.mark.asyncio
+    async def test_abandoned_task_stays_in_flight(self, executor):
+        with pytest.raises(ComputeTimeoutError):
+            await executor.run(time.sleep, 0.3, label="slow", timeout=0.05)
+        # The worker is still busy with the abandoned task
+        assert executor.in_flight()["thread"] == 1
+        await asyncio.sleep(0.4)
+        assert executor.in_flight()["thread"] == 0
+
+    @pytest.mark.asyncio
+    async def test_unknown_kind(self, executor):
+        with pytest.raises(ValueError):
+            await executor.run(_add, 1, 2, kind="gpu")
@@ -0,0 +1,89 @@
+"""Tests for server.agents.context_assembler module."""
+from server.agents import context_assembler as ca
+from server.agents.context_assembler import (
+    ContextAssembler,
+    ContextSection,
+    count_tokens,
+    fit_history,
+    truncate_tokens,
+)
+from server.infrastructure.utils import trim_history
+
+
+class TestTokens:
+    def test_count_and_truncate(self):
+        text = "alpha beta gamma delta epsilon"
+        assert count_tokens(text) == 9
+        assert count_tokens("") == 0
+        assert truncate_tokens(text, 100) == text
+        head = truncate_tokens(text, 4)
+        assert head == "alpha beta..."
+        assert count_tokens(head) <= 4
+        assert truncate_tokens(text, 4, keep="tail") == "...epsilon"
+
+    def test_count_cache_is_bounded_and_keeps_no_text(self, monkeypatch):
+        monkeypatch.setattr(ca, "TOKEN_COUNT_CACHE_SIZE", 2)
+        monkeypatch.setattr(ca, "_token_counts", ca.OrderedDict())
+        big = "word " * 100_000
+        assert count_tokens(big) == 100_000
+        assert count_tokens("a b") == count_tokens("c d") == 2
+        assert len(ca._token_counts) == 2
+        assert all(len(key) == 16 and isinstance(n, int) for key, n in ca._token_counts.items())
+        assert truncate_tokens(big, 3) == "word word..."
+
+    def test_context_budget_uses_model_window(self, monkeypatch):
+        monkeypatch.setattr(ca, "CONTEXT_MAX_TOKENS", 6000)
+        assert ca.context_budget("meta-llama/llama-3-8b-instruct") == 2048
+        assert ca.context_budget("anthropic/claude-3.5-sonnet") == 6000
+        assert ca.context_budget("unknown/model") == 6000
+
+
+class TestContextAssembler:
+    def _sections(self, code="x " * 200):
+        return [
+            ContextSection("structure", "StructureContext: PDB 1ABC. Chains: A(120).", priority=1),
+            ContextSection("code", code, priority=2, min_tokens=8),
+            ContextSection("history", "Recent AlphaFold2 prediction: model.pdb", priority=4),
+            ContextSection("selection", "Context: ALA12 (Chain A)", priority=0),
+        ]
+
+    def test_everything_fits_in_declared_order(self):
+        result = ContextAssembler().assemble(self._sections(code="const x = 1;"), budget=1000)
+        assert result.text.startswith("StructureContext")
+        assert result.text.endswith("ALA12 (Chain A)")
+        assert result.dropped == [] and result.truncated == []
+        assert result.tokens <= 1000
+
+    def test_low_priority_truncated_then_dropped(self):
+        result = ContextAssembler().assemble(self._sections(), budget=60)
+        assert result.truncated == ["code"]
+        assert result.dropped == ["history"]
+        assert "ALA12" in result.text and "StructureContext" in result.text
+        assert count_tokens(result.text) <= 60
+
+    def test_session_cache_reuses_rendering(self):
+        assembler = ContextAssembler()
+        first = assembler.assemble(self._sections(), budget=60, session_key="s1")
+        second = assembler.assemble(self._sections(), budget=60, session_key="s1")
+        assert not first.cached and second.cached
+        assert second.text == first.text
+        changed = assembler.assemble(self._sections(code="y"), budget=60, session_key="s1")
+        assert not changed.cached and "y" in changed.text
+
+    def test_session_cache_is_bounded(self):
+        assembler = ContextAssembler(session_cache_size=2)
+        for key in ("a", "b", "c"):
+            assembler.assemble(self._sections(), budget=60, session_key=key)
+        assert not assembler.assemble(self._sections(), budget=60, session_key="a").cached
+
+
+class TestHistory:
+    def test_fit_history_keeps_most_recent(self):
+        messages = [{"role": "user", "content": "word " * 50}, {"role": "assistant", "content": "ok"}, {"role": "user", "content": "next"}]
+        assert fit_history(messages, 20) == messages[1:]
+        assert fit_history(messages, 0) == []
+
+    def test_trim_history_enforces_char_cap(self):
+        history = [{"type": "user", "content": "a" * 100} for _ in range(5)]
+        assert len(trim_history(history, max_turns=4, max_chars=300)) == 2
+        assert len(trim_history(history, max_chars=10)) == 1
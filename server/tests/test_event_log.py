@@ -0,0 +1,95 @@
+"""Tests for server.infrastructure.event_log module."""
+import json
+import logging
+import random
+
+from server.infrastructure.event_log import (
+    EventFilter,
+    EventLogger,
+    LazyJson,
+    _parse_rates,
+    render_payload,
+)
+
+
+class _Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record):
+        self.lines.append(self.format(record))
+
+
+def _logger(**filter_kwargs):
+    handler = _Collect()
+    return EventLogger(EventFilter(**filter_kwargs), enabled=True, max_chars=50, handler=handler), handler
+
+
+class TestEventFilter:
+    def test_level(self):
+        f = EventFilter("info")
+        assert f.accept("a", logging.INFO)
+        assert not f.accept("a", logging.DEBUG)
+
+    def test_sections_and_exclude(self):
+        f = EventFilter("debug", sections=["runner:*", "files"], exclude=["runner:stream:*"])
+        assert f.accept("runner:thinking", logging.INFO)
+        assert f.accept("files", logging.INFO)
+        assert not f.accept("other", logging.INFO)
+        assert not f.accept("runner:stream:content", logging.INFO)
+
+    def test_sampling(self):
+        random.seed(0)
+        f = EventFilter("debug", sample_rates=_parse_rates("hot=0.1, off=0, bad=x"))
+        kept = sum(f.accept("hot", logging.INFO) for _ in range(2000))
+        assert 100 < kept < 300
+        assert not any(f.accept("off", logging.INFO) for _ in range(100))
+        assert f.accept("bad", logging.INFO)
+
+
+class TestEventLogger:
+    def test_renders_on_listener_with_cap(self):
+        logger, handler = _logger()
+        logger.log("section", {"text": "x" * 200})
+        logger.log("plain", "hello")
+        logger.flush()
+        logger.stop()
+        assert handler.lines[0].startswith("[section] ")
+        assert handler.lines[0].endswith("... [truncated]")
+        assert handler.lines[1].endswith(" hello")
+
+    def test_lazy_payload_only_built_when_kept(self):
+        logger, handler = _logger(level="info")
+        calls = []
+
+        def build():
+            calls.append(1)
+            return {"n": 1}
+
+        logger.log("debug_only", build, level="debug")
+        logger.log("kept", build)
+        logger.flush()
+        logger.stop()
+        assert calls == [1]
+        assert handler.lines[0].endswith('{"n": 1}')
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        logger = EventLogger(EventFilter("debug"), enabled=True, queue_size=2, handler=_Collect())
+        logger._listener = object()  # pretend started so nothing drains the queue
+        for i in range(5):
+            logger.log("s", {"i": i})
+        assert logger.stats() == {"accepted": 5, "dropped": 3, "queued": 2}
+
+    def test_disabled(self):
+        logger, handler = _logger()
+        logger.enabled = False
+        logger.log("s", {"a": 1})
+        assert logger.stats()["accepted"] == 0
+
+
+class TestRendering:
+    def test_render_payload_and_lazy_json(self):
+        assert json.loads(render_payload({"a": [1, 2]})) == {"a": [1, 2]}
+        assert render_payload("x" * 20, max_chars=5) == "xxxxx... [truncated]"
+        assert str(LazyJson({"pdb": "ATOM" * 10}, max_chars=10)).endswith("[truncated]")
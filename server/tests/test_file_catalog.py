@@ -0,0 +1,113 @@
+"""Tests for server.domain.storage.file_catalog module."""
+import json
+
+import pytest
+from fastapi import HTTPException
+from server.domain.storage.backends import LocalStorageBackend
+from server.domain.storage.file_catalog import (
+    iter_user_files_ndjson,
+    query_user_files,
+    reconcile_file_batch,
+)
+
+
+@pytest.fixture
+def db(route_db):
+    return route_db
+
+
+@pytest.fixture
+def insert_file(db, seed_user):
+    def _insert(file_id, file_type="upload", created_at="2026-01-01 00:00:00", job_id=None, size=10,
+                stored_path=None, user_id=None):
+        db.execute(
+            """INSERT INTO user_files
+               (id, user_id, file_type, original_filename, stored_path, size, metadata, job_id, created_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (file_id, user_id or seed_user, file_type, f"{file_id}.pdb", stored_path or f"files/{file_id}.pdb",
+             size, json.dumps({"chains": ["A"]}), job_id, created_at),
+        )
+        db.commit()
+        return file_id
+    return _insert
+
+
+@pytest.fixture
+def catalog(insert_file):
+    insert_file("f1", created_at="2026-01-01 10:00:00")
+    insert_file("f2", file_type="rfdiffusion", job_id="job-1", created_at="2026-01-02 10:00:00")
+    insert_file("f3", file_type="proteinmpnn", job_id="job-1", created_at="2026-01-03 10:00:00")
+    insert_file("f4", file_type="openfold2", created_at="2026-01-03 10:00:00")
+
+
+class TestQueryUserFiles:
+    def test_newest_first_with_download_urls(self, db, catalog, seed_user):
+        files, next_cursor = query_user_files(db, seed_user)
+        assert [f["file_id"] for f in files] == ["f4", "f3", "f2", "f1"]
+        assert next_cursor is None
+        urls = {f["file_id"]: f["download_url"] for f in files}
+        assert urls["f1"] == "/api/upload/pdb/f1"
+        assert urls["f2"] == "/api/files/f2/download"
+        assert urls["f3"] == "/api/proteinmpnn/result/f3"
+        assert files[0]["metadata"] == {"chains": ["A"]}
+
+    def test_filters(self, db, catalog, seed_user):
+        assert [f["file_id"] for f in query_user_files(db, seed_user, file_type="rfdiffusion")[0]] == ["f2"]
+        assert [f["file_id"] for f in query_user_files(db, seed_user, job_id="job-1")[0]] == ["f3", "f2"]
+        dated, _ = query_user_files(db, seed_user, created_after="2026-01-02", created_before="2026-01-03T00:00:00Z")
+        assert [f["file_id"] for f in dated] == ["f2"]
+
+    def test_cursor_pages(self, db, catalog, seed_user):
+        seen, cursor = [], None
+        while True:
+            page, cursor = query_user_files(db, seed_user, limit=3, cursor=cursor)
+            seen += [f["file_id"] for f in page]
+            if cursor is None:
+                break
+        assert seen == ["f4", "f3", "f2", "f1"]
+
+    def test_scoped_to_user_and_hides_missing(self, db, catalog, seed_user, other_user, insert_file):
+        insert_file("theirs", user_id=other_user)
+        db.execute("UPDATE user_files SET missing_at = CURRENT_TIMESTAMP WHERE id = 'f1'")
+        ids = [f["file_id"] for f in query_user_files(db, seed_user)[0]]
+        assert ids == ["f4", "f3", "f2"]
+
+    def test_bad_cursor(self, db, seed_user):
+        with pytest.raises(HTTPException) as exc:
+            query_user_files(db, seed_user, limit=2, cursor="nope")
+        assert exc.value.status_code == 400
+
+
+class TestNdjson:
+    def test_streams_all_rows_in_batches(self, catalog, seed_user):
+        lines = list(iter_user_files_ndjson(seed_user, batch_size=1, file_type=None, job_id="job-1"))
+        assert [json.loads(line)["file_id"] for line in lines] == ["f3", "f2"]
+
+    def test_bad_cursor_rejected_before_streaming(self, seed_user):
+        with pytest.raises(HTTPException):
+            iter_user_files_ndjson(seed_user, cursor="nope")
+
+
+class TestReconcileFileBatch:
+    def test_marks_missing_and_backfills_size(self, db, insert_file, tmp_path):
+        (tmp_path / "files").mkdir()
+        (tmp_path / "files" / "present.pdb").write_text("ATOM\n")
+        insert_file("present", size=0)
+        insert_file("gone")
+
+        last_id, changed = reconcile_file_batch(backend=LocalStorageBackend(tmp_path))
+        assert (last_id, changed) == (None, 2)
+        rows = {r["id"]: r for r in db.execute("SELECT id, size, missing_at FROM user_files")}
+        assert rows["present"]["size"] == 5 and rows["present"]["missing_at"] is None
+        assert rows["gone"]["missing_at"] is not None
+
+        assert reconcile_file_batch(backend=LocalStorageBackend(tmp_path)) == (None, 0)
+        (tmp_path / "files" / "gone.pdb").write_text("ATOM\n")
+        reconcile_file_batch(backend=LocalStorageBackend(tmp_path))
+        assert db.execute("SELECT missing_at FROM user_files WHERE id = 'gone'").fetchone()[0] is None
+
+    def test_batches_by_id(self, insert_file, tmp_path):
+        for i in range(3):
+            insert_file(f"f{i}")
+        assert reconcile_file_batch(batch_size=2, backend=LocalStorageBackend(tmp_path))[0] == "f1"
+        assert reconcile_file_batch("f1", batch_size=2, backend=LocalStorageBackend(tmp_path))[0] is None
@@ -0,0 +1,157 @@
+"""Tests for server.infrastructure.file_serving module."""
+import gzip
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from server.infrastructure import file_serving as fs
+from server.infrastructure.file_serving import (
+    build_precompressed,
+    etag_matches,
+    parse_range,
+    serve_file,
+    variant_path,
+)
+
+PDB_TEXT = "ATOM      1  N   ALA A   1      11.104   6.134  -6.504  1.00 90.00           N\n" * 200
+
+
+@pytest.fixture
+def pdb_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(fs, "PRECOMPRESS_MIN_BYTES", 1024)
+    fs.etag_cache.clear()
+    path = tmp_path / "model.pdb"
+    path.write_text(PDB_TEXT)
+    return path
+
+
+@pytest.fixture
+def client(pdb_file):
+    app = FastAPI()
+
+    @app.get("/file")
+    async def get_file(request: Request):
+        return await serve_file(request, pdb_file, media_type="chemical/x-pdb", filename="model.pdb")
+
+    return TestClient(app)
+
+
+IDENTITY = {"accept-encoding": "identity"}
+
+
+class TestParseRange:
+    def test_forms(self):
+        assert parse_range("bytes=0-9", 100) == (0, 9)
+        assert parse_range("bytes=90-", 100) == (90, 99)
+        assert parse_range("bytes=-10", 100) == (90, 99)
+        assert parse_range("bytes=50-500", 100) == (50, 99)
+
+    def test_served_in_full(self):
+        assert parse_range(None, 100) is None
+        assert parse_range("bytes=0-1,5-6", 100) is None
+        assert parse_range("items=0-1", 100) is None
+
+    def test_unsatisfiable(self):
+        with pytest.raises(ValueError):
+            parse_range("bytes=100-", 100)
+        with pytest.raises(ValueError):
+            parse_range("bytes=5-2", 100)
+
+
+class TestEtagMatches:
+    def test_lists_weak_and_variants(self):
+        assert etag_matches('"abc"', '"abc"')
+        assert etag_matches('W/"abc", "zzz"', '"abc"')
+        assert etag_matches('"abc-gzip"', '"abc"')
+        assert etag_matches("*", '"abc"')
+        assert not etag_matches('"abd"', '"abc"')
+        assert not etag_matches(None, '"abc"')
+
+
+class TestServeFile:
+    def test_full_response_with_content_etag(self, client, pdb_file):
+        response = client.get("/file", headers=IDENTITY)
+        assert response.status_code == 200
+        assert response.text == PDB_TEXT
+        assert response.headers["accept-ranges"] == "bytes"
+        etag = response.headers["etag"]
+
+        pdb_file.write_text(PDB_TEXT)  # same bytes, new mtime
+        assert client.get("/file", headers=IDENTITY).headers["etag"] == etag
+
+    def test_if_none_match_returns_304(self, client):
+        etag = client.get("/file", headers=IDENTITY).headers["etag"]
+        response = client.get("/file", headers={"if-none-match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_range(self, client):
+        response = client.get("/file", headers={"range": "bytes=10-19"})
+        assert response.status_code == 206
+        assert response.headers["content-range"] == f"bytes 10-19/{len(PDB_TEXT)}"
+        assert response.content == PDB_TEXT.encode()[10:20]
+
+    def test_stale_if_range_gets_full_body(self, client):
+        response = client.get("/file", headers={"range": "bytes=0-9", "if-range": '"old"', **IDENTITY})
+        assert response.status_code == 200
+        assert len(response.content) == len(PDB_TEXT)
+
+    def test_unsatisfiable_range(self, client):
+        response = client.get("/file", headers={"range": f"bytes={len(PDB_TEXT)}-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == f"bytes */{len(PDB_TEXT)}"
+
+    def test_precompressed_variant_built_then_served(self, client, pdb_file):
+        client.get("/file", headers=IDENTITY)
+        gz_path = variant_path(pdb_file, ".gz")
+        assert gz_path.exists()
+        assert gzip.decompress(gz_path.read_bytes()).decode() == PDB_TEXT
+
+        response = client.get("/file", headers={"accept-encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["etag"].endswith('-gzip"')
+        assert response.text == PDB_TEXT
+
+    def test_stale_variant_ignored(self, client, pdb_file):
+        build_precompressed(pdb_file)
+        pdb_file.write_text("ATOM changed\n" * 200)
+        response = client.get("/file", headers={"accept-encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        assert response.text.startswith("ATOM changed")
+
+
+class TestStoredCompressed:
+    def test_gzip_result_sent_encoded_or_decompressed(self, tmp_path):
+        path = tmp_path / "model.pdb.gz"
+        path.write_bytes(gzip.compress(PDB_TEXT.encode()))
+        app = FastAPI()
+
+        @app.get("/file")
+        async def get_file(request: Request):
+            return await serve_file(request, path, media_type="chemical/x-pdb", filename="model.pdb")
+
+        client = TestClient(app)
+        encoded = client.get("/file", headers={"accept-encoding": "gzip"})
+        assert encoded.headers["content-encoding"] == "gzip"
+        assert encoded.text == PDB_TEXT
+
+        plain = client.get("/file", headers=IDENTITY)
+        assert "content-encoding" not in plain.headers
+        assert plain.text == PDB_TEXT
+
+    def test_encoded_and_decoded_bodies_have_distinct_etags(self, tmp_path):
+        path = tmp_path / "model.pdb.gz"
+        path.write_bytes(gzip.compress(PDB_TEXT.encode()))
+        app = FastAPI()
+
+        @app.get("/file")
+        async def get_file(request: Request):
+            return await serve_file(request, path, media_type="chemical/x-pdb")
+
+        client = TestClient(app)
+        encoded = client.get("/file", headers={"accept-encoding": "gzip"}).headers["etag"]
+        plain = client.get("/file", headers=IDENTITY).headers["etag"]
+        assert encoded == '"%s-gzip"' % plain.strip('"')
+        revalidated = client.get("/file", headers={"accept-encoding": "gzip", "if-none-match": encoded})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["etag"] == encoded
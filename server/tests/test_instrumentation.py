@@ -0,0 +1,147 @@
+"""Tests for server.infrastructure.instrumentation module."""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from server.api.middleware.instrumentation import (
+    REQUEST_SECONDS,
+    REQUESTS_IN_FLIGHT,
+    RequestMetricsMiddleware,
+)
+from server.infrastructure.instrumentation import (
+    DB_QUERY_SECONDS,
+    SPAN_SECONDS,
+    MetricsRegistry,
+    span,
+    timed,
+)
+
+
+def _count(histogram, **labels):
+    snapshot = histogram.snapshot(**labels)
+    return snapshot["count"] if snapshot else 0
+
+
+class TestRegistry:
+    def test_histogram_renders_cumulative_buckets(self):
+        registry = MetricsRegistry()
+        latency = registry.histogram("test_latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            latency.observe(value, route="/a")
+
+        lines = registry.render().splitlines()
+        assert lines[:2] == ["# HELP test_latency_seconds Latency.", "# TYPE test_latency_seconds histogram"]
+        assert 'test_latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+        assert 'test_latency_seconds_bucket{route="/a",le="1"} 3' in lines
+        assert 'test_latency_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+        assert 'test_latency_seconds_sum{route="/a"} 4.25' in lines
+        assert 'test_latency_seconds_count{route="/a"} 4' in lines
+
+    def test_counter_gauge_and_label_escaping(self):
+        registry = MetricsRegistry()
+        errors = registry.counter("test_errors_total", "Errors.", ("kind",))
+        depth = registry.gauge("test_depth", "Depth.")
+        errors.inc(kind='say "hi"\n')
+        errors.inc(2, kind='say "hi"\n')
+        depth.inc()
+        depth.inc()
+        depth.dec()
+
+        text = registry.render()
+        assert 'test_errors_total{kind="say \\"hi\\"\\n"} 3' in text
+        assert "test_depth 1" in text
+
+    def test_rejects_wrong_labels_and_kind_clash(self):
+        registry = MetricsRegistry()
+        latency = registry.histogram("test_seconds", "Latency.", ("route",))
+        with pytest.raises(ValueError):
+            latency.observe(1.0, path="/a")
+        with pytest.raises(ValueError):
+            registry.counter("test_seconds", "Clash.")
+        assert registry.histogram("test_seconds", "Latency.", ("route",)) is latency
+
+    def test_collectors_run_before_render(self):
+        registry = MetricsRegistry()
+        depth = registry.gauge("test_queue_depth", "Depth.")
+        registry.add_collector(lambda: depth.set(7))
+        registry.add_collector(lambda: 1 / 0)
+        assert "test_queue_depth 7" in registry.render()
+
+
+class TestSpans:
+    def test_records_outcome(self):
+        ok_before = _count(SPAN_SECONDS, span="test.block", outcome="ok")
+        err_before = _count(SPAN_SECONDS, span="test.block", outcome="error")
+        with span("test.block"):
+            pass
+        with pytest.raises(RuntimeError):
+            with span("test.block"):
+                raise RuntimeError("boom")
+        assert _count(SPAN_SECONDS, span="test.block", outcome="ok") == ok_before + 1
+        assert _count(SPAN_SECONDS, span="test.block", outcome="error") == err_before + 1
+
+    async def test_timed_async_function(self):
+        @timed("test.async")
+        async def work(x):
+            async with span("test.inner"):
+                return x * 2
+
+        before = _count(SPAN_SECONDS, span="test.async", outcome="ok")
+        assert await work(3) == 6
+        assert work.__name__ == "work"
+        assert _count(SPAN_SECONDS, span="test.async", outcome="ok") == before + 1
+        assert _count(SPAN_SECONDS, span="test.inner", outcome="ok") >= 1
+
+
+class TestDbQueries:
+    def test_get_db_times_statements(self, route_db):
+        from server.database.db import get_db
+
+        before = _count(DB_QUERY_SECONDS, operation="select")
+        inserts = _count(DB_QUERY_SECONDS, operation="insert")
+        with get_db() as conn:
+            conn.execute("SELECT 1").fetchone()
+            conn.executemany(
+                "INSERT INTO users (id, username) VALUES (?, ?)", [("u-1", "one"), ("u-2", "two")]
+            )
+        assert _count(DB_QUERY_SECONDS, operation="select") == before + 1
+        assert _count(DB_QUERY_SECONDS, operation="insert") == inserts + 1
+
+
+class TestRequestMetricsMiddleware:
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+        app.add_middleware(RequestMetricsMiddleware)
+
+        @app.get("/items/{item_id}")
+        def get_item(item_id: str):
+            assert REQUESTS_IN_FLIGHT.value(method="GET", route="/items/{item_id}") == 1
+            return {"id": item_id}
+
+        @app.get("/broken")
+        def broken():
+            raise RuntimeError("boom")
+
+        return TestClient(app, raise_server_exceptions=False)
+
+    def test_labels_by_route_template(self, client):
+        labels = {"method": "GET", "route": "/items/{item_id}", "status": "200"}
+        before = _count(REQUEST_SECONDS, **labels)
+        assert client.get("/items/1").status_code == 200
+        assert client.get("/items/2").status_code == 200
+        assert _count(REQUEST_SECONDS, **labels) == before + 2
+        assert REQUESTS_IN_FLIGHT.value(method="GET", route="/items/{item_id}") == 0
+
+    def test_unmatched_and_errors(self, client):
+        unmatched = {"method": "GET", "route": "unmatched", "status": "404"}
+        failed = {"method": "GET", "route": "/broken", "status": "500"}
+        not_allowed = {"method": "POST", "route": "/broken", "status": "405"}
+        counts = [_count(REQUEST_SECONDS, **labels) for labels in (unmatched, failed, not_allowed)]
+
+        assert client.get("/scanner/probe.php").status_code == 404
+        assert client.get("/broken").status_code == 500
+        assert client.post("/broken").status_code == 405
+        assert [_count(REQUEST_SECONDS, **labels) for labels in (unmatched, failed, not_allowed)] == [
+            n + 1 for n in counts
+        ]
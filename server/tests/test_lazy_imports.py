@@ -0,0 +1,67 @@
+"""Tests for server.infrastructure.lazy_imports module."""
+import sys
+
+import pytest
+from server.infrastructure.langsmith_config import traceable
+from server.infrastructure.lazy_imports import lazy_attribute, lazy_module
+
+
+@pytest.fixture
+def fake_module(tmp_path, monkeypatch):
+    (tmp_path / "lazy_target_mod.py").write_text(
+        "class Handler:\n    def __init__(self):\n        self.jobs = {}\n\nhandler = Handler()\nVALUE = 42\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "lazy_target_mod"
+    sys.modules.pop("lazy_target_mod", None)
+
+
+class TestLazyModule:
+    def test_imports_on_first_attribute(self, fake_module):
+        module = lazy_module(fake_module)
+        assert fake_module not in sys.modules
+        assert not module.is_loaded
+        assert module.VALUE == 42
+        assert module.is_loaded
+        assert fake_module in sys.modules
+
+    def test_missing_module_fails_on_use(self):
+        module = lazy_module("no_such_module_xyz")
+        with pytest.raises(ImportError):
+            module.anything
+
+
+class TestLazyAttribute:
+    def test_forwards_to_object(self, fake_module):
+        handler = lazy_attribute(fake_module, "handler")
+        assert fake_module not in sys.modules
+        handler.jobs["job-1"] = "queued"
+        handler.extra = True
+        real = sys.modules[fake_module].handler
+        assert real.jobs == {"job-1": "queued"}
+        assert real.extra is True
+
+
+class TestLazyTraceable:
+    async def test_async_function(self):
+        @traceable(name="Add", run_type="chain")
+        async def add(a, b):
+            return a + b
+
+        assert add.__name__ == "add"
+        assert await add(1, 2) == 3
+
+    async def test_async_generator(self):
+        @traceable(name="Count", run_type="chain")
+        async def count(n):
+            for i in range(n):
+                yield i
+
+        assert [i async for i in count(3)] == [0, 1, 2]
+
+    def test_sync_function_and_bare_decorator(self):
+        @traceable
+        def double(x):
+            return x * 2
+
+        assert double(4) == 8
@@ -0,0 +1,75 @@
+"""Tests for server.infrastructure.llm_cache module."""
+from server.infrastructure import llm_cache
+from server.infrastructure.llm_cache import LLMResponseCache
+
+
+def _messages(text, system="You write titles."):
+    return [{"role": "system", "content": system}, {"role": "user", "content": text}]
+
+
+class TestLLMResponseCache:
+    def test_hit_after_put_with_normalized_whitespace(self):
+        cache = LLMResponseCache()
+        assert cache.get("m", _messages("Title for  this chat"), 0, 30) is None
+        cache.put("m", _messages("Title for this chat"), 0, "Chat", 30)
+        assert cache.get("m", _messages(" Title for\nthis chat "), 0, 30) == "Chat"
+        stats = cache.get_stats()
+        assert (stats["hits"], stats["misses"], stats["stores"]) == (1, 1, 1)
+        assert stats["hit_rate"] == 0.5
+
+    def test_key_includes_model_temperature_and_max_tokens(self):
+        cache = LLMResponseCache()
+        cache.put("m", _messages("x"), 0, "value", 30)
+        assert cache.get("other", _messages("x"), 0, 30) is None
+        assert cache.get("m", _messages("x"), 0.2, 30) is None
+        assert cache.get("m", _messages("x"), 0, 60) is None
+        assert cache.get("m", _messages("x", system="other"), 0, 30) is None
+
+    def test_ttl_expiry(self, monkeypatch):
+        now = [100.0]
+        monkeypatch.setattr(llm_cache.time, "monotonic", lambda: now[0])
+        cache = LLMResponseCache(ttl_seconds=10)
+        cache.put("m", _messages("x"), 0, "value")
+        now[0] += 11
+        assert cache.get("m", _messages("x"), 0) is None
+        stats = cache.get_stats()
+        assert stats["expired"] == 1 and stats["entries"] == 0 and stats["bytes"] == 0
+
+    def test_evicts_least_recently_used_over_budget(self):
+        cache = LLMResponseCache(max_bytes=10)
+        cache.put("m", _messages("a"), 0, "a", size=4)
+        cache.put("m", _messages("b"), 0, "b", size=4)
+        cache.get("m", _messages("a"), 0)
+        cache.put("m", _messages("c"), 0, "c", size=4)
+        assert cache.get("m", _messages("b"), 0) is None
+        assert cache.get("m", _messages("a"), 0) == "a"
+        assert cache.get_stats()["evictions"] == 1
+        cache.put("m", _messages("big"), 0, "big", size=11)
+        assert cache.get("m", _messages("big"), 0) is None
+
+    def test_cacheable_calls(self):
+        cache = LLMResponseCache(cacheable_agents=["code-builder"])
+        assert cache.is_cacheable(0)
+        assert cache.is_cacheable(0.2, "code-builder")
+        assert not cache.is_cacheable(0.5, "bio-chat")
+        assert not cache.is_cacheable(0.5)
+        cache.enabled = False
+        assert not cache.is_cacheable(0)
+
+
+class TestNearDuplicateTier:
+    text = "show the protein 1abc as cartoon and color the ligand by element please"
+
+    def test_disabled_by_default(self):
+        cache = LLMResponseCache(near_threshold=0)
+        cache.put("m", _messages(self.text), 0, "code")
+        assert cache.get("m", _messages(self.text + " now"), 0) is None
+
+    def test_serves_similar_final_message_with_same_context(self):
+        cache = LLMResponseCache(near_threshold=0.8)
+        cache.put("m", _messages(self.text), 0, "code")
+        assert cache.get("m", _messages(self.text + " now"), 0) == "code"
+        assert cache.get("m", _messages("color chain B red"), 0) is None
+        assert cache.get("m", _messages(self.text + " now", system="other"), 0) is None
+        stats = cache.get_stats()
+        assert (stats["near_hits"], stats["misses"]) == (1, 2)
@@ -0,0 +1,62 @@
+"""Tests for the scripts in server/database/migrations."""
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+MIGRATIONS_DIR = Path(__file__).parent.parent / "database" / "migrations"
+SCHEMA_PATH = Path(__file__).parent.parent / "database" / "schema.sql"
+
+
+@pytest.fixture
+def database_path(tmp_path):
+    path = tmp_path / "custom.db"
+    conn = sqlite3.connect(str(path))
+    conn.executescript(SCHEMA_PATH.read_text(encoding="utf-8"))
+    conn.close()
+    return path
+
+
+@pytest.mark.parametrize("name", [
+    "006_file_catalog.py",
+    "008_chat_search.py",
+    "009_metric_rollups.py",
+    "010_admin_exports.py",
+    "011_execution_history_index.py",
+])
+def test_migration_uses_database_path(name, database_path, tmp_path):
+    result = subprocess.run(
+        [sys.executable, str(MIGRATIONS_DIR / name)],
+        env={"DATABASE_PATH": str(database_path), "PATH": ""},
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert f"Database path: {database_path}" in result.stdout
+
+
+def test_execution_history_index_added_to_existing_database(database_path, tmp_path):
+    conn = sqlite3.connect(str(database_path))
+    conn.execute("DROP INDEX idx_pipeline_executions_history")
+    conn.close()
+
+    subprocess.run(
+        [sys.executable, str(MIGRATIONS_DIR / "011_execution_history_index.py")],
+        env={"DATABASE_PATH": str(database_path), "PATH": ""},
+        cwd=tmp_path,
+        capture_output=True,
+        check=True,
+        timeout=60,
+    )
+    conn = sqlite3.connect(str(database_path))
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT id FROM pipeline_executions WHERE pipeline_id = ? "
+        "ORDER BY started_at DESC, id DESC LIMIT 20",
+        ("p1",),
+    ).fetchall()
+    conn.close()
+    assert any("idx_pipeline_executions_history" in row[-1] for row in plan)
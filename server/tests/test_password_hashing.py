@@ -0,0 +1,76 @@
+"""Tests for server.infrastructure.password_hashing module."""
+import asyncio
+import pytest
+from server.infrastructure.auth import hash_password
+from server.infrastructure.password_hashing import (
+    PasswordHasher,
+    PasswordHashBusyError,
+    get_hash_rounds,
+)
+
+
+@pytest.fixture
+def hasher():
+    h = PasswordHasher(workers=1, max_pending=4, queue_timeout=5, rounds=4)
+    yield h
+    h.shutdown()
+
+
+class TestPasswordHasher:
+    @pytest.mark.asyncio
+    async def test_hash_and_verify_roundtrip(self, hasher):
+        hashed = await hasher.hash("s3cret")
+        assert get_hash_rounds(hashed) == 4
+        assert await hasher.verify("s3cret", hashed) is True
+        assert await hasher.verify("wrong", hashed) is False
+
+    @pytest.mark.asyncio
+    async def test_rehash_when_cost_changes(self, hasher):
+        old_hash = hash_password("s3cret", rounds=5)
+        valid, new_hash = await hasher.verify_and_rehash("s3cret", old_hash)
+        assert valid is True
+        assert new_hash is not None
+        assert get_hash_rounds(new_hash) == 4
+
+    @pytest.mark.asyncio
+    async def test_no_rehash_at_current_cost(self, hasher):
+        hashed = hash_password("s3cret", rounds=4)
+        assert await hasher.verify_and_rehash("s3cret", hashed) == (True, None)
+
+    @pytest.mark.asyncio
+    async def test_no_rehash_on_invalid_password(self, hasher):
+        old_hash = hash_password("s3cret", rounds=5)
+        assert await hasher.verify_and_rehash("nope", old_hash) == (False, None)
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_queue_full(self):
+        hasher = PasswordHasher(workers=1, max_pending=1, queue_timeout=5, rounds=4)
+        first = asyncio.create_task(hasher.hash("a"))
+        await asyncio.sleep(0)
+        with pytest.raises(PasswordHashBusyError):
+            await hasher.hash("b")
+        await first
+        assert hasher.get_metrics()["counts"]["rejected"] == 1
+        hasher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_queue_timeout(self):
+        hasher = PasswordHasher(workers=1, max_pending=4, queue_timeout=0.001, rounds=10)
+        tasks = [asyncio.create_task(hasher.hash("a")) for _ in range(2)]
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert any(isinstance(r, PasswordHashBusyError) for r in results)
+        assert hasher.get_metrics()["counts"]["timed_out"] >= 1
+        hasher.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_metrics_record_latency(self, hasher):
+        await hasher.hash("s3cret")
+        metrics = hasher.get_metrics()
+        assert metrics["counts"]["hash"] == 1
+        assert metrics["run_ms"]["max"] > 0
+        assert metrics["pending"] == 0
+
+
+def test_get_hash_rounds_unparseable():
+    assert get_hash_rounds("") is None
+    assert get_hash_rounds("not-a-hash") is None
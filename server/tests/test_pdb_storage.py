@@ -0,0 +1,83 @@
+"""Tests for server.domain.storage.pdb_storage streaming upload helpers."""
+import gzip
+
+import pytest
+from fastapi import HTTPException
+from server.domain.storage.pdb_storage import (
+    PDBStreamAnalyzer,
+    PDBUploadSink,
+    PDBUploadTooLarge,
+    _analyze_pdb,
+    _normalize_pdb_filename,
+)
+from .conftest import make_backbone_pdb
+
+
+def _two_chain_pdb():
+    return (
+        make_backbone_pdb(n_residues=7, chain="A").replace("END\n", "")
+        + make_backbone_pdb(n_residues=4, chain="B")
+    )
+
+
+class TestPDBStreamAnalyzer:
+    @pytest.mark.parametrize("chunk_size", [1, 7, 80, 81, 4096])
+    def test_chunk_boundaries_match_whole_file(self, chunk_size):
+        content = _two_chain_pdb().encode()
+        analyzer = PDBStreamAnalyzer()
+        for offset in range(0, len(content), chunk_size):
+            analyzer.feed(content[offset:offset + chunk_size])
+        assert analyzer.finish() == (33, ["A", "B"], {"A": 7, "B": 4})
+
+    def test_crlf_and_missing_trailing_newline(self):
+        content = _two_chain_pdb().replace("END\n", "").rstrip("\n").replace("\n", "\r\n")
+        assert _analyze_pdb(content) == (33, ["A", "B"], {"A": 7, "B": 4})
+
+
+class TestPDBUploadSink:
+    def test_plain_upload(self, tmp_path):
+        content = _two_chain_pdb().encode()
+        sink = PDBUploadSink(tmp_path / "f.pdb", max_bytes=len(content))
+        sink.write(content[:100])
+        sink.write(content[100:])
+        assert sink.finish()[0] == 33
+        assert (tmp_path / "f.pdb").read_bytes() == content
+        assert not (tmp_path / "f.pdb.part").exists()
+
+    def test_gzip_detected_by_magic(self, tmp_path):
+        content = _two_chain_pdb().encode()
+        packed = gzip.compress(content)
+        sink = PDBUploadSink(tmp_path / "f.pdb")
+        for offset in range(0, len(packed), 50):
+            sink.write(packed[offset:offset + 50])
+        assert sink.finish()[1] == ["A", "B"]
+        assert sink.size == len(content)
+        assert sink.raw_size == len(packed)
+        assert (tmp_path / "f.pdb").read_bytes() == content
+
+    def test_limit_applies_to_decompressed_size(self, tmp_path):
+        packed = gzip.compress(b"REMARK\n" * 100_000)
+        sink = PDBUploadSink(tmp_path / "f.pdb", max_bytes=10_000)
+        with pytest.raises(PDBUploadTooLarge) as exc:
+            sink.write(packed)
+        assert exc.value.status_code == 413
+        sink.abort()
+        assert list(tmp_path.iterdir()) == []
+
+    def test_truncated_gzip_rejected(self, tmp_path):
+        packed = gzip.compress(_two_chain_pdb().encode())
+        sink = PDBUploadSink(tmp_path / "f.pdb", compressed=True)
+        sink.write(packed[:-10])
+        with pytest.raises(HTTPException) as exc:
+            sink.finish()
+        assert exc.value.status_code == 400
+        assert list(tmp_path.iterdir()) == []
+
+
+def test_normalize_pdb_filename():
+    assert _normalize_pdb_filename("a.PDB") == "a.PDB"
+    assert _normalize_pdb_filename("a.pdb.gz", allow_gzip=True) == "a.pdb"
+    with pytest.raises(HTTPException):
+        _normalize_pdb_filename("a.pdb.gz")
+    with pytest.raises(HTTPException):
+        _normalize_pdb_filename("a.cif", allow_gzip=True)
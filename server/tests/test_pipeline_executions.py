@@ -0,0 +1,157 @@
+"""Tests for execution history endpoints in server.api.routes.pipelines."""
+import gzip
+import json
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+from server.api.routes.pipelines import (
+    create_execution,
+    delete_pipeline,
+    get_node_execution,
+    list_executions,
+)
+
+
+@pytest.fixture
+def db(route_db):
+    return route_db
+
+
+@pytest.fixture
+def user(seed_user):
+    return {"id": seed_user}
+
+
+@pytest.fixture
+def pipeline_with_runs(insert_pipeline, insert_execution):
+    pid = insert_pipeline(nodes=[
+        {"id": "n_in", "type": "input_node", "label": "Input"},
+        {"id": "n_fold", "type": "alphafold_node", "label": "Fold"},
+    ])
+    logs = [
+        {"node_id": "n_in", "node_label": "Input", "node_type": "input_node", "status": "success",
+         "output_data": {"filename": "a.pdb"}},
+        {"node_id": "n_fold", "node_label": "Fold", "node_type": "alphafold_node", "status": "success",
+         "request_method": "POST", "request_url": "/api/fold", "request_body": {"seq": "MKT" * 400},
+         "response_status": 200, "response_status_text": "OK", "response_data": {"plddt": [90] * 500}},
+    ]
+    execution_ids = [insert_execution(pid, node_logs=logs)[0] for _ in range(5)]
+    return pid, execution_ids
+
+
+def _request(accept_encoding=""):
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+class TestListExecutions:
+    @pytest.mark.asyncio
+    async def test_summary_omits_payloads(self, pipeline_with_runs, user):
+        pid, _ = pipeline_with_runs
+        result = await list_executions(pid, user=user, limit=20, cursor=None, full=False)
+        assert len(result["executions"]) == 5
+        assert result["next_cursor"] is None
+        log = result["executions"][0]["execution_log"]
+        assert [e["nodeId"] for e in log] == ["n_in", "n_fold"]
+        assert log[0]["output"] == {"filename": "a.pdb"}
+        assert log[1]["hasPayload"] is True
+        assert log[1]["request"] == {"method": "POST", "url": "/api/fold"}
+        assert "data" not in log[1]["response"]
+
+    @pytest.mark.asyncio
+    async def test_full_inlines_payloads(self, pipeline_with_runs, user):
+        pid, _ = pipeline_with_runs
+        result = await list_executions(pid, user=user, limit=1, cursor=None, full=True)
+        entry = result["executions"][0]["execution_log"][1]
+        assert entry["request"]["body"] == {"seq": "MKT" * 400}
+        assert entry["response"]["data"] == {"plddt": [90] * 500}
+
+    @pytest.mark.asyncio
+    async def test_cursor_pages_cover_all_executions(self, pipeline_with_runs, user):
+        pid, execution_ids = pipeline_with_runs
+        seen, cursor = [], None
+        while True:
+            page = await list_executions(pid, user=user, limit=2, cursor=cursor, full=False)
+            assert len(page["executions"]) <= 2
+            seen += [ex["id"] for ex in page["executions"]]
+            assert all(len(ex["execution_log"]) == 2 for ex in page["executions"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        assert sorted(seen) == sorted(execution_ids)
+        assert len(seen) == len(set(seen))
+
+    @pytest.mark.asyncio
+    async def test_unknown_pipeline_and_bad_cursor(self, pipeline_with_runs, user, other_user):
+        pid, _ = pipeline_with_runs
+        with pytest.raises(HTTPException) as exc:
+            await list_executions(pid, user={"id": other_user}, limit=20, cursor=None, full=False)
+        assert exc.value.status_code == 404
+        with pytest.raises(HTTPException) as exc:
+            await list_executions(pid, user=user, limit=20, cursor="not-a-cursor", full=False)
+        assert exc.value.status_code == 400
+
+
+class TestGetNodeExecution:
+    @pytest.mark.asyncio
+    async def test_returns_full_entry(self, pipeline_with_runs, user):
+        pid, execution_ids = pipeline_with_runs
+        response = await get_node_execution(pid, execution_ids[0], "n_fold", _request(), user=user)
+        assert "content-encoding" not in response.headers
+        entry = json.loads(response.body)["node_execution"]
+        assert entry["response"]["data"] == {"plddt": [90] * 500}
+
+    @pytest.mark.asyncio
+    async def test_gzip_when_accepted(self, pipeline_with_runs, user):
+        pid, execution_ids = pipeline_with_runs
+        response = await get_node_execution(pid, execution_ids[0], "n_fold", _request("gzip, br"), user=user)
+        assert response.headers["content-encoding"] == "gzip"
+        entry = json.loads(gzip.decompress(response.body))["node_execution"]
+        assert entry["request"]["body"] == {"seq": "MKT" * 400}
+
+    @pytest.mark.asyncio
+    async def test_other_user_gets_404(self, pipeline_with_runs, other_user):
+        pid, execution_ids = pipeline_with_runs
+        with pytest.raises(HTTPException) as exc:
+            await get_node_execution(pid, execution_ids[0], "n_fold", _request(), user={"id": other_user})
+        assert exc.value.status_code == 404
+
+
+class TestBlobBackedPayloads:
+    @pytest.mark.asyncio
+    async def test_external_output_loaded_lazily(self, insert_pipeline, insert_execution, user, tmp_path, monkeypatch):
+        from server.domain.storage import blob_store as bs
+
+        monkeypatch.setattr(bs, "blob_store", bs.BlobStore(tmp_path / "blobs", codec="gzip"))
+        monkeypatch.setattr(bs, "PAYLOAD_INLINE_MAX_BYTES", 64)
+        pid = insert_pipeline(nodes=[{"id": "n_in", "type": "input_node", "label": "Input"}])
+        insert_execution(pid, node_logs=[
+            {"node_id": "n_in", "node_label": "Input", "node_type": "input_node", "status": "success",
+             "output_data": {"msa": "A" * 500}},
+        ])
+        bs.migrate_payload_batch()
+
+        summary = await list_executions(pid, user=user, limit=1, cursor=None, full=False)
+        entry = summary["executions"][0]["execution_log"][0]
+        assert "output" not in entry and entry["hasPayload"] is True
+
+        full = await list_executions(pid, user=user, limit=1, cursor=None, full=True)
+        assert full["executions"][0]["execution_log"][0]["output"] == {"msa": "A" * 500}
+
+    @pytest.mark.asyncio
+    async def test_created_blobs_are_released_with_the_pipeline(self, insert_pipeline, user, tmp_path, monkeypatch):
+        from server.domain.storage import blob_store as bs
+
+        store = bs.BlobStore(tmp_path / "blobs", codec="gzip")
+        monkeypatch.setattr(bs, "blob_store", store)
+        monkeypatch.setattr(bs, "PAYLOAD_INLINE_MAX_BYTES", 64)
+        pid = insert_pipeline(nodes=[{"id": "n_in", "type": "input_node", "label": "Input"}])
+        await create_execution(pid, {"execution_log": [
+            {"nodeId": "n_in", "status": "success", "output": {"msa": "A" * 500}},
+        ]}, user=user)
+        assert len(list(store.iter_blobs())) == 1
+
+        await delete_pipeline(pid, user=user)
+        assert bs.sweep_unreferenced_blobs(grace_seconds=0) == 1
+        assert list(store.iter_blobs()) == []
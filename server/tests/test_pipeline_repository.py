@@ -0,0 +1,167 @@
+"""Tests for server.domain.pipeline.repository module."""
+import pytest
+from server.domain.pipeline.repository import (
+    PipelineGraphCache,
+    load_pipeline,
+    load_pipeline_graphs,
+    load_pipelines,
+    pipeline_graph_cache,
+    save_pipeline_graph,
+    update_node_positions,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    pipeline_graph_cache.clear()
+    yield
+    pipeline_graph_cache.clear()
+
+
+@pytest.fixture
+def two_pipelines(insert_pipeline):
+    first = insert_pipeline(
+        name="First",
+        nodes=[
+            {"id": "a1", "type": "input_node", "label": "In", "config": {"filename": "x.pdb"}},
+            {"id": "a2", "type": "rfdiffusion_node", "label": "Design", "position_x": 10, "position_y": 20},
+        ],
+        edges=[{"source": "a1", "target": "a2"}],
+    )
+    second = insert_pipeline(name="Second", nodes=[{"id": "b1", "type": "input_node", "label": "Only"}])
+    return first, second
+
+
+def _rows(db, *ids):
+    placeholders = ",".join("?" * len(ids))
+    return db.execute(f"SELECT * FROM pipelines WHERE id IN ({placeholders}) ORDER BY name", ids).fetchall()
+
+
+class TestLoadPipelineGraphs:
+    def test_assembles_nodes_and_edges(self, db, two_pipelines):
+        first, second = two_pipelines
+        graphs = load_pipeline_graphs(db, _rows(db, first, second))
+        assert [n["id"] for n in graphs[first]["nodes"]] == ["a1", "a2"]
+        assert graphs[first]["nodes"][0]["config"] == {"filename": "x.pdb"}
+        assert graphs[first]["nodes"][1]["position"] == {"x": 10, "y": 20}
+        assert graphs[first]["edges"] == [{"source": "a1", "target": "a2"}]
+        assert graphs[second]["edges"] == []
+
+    def test_two_queries_for_many_pipelines(self, db, two_pipelines):
+        statements = []
+        db.set_trace_callback(statements.append)
+        load_pipeline_graphs(db, _rows(db, *two_pipelines))
+        db.set_trace_callback(None)
+        graph_queries = [s for s in statements if "pipeline_nodes" in s or "pipeline_edges" in s]
+        assert len(graph_queries) == 2
+
+    def test_cache_hit_until_updated_at_changes(self, db, two_pipelines):
+        first, _ = two_pipelines
+        load_pipeline_graphs(db, _rows(db, first))
+        load_pipeline_graphs(db, _rows(db, first))
+        assert pipeline_graph_cache.hits == 1
+
+        db.execute("UPDATE pipeline_nodes SET label = 'Renamed' WHERE id = 'a1'")
+        db.execute("UPDATE pipelines SET updated_at = '2099-01-01' WHERE id = ?", (first,))
+        graphs = load_pipeline_graphs(db, _rows(db, first))
+        assert graphs[first]["nodes"][0]["label"] == "Renamed"
+
+
+class TestLoadPipelines:
+    def test_preserves_row_order(self, db, two_pipelines):
+        pipelines = load_pipelines(db, _rows(db, *two_pipelines))
+        assert [p["name"] for p in pipelines] == ["First", "Second"]
+        assert pipelines[0]["nodes"][1]["type"] == "rfdiffusion_node"
+
+    def test_load_pipeline_checks_owner(self, db, two_pipelines, seed_user, other_user):
+        first, _ = two_pipelines
+        assert load_pipeline(db, first, seed_user)["name"] == "First"
+        assert load_pipeline(db, first, other_user) is None
+
+
+class TestPipelineGraphCache:
+    def test_evicts_least_recently_used(self):
+        cache = PipelineGraphCache(max_size=2)
+        graph = {"nodes": [], "edges": []}
+        cache.put("a", 1, graph)
+        cache.put("b", 1, graph)
+        cache.get("a", 1)
+        cache.put("c", 1, graph)
+        assert cache.get("b", 1) is None
+        assert cache.get("a", 1) is graph
+        assert cache.get_stats()["size"] == 2
+
+
+def _canvas(db, pid):
+    graph = load_pipeline_graphs(db, _rows(db, pid))[pid]
+    nodes = [dict(n, position=dict(n["position"])) for n in graph["nodes"]]
+    return nodes, list(graph["edges"])
+
+
+def _writes(db, fn):
+    statements = []
+    db.set_trace_callback(statements.append)
+    result = fn()
+    db.set_trace_callback(None)
+    writes = [s for s in statements if s.lstrip().split()[0].upper() in {"INSERT", "UPDATE", "DELETE"}]
+    return result, writes
+
+
+class TestSavePipelineGraph:
+    def test_unchanged_canvas_writes_nothing(self, db, two_pipelines):
+        first, _ = two_pipelines
+        nodes, edges = _canvas(db, first)
+        changes, writes = _writes(db, lambda: save_pipeline_graph(db, first, nodes, edges, "now"))
+        assert writes == []
+        assert not any(changes.values())
+
+    def test_drag_is_position_only(self, db, two_pipelines):
+        first, _ = two_pipelines
+        nodes, edges = _canvas(db, first)
+        nodes[1]["position"] = {"x": 55, "y": 66}
+        changes, writes = _writes(db, lambda: save_pipeline_graph(db, first, nodes, edges, "now"))
+        assert changes["nodes_moved"] == 1 and changes["nodes_updated"] == 0
+        assert len(writes) == 1 and "position_x" in writes[0]
+        assert _canvas(db, first)[0][1]["position"] == {"x": 55, "y": 66}
+
+    def test_insert_update_delete(self, db, two_pipelines):
+        first, _ = two_pipelines
+        nodes, _ = _canvas(db, first)
+        nodes[0]["label"] = "Renamed"
+        nodes = [nodes[0], {"id": "a3", "type": "alphafold_node", "label": "Fold", "position": {"x": 1, "y": 2}}]
+        changes = save_pipeline_graph(db, first, nodes, [{"source": "a1", "target": "a3"}], "now")
+        assert changes["nodes_inserted"] == 1
+        assert changes["nodes_updated"] == 1
+        assert changes["nodes_deleted"] == 1
+        assert changes["edges_inserted"] == 1 and changes["edges_deleted"] == 1
+
+        saved_nodes, saved_edges = _canvas(db, first)
+        assert [n["id"] for n in saved_nodes] == ["a1", "a3"]
+        assert saved_nodes[0]["label"] == "Renamed"
+        assert saved_edges == [{"source": "a1", "target": "a3"}]
+
+    def test_node_files_synced_by_diff(self, db, two_pipelines, seed_user):
+        first, _ = two_pipelines
+        db.execute(
+            "INSERT INTO user_files (id, user_id, file_type, original_filename, stored_path) VALUES ('f1', ?, 'upload', 'x.pdb', 'x')",
+            (seed_user,),
+        )
+        nodes, edges = _canvas(db, first)
+        nodes[0]["config"] = {"file_id": "f1", "filename": "x.pdb", "chains": ["A"]}
+        assert save_pipeline_graph(db, first, nodes, edges, "now")["files_inserted"] == 1
+        assert save_pipeline_graph(db, first, nodes, edges, "now")["files_inserted"] == 0
+
+        nodes[0]["config"] = {}
+        assert save_pipeline_graph(db, first, nodes, edges, "now")["files_deleted"] == 1
+        count = db.execute("SELECT COUNT(*) FROM pipeline_node_files WHERE pipeline_id = ?", (first,)).fetchone()[0]
+        assert count == 0
+
+
+class TestUpdateNodePositions:
+    def test_moves_nodes_and_bumps_updated_at(self, db, two_pipelines):
+        first, _ = two_pipelines
+        updated = update_node_positions(db, first, {"a1": {"x": 3, "y": 4}, "missing": {"x": 0, "y": 0}}, "2099-01-01")
+        assert updated == 1
+        assert _canvas(db, first)[0][0]["position"] == {"x": 3, "y": 4}
+        row = db.execute("SELECT updated_at FROM pipelines WHERE id = ?", (first,)).fetchone()
+        assert row[0] == "2099-01-01"
@@ -0,0 +1,22 @@
+"""Tests for server.agents.handlers.proteinmpnn module."""
+import gzip
+
+from server.agents.handlers.proteinmpnn import ProteinMPNNHandler
+
+
+class TestListAvailableSources:
+    def test_legacy_directory_lists_plain_and_compressed(self, tmp_path):
+        legacy = tmp_path / "rfdiffusion_results"
+        legacy.mkdir()
+        (legacy / "rfdiffusion_old.pdb").write_text("ATOM\n")
+        (legacy / "rfdiffusion_new.pdb.gz").write_bytes(gzip.compress(b"ATOM\n"))
+        (legacy / "rfdiffusion_notes.txt").write_text("not a structure")
+        handler = ProteinMPNNHandler()
+        handler._base_dir = tmp_path
+
+        entries = handler.list_available_sources()["rfdiffusion"]
+        assert [(e["jobId"], e["filename"]) for e in entries] == [
+            ("old", "rfdiffusion_old.pdb"),
+            ("new", "rfdiffusion_new.pdb"),
+        ]
+        assert entries[1]["path"].endswith("rfdiffusion_new.pdb.gz")
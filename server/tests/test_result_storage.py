@@ -0,0 +1,127 @@
+"""Tests for server.domain.storage.result_storage module."""
+import asyncio
+import gzip
+
+import pytest
+from server.domain.storage import result_storage as rs
+from server.domain.storage.result_storage import (
+    ResultWriter,
+    compress_existing_results,
+    locate_result,
+    logical_name,
+    read_result_json,
+    read_result_text,
+    write_result_json,
+    write_result_json_async,
+    write_result_text,
+    write_result_text_async,
+)
+
+PDB_TEXT = "ATOM      1  N   ALA A   1      11.104   6.134  -6.504  1.00 90.00           N\n" * 50
+
+
+@pytest.fixture
+def db(route_db):
+    return route_db
+
+
+class TestWriteAndRead:
+    def test_structure_written_as_gzip(self, tmp_path):
+        written = write_result_text(tmp_path / "model.pdb", PDB_TEXT)
+        assert written.name == "model.pdb.gz"
+        assert gzip.decompress(written.read_bytes()).decode() == PDB_TEXT
+        assert read_result_text(tmp_path / "model.pdb") == PDB_TEXT
+        assert read_result_text(written) == PDB_TEXT
+        assert logical_name(written) == "model.pdb"
+
+    def test_json_is_compact_and_compressed(self, tmp_path):
+        written = write_result_json(tmp_path / "result.json", {"sequences": ["MKT"] * 3})
+        assert written.suffix in (".zst", ".gz")
+        assert read_result_json(tmp_path / "result.json") == {"sequences": ["MKT"] * 3}
+
+    def test_legacy_plain_file_still_readable(self, tmp_path):
+        (tmp_path / "old.pdb").write_text(PDB_TEXT)
+        assert locate_result(tmp_path / "old.pdb") == tmp_path / "old.pdb"
+        assert read_result_text(tmp_path / "old.pdb") == PDB_TEXT
+        assert locate_result(tmp_path / "absent.pdb") is None
+        with pytest.raises(FileNotFoundError):
+            read_result_text(tmp_path / "absent.pdb")
+
+    def test_rewrite_replaces_other_format(self, tmp_path):
+        (tmp_path / "model.pdb").write_text("stale")
+        write_result_text(tmp_path / "model.pdb", PDB_TEXT)
+        assert not (tmp_path / "model.pdb").exists()
+        assert read_result_text(tmp_path / "model.pdb") == PDB_TEXT
+
+    def test_compression_disabled(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(rs, "RESULT_COMPRESSION", "none")
+        assert write_result_text(tmp_path / "model.pdb", PDB_TEXT) == tmp_path / "model.pdb"
+
+
+class TestResultWriter:
+    def test_async_writes(self, tmp_path):
+        async def run():
+            return await asyncio.gather(
+                write_result_text_async(tmp_path / "a" / "model.pdb", PDB_TEXT),
+                write_result_json_async(tmp_path / "a" / "result.json", {"status": "completed"}),
+                write_result_text_async(tmp_path / "a" / "designed_sequences.fasta", ">a\nMKT"),
+            )
+
+        pdb, result, fasta = asyncio.run(run())
+        assert pdb.name == "model.pdb.gz"
+        assert read_result_text(tmp_path / "a" / "model.pdb") == PDB_TEXT
+        assert read_result_json(result) == {"status": "completed"}
+        assert fasta.read_text() == ">a\nMKT"
+        assert not list((tmp_path / "a").glob("*.tmp"))
+
+    def test_batch_isolates_failures(self, tmp_path):
+        def broken(_value):
+            raise ValueError("cannot encode")
+
+        outcomes = ResultWriter(fsync=True).write_batch([
+            (tmp_path / "ok.json", {"a": 1}, rs._encode_json),
+            (tmp_path / "bad.json", {"a": 1}, broken),
+            (tmp_path / "notes.txt", b"plain", None),
+        ])
+        assert read_result_json(outcomes[0]) == {"a": 1}
+        assert isinstance(outcomes[1], ValueError)
+        assert outcomes[2].read_bytes() == b"plain"
+
+    def test_error_reaches_caller(self, tmp_path):
+        (tmp_path / "file").write_text("not a directory")
+
+        async def run():
+            await write_result_text_async(tmp_path / "file" / "model.pdb", PDB_TEXT)
+
+        with pytest.raises(OSError):
+            asyncio.run(run())
+
+
+class TestCompressExistingResults:
+    def test_converts_tree_and_repoints_rows(self, db, seed_user, tmp_path):
+        rf_dir = tmp_path / "storage" / seed_user / "rfdiffusion_results"
+        rf_dir.mkdir(parents=True)
+        (rf_dir / "rfdiffusion_j1.pdb").write_text(PDB_TEXT)
+        mpnn_dir = tmp_path / "storage" / seed_user / "proteinmpnn_results" / "j2"
+        mpnn_dir.mkdir(parents=True)
+        (mpnn_dir / "result.json").write_text('{\n  "status": "completed"\n}')
+        (mpnn_dir / "designed_sequences.fasta").write_text(">a\nMKT\n")
+        db.execute(
+            "INSERT INTO user_files (id, user_id, file_type, original_filename, stored_path, size) VALUES (?, ?, ?, ?, ?, ?)",
+            ("j1", seed_user, "rfdiffusion", "rfdiffusion_j1.pdb", f"storage/{seed_user}/rfdiffusion_results/rfdiffusion_j1.pdb", len(PDB_TEXT)),
+        )
+        db.commit()
+
+        assert compress_existing_results(tmp_path / "storage", tmp_path, dry_run=True)["files"] == 2
+        assert (rf_dir / "rfdiffusion_j1.pdb").exists()
+
+        stats = compress_existing_results(tmp_path / "storage", tmp_path)
+        assert stats["files"] == 2 and stats["rows_updated"] == 1
+        assert stats["bytes_after"] < stats["bytes_before"]
+        assert (mpnn_dir / "designed_sequences.fasta").exists()
+        assert read_result_json(mpnn_dir / "result.json") == {"status": "completed"}
+        stored = db.execute("SELECT stored_path FROM user_files WHERE id = 'j1'").fetchone()[0]
+        assert stored.endswith("rfdiffusion_j1.pdb.gz")
+        assert read_result_text(tmp_path / stored) == PDB_TEXT
+
+        assert compress_existing_results(tmp_path / "storage", tmp_path)["files"] == 0
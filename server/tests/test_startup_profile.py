@@ -0,0 +1,96 @@
+"""Tests for server.infrastructure.startup_profile module."""
+import sys
+
+import pytest
+from server.infrastructure.startup_profile import ImportProfiler, StartupProfile, format_importtime
+
+
+@pytest.fixture
+def fake_package(tmp_path, monkeypatch):
+    pkg = tmp_path / "profiled_pkg"
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("from . import child\nfrom . import sibling\n")
+    (pkg / "child.py").write_text("from . import grandchild\nVALUE = 1\n")
+    (pkg / "grandchild.py").write_text("VALUE = 2\n")
+    (pkg / "sibling.py").write_text("VALUE = 3\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "profiled_pkg"
+    for name in [m for m in sys.modules if m == "profiled_pkg" or m.startswith("profiled_pkg.")]:
+        del sys.modules[name]
+
+
+class TestImportProfiler:
+    def test_records_tree_in_import_order(self, fake_package):
+        profiler = ImportProfiler()
+        profiler.install()
+        try:
+            __import__(fake_package)
+        finally:
+            profiler.uninstall()
+
+        tree = [(r["module"], r["depth"]) for r in profiler.tree()]
+        assert tree == [
+            ("profiled_pkg", 0),
+            ("profiled_pkg.child", 1),
+            ("profiled_pkg.grandchild", 2),
+            ("profiled_pkg.sibling", 1),
+        ]
+        by_name = {r["module"]: r for r in profiler.records}
+        parent = by_name["profiled_pkg"]
+        assert parent["cumulative_us"] >= by_name["profiled_pkg.child"]["cumulative_us"]
+        assert parent["self_us"] <= parent["cumulative_us"]
+        assert profiler not in sys.meta_path
+
+    def test_restores_real_loader(self, fake_package):
+        profiler = ImportProfiler()
+        profiler.install()
+        try:
+            module = __import__(fake_package)
+        finally:
+            profiler.uninstall()
+        assert type(module.__loader__).__name__ != "_TimedLoader"
+        assert module.__spec__.loader is module.__loader__
+
+
+class TestFormatImporttime:
+    def test_layout_and_threshold(self):
+        records = [
+            {"module": "slow", "depth": 0, "self_us": 100, "cumulative_us": 9000},
+            {"module": "slow.part", "depth": 1, "self_us": 8900, "cumulative_us": 8900},
+            {"module": "fast", "depth": 0, "self_us": 10, "cumulative_us": 10},
+        ]
+        lines = format_importtime(records, min_ms=1).splitlines()
+        assert lines[0] == "import time: self [us] | cumulative | imported package"
+        assert lines[1] == "import time:       100 |       9000 | slow"
+        assert lines[2].endswith("|   slow.part")
+        assert len(lines) == 3
+
+
+class TestStartupProfile:
+    def test_records_imports_and_phases(self, fake_package):
+        profile = StartupProfile()
+        profile.begin_imports(profile=True)
+        __import__(fake_package)
+        profile.end_imports()
+        profile.record("router_warmup", 0.25)
+
+        stats = profile.get_stats()
+        assert stats["modules_loaded"] >= 4
+        assert stats["imports_seconds"] >= 0
+        assert stats["router_warmup_seconds"] == 0.25
+        assert stats["import_profile"] is True
+        assert stats["top_imports"][0]["module"] == "profiled_pkg"
+        assert "profiled_pkg.grandchild" in profile.format_imports(min_ms=0)
+        assert profile.profiler not in sys.meta_path
+
+    def test_report_needs_profiling(self):
+        profile = StartupProfile()
+        profile.begin_imports(profile=False)
+        profile.end_imports()
+        assert profile.format_imports() is None
+        assert profile.get_stats()["top_imports"] == []
+
+    def test_warm_imports_skips_missing_modules(self):
+        profile = StartupProfile()
+        assert profile.warm_imports(["json", "no_such_module_xyz"]) == ["json"]
+        assert "warm_imports_seconds" in profile.get_stats()
@@ -0,0 +1,308 @@
+"""Tests for server.domain.storage.backends module."""
+import asyncio
+import io
+import threading
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+from server.domain.storage import backends
+from server.domain.storage.backends import (
+    CachedStorageBackend,
+    LocalStorageBackend,
+    S3StorageBackend,
+    StorageError,
+    storage_key,
+)
+from server.domain.storage.blob_store import BlobStore
+from server.domain.storage.file_access import get_user_file_path_async
+from server.domain.storage.result_storage import read_result_text, write_result_text
+
+
+class _ClientError(Exception):
+    def __init__(self, code):
+        super().__init__(code)
+        self.response = {"Error": {"Code": code}}
+
+
+class FakeS3Client:
+    """In-memory stand-in implementing the boto3 S3 calls the backend uses."""
+
+    def __init__(self):
+        self.objects = {}
+        self.modified = {}
+        self.gets = 0
+        self.threads = set()
+
+    def put_object(self, Bucket, Key, Body):
+        self.objects[(Bucket, Key)] = bytes(Body)
+        self.modified[(Bucket, Key)] = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    def upload_file(self, Filename, Bucket, Key):
+        with open(Filename, "rb") as f:
+            self.put_object(Bucket, Key, f.read())
+
+    def copy_object(self, Bucket, Key, CopySource, MetadataDirective):
+        source = (CopySource["Bucket"], CopySource["Key"])
+        if source not in self.objects:
+            raise _ClientError("NoSuchKey")
+        self.objects[(Bucket, Key)] = self.objects[source]
+        self.modified[(Bucket, Key)] = datetime.now(timezone.utc)
+
+    def get_object(self, Bucket, Key):
+        self.threads.add(threading.current_thread().name)
+        if (Bucket, Key) not in self.objects:
+            raise _ClientError("NoSuchKey")
+        self.gets += 1
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise _ClientError("404")
+        return {"ContentLength": len(self.objects[(Bucket, Key)]), "LastModified": self.modified[(Bucket, Key)]}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+        self.modified.pop((Bucket, Key), None)
+
+    def get_paginator(self, operation):
+        assert operation == "list_objects_v2"
+        return self
+
+    def paginate(self, Bucket, Prefix):
+        yield {"Contents": [
+            {"Key": key, "LastModified": self.modified[(bucket, key)]}
+            for bucket, key in sorted(self.objects) if bucket == Bucket and key.startswith(Prefix)
+        ]}
+
+
+@pytest.fixture
+def s3_client():
+    return FakeS3Client()
+
+
+@pytest.fixture
+def cached(s3_client, tmp_path):
+    return CachedStorageBackend(S3StorageBackend("bucket", "prefix", client=s3_client), tmp_path / "cache")
+
+
+class TestStorageKey:
+    def test_relative_to_server_dir(self):
+        assert storage_key(backends.BASE_DIR / "storage" / "u1" / "a.pdb") == "storage/u1/a.pdb"
+        assert storage_key("storage/u1/a.pdb") == "storage/u1/a.pdb"
+        assert storage_key("/elsewhere/a.pdb") == "/elsewhere/a.pdb"
+
+
+class TestStorageBackend:
+    def test_incomplete_backend_fails_on_instantiation(self):
+        class ReadOnlyBackend(backends.StorageBackend):
+            def read_bytes(self, key):
+                return b""
+
+        with pytest.raises(TypeError, match="abstract"):
+            ReadOnlyBackend()
+
+
+class TestLocalStorageBackend:
+    def test_roundtrip(self, tmp_path):
+        backend = LocalStorageBackend(tmp_path)
+        backend.write_bytes("storage/u1/a.pdb", b"ATOM")
+        assert backend.exists("storage/u1/a.pdb")
+        assert backend.size("storage/u1/a.pdb") == 4
+        assert backend.local_path("storage/u1/a.pdb") == tmp_path / "storage/u1/a.pdb"
+        backend.delete("storage/u1/a.pdb")
+        assert backend.size("storage/u1/a.pdb") is None
+        with pytest.raises(FileNotFoundError):
+            backend.local_path("storage/u1/a.pdb")
+
+    def test_list_keys(self, tmp_path):
+        backend = LocalStorageBackend(tmp_path)
+        backend.write_bytes("blobs/ab/ab1.gz", b"1")
+        backend.write_bytes("blobs/cd/cd2.gz", b"2")
+        backend.write_bytes("other/x.gz", b"3")
+        (tmp_path / "blobs" / "ab" / "ab3.gz.123.tmp").write_bytes(b"partial")
+        assert sorted(key for key, _ in backend.list_keys("blobs")) == ["blobs/ab/ab1.gz", "blobs/cd/cd2.gz"]
+        assert list(backend.list_keys("missing")) == []
+
+    def test_write_file_moves_source(self, tmp_path):
+        backend = LocalStorageBackend(tmp_path / "root")
+        source = tmp_path / "upload.part"
+        source.write_bytes(b"data")
+        backend.write_file("k/a.bin", source)
+        assert not source.exists()
+        assert backend.read_bytes("k/a.bin") == b"data"
+
+    def test_async_stream_and_write_stream(self, tmp_path):
+        backend = LocalStorageBackend(tmp_path)
+
+        async def chunks():
+            for part in (b"ab", b"cd", b"e"):
+                yield part
+
+        async def run():
+            size = await backend.write_stream("s/file.bin", chunks())
+            streamed = [chunk async for chunk in backend.stream("s/file.bin", chunk_size=2)]
+            return size, streamed, await backend.read("s/file.bin")
+
+        size, streamed, content = asyncio.run(run())
+        assert size == 5
+        assert streamed == [b"ab", b"cd", b"e"]
+        assert content == b"abcde"
+
+
+class TestS3StorageBackend:
+    def test_objects_are_prefixed(self, s3_client):
+        backend = S3StorageBackend("bucket", "/prefix/", client=s3_client)
+        backend.write_bytes("storage/u1/a.pdb", b"ATOM")
+        assert ("bucket", "prefix/storage/u1/a.pdb") in s3_client.objects
+        assert backend.read_bytes("storage/u1/a.pdb") == b"ATOM"
+        assert backend.size("storage/u1/a.pdb") == 4
+
+    def test_list_keys_strips_prefix(self, s3_client):
+        backend = S3StorageBackend("bucket", "prefix", client=s3_client)
+        backend.write_bytes("blobs/ab/ab1.gz", b"1")
+        backend.write_bytes("blobsx/other.gz", b"2")
+        assert list(backend.list_keys("blobs")) == [
+            ("blobs/ab/ab1.gz", datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp())
+        ]
+
+    def test_touch_refreshes_modified(self, s3_client):
+        backend = S3StorageBackend("bucket", "prefix", client=s3_client)
+        backend.write_bytes("blobs/ab/ab1.gz", b"1")
+        before = backend.modified("blobs/ab/ab1.gz")
+        assert backend.touch("blobs/ab/ab1.gz")
+        assert backend.modified("blobs/ab/ab1.gz") > before
+        assert backend.read_bytes("blobs/ab/ab1.gz") == b"1"
+        assert not backend.touch("nope")
+        assert backend.modified("nope") is None
+
+    def test_missing_objects(self, s3_client):
+        backend = S3StorageBackend("bucket", client=s3_client)
+        assert not backend.exists("nope")
+        with pytest.raises(FileNotFoundError):
+            backend.read_bytes("nope")
+        with pytest.raises(ValueError):
+            backend.object_key("/abs/path")
+
+    def test_requires_bucket(self, s3_client):
+        with pytest.raises(StorageError):
+            S3StorageBackend("", client=s3_client)
+
+
+class TestCachedStorageBackend:
+    def test_read_through_cache(self, cached, s3_client):
+        cached.remote.write_bytes("storage/u1/a.pdb", b"ATOM")
+        assert cached.read_bytes("storage/u1/a.pdb") == b"ATOM"
+        assert cached.read_bytes("storage/u1/a.pdb") == b"ATOM"
+        assert s3_client.gets == 1
+        assert cached.local_path("storage/u1/a.pdb").read_bytes() == b"ATOM"
+
+    def test_write_through_and_delete(self, cached, s3_client, tmp_path):
+        source = tmp_path / "upload.part"
+        source.write_bytes(b"streamed")
+        cached.write_file("storage/u1/b.pdb", source)
+        assert s3_client.objects[("bucket", "prefix/storage/u1/b.pdb")] == b"streamed"
+        assert cached.read_bytes("storage/u1/b.pdb") == b"streamed"
+        assert s3_client.gets == 0
+
+        cached.delete("storage/u1/b.pdb")
+        assert not cached.exists("storage/u1/b.pdb")
+        assert s3_client.objects == {}
+
+    def test_evicts_least_recently_used(self, s3_client, tmp_path):
+        cache = CachedStorageBackend(
+            S3StorageBackend("bucket", client=s3_client), tmp_path / "cache", max_bytes=10, evict_grace=0
+        )
+        cache.write_bytes("a", b"123456")
+        cache.write_bytes("b", b"123456")
+        assert not cache.cache.exists("a")
+        assert cache.cache.exists("b")
+        assert cache.read_bytes("a") == b"123456"  # fetched again from the bucket
+
+    def test_keeps_recently_used_files(self, s3_client, tmp_path):
+        cache = CachedStorageBackend(
+            S3StorageBackend("bucket", client=s3_client), tmp_path / "cache", max_bytes=10, evict_grace=60
+        )
+        cache.write_bytes("a", b"123456")
+        cache.write_bytes("b", b"123456")
+        assert cache.cache.exists("a")  # may still be streaming
+        assert cache.cache.exists("b")
+
+    def test_indexes_existing_cache_once(self, s3_client, tmp_path, monkeypatch):
+        remote = S3StorageBackend("bucket", client=s3_client)
+        warm = tmp_path / "cache"
+        LocalStorageBackend(warm).write_bytes("old", b"123456")
+        cache = CachedStorageBackend(remote, warm, max_bytes=10, evict_grace=0)
+        scans = []
+        list_keys = cache.cache.list_keys
+        monkeypatch.setattr(cache.cache, "list_keys", lambda prefix: scans.append(prefix) or list_keys(prefix))
+
+        cache.write_bytes("a", b"1234")
+        assert cache.cache.exists("old")
+        cache.write_bytes("b", b"1234")
+        cache.read_bytes("a")
+        cache.write_bytes("c", b"1234")
+        assert scans == [""]
+        assert not cache.cache.exists("old")
+        assert not cache.cache.exists("b")  # a was read more recently
+        assert cache.cache.exists("a") and cache.cache.exists("c")
+
+    def test_delete_and_evict_drop_precompressed_siblings(self, s3_client, tmp_path):
+        cache = CachedStorageBackend(
+            S3StorageBackend("bucket", client=s3_client), tmp_path / "cache", max_bytes=10, evict_grace=0
+        )
+        cache.write_bytes("a.pdb", b"123456")
+        cache.write_bytes("b.pdb", b"1234")
+        for key in ("a.pdb", "b.pdb"):
+            cache.cache.write_bytes(f"{key}.gz", b"gz")
+        cache.write_bytes("c.pdb", b"1234")  # evicts a.pdb
+        cache.delete("b.pdb")
+        assert not cache.cache.exists("a.pdb.gz")
+        assert not cache.cache.exists("b.pdb.gz")
+
+    def test_results_and_blobs_use_backend(self, cached, s3_client, monkeypatch):
+        monkeypatch.setattr(backends, "storage_backend", cached)
+        written = write_result_text(backends.BASE_DIR / "storage" / "u1" / "rfdiffusion_results" / "m.pdb", "ATOM\n")
+        assert ("bucket", f"prefix/{storage_key(written)}") in s3_client.objects
+        assert not written.exists()
+        assert read_result_text(written) == "ATOM\n"
+
+        store = BlobStore(backends.BASE_DIR / "storage" / "blobs")
+        digest, codec, _ = store.put(b"x" * 100)
+        assert any(key[1].startswith("prefix/storage/blobs/") for key in s3_client.objects)
+        assert store.get(digest, codec) == b"x" * 100
+
+
+class TestUserFilePath:
+    @pytest.fixture
+    def db(self, route_db):
+        return route_db
+
+    @pytest.mark.asyncio
+    async def test_downloads_off_the_event_loop(self, cached, s3_client, db, seed_user, monkeypatch):
+        monkeypatch.setattr(backends, "storage_backend", cached)
+        cached.remote.write_bytes("storage/u1/a.pdb", b"ATOM")
+        db.execute(
+            "INSERT INTO user_files (id, user_id, file_type, original_filename, stored_path) VALUES (?, ?, ?, ?, ?)",
+            ("f1", seed_user, "upload", "a.pdb", "storage/u1/a.pdb"),
+        )
+        db.commit()
+
+        path = await get_user_file_path_async("f1", seed_user)
+        assert path.read_bytes() == b"ATOM"
+        assert threading.current_thread().name not in s3_client.threads
+
+    @pytest.mark.asyncio
+    async def test_missing_and_foreign_files(self, cached, db, seed_user, monkeypatch):
+        monkeypatch.setattr(backends, "storage_backend", cached)
+        db.execute(
+            "INSERT INTO user_files (id, user_id, file_type, original_filename, stored_path) VALUES (?, ?, ?, ?, ?)",
+            ("f1", seed_user, "upload", "a.pdb", "storage/u1/gone.pdb"),
+        )
+        db.commit()
+
+        with pytest.raises(HTTPException) as missing:
+            await get_user_file_path_async("f1", seed_user)
+        with pytest.raises(HTTPException) as foreign:
+            await get_user_file_path_async("f1", "someone-else")
+        assert (missing.value.status_code, foreign.value.status_code) == (404, 403)
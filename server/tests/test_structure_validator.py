@@ -0,0 +1,74 @@
+"""Tests for server.tools.validation.structure_validator Ramachandran analysis."""
+import numpy as np
+import pytest
+from server.tools.validation.structure_validator import (
+    _backbone_phi_psi,
+    _classify_rama,
+    validate_structure,
+)
+from .conftest import make_backbone_pdb
+
+
+class TestClassifyRama:
+    def test_general_regions(self):
+        assert _classify_rama(-63.0, -42.0) == "favored"
+        assert _classify_rama(-120.0, 130.0) == "favored"
+        assert _classify_rama(-110.0, -75.0) == "allowed"
+        assert _classify_rama(60.0, -150.0) == "outlier"
+
+    def test_missing_angle_is_unknown(self):
+        assert _classify_rama(None, -42.0) == "unknown"
+        assert _classify_rama(-63.0, None) == "unknown"
+
+    def test_glycine_map_is_mirrored(self):
+        # Mirror of the beta region is only accessible to glycine
+        assert _classify_rama(120.0, -130.0) == "outlier"
+        assert _classify_rama(120.0, -130.0, "GLY") == "favored"
+
+    def test_proline_phi_is_restricted(self):
+        assert _classify_rama(-65.0, 145.0, "PRO") == "favored"
+        assert _classify_rama(-150.0, 150.0, "PRO") == "outlier"
+
+    def test_angle_edges_are_in_grid(self):
+        for phi, psi in [(-180.0, -180.0), (180.0, 180.0), (179.99, -179.99)]:
+            assert _classify_rama(phi, psi) in {"favored", "allowed", "outlier"}
+
+
+class TestBackbonePhiPsi:
+    def test_recovers_builder_angles(self):
+        report = validate_structure(make_backbone_pdb(n_residues=10, phi=-75.0, psi=145.0))
+        assert report.rama_total == 8
+        for entry in report.rama_data:
+            assert entry["phi"] == pytest.approx(-75.0, abs=0.2)
+            assert entry["psi"] == pytest.approx(145.0, abs=0.2)
+
+    def test_chain_break_gives_nan(self):
+        n_xyz = np.array([[0.0, 0.0, 0.0], [10.0, 0.0, 0.0]])
+        ca_xyz = n_xyz + [1.0, 0.5, 0.0]
+        c_xyz = n_xyz + [2.0, 0.0, 0.3]
+        phi, psi = _backbone_phi_psi(n_xyz, ca_xyz, c_xyz, np.array([0, 0]))
+        assert np.isnan(phi).all() and np.isnan(psi).all()
+
+    def test_separate_chains_are_not_linked(self):
+        pdb = (
+            make_backbone_pdb(n_residues=5, chain="A").replace("END\n", "")
+            + make_backbone_pdb(n_residues=5, chain="B")
+        )
+        report = validate_structure(pdb)
+        # Terminal residues of each chain lack phi or psi
+        assert report.rama_total == 6
+        assert report.chains == ["A", "B"]
+
+
+class TestValidateStructureRama:
+    def test_helix_is_all_favored(self):
+        report = validate_structure(make_backbone_pdb(n_residues=12))
+        assert report.rama_favored == report.rama_total == 10
+        assert report.rama_outlier == 0
+        terminal = [m for m in report.residue_metrics if m["rama_region"] == "unknown"]
+        assert len(terminal) == 2
+
+    def test_proline_outliers_reported(self):
+        report = validate_structure(make_backbone_pdb(n_residues=8, phi=-150.0, psi=150.0, resname="PRO"))
+        assert report.rama_outlier == report.rama_total == 6
+        assert report.rama_outlier_pct == 100.0
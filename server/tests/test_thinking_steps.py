@@ -0,0 +1,67 @@
+"""Tests for server.agents.thinking_steps module."""
+from server.agents.thinking_steps import ThinkingStepParser
+
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def make_trace(steps, lines_per_step=4):
+    parts = []
+    for n in range(1, steps + 1):
+        parts.append(f"{n}. Consider aspect {n} of the structure")
+        for k in range(lines_per_step):
+            parts.append(f"the residue contacts in region {n}.{k} suggest a stable helix packing")
+    return "\n".join(parts) + "\n"
+
+
+def _run(text, size):
+    parser = ThinkingStepParser()
+    events = []
+    for chunk in chunked(text, size):
+        events.extend(parser.feed(chunk))
+    events.extend(parser.finish())
+    return parser, events
+
+
+class TestThinkingStepParser:
+    def test_numbered_steps(self):
+        parser, events = _run("1. Read the input\nlook at chains\n2) Plan\nuse RFdiffusion\nthen MPNN", 5)
+        assert [(s["id"], s["title"], s["content"], s["status"]) for s in parser.steps] == [
+            ("step_1", "Read the input", "look at chains", "completed"),
+            ("step_2", "Plan", "use RFdiffusion\nthen MPNN", "completed"),
+        ]
+        assert events[-1] == parser.steps[-1]
+
+    def test_bullets_and_headers(self):
+        parser, _ = _run("Analysis: check the fold\n- first idea\nmore\n* second idea\n", 3)
+        assert [(s["id"], s["title"], s["content"]) for s in parser.steps] == [
+            ("step_analysis", "Analysis", "check the fold"),
+            ("step_1", "first idea", "more"),
+            ("step_2", "second idea", ""),
+        ]
+
+    def test_completed_step_emitted_before_current(self):
+        parser = ThinkingStepParser()
+        assert parser.feed("1. One\nbody") == [{"id": "step_1", "title": "One", "content": "", "status": "processing"}]
+        events = parser.feed("\n2. Two\n")
+        assert [(e["id"], e["status"]) for e in events] == [("step_1", "completed"), ("step_2", "processing")]
+        assert events[0]["content"] == "body"
+
+    def test_partial_lines_wait_for_newline(self):
+        parser = ThinkingStepParser()
+        assert parser.feed("1. Ti") == []
+        assert parser.feed("tle") == []
+        assert parser.feed("\n")[0]["title"] == "Title"
+
+    def test_repeated_id_replaces_step(self):
+        parser, _ = _run("1. First\n1. Again\n", 4)
+        assert len(parser.steps) == 1
+        assert parser.steps[0]["title"] == "Again"
+
+    def test_chunking_does_not_change_result(self):
+        text = make_trace(20)
+        whole, _ = _run(text, len(text))
+        tiny, _ = _run(text, 3)
+        assert whole.steps == tiny.steps
+        assert len(whole.steps) == 20
@@ -0,0 +1,52 @@
+"""Tests for server.agents.handlers.validation module."""
+import threading
+
+import pytest
+from server.agents.handlers import validation
+from server.agents.handlers.validation import validation_handler
+
+
+@pytest.fixture
+def user_files(tmp_path, monkeypatch):
+    files = {}
+    readers = set()
+
+    def get_user_file_path(file_id, user_id):
+        readers.add(threading.current_thread().name)
+        if file_id not in files:
+            raise FileNotFoundError(file_id)
+        return files[file_id]
+
+    def add(file_id, content):
+        path = tmp_path / f"{file_id}.pdb"
+        path.write_text(content)
+        files[file_id] = path
+
+    monkeypatch.setattr(validation, "get_user_file_path", get_user_file_path)
+    add.readers = readers
+    return add
+
+
+class TestLoadBatchStructures:
+    @pytest.mark.asyncio
+    async def test_reads_files_off_the_event_loop(self, user_files):
+        user_files("f1", "ATOM 1")
+        user_files("f2", "ATOM 2")
+        structures = await validation_handler.load_batch_structures(
+            [{"file_id": "f1"}, {"name": "inline", "pdb_content": "ATOM 3"}, {"file_id": "f2", "name": "two"}],
+            "u1",
+        )
+        assert structures == [("f1", "ATOM 1"), ("inline", "ATOM 3"), ("two", "ATOM 2")]
+        assert threading.current_thread().name not in user_files.readers
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("items, message", [
+        ([], "non-empty"),
+        (["nope"], "must be an object"),
+        ([{"name": "empty"}], "needs pdb_content or file_id"),
+        ([{"pdb_content": "ATOM"}, {"file_id": "missing"}], "structures[1]: file missing could not be loaded"),
+    ])
+    async def test_invalid_items(self, user_files, items, message):
+        with pytest.raises(ValueError) as exc:
+            await validation_handler.load_batch_structures(items, "u1")
+        assert message in str(exc.value)
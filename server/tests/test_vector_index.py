@@ -0,0 +1,89 @@
+"""Tests for server.memory.rag.vector_index module."""
+import asyncio
+import json
+
+import numpy as np
+import pytest
+from server.memory.rag.build_mvs_index import EXAMPLES_DIR, build_index, load_examples, main
+from server.memory.rag.mvs_rag import LocalMVSRAGRetriever, MVS_INDEX_DIR, extract_intent_keywords
+from server.memory.rag.vector_index import HashingEmbedder, VectorIndex, keyword_overlap, tokenize
+
+
+def _index():
+    texts = ["label the ligand red", "show electron density isosurface", "color chain A blue"]
+    return VectorIndex.build(texts, [{"id": i} for i in range(len(texts))])
+
+
+class TestVectorIndex:
+    def test_tokenize_splits_identifiers(self):
+        assert tokenize("labelAsymId label_asym_id the ALA") == ["label", "asym", "id", "label", "asym", "id", "ala"]
+
+    def test_embedding_is_deterministic(self):
+        embedder = HashingEmbedder(64)
+        assert np.array_equal(embedder.raw("ball and stick"), embedder.raw("ball and stick"))
+
+    def test_search_ranks_best_match_first(self):
+        index = _index()
+        rows = index.search("electron density map", top_k=2)
+        assert rows[0][0] == 1
+        assert rows[0][1] > rows[1][1]
+        assert index.search("anything", top_k=0) == []
+
+    def test_save_and_memory_mapped_load(self, tmp_path):
+        _index().save(tmp_path)
+        loaded = VectorIndex.load(tmp_path)
+        assert isinstance(loaded.vectors, np.memmap)
+        assert loaded.records == [{"id": 0}, {"id": 1}, {"id": 2}]
+        assert loaded.search("chain blue", top_k=1)[0][0] == 2
+
+    def test_rejects_other_embedders(self, tmp_path):
+        _index().save(tmp_path)
+        meta = json.loads((tmp_path / "records.json").read_text())
+        meta["embedder"] = "openai"
+        (tmp_path / "records.json").write_text(json.dumps(meta))
+        with pytest.raises(ValueError):
+            VectorIndex.load(tmp_path)
+
+    def test_keyword_overlap(self):
+        assert keyword_overlap(["ligand", "label"], ["label", "color"]) == 0.5
+        assert keyword_overlap([], ["label"]) == 0.0
+
+
+class TestBuildMvsIndex:
+    def test_loads_code_and_jsonl_examples(self, tmp_path):
+        (tmp_path / "ex.js").write_text("// use_case: Label ligand\n// features: ligand, label\nawait mvs.apply();\n")
+        (tmp_path / "more.jsonl").write_text(json.dumps({"code_text": "mvs.canvas({})", "use_case": "Canvas"}) + "\n")
+        records = load_examples([tmp_path])
+        assert [r["use_case"] for r in records] == ["Label ligand", "Canvas"]
+        assert records[0]["features"] == ["ligand", "label"]
+        assert records[0]["code"] == "await mvs.apply();"
+
+    def test_cli_writes_index_with_intents(self, tmp_path):
+        assert main([str(EXAMPLES_DIR), "--out", str(tmp_path)]) == 0
+        index = VectorIndex.load(tmp_path)
+        assert len(index) == len(load_examples([EXAMPLES_DIR]))
+        assert all("intents" in r for r in index.records)
+
+    def test_bundled_index_is_up_to_date(self):
+        bundled = VectorIndex.load(MVS_INDEX_DIR)
+        assert bundled.records == build_index([EXAMPLES_DIR]).records
+
+
+class TestLocalRetriever:
+    def test_retrieves_and_reranks_by_intent(self):
+        retriever = LocalMVSRAGRetriever()
+        assert asyncio.run(retriever.initialize())
+        examples = retriever.search("show the electron density map", top_k=2)
+        assert "volume" in extract_intent_keywords("show the electron density map")
+        assert examples[0]["use_case"].startswith("Show electron density")
+        assert retriever.search("hello there") == []
+
+    def test_enhanced_prompt_includes_examples(self):
+        retriever = LocalMVSRAGRetriever()
+        asyncio.run(retriever.initialize())
+        prompt = asyncio.run(retriever.build_enhanced_prompt("compare two structures", "BASE"))
+        assert prompt.startswith("BASE\n\nRELEVANT WORKING EXAMPLES:")
+        assert "Compare two structures" in prompt
+
+    def test_missing_index(self, tmp_path):
+        assert not asyncio.run(LocalMVSRAGRetriever(tmp_path / "none").initialize())
@@ -4,13 +4,14 @@ NVIDIA NIMS API client for AlphaFold3 protein structure prediction.
 Supports multiple entity types (Protein, DNA, RNA, Ligand) with MSA files.
 """
 
+from __future__ import annotations
+
 import os
 import json
 import time
 import asyncio
 from typing import Dict, Any, Optional, Callable, List, Tuple
 from pathlib import Path
-import aiohttp
 import ssl
 import logging
 
@@ -19,6 +20,18 @@ try:
 except ImportError:
     certifi = None
 
+try:
+    from ...domain.storage.backends import get_storage_backend, storage_key
+    from ...domain.storage.result_storage import write_result_text, write_result_text_async
+    from ...infrastructure.lazy_imports import lazy_module
+except ImportError:
+    from domain.storage.backends import get_storage_backend, storage_key
+    from domain.storage.result_storage import write_result_text, write_result_text_async
+    from infrastructure.lazy_imports import lazy_module
+
+# Imported on first request; aiohttp is slow to import
+aiohttp = lazy_module("aiohttp")
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -116,10 +129,9 @@ class AlphaFold3Client:
         return True, clean_seq
     
     def read_msa_file(self, file_path: str) -> str:
-        """Read MSA file content"""
+        """Read MSA file content from the storage backend"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
+            return get_storage_backend().read_bytes(storage_key(file_path)).decode('utf-8')
         except Exception as e:
             logger.error(f"Error reading MSA file {file_path}: {e}")
             raise
@@ -456,11 +468,20 @@ class AlphaFold3Client:
             results_dir = base_dir / "alphafold3_results"
             results_dir.mkdir(exist_ok=True)
             
-            filepath = results_dir / filename
-            with open(filepath, 'w') as f:
-                f.write(pdb_content)
+            # Written compressed (filename.pdb.gz)
+            filepath = write_result_text(results_dir / filename, pdb_content)
             
             return str(filepath.relative_to(base_dir))
         except Exception as e:
             logger.error(f"Error saving PDB file: {e}")
             raise
+    
+    async def save_pdb_file_async(self, pdb_content: str, filename: str) -> str:
+        """Save PDB content to file without blocking the event loop"""
+        try:
+            base_dir = Path(__file__).parent.parent.parent
+            filepath = await write_result_text_async(base_dir / "alphafold3_results" / filename, pdb_content)
+            return str(filepath.relative_to(base_dir))
+        except Exception as e:
+            logger.error(f"Error saving PDB file: {e}")
+            raise
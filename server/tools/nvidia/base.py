@@ -4,10 +4,11 @@ Base class for NVIDIA Health API clients.
 Provides common functionality for RFdiffusion, AlphaFold, and other NVIDIA Health API integrations.
 """
 
+from __future__ import annotations
+
 import os
 import logging
 from typing import Dict, Any, Optional
-import aiohttp
 import ssl
 
 try:
@@ -15,6 +16,14 @@ try:
 except ImportError:  # pragma: no cover
     certifi = None
 
+try:
+    from ...infrastructure.lazy_imports import lazy_module
+except ImportError:
+    from infrastructure.lazy_imports import lazy_module
+
+# Imported on first request; aiohttp is slow to import
+aiohttp = lazy_module("aiohttp")
+
 logger = logging.getLogger(__name__)
 
 
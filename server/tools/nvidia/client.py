@@ -4,13 +4,14 @@ NVIDIA NIMS API client for AlphaFold2 protein structure prediction.
 Handles authentication, request submission, polling, and result processing.
 """
 
+from __future__ import annotations
+
 import os
 import json
 import time
 import asyncio
 from typing import Dict, Any, Optional, Callable, Tuple
 from pathlib import Path
-import aiohttp
 import ssl
 import logging
 
@@ -19,6 +20,20 @@ try:
 except ImportError:  # pragma: no cover
     certifi = None
 
+try:
+    from ...domain.storage.result_storage import write_result_text, write_result_text_async
+    from ...infrastructure.event_log import LazyJson
+    from ...infrastructure.instrumentation import span, timed
+    from ...infrastructure.lazy_imports import lazy_module
+except ImportError:
+    from domain.storage.result_storage import write_result_text, write_result_text_async
+    from infrastructure.event_log import LazyJson
+    from infrastructure.instrumentation import span, timed
+    from infrastructure.lazy_imports import lazy_module
+
+# Imported on first request; aiohttp is slow to import
+aiohttp = lazy_module("aiohttp")
+
 # Set up file logging for NIMS API calls
 def setup_nims_logging():
     """Set up file logging for NIMS API calls"""
@@ -215,7 +230,8 @@ class NIMSClient:
                 while True:
                     attempt += 1
                     try:
-                        response = await session.post(self.base_url, headers=self.headers, json=payload)
+                        async with span("nims.submit"):
+                            response = await session.post(self.base_url, headers=self.headers, json=payload)
                     except Exception as e:
                         if attempt <= self.post_retries:
                             backoff = min(2 ** attempt, 5)
@@ -231,7 +247,12 @@ class NIMSClient:
                     if response.status == 200:
                         # Immediate response (rare)
                         result_data = await response.json()
-                        api_logger.info(f"Immediate completion - Response Body: {json.dumps(result_data, indent=2)}")
+                        # Bodies carry whole PDBs: keys at INFO, the (capped) body only at DEBUG
+                        api_logger.info(
+                            "Immediate completion - Response keys: %s",
+                            list(result_data) if isinstance(result_data, dict) else type(result_data).__name__,
+                        )
+                        api_logger.debug("Immediate completion - Response Body: %s", LazyJson(result_data))
                         if progress_callback:
                             progress_callback("Folding completed!", 100)
                         return {"status": "completed", "data": result_data}
@@ -299,6 +320,7 @@ class NIMSClient:
             logger.error(error_details)
             return {"error": str(e), "status": "exception", "details": error_details}
     
+    @timed("nims.poll")
     async def _poll_for_results(
         self,
         session: aiohttp.ClientSession,
@@ -485,9 +507,8 @@ class NIMSClient:
             results_dir = base_dir / "alphafold_results"
             results_dir.mkdir(exist_ok=True)
             
-            filepath = results_dir / filename
-            with open(filepath, 'w') as f:
-                f.write(pdb_content)
+            # Written compressed (filename.pdb.gz)
+            filepath = write_result_text(results_dir / filename, pdb_content)
             
             # Return relative path from server directory for consistency with proteinmpnn
             return str(filepath.relative_to(base_dir))
@@ -496,6 +517,16 @@ class NIMSClient:
             logger.error(f"Error saving PDB file: {e}")
             raise
 
+    async def save_pdb_file_async(self, pdb_content: str, filename: str) -> str:
+        """Save PDB content to file without blocking the event loop"""
+        try:
+            base_dir = Path(__file__).parent
+            filepath = await write_result_text_async(base_dir / "alphafold_results" / filename, pdb_content)
+            return str(filepath.relative_to(base_dir))
+        except Exception as e:
+            logger.error(f"Error saving PDB file: {e}")
+            raise
+
     def estimate_folding_time(self, sequence: str, **params) -> str:
         """Estimate folding time based on sequence length and parameters"""
         seq_len = len(sequence.replace(' ', ''))
@@ -10,7 +10,6 @@ import logging
 import os
 from typing import Any, Dict, Optional, Tuple
 
-import aiohttp
 import ssl
 
 try:
@@ -18,6 +17,14 @@ try:
 except ImportError:
     certifi = None
 
+try:
+    from ...infrastructure.lazy_imports import lazy_module
+except ImportError:
+    from infrastructure.lazy_imports import lazy_module
+
+# Imported on first request; aiohttp is slow to import
+aiohttp = lazy_module("aiohttp")
+
 logger = logging.getLogger(__name__)
 
 # Valid amino acid single-letter codes
@@ -10,13 +10,22 @@ import ssl
 from pathlib import Path
 from typing import Any, Dict, Optional, Tuple
 
-import aiohttp
 
 try:
     import certifi
 except ImportError:  # pragma: no cover - optional dependency
     certifi = None
 
+try:
+    from ...infrastructure.event_log import LazyJson
+    from ...infrastructure.lazy_imports import lazy_module
+except ImportError:
+    from infrastructure.event_log import LazyJson
+    from infrastructure.lazy_imports import lazy_module
+
+# Imported on first request; aiohttp is slow to import
+aiohttp = lazy_module("aiohttp")
+
 
 def setup_proteinmpnn_logging() -> logging.Logger:
     """Configure dedicated logfile for ProteinMPNN API calls."""
@@ -133,7 +142,7 @@ class ProteinMPNNClient:
             payload.get("sampling_temp"),
             chain_ids,
         )
-        api_logger.debug("Payload preview: %s", json.dumps({k: v for k, v in payload.items() if k != "input_pdb"})[:500])
+        api_logger.debug("Payload preview: %s", LazyJson({k: v for k, v in payload.items() if k != "input_pdb"}, max_chars=500))
 
         ssl_context = ssl.create_default_context()
         if certifi is not None:
@@ -162,7 +171,8 @@ class ProteinMPNNClient:
                         )
                         if response.status in (200, 201, 202):
                             data = await response.json()
-                            api_logger.info("ProteinMPNN API response: %s", json.dumps(data, indent=2)[:1000])
+                            api_logger.info("ProteinMPNN API response keys: %s", list(data) if isinstance(data, dict) else type(data).__name__)
+                            api_logger.debug("ProteinMPNN API response: %s", LazyJson(data, max_chars=1000))
                             api_logger.info("ProteinMPNN response headers: %s", dict(response.headers))
                             
                             # ProteinMPNN is synchronous - results are returned immediately
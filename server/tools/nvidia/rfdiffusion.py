@@ -10,11 +10,20 @@ import time
 import asyncio
 from typing import Dict, Any, Optional, List, Callable, Tuple
 from pathlib import Path
-import aiohttp
 import ssl
 import logging
 import requests
 
+try:
+    from ...domain.storage.result_storage import write_result_text
+    from ...infrastructure.lazy_imports import lazy_module
+except ImportError:
+    from domain.storage.result_storage import write_result_text
+    from infrastructure.lazy_imports import lazy_module
+
+# Imported on first request; aiohttp is slow to import
+aiohttp = lazy_module("aiohttp")
+
 logger = logging.getLogger(__name__)
 
 class RFdiffusionClient:
@@ -311,9 +320,8 @@ class RFdiffusionClient:
             results_dir = base_dir / "rfdiffusion_results"
             results_dir.mkdir(exist_ok=True)
             
-            filepath = results_dir / filename
-            with open(filepath, 'w') as f:
-                f.write(pdb_content)
+            # Written compressed (filename.pdb.gz)
+            filepath = write_result_text(results_dir / filename, pdb_content)
             
             # Return relative path from server directory for consistency with proteinmpnn
             return str(filepath.relative_to(base_dir))
@@ -0,0 +1,189 @@
+"""
+Batch validation of many structures across the shared process pool.
+
+Pipeline outputs and design sweeps produce tens of models that all need
+grading. ``stream_validate_structures`` fans them out to worker processes and
+yields each result as soon as it finishes; ``rank_results`` turns the
+collected results into a summary table ordered best-first.
+"""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from .structure_validator import ValidationReport, validate_structure
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on structures accepted in one batch request.
+MAX_BATCH_SIZE: int = 100
+
+
+@dataclass
+class BatchValidationResult:
+    """Outcome of validating one structure in a batch."""
+
+    index: int
+    name: str
+    report: Optional[ValidationReport] = None
+    error: Optional[str] = None
+    elapsed_ms: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.report is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for the API; the full report is nested under ``report``."""
+        return {
+            "index": self.index,
+            "name": self.name,
+            "ok": self.ok,
+            "error": self.error,
+            "elapsed_ms": round(self.elapsed_ms, 1),
+            "report": self.report.to_dict() if self.report else None,
+        }
+
+
+def _validate_one(index: int, name: str, pdb_content: str) -> BatchValidationResult:
+    """Worker entry point; must stay module-level so it can be pickled."""
+    started = time.perf_counter()
+    try:
+        report = validate_structure(pdb_content)
+        return BatchValidationResult(
+            index=index,
+            name=name,
+            report=report,
+            elapsed_ms=(time.perf_counter() - started) * 1000,
+        )
+    except Exception as exc:
+        return BatchValidationResult(
+            index=index,
+            name=name,
+            error=str(exc),
+            elapsed_ms=(time.perf_counter() - started) * 1000,
+        )
+
+
+async def _run_on_compute_pool(index: int, name: str, pdb_content: str) -> BatchValidationResult:
+    """Validate one structure on the shared compute process pool."""
+    try:
+        from ...infrastructure.compute import ComputeTimeoutError, compute_executor
+        from ...infrastructure.instrumentation import span
+    except ImportError:
+        from infrastructure.compute import ComputeTimeoutError, compute_executor
+        from infrastructure.instrumentation import span
+    try:
+        async with span("validate_structure"):
+            return await compute_executor.run(
+                _validate_one, index, name, pdb_content, kind="process", label="validate_structure"
+            )
+    except ComputeTimeoutError as exc:
+        return BatchValidationResult(index=index, name=name, error=str(exc))
+
+
+async def stream_validate_structures(
+    structures: Sequence[Tuple[str, str]],
+    executor: Optional[Executor] = None,
+) -> AsyncIterator[BatchValidationResult]:
+    """
+    Validate ``(name, pdb_content)`` pairs concurrently, yielding in completion order.
+
+    Parameters
+    ----------
+    structures : sequence of (name, pdb_content)
+        Structures to validate. Order is preserved in ``BatchValidationResult.index``.
+    executor : Executor, optional
+        Pool to run on. Defaults to the shared compute process pool, which
+        also applies the configured per-task timeout.
+    """
+    if len(structures) > MAX_BATCH_SIZE:
+        raise ValueError(f"Batch too large: {len(structures)} structures (max {MAX_BATCH_SIZE})")
+
+    if executor is None:
+        pending = [
+            asyncio.ensure_future(_run_on_compute_pool(index, name, content))
+            for index, (name, content) in enumerate(structures)
+        ]
+    else:
+        loop = asyncio.get_running_loop()
+        pending = [
+            loop.run_in_executor(executor, _validate_one, index, name, content)
+            for index, (name, content) in enumerate(structures)
+        ]
+    try:
+        for next_done in asyncio.as_completed(pending):
+            yield await next_done
+    finally:
+        # Client went away mid-stream: drop work that has not started yet
+        for fut in pending:
+            fut.cancel()
+
+
+def summarize_result(result: BatchValidationResult) -> Dict[str, Any]:
+    """One row of the ranking table."""
+    row: Dict[str, Any] = {"index": result.index, "name": result.name, "ok": result.ok}
+    if result.report is None:
+        row["error"] = result.error
+        return row
+    report = result.report
+    row.update(
+        {
+            "grade": report.grade,
+            "overall_score": report.overall_score,
+            "plddt_mean": report.plddt_mean,
+            "rama_favored_pct": report.rama_favored_pct,
+            "rama_outlier_pct": report.rama_outlier_pct,
+            "clash_count": report.clash_count,
+            "total_residues": report.total_residues,
+        }
+    )
+    return row
+
+
+def rank_results(results: Sequence[BatchValidationResult]) -> List[Dict[str, Any]]:
+    """
+    Build the summary table, best structure first.
+
+    Sorted by overall_score, then mean pLDDT, then fewest clashes. Structures
+    that failed validation are listed last with ``rank`` set to None.
+    """
+    ok = sorted(
+        (r for r in results if r.ok),
+        key=lambda r: (-r.report.overall_score, -r.report.plddt_mean, r.report.clash_count, r.index),
+    )
+    failed = sorted((r for r in results if not r.ok), key=lambda r: r.index)
+
+    table: List[Dict[str, Any]] = []
+    for rank, result in enumerate(ok, start=1):
+        row = summarize_result(result)
+        row["rank"] = rank
+        table.append(row)
+    for result in failed:
+        row = summarize_result(result)
+        row["rank"] = None
+        table.append(row)
+    return table
+
+
+async def validate_structures_batch(
+    structures: Sequence[Tuple[str, str]],
+    executor: Optional[Executor] = None,
+) -> Dict[str, Any]:
+    """Validate a batch and return all results plus the ranked summary."""
+    started = time.perf_counter()
+    results = [r async for r in stream_validate_structures(structures, executor=executor)]
+    results.sort(key=lambda r: r.index)
+    logger.info(
+        "Batch validation complete: %d structures, %d failed, %.0f ms",
+        len(results),
+        sum(1 for r in results if not r.ok),
+        (time.perf_counter() - started) * 1000,
+    )
+    return {
+        "results": [r.to_dict() for r in results],
+        "ranking": rank_results(results),
+    }
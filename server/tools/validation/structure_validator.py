@@ -9,13 +9,12 @@ suggestions.
 
 import io
 import logging
-import math
 from dataclasses import dataclass, field, asdict
+from functools import lru_cache
 from typing import Any, Dict, List, Optional, Tuple
 
 try:
-    from Bio.PDB import PDBParser, NeighborSearch, PPBuilder, is_aa
-    from Bio.PDB.vectors import calc_dihedral
+    from Bio.PDB import PDBParser, NeighborSearch, is_aa
     HAS_BIOPYTHON = True
 except ImportError:
     HAS_BIOPYTHON = False
@@ -49,6 +48,43 @@ RAMA_REGIONS: Dict[str, Dict[str, List[Tuple[float, float, float, float]]]] = {
     },
 }
 
+# Glycine has no side chain, so its map is roughly centrosymmetric: every
+# general region is also accessible at (-phi, -psi).
+GLY_RAMA_REGIONS: Dict[str, Dict[str, List[Tuple[float, float, float, float]]]] = {
+    **RAMA_REGIONS,
+    **{
+        f"{name}_mirror": {
+            level: [(-phi_max, -phi_min, -psi_max, -psi_min) for phi_min, phi_max, psi_min, psi_max in boxes]
+            for level, boxes in region.items()
+        }
+        for name, region in RAMA_REGIONS.items()
+    },
+}
+
+# Proline's ring pins phi near -65 degrees; only the alpha and
+# polyproline-II/beta psi bands are populated.
+PRO_RAMA_REGIONS: Dict[str, Dict[str, List[Tuple[float, float, float, float]]]] = {
+    "alpha_helix": {
+        "favored": [(-90.0, -45.0, -60.0, -10.0)],
+        "allowed": [(-100.0, -40.0, -75.0, 20.0)],
+    },
+    "polyproline": {
+        "favored": [(-90.0, -45.0, 110.0, 180.0)],
+        "allowed": [(-100.0, -40.0, 50.0, 180.0), (-100.0, -40.0, -180.0, -160.0)],
+    },
+}
+
+# Resolution (degrees) of the precomputed Ramachandran lookup grids.
+RAMA_GRID_STEP: float = 2.0
+
+# Grid cell values
+_RAMA_OUTLIER, _RAMA_ALLOWED, _RAMA_FAVORED = 0, 1, 2
+_RAMA_LABELS = ("outlier", "allowed", "favored")
+
+# Maximum C(i)-N(i+1) distance (Angstroms) for consecutive residues to be
+# treated as peptide-bonded, matching Bio.PDB.PPBuilder.
+PEPTIDE_BOND_MAX: float = 1.8
+
 # Two non-bonded heavy atoms closer than this (Angstroms) are clashing.
 CLASH_THRESHOLD: float = 2.2
 
@@ -117,29 +153,104 @@ class ValidationReport:
 # Helper functions
 # ---------------------------------------------------------------------------
 
-def _in_region(
-    phi: float, psi: float, bounds: List[Tuple[float, float, float, float]]
-) -> bool:
-    """Return True if (phi, psi) falls inside any of the rectangular *bounds*."""
-    for phi_min, phi_max, psi_min, psi_max in bounds:
-        if phi_min <= phi <= phi_max and psi_min <= psi <= psi_max:
-            return True
-    return False
-
+@lru_cache(maxsize=None)
+def _rama_grid(residue_class: str) -> "np.ndarray":
+    """
+    Build (once) the classification grid for ``general``, ``gly`` or ``pro``.
 
-def _classify_rama(phi: Optional[float], psi: Optional[float]) -> str:
+    Cell ``[i, j]`` covers phi in ``[-180 + i*step, -180 + (i+1)*step)`` and the
+    same for psi; it holds the best region level whose boxes contain its centre.
+    """
+    regions = {"gly": GLY_RAMA_REGIONS, "pro": PRO_RAMA_REGIONS}.get(residue_class, RAMA_REGIONS)
+    n = int(round(360.0 / RAMA_GRID_STEP))
+    centers = -180.0 + (np.arange(n) + 0.5) * RAMA_GRID_STEP
+    phi, psi = np.meshgrid(centers, centers, indexing="ij")
+
+    grid = np.full((n, n), _RAMA_OUTLIER, dtype=np.uint8)
+    for level, value in (("allowed", _RAMA_ALLOWED), ("favored", _RAMA_FAVORED)):
+        for region in regions.values():
+            for phi_min, phi_max, psi_min, psi_max in region[level]:
+                inside = (phi >= phi_min) & (phi <= phi_max) & (psi >= psi_min) & (psi <= psi_max)
+                grid[inside] = np.maximum(grid[inside], value)
+    return grid
+
+
+def _rama_class(residue_name: Optional[str]) -> str:
+    if residue_name == "GLY":
+        return "gly"
+    if residue_name == "PRO":
+        return "pro"
+    return "general"
+
+
+def _classify_rama_array(
+    phi: "np.ndarray", psi: "np.ndarray", residue_classes: "np.ndarray"
+) -> "np.ndarray":
+    """Vectorized grid lookup; returns region level codes for each (phi, psi)."""
+    n = int(round(360.0 / RAMA_GRID_STEP))
+    phi_idx = np.clip(((phi + 180.0) // RAMA_GRID_STEP).astype(np.int64), 0, n - 1)
+    psi_idx = np.clip(((psi + 180.0) // RAMA_GRID_STEP).astype(np.int64), 0, n - 1)
+    codes = np.full(phi.shape, _RAMA_OUTLIER, dtype=np.uint8)
+    for residue_class in ("general", "gly", "pro"):
+        mask = residue_classes == residue_class
+        if mask.any():
+            codes[mask] = _rama_grid(residue_class)[phi_idx[mask], psi_idx[mask]]
+    return codes
+
+
+def _classify_rama(
+    phi: Optional[float], psi: Optional[float], residue_name: Optional[str] = None
+) -> str:
     """Classify a phi/psi pair into favored / allowed / outlier."""
     if phi is None or psi is None:
         return "unknown"
+    code = _classify_rama_array(
+        np.array([phi], dtype=float),
+        np.array([psi], dtype=float),
+        np.array([_rama_class(residue_name)]),
+    )[0]
+    return _RAMA_LABELS[code]
+
+
+def _dihedrals(
+    p0: "np.ndarray", p1: "np.ndarray", p2: "np.ndarray", p3: "np.ndarray"
+) -> "np.ndarray":
+    """Dihedral angles in degrees for rows of four (N, 3) coordinate arrays."""
+    b0 = p0 - p1
+    b1 = p2 - p1
+    b2 = p3 - p2
+    b1 = b1 / np.linalg.norm(b1, axis=1, keepdims=True)
+    v = b0 - np.sum(b0 * b1, axis=1, keepdims=True) * b1
+    w = b2 - np.sum(b2 * b1, axis=1, keepdims=True) * b1
+    x = np.sum(v * w, axis=1)
+    y = np.sum(np.cross(b1, v) * w, axis=1)
+    return np.degrees(np.arctan2(y, x))
+
+
+def _backbone_phi_psi(
+    n_xyz: "np.ndarray", ca_xyz: "np.ndarray", c_xyz: "np.ndarray", chain_idx: "np.ndarray"
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Compute phi/psi for every residue in one vectorized pass.
 
-    # Check favored regions first, then allowed.
-    for _region_name, region_data in RAMA_REGIONS.items():
-        if _in_region(phi, psi, region_data["favored"]):
-            return "favored"
-    for _region_name, region_data in RAMA_REGIONS.items():
-        if _in_region(phi, psi, region_data["allowed"]):
-            return "allowed"
-    return "outlier"
+    Residues must be in chain order. Angles across a chain break (different
+    chain, or C-N gap longer than a peptide bond) are NaN.
+    """
+    count = len(ca_xyz)
+    phi = np.full(count, np.nan)
+    psi = np.full(count, np.nan)
+    if count < 2:
+        return phi, psi
+
+    # linked[i]: residue i is peptide-bonded to residue i + 1
+    linked = (chain_idx[:-1] == chain_idx[1:]) & (
+        np.linalg.norm(c_xyz[:-1] - n_xyz[1:], axis=1) < PEPTIDE_BOND_MAX
+    )
+    all_psi = _dihedrals(n_xyz[:-1], ca_xyz[:-1], c_xyz[:-1], n_xyz[1:])
+    all_phi = _dihedrals(c_xyz[:-1], n_xyz[1:], ca_xyz[1:], c_xyz[1:])
+    psi[:-1] = np.where(linked, all_psi, np.nan)
+    phi[1:] = np.where(linked, all_phi, np.nan)
+    return phi, psi
 
 
 def _compute_grade(score: float) -> str:
@@ -377,8 +488,13 @@ def validate_structure(pdb_content: str) -> ValidationReport:
     plddt_scores: List[float] = []
     all_atoms = []
     chain_ids: set = set()
+    # Backbone N/CA/C coordinates of residues with a complete backbone, in chain order
+    backbone_keys: List[Tuple[str, int]] = []
+    backbone_names: List[str] = []
+    backbone_chain_idx: List[int] = []
+    backbone_xyz: List[Any] = []
 
-    for chain in model:
+    for chain_index, chain in enumerate(model):
         chain_id = chain.id
         chain_ids.add(chain_id)
         for residue in chain:
@@ -401,6 +517,14 @@ def validate_structure(pdb_content: str) -> ValidationReport:
                 plddt=plddt_val,
             )
 
+            if "N" in residue and "CA" in residue and "C" in residue:
+                backbone_keys.append(key)
+                backbone_names.append(resname)
+                backbone_chain_idx.append(chain_index)
+                backbone_xyz.append(
+                    (residue["N"].coord, residue["CA"].coord, residue["C"].coord)
+                )
+
             for atom in residue:
                 all_atoms.append(atom)
 
@@ -436,9 +560,8 @@ def validate_structure(pdb_content: str) -> ValidationReport:
     ]
 
     # ------------------------------------------------------------------
-    # Ramachandran analysis via PPBuilder
+    # Ramachandran analysis: vectorized dihedrals + grid lookup
     # ------------------------------------------------------------------
-    ppb = PPBuilder()
     rama_favored = 0
     rama_allowed = 0
     rama_outlier = 0
@@ -446,42 +569,49 @@ def validate_structure(pdb_content: str) -> ValidationReport:
     rama_data: List[Dict[str, Any]] = []
     rama_outlier_residues: List[Tuple[str, int]] = []
 
-    for pp in ppb.build_peptides(model):
-        phi_psi_list = pp.get_phi_psi_list()
-        residues_in_pp = list(pp)
-        for residue, (phi_raw, psi_raw) in zip(residues_in_pp, phi_psi_list):
-            chain_id = residue.get_parent().id
-            resnum = residue.id[1]
-            key = (chain_id, resnum)
-
-            phi_deg = math.degrees(phi_raw) if phi_raw is not None else None
-            psi_deg = math.degrees(psi_raw) if psi_raw is not None else None
-
-            classification = _classify_rama(phi_deg, psi_deg)
-
-            if key in residue_map:
-                residue_map[key].phi = phi_deg
-                residue_map[key].psi = psi_deg
-                residue_map[key].rama_region = classification
+    if backbone_xyz:
+        xyz = np.asarray(backbone_xyz, dtype=np.float64)  # (residues, 3 atoms, 3)
+        phi_arr, psi_arr = _backbone_phi_psi(
+            xyz[:, 0], xyz[:, 1], xyz[:, 2], np.asarray(backbone_chain_idx)
+        )
+        has_phi = ~np.isnan(phi_arr)
+        has_psi = ~np.isnan(psi_arr)
+        complete = has_phi & has_psi
+        codes = _classify_rama_array(
+            np.where(complete, phi_arr, 0.0),
+            np.where(complete, psi_arr, 0.0),
+            np.array([_rama_class(name) for name in backbone_names]),
+        )
 
-            if classification == "unknown":
+        rama_total = int(complete.sum())
+        rama_favored = int(np.sum(complete & (codes == _RAMA_FAVORED)))
+        rama_allowed = int(np.sum(complete & (codes == _RAMA_ALLOWED)))
+        rama_outlier = int(np.sum(complete & (codes == _RAMA_OUTLIER)))
+
+        phi_list = phi_arr.tolist()
+        psi_list = psi_arr.tolist()
+        for i, key in enumerate(backbone_keys):
+            phi_deg = phi_list[i] if has_phi[i] else None
+            psi_deg = psi_list[i] if has_psi[i] else None
+            metrics = residue_map[key]
+            metrics.phi = phi_deg
+            metrics.psi = psi_deg
+
+            if not complete[i]:
                 # Terminal residues with missing phi or psi -- skip counting
+                metrics.rama_region = "unknown"
                 continue
 
-            rama_total += 1
-            if classification == "favored":
-                rama_favored += 1
-            elif classification == "allowed":
-                rama_allowed += 1
-            else:
-                rama_outlier += 1
-                rama_outlier_residues.append((chain_id, resnum))
+            classification = _RAMA_LABELS[codes[i]]
+            metrics.rama_region = classification
+            if classification == "outlier":
+                rama_outlier_residues.append(key)
 
             rama_data.append(
                 {
-                    "chain_id": chain_id,
-                    "residue_number": resnum,
-                    "residue_name": residue.resname.strip(),
+                    "chain_id": key[0],
+                    "residue_number": key[1],
+                    "residue_name": backbone_names[i],
                     "phi": phi_deg,
                     "psi": psi_deg,
                     "region": classification,
@@ -75,7 +75,8 @@ export const AttachmentMenu: React.FC<AttachmentMenuProps> = ({
 
     for (const file of files) {
       // Validate file type
-      if (!file.name.toLowerCase().endsWith('.pdb')) {
+      const lowerName = file.name.toLowerCase();
+      if (!lowerName.endsWith('.pdb') && !lowerName.endsWith('.pdb.gz')) {
         onError(`Please select PDB files only. ${file.name} is not a PDB file.`);
         continue;
       }
@@ -211,7 +212,7 @@ export const AttachmentMenu: React.FC<AttachmentMenuProps> = ({
       <input
         ref={fileInputRef}
         type="file"
-        accept=".pdb"
+        accept=".pdb,.gz"
         multiple
         onChange={handleFileInputChange}
         className="hidden"
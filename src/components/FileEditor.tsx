@@ -44,7 +44,7 @@ export const FileEditor: React.FC<FileEditorProps> = ({ fileId, filename, fileTy
 
   const handleDownload = async () => {
     try {
-      const response = await api.get(`/files/${fileId}`, {
+      const response = await api.get(`/files/${fileId}?format=raw`, {
         responseType: 'blob',
       });
       
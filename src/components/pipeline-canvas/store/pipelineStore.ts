@@ -192,7 +192,7 @@ export const restoreExecutionLogsIfNeeded = async (): Promise<void> => {
   const { currentPipeline, currentExecution } = usePipelineStore.getState();
   if (!currentPipeline?.id || currentExecution) return;
   try {
-    const res = await deps.apiClient.get(`/pipelines/${currentPipeline.id}/executions`);
+    const res = await deps.apiClient.get(`/pipelines/${currentPipeline.id}/executions?limit=1&full=true`);
     const executions = res.data?.executions || [];
     if (executions.length > 0) {
       const latest = executions[0];
@@ -701,7 +701,7 @@ export const usePipelineStore = create<PipelineState>()(
             // Fetch and restore latest execution logs for post-refresh viewing
             if (effectiveDeps.apiClient) {
               try {
-                const res = await effectiveDeps.apiClient.get(`/pipelines/${pipelineId}/executions`);
+                const res = await effectiveDeps.apiClient.get(`/pipelines/${pipelineId}/executions?limit=1&full=true`);
                 const executions = res.data?.executions || [];
                 if (executions.length > 0) {
                   const latest = executions[0];
@@ -747,7 +747,7 @@ export const usePipelineStore = create<PipelineState>()(
           // Try to fetch execution logs from backend (pipeline may have been synced)
           if (effectiveDeps.apiClient) {
             try {
-              const res = await effectiveDeps.apiClient.get(`/pipelines/${pipelineId}/executions`);
+              const res = await effectiveDeps.apiClient.get(`/pipelines/${pipelineId}/executions?limit=1&full=true`);
               const executions = res.data?.executions || [];
               if (executions.length > 0) {
                 const latest = executions[0];
@@ -1339,7 +1339,7 @@ export const usePipelineStore = create<PipelineState>()(
               // Fetch execution logs for the restored pipeline (survives page refresh)
               const { apiClient } = getDependencies();
               if (parsed.id && apiClient) {
-                apiClient.get(`/pipelines/${parsed.id}/executions`)
+                apiClient.get(`/pipelines/${parsed.id}/executions?limit=1&full=true`)
                   .then((res) => {
                     const executions = res.data?.executions || [];
                     if (executions.length > 0) {
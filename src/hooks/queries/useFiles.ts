@@ -11,11 +11,13 @@ export interface FileMetadata {
   download_url: string;
   metadata?: Record<string, any>;
   file_path?: string;
+  created_at?: string;
 }
 
 interface FilesResponse {
   status: string;
   files: FileMetadata[];
+  next_cursor?: string | null;
 }
 
 /**